@@ -12,6 +12,13 @@ CREATE TABLE sensor_data (
     ventilation_on_duration_seconds FLOAT,
     ventilation_off_duration_seconds FLOAT
 );
+-- Valeurs brutes des capteurs (avant filtrage), à côté des valeurs filtrées. À appliquer aussi sur une
+-- base existante; sans ces colonnes, seules les valeurs filtrées sont enregistrées.
+ALTER TABLE sensor_data
+    ADD COLUMN IF NOT EXISTS temperature_raw FLOAT,
+    ADD COLUMN IF NOT EXISTS humidity_raw FLOAT,
+    ADD COLUMN IF NOT EXISTS co2_raw FLOAT;
+
 -- visioner les donner et la table
 SELECT * FROM sensor_data;
 
@@ -20,4 +27,68 @@ DELETE FROM sensor_data;
 
 -- Modifier la table pour supprimer la colonne id
 ALTER TABLE sensor_data
-DROP COLUMN id;
\ No newline at end of file
+DROP COLUMN id;
+
+-- Table centrale (base de la flotte): reçoit les données répliquées de chaque serre.
+-- La clé primaire (greenhouse_id, timestamp) rend les upserts de l'agent de réplication idempotents.
+CREATE TABLE sensor_data_central (
+    greenhouse_id TEXT NOT NULL,
+    source_seq BIGINT,
+    timestamp TIMESTAMP NOT NULL,
+    temperature FLOAT,
+    humidity FLOAT,
+    co2 FLOAT,
+    humidifier_active BOOLEAN,
+    ventilation_active BOOLEAN,
+    leds_active BOOLEAN,
+    humidifier_on_duration_seconds FLOAT,
+    humidifier_off_duration_seconds FLOAT,
+    ventilation_on_duration_seconds FLOAT,
+    ventilation_off_duration_seconds FLOAT,
+    PRIMARY KEY (greenhouse_id, timestamp)
+);
+
+-- Point de collecte HTTP (/api/ingest): événements d'actionneurs et dernière séquence de lot par serre.
+CREATE TABLE actuator_events (
+    greenhouse_id TEXT NOT NULL,
+    timestamp TIMESTAMP NOT NULL,
+    device TEXT NOT NULL,
+    state BOOLEAN NOT NULL,
+    duration_seconds FLOAT,
+    PRIMARY KEY (greenhouse_id, timestamp, device)
+);
+
+CREATE TABLE ingest_sequences (
+    greenhouse_id TEXT PRIMARY KEY,
+    last_batch_seq BIGINT NOT NULL
+);
+
+-- Séquences de lots reçues (rejeux reconnus, lots hors ordre insérés). Migration d'une base existante:
+-- créer cette table; les lots antérieurs rejoués sont réécrits à l'identique (upserts).
+CREATE TABLE ingest_batches (
+    greenhouse_id TEXT NOT NULL,
+    batch_seq BIGINT NOT NULL,
+    received_at TIMESTAMP NOT NULL DEFAULT now(),
+    PRIMARY KEY (greenhouse_id, batch_seq)
+);
+
+-- Index pour les exports par période (export_sensor_data.py, /api/export): évite de parcourir toute la table.
+CREATE INDEX IF NOT EXISTS idx_sensor_data_timestamp ON sensor_data (timestamp);
+
+-- Agrégats horaires conservés plus longtemps que les données brutes (src/utils/retention.py).
+CREATE TABLE sensor_data_hourly (
+    hour TIMESTAMP PRIMARY KEY,
+    sample_count INTEGER NOT NULL,
+    temperature_avg FLOAT, temperature_min FLOAT, temperature_max FLOAT,
+    humidity_avg FLOAT, humidity_min FLOAT, humidity_max FLOAT,
+    co2_avg FLOAT, co2_min FLOAT, co2_max FLOAT,
+    humidifier_active_ratio FLOAT,
+    ventilation_active_ratio FLOAT,
+    leds_active_ratio FLOAT
+);
+
+-- Optionnel: partitionner sensor_data par mois. La rétention supprime alors des partitions
+-- entières (DETACH + DROP, instantané) au lieu de supprimer des lignes par lots.
+-- CREATE TABLE sensor_data (...mêmes colonnes...) PARTITION BY RANGE (timestamp);
+-- CREATE TABLE sensor_data_2024_05 PARTITION OF sensor_data
+--     FOR VALUES FROM ('2024-05-01') TO ('2024-06-01');
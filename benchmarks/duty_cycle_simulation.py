@@ -0,0 +1,116 @@
+# benchmarks/duty_cycle_simulation.py
+"""
+Simulation comparative: humidificateur en tout-ou-rien (seuils ON/OFF actuels)
+contre le mode rapport cyclique (PI à modulation temporelle).
+
+Modèle thermique simple au pas d'une seconde:
+  - l'humidité relaxe vers l'humidité extérieure (fuites, ventilation naturelle);
+  - l'humidificateur injecte de la vapeur via un retard du premier ordre (brumisation,
+    mélange de l'air), source du dépassement en tout-ou-rien;
+  - la logique est évaluée toutes les `--logic-interval` secondes, comme la boucle du contrôleur.
+
+Affiche en JSON, pour chaque stratégie: écart-type, bande p5-p95, min/max de l'humidité
+(après une heure de mise en régime) et le nombre de commutations du relais.
+
+Exemple:
+    python benchmarks/duty_cycle_simulation.py --hours 24 --period 480 --kp 0.05 --ki 0.0001
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import config
+from src.core.duty_cycle import DutyCycleRegulator
+
+
+class GreenhouseHumidityModel:
+    def __init__(self, initial: float, outside: float, leak_tau: float, mist_gain: float, mist_tau: float, noise: float):
+        self.humidity = initial
+        self.outside = outside
+        self.leak_tau = leak_tau
+        self.mist_gain = mist_gain
+        self.mist_tau = mist_tau
+        self.noise = noise
+        self._mist = 0.0 # Apport effectif de vapeur (retardé), en %/s
+
+    def step(self, humidifier_on: bool, dt: float = 1.0):
+        target = self.mist_gain if humidifier_on else 0.0
+        self._mist += (target - self._mist) * dt / self.mist_tau
+        self.humidity += (self._mist - (self.humidity - self.outside) / self.leak_tau) * dt
+        self.humidity = min(self.humidity, 99.0)
+
+    def read(self) -> float:
+        return self.humidity + random.gauss(0.0, self.noise)
+
+
+def simulate(strategy: str, args) -> dict:
+    random.seed(args.seed)
+    model = GreenhouseHumidityModel(args.initial, args.outside, args.leak_tau, args.mist_gain, args.mist_tau, args.noise)
+    regulator = DutyCycleRegulator(args.kp, args.ki, period_seconds=args.period, min_pulse_seconds=args.min_pulse)
+    setpoint = (args.seuil_on + args.seuil_off) / 2.0
+    state, pulse_end, transitions = False, None, 0
+    samples = []
+    for t in range(int(args.hours * 3600)):
+        if t % args.logic_interval == 0:
+            measure = model.read()
+            if strategy == "tout_ou_rien":
+                desired = True if measure < args.seuil_on else (False if measure >= args.seuil_off else state)
+                pulse_end = None
+            else:
+                remaining_on = regulator.update(setpoint - measure, float(t))
+                desired = remaining_on > 0
+                pulse_end = t + remaining_on if desired and not regulator.is_continuous else None
+            if desired != state:
+                state, transitions = desired, transitions + 1
+        if pulse_end is not None and t >= pulse_end:
+            state, pulse_end, transitions = False, None, transitions + 1
+        model.step(state)
+        if t >= 3600:
+            samples.append(model.humidity)
+    samples.sort()
+    return {
+        "stddev": round(statistics.pstdev(samples), 2),
+        "p5": round(samples[int(len(samples) * 0.05)], 2),
+        "p95": round(samples[int(len(samples) * 0.95)], 2),
+        "band_p5_p95": round(samples[int(len(samples) * 0.95)] - samples[int(len(samples) * 0.05)], 2),
+        "min": round(samples[0], 2),
+        "max": round(samples[-1], 2),
+        "mean": round(statistics.fmean(samples), 2),
+        "transitions": transitions,
+        "transitions_per_hour": round(transitions / args.hours, 1),
+    }
+
+
+def main():
+    defaults = config.MODE_CYCLE_ACTIONNEURS["humidifier"]
+    parser = argparse.ArgumentParser(description="Simulation tout-ou-rien vs rapport cyclique (humidificateur)")
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--logic-interval", type=int, default=config.INTERVALLE_LECTURE_CAPTEURS_SECONDES)
+    parser.add_argument("--seuil-on", type=float, default=config.SEUIL_HUMIDITE_ON)
+    parser.add_argument("--seuil-off", type=float, default=config.SEUIL_HUMIDITE_OFF)
+    parser.add_argument("--kp", type=float, default=defaults["kp"])
+    parser.add_argument("--ki", type=float, default=defaults["ki"])
+    parser.add_argument("--period", type=float, default=defaults["periode_secondes"], help="Période du rapport cyclique (s)")
+    parser.add_argument("--min-pulse", type=float, default=defaults["impulsion_min_secondes"])
+    parser.add_argument("--initial", type=float, default=70.0)
+    parser.add_argument("--outside", type=float, default=55.0)
+    parser.add_argument("--leak-tau", type=float, default=1800.0, help="Constante de temps des fuites (s)")
+    parser.add_argument("--mist-gain", type=float, default=0.04, help="Apport max de l'humidificateur (%%/s)")
+    parser.add_argument("--mist-tau", type=float, default=180.0, help="Retard de la brumisation (s)")
+    parser.add_argument("--noise", type=float, default=0.3, help="Bruit de mesure (écart-type, %%)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    print(json.dumps({
+        "setpoint": round((args.seuil_on + args.seuil_off) / 2.0, 2),
+        "tout_ou_rien": simulate("tout_ou_rien", args),
+        "rapport_cyclique": simulate("rapport_cyclique", args),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,349 @@
+# benchmarks/fleet_benchmark.py
+"""
+Banc de mesure de la montée en charge d'un processus multi-zones.
+
+Pour chaque nombre de zones (ex: 1, 10, 100, 1000), des zones SerreController sont créées
+sur matériel simulé (MockHardware), sans threads propres (autostart=False), via
+MultiZoneController. Le temps est virtuel: `time.time()` et `datetime.now()` des modules
+du contrôleur suivent une horloge avancée d'un intervalle de logique par cycle; aucun
+cycle n'attend réellement.
+
+Mesures (JSON sur la sortie standard, ou --output):
+  - memory: mémoire allouée par zone (tracemalloc) et durée de création;
+  - cpu: temps CPU d'un cycle complet (acquisition + logique de toutes les zones), séquentiel;
+  - db_buffer: débit de DatabaseManager.add_sensor_data_to_buffer (buffer partagé par toutes
+    les zones, vidé dans un pool factice qui compte les lignes);
+  - api_status: latence de get_status() + sérialisation JSON pendant que le pool exécute les cycles;
+  - locks: acquisitions et attentes sur les verrous des zones (settings et données capteurs).
+
+Exemple:
+    python benchmarks/fleet_benchmark.py --zones 1,10,100,1000 --cycles 10 --output fleet.json
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import wait
+from datetime import datetime
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import config
+from src.core.serre_logic import SerreController
+from src.core.zones import MultiZoneController
+from src.hardware_interface.mock_hardware import MockHardware
+from src.utils.db_utils import DatabaseManager
+
+# Modules qui lisent datetime.now() pendant un cycle
+DATETIME_MODULES = (
+    "src.core.serre_logic",
+    "src.core.sampling_policy",
+    "src.core.actuators.led_controller",
+    "src.core.actuators.humidifier_controller",
+    "src.core.actuators.ventilation_controller",
+)
+
+
+class VirtualClock:
+    """Horloge simulée: `time()` (epoch, s) et `now()` (datetime locale) n'avancent que par advance()."""
+    def __init__(self, start: float):
+        self._now = float(start)
+
+    def time(self) -> float:
+        return self._now
+
+    def now(self, tz=None) -> datetime:
+        return datetime.fromtimestamp(self._now, tz)
+
+    def advance(self, seconds: float):
+        self._now += seconds
+
+    @contextlib.contextmanager
+    def installed(self):
+        """Remplace time.time() et datetime.now() des modules du contrôleur le temps du bloc."""
+        clock = self
+
+        class VirtualDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return clock.now(tz)
+
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(mock.patch("time.time", self.time))
+            for module in DATETIME_MODULES:
+                stack.enter_context(mock.patch(f"{module}.datetime", VirtualDatetime))
+            yield self
+
+
+class InstrumentedLock:
+    """Verrou qui compte ses acquisitions et le temps d'attente quand il est déjà pris."""
+    __slots__ = ("_lock", "acquisitions", "contended", "wait_seconds")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if self._lock.acquire(False):
+            self.acquisitions += 1 # Compteurs modifiés verrou tenu: pas de course
+            return True
+        start = time.perf_counter()
+        acquired = self._lock.acquire(blocking, timeout)
+        if acquired:
+            self.acquisitions += 1
+            self.contended += 1
+            self.wait_seconds += time.perf_counter() - start
+        return acquired
+
+    def release(self):
+        self._lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class _CountingCursor:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def executemany(self, query, rows):
+        self.pool.rows += len(rows)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _CountingConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def cursor(self):
+        return _CountingCursor(self.pool)
+
+    def commit(self):
+        self.pool.commits += 1
+
+    def rollback(self):
+        pass
+
+
+class CountingPool:
+    """Pool factice: chaque flush est « inséré » en comptant les lignes (aucune base requise)."""
+    def __init__(self):
+        self.rows = 0
+        self.commits = 0
+
+    def getconn(self):
+        return _CountingConnection(self)
+
+    def putconn(self, conn):
+        pass
+
+
+class BenchmarkDatabaseManager(DatabaseManager):
+    """DatabaseManager réel (buffer, arrondis, seuils de flush) branché sur CountingPool."""
+    def __init__(self):
+        self.db_pool = CountingPool()
+        self.data_buffer = []
+        self.last_flush_time = time.time()
+        self.local_store = None
+        self._lock = threading.Lock()
+
+    def add_sensor_data_to_buffer(self, *args, **kwargs):
+        with self._lock: # Partagé par toutes les zones et les threads du pool
+            super().add_sensor_data_to_buffer(*args, **kwargs)
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def build_fleet(zone_count: int, settings_dir: str, db_manager, workers: int) -> MultiZoneController:
+    def factory(zone_id, spec, with_history, timer_wheel):
+        zone = SerreController(
+            zone_id=zone_id, hardware=MockHardware(), db_manager=db_manager,
+            settings_file=os.path.join(settings_dir, f"{zone_id}.json"),
+            timer_wheel=timer_wheel, autostart=False)
+        zone.settings_lock = InstrumentedLock()
+        zone._sensor_data_lock = InstrumentedLock()
+        return zone
+
+    zones_spec = {f"zone-{i:04d}": {} for i in range(zone_count)}
+    return MultiZoneController(zones_spec, max_workers=workers, zone_factory=factory, autostart=False)
+
+
+def run_cycle(zones) -> None:
+    for zone in zones:
+        zone._acquire_sensors_once()
+        zone._run_logic_cycle()
+
+
+def measure_fleet(zone_count: int, args, clock: VirtualClock) -> dict:
+    settings_dir = tempfile.mkdtemp(prefix="fleet_bench_")
+    db_manager = BenchmarkDatabaseManager()
+    try:
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        build_start = time.perf_counter()
+        manager = build_fleet(zone_count, settings_dir, db_manager, args.workers)
+        build_seconds = time.perf_counter() - build_start
+        allocated = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+        zones = list(manager.zones.values())
+
+        # --- CPU par cycle (séquentiel, un seul thread) ---
+        run_cycle(zones) # Mise en régime (filtres, premières transitions d'actionneurs)
+        cpu_samples = []
+        for _ in range(args.cycles):
+            clock.advance(config.INTERVALLE_LECTURE_CAPTEURS_SECONDES)
+            cpu_start = time.process_time()
+            run_cycle(zones)
+            cpu_samples.append(time.process_time() - cpu_start)
+
+        # --- Débit du buffer DB ---
+        flushes_during_cycles = db_manager.db_pool.commits
+        rows_before, records = db_manager.db_pool.rows, args.db_records
+        db_start = time.perf_counter()
+        for i in range(records):
+            db_manager.add_sensor_data_to_buffer(
+                timestamp=clock.now(), temperature=21.3, humidity=80.2, co2=850.0,
+                humidifier_active=bool(i % 2), ventilation_active=False, leds_active=True,
+                humidifier_on_duration=12.0 if i % 2 else None, humidifier_off_duration=None if i % 2 else 30.0,
+                ventilation_on_duration=None, ventilation_off_duration=45.0)
+        db_manager.flush_buffer()
+        db_seconds = time.perf_counter() - db_start
+
+        # --- Latence du statut pendant l'exécution concurrente des cycles ---
+        for zone in zones: # Seule la phase concurrente est comptée
+            for lock in (zone.settings_lock, zone._sensor_data_lock):
+                lock.acquisitions = lock.contended = 0
+                lock.wait_seconds = 0.0
+        latencies, summary_latencies = [], []
+        stop = threading.Event()
+
+        def status_client(seed):
+            rng = random.Random(seed)
+            while not stop.is_set():
+                start = time.perf_counter()
+                json.dumps(rng.choice(zones).get_status())
+                latencies.append(time.perf_counter() - start)
+
+        clients = [threading.Thread(target=status_client, args=(i,), daemon=True) for i in range(args.api_clients)]
+        for client in clients:
+            client.start()
+        concurrent_start = time.perf_counter()
+        for _ in range(args.cycles):
+            clock.advance(config.INTERVALLE_LECTURE_CAPTEURS_SECONDES)
+            futures = [manager.executor.submit(zone._acquire_sensors_once) for zone in zones]
+            wait(futures)
+            futures = [manager.executor.submit(zone._run_logic_cycle) for zone in zones]
+            summary_start = time.perf_counter()
+            json.dumps(manager.get_zones_summary())
+            summary_latencies.append(time.perf_counter() - summary_start)
+            wait(futures)
+        concurrent_seconds = time.perf_counter() - concurrent_start
+        stop.set()
+        for client in clients:
+            client.join()
+
+        locks = [lock for zone in zones for lock in (zone.settings_lock, zone._sensor_data_lock)]
+        acquisitions = sum(lock.acquisitions for lock in locks)
+        contended = sum(lock.contended for lock in locks)
+        latencies.sort()
+        manager.shutdown()
+
+        cpu_mean = statistics.fmean(cpu_samples)
+        return {
+            "zones": zone_count,
+            "memory": {
+                "per_zone_kib": round(allocated / zone_count / 1024, 1),
+                "total_mib": round(allocated / 1024 / 1024, 2),
+                "build_seconds": round(build_seconds, 3),
+            },
+            "cpu": {
+                "ms_per_cycle": round(cpu_mean * 1000, 3),
+                "ms_per_cycle_max": round(max(cpu_samples) * 1000, 3),
+                "us_per_zone_cycle": round(cpu_mean / zone_count * 1e6, 1),
+                "cycle_budget_fraction": round(cpu_mean / config.INTERVALLE_LECTURE_CAPTEURS_SECONDES, 5),
+            },
+            "db_buffer": {
+                "records_per_second": round(records / db_seconds),
+                "rows_flushed": db_manager.db_pool.rows - rows_before,
+                "flushes_during_cycles": flushes_during_cycles,
+            },
+            "api_status": {
+                "requests": len(latencies),
+                "p50_ms": round(_percentile(latencies, 0.50) * 1000, 3),
+                "p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+                "zones_summary_ms": round(statistics.fmean(summary_latencies) * 1000, 3),
+                "concurrent_cycles_seconds": round(concurrent_seconds, 3),
+            },
+            "locks": {
+                "acquisitions": acquisitions,
+                "contended": contended,
+                "contended_fraction": round(contended / acquisitions, 5) if acquisitions else 0.0,
+                "wait_ms_total": round(sum(lock.wait_seconds for lock in locks) * 1000, 3),
+            },
+        }
+    finally:
+        shutil.rmtree(settings_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Montée en charge multi-zones (horloge virtuelle, matériel simulé)")
+    parser.add_argument("--zones", default="1,10,100,1000", help="Nombres de zones, séparés par des virgules")
+    parser.add_argument("--cycles", type=int, default=10, help="Cycles mesurés par phase")
+    parser.add_argument("--workers", type=int, default=config.ZONES_THREADS, help="Threads du pool partagé")
+    parser.add_argument("--api-clients", type=int, default=2, help="Threads lisant le statut pendant la phase concurrente")
+    parser.add_argument("--db-records", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Fichier JSON de résultats (sinon sortie standard)")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    random.seed(args.seed)
+
+    clock = VirtualClock(datetime(2024, 5, 19, 10, 0).timestamp())
+    results = []
+    with clock.installed():
+        for zone_count in (int(n) for n in args.zones.split(',') if n.strip()):
+            results.append(measure_fleet(zone_count, args, clock))
+
+    report = {
+        "benchmark": "fleet",
+        "python": sys.version.split()[0],
+        "parameters": {"cycles": args.cycles, "workers": args.workers, "api_clients": args.api_clients,
+                       "db_records": args.db_records, "seed": args.seed,
+                       "logic_interval_seconds": config.INTERVALLE_LECTURE_CAPTEURS_SECONDES},
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+# benchmarks/ingest_load_generator.py
+"""
+Générateur de charge pour le point de collecte /api/ingest.
+
+Simule N serres qui envoient chacune des lots compressés (gzip) d'échantillons et
+d'événements, avec des numéros de lot croissants, puis affiche le débit (lignes/s)
+et les latences observées.
+
+Exemple:
+    python benchmarks/ingest_load_generator.py --url http://127.0.0.1:5000/api/ingest --token secret \\
+        --greenhouses 200 --batch-size 500 --duration 30 --workers 16
+"""
+import argparse
+import gzip
+import json
+import random
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta
+
+
+def build_batch(greenhouse_id: str, batch_seq: int, batch_size: int, start: datetime) -> dict:
+    """Construit un lot au format compact attendu par validate_ingest_batch."""
+    samples = []
+    for i in range(batch_size):
+        ts = start + timedelta(minutes=i)
+        humidifier_on = random.random() < 0.3
+        ventilation_on = random.random() < 0.2
+        samples.append([
+            ts.isoformat(sep=' '),
+            round(random.uniform(18, 24), 1), round(random.uniform(70, 90), 1), round(random.uniform(400, 1500)),
+            humidifier_on, ventilation_on, 8 <= ts.hour < 20,
+            round(random.uniform(0, 600), 1) if humidifier_on else None,
+            None if humidifier_on else round(random.uniform(0, 600), 1),
+            round(random.uniform(0, 600), 1) if ventilation_on else None,
+            None if ventilation_on else round(random.uniform(0, 600), 1),
+        ])
+    events = [[(start + timedelta(minutes=i, seconds=30)).isoformat(sep=' '), "humidifier", i % 2 == 0, 60.0]
+              for i in range(0, batch_size, 10)]
+    return {"greenhouse_id": greenhouse_id, "batch_seq": batch_seq, "samples": samples, "events": events}
+
+
+class LoadGenerator:
+    def __init__(self, url, greenhouses, batch_size, duration, workers, token=None):
+        self.url = url
+        self.batch_size = batch_size
+        self.duration = duration
+        self.workers = workers
+        self.token = token
+        self.greenhouse_ids = [f"bench-{i:04d}" for i in range(greenhouses)]
+        # Numéro de lot et horodatage courant par serre (un seul envoyeur à la fois par serre).
+        self._next_seq = {gid: int(time.time()) for gid in self.greenhouse_ids}
+        self._next_start = {gid: datetime(2024, 1, 1) for gid in self.greenhouse_ids}
+        self._assignment_lock = threading.Lock()
+        self._free = list(self.greenhouse_ids)
+        self.latencies = []
+        self.rows_sent = 0
+        self.status_counts = {}
+        self._stats_lock = threading.Lock()
+
+    def _send(self, body: bytes) -> int:
+        request = urllib.request.Request(self.url, data=body, method='POST', headers={
+            "Content-Type": "application/json", "Content-Encoding": "gzip"})
+        if self.token:
+            request.add_header("Authorization", f"Bearer {self.token}")
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+        except urllib.error.URLError:
+            return 0
+
+    def _worker(self, deadline: float):
+        while time.time() < deadline:
+            with self._assignment_lock:
+                if not self._free:
+                    gid = None
+                else:
+                    gid = self._free.pop(random.randrange(len(self._free)))
+                    seq = self._next_seq[gid]
+                    start = self._next_start[gid]
+            if gid is None:
+                time.sleep(0.001)
+                continue
+            batch = build_batch(gid, seq, self.batch_size, start)
+            body = gzip.compress(json.dumps(batch, separators=(',', ':')).encode('utf-8'), compresslevel=5)
+            t0 = time.perf_counter()
+            status = self._send(body)
+            latency = time.perf_counter() - t0
+            with self._assignment_lock:
+                self._next_seq[gid] = seq + 1
+                self._next_start[gid] = start + timedelta(minutes=self.batch_size)
+                self._free.append(gid)
+            with self._stats_lock:
+                self.latencies.append(latency)
+                self.status_counts[status] = self.status_counts.get(status, 0) + 1
+                if status == 200:
+                    self.rows_sent += len(batch["samples"]) + len(batch["events"])
+
+    def run(self) -> dict:
+        deadline = time.time() + self.duration
+        threads = [threading.Thread(target=self._worker, args=(deadline,), name=f"LoadWorker-{i}")
+                   for i in range(self.workers)]
+        t0 = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - t0
+        latencies = sorted(self.latencies) or [0.0]
+        return {
+            "elapsed_seconds": round(elapsed, 2),
+            "batches": len(self.latencies),
+            "rows_accepted": self.rows_sent,
+            "rows_per_second": round(self.rows_sent / elapsed, 1) if elapsed else 0.0,
+            "latency_ms_p50": round(statistics.median(latencies) * 1000, 1),
+            "latency_ms_p95": round(latencies[int(len(latencies) * 0.95) - 1 if len(latencies) > 1 else 0] * 1000, 1),
+            "latency_ms_max": round(latencies[-1] * 1000, 1),
+            "status_counts": {str(k): v for k, v in sorted(self.status_counts.items())},
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Générateur de charge pour /api/ingest")
+    parser.add_argument("--url", default="http://127.0.0.1:5000/api/ingest")
+    parser.add_argument("--greenhouses", type=int, default=100, help="Nombre de serres simulées")
+    parser.add_argument("--batch-size", type=int, default=500, help="Échantillons par lot")
+    parser.add_argument("--duration", type=float, default=30, help="Durée du test (secondes)")
+    parser.add_argument("--workers", type=int, default=8, help="Requêtes concurrentes")
+    parser.add_argument("--token", default=None, help="Jeton INGEST_TOKEN du point de collecte")
+    args = parser.parse_args()
+
+    generator = LoadGenerator(args.url, args.greenhouses, args.batch_size, args.duration, args.workers, args.token)
+    print(json.dumps(generator.run(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# benchmarks/logging_jitter.py
+"""
+Gigue d'une boucle de contrôle selon la journalisation: FileHandler synchrone (configuration
+historique de main.py/app.py) contre le pipeline asynchrone de src/utils/logging_setup.py.
+
+La boucle simulée tourne à période fixe et journalise à chaque cycle comme le contrôleur:
+une ligne INFO de données capteurs et deux commutations GPIO. `--latence-ecriture-ms` ajoute
+une attente à chaque vidage du fichier pour reproduire une carte SD lente.
+
+Mesures (JSON sur la sortie standard, ou --output), par mode:
+  - cycle_ms: durée du travail d'un cycle (journalisation comprise), p50/p99/max;
+  - retard_reveil_ms: retard du réveil sur l'échéance planifiée, p50/p99/max.
+
+Exemple:
+    python benchmarks/logging_jitter.py --cycles 2000 --periode-ms 10 --latence-ecriture-ms 2
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import config
+from src.utils.logging_setup import configure_logging, LOG_FORMAT
+
+
+class SlowFlushStream:
+    """Flux de fichier dont chaque vidage attend `latency` secondes (écriture SD lente)."""
+    def __init__(self, stream, latency: float):
+        self._stream = stream
+        self._latency = latency
+
+    def write(self, data):
+        return self._stream.write(data)
+
+    def flush(self):
+        self._stream.flush()
+        if self._latency:
+            time.sleep(self._latency)
+
+    def __getattr__(self, name): # seek/tell (rotation par taille), close...
+        return getattr(self._stream, name)
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _summary(values: list) -> dict:
+    values = sorted(values)
+    return {"p50": round(_percentile(values, 0.50) * 1000, 3), "p99": round(_percentile(values, 0.99) * 1000, 3),
+            "max": round(values[-1] * 1000, 3) if values else 0.0}
+
+
+def _setup_synchronous(log_path: str, latency: float):
+    handler = logging.FileHandler(log_path, mode='a')
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    handler.stream = SlowFlushStream(handler.stream, latency)
+    root_logger = logging.getLogger()
+    root_logger.addHandler(handler)
+    return lambda: (root_logger.removeHandler(handler), handler.close())
+
+
+def _setup_asynchronous(log_path: str, latency: float):
+    with mock.patch('atexit.register'):
+        listener = configure_logging(logging.INFO, log_path, asynchronous=True, console=False)
+    for handler in listener.handlers:
+        handler.stream = SlowFlushStream(handler.stream, latency)
+
+    def teardown():
+        listener.stop()
+        for handler in listener.handlers:
+            logging.getLogger().removeHandler(handler)
+            handler.close()
+    return teardown
+
+
+def run_loop(cycles: int, period: float) -> dict:
+    logger = logging.getLogger("src.core.serre_logic")
+    gpio_logger = logging.getLogger("src.hardware_interface.raspberry_pi")
+    work, lateness = [], []
+    next_deadline = time.perf_counter() + period
+    for i in range(cycles):
+        now = time.perf_counter()
+        if next_deadline > now:
+            time.sleep(next_deadline - now)
+        woke = time.perf_counter()
+        lateness.append(max(0.0, woke - next_deadline))
+        logger.info(f"SerreControllerLogicThread: Données capteurs pour logique: T={20 + i % 5:.1f}°C, H=65.0%, CO2=640ppm")
+        gpio_logger.info(f"Ventilation activé(e) (GPIO 27 mis à {i % 2})")
+        gpio_logger.info(f"Brumisateur désactivé(e) (GPIO 22 mis à {1 - i % 2})")
+        work.append(time.perf_counter() - woke)
+        next_deadline += period
+    return {"cycle_ms": _summary(work), "retard_reveil_ms": _summary(lateness)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gigue de la boucle de contrôle: journalisation synchrone vs asynchrone")
+    parser.add_argument("--cycles", type=int, default=2000)
+    parser.add_argument("--periode-ms", type=float, default=10.0, help="Période de la boucle simulée")
+    parser.add_argument("--latence-ecriture-ms", type=float, default=2.0, help="Attente ajoutée à chaque vidage du fichier")
+    parser.add_argument("--output", help="Fichier JSON de résultats (sinon sortie standard)")
+    args = parser.parse_args()
+
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    root_logger.setLevel(logging.INFO)
+    tmp_dir = tempfile.mkdtemp()
+    results = {}
+    try:
+        # Limitation des répétitions désactivée: on mesure le coût d'écriture, pas la suppression
+        with mock.patch.object(config, 'LOG_LIMITE_PAR_FENETRE', 10 ** 9):
+            for mode, setup in (("synchrone", _setup_synchronous), ("asynchrone", _setup_asynchronous)):
+                teardown = setup(os.path.join(tmp_dir, f"{mode}.log"), args.latence_ecriture_ms / 1000)
+                try:
+                    results[mode] = run_loop(args.cycles, args.periode_ms / 1000)
+                finally:
+                    teardown()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    report = {
+        "benchmark": "logging_jitter",
+        "python": sys.version.split()[0],
+        "parameters": {"cycles": args.cycles, "periode_ms": args.periode_ms,
+                       "latence_ecriture_ms": args.latence_ecriture_ms, "lignes_par_cycle": 3},
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# benchmarks/rule_engine_benchmark.py
+"""
+Compare le coût d'évaluation de la logique automatique:
+  - classes d'actionneurs actuelles (_get_desired_automatic_state, lecture des settings à chaque appel);
+  - règles déclaratives équivalentes compilées par RuleEngine;
+  - un parc de N zones x 3 actionneurs évalué en un appel (evaluate_all).
+
+Affiche en JSON les microsecondes par évaluation.
+
+Exemple:
+    python benchmarks/rule_engine_benchmark.py --iterations 20000 --zones 100
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import config
+from src.core.actuators.humidifier_controller import HumidifierController
+from src.core.actuators.led_controller import LedController
+from src.core.actuators.ventilation_controller import VentilationController
+from src.core.rules import RuleContext, RuleEngine
+
+OPERATION = {"plage_heures": [config.KEY_HEURE_DEBUT_JOUR_OPERATION, config.KEY_HEURE_FIN_JOUR_OPERATION]}
+
+# Équivalents déclaratifs de la logique codée (hors session spéciale de l'humidificateur)
+EQUIVALENT_RULES = {
+    "leds": {"on_si": {"plage_heures": [config.KEY_HEURE_DEBUT_LEDS, config.KEY_HEURE_FIN_LEDS]}},
+    "humidifier": {
+        "on_si": {"tous": [OPERATION, {"capteur": "humidite", "op": "<", "valeur": {"setting": config.KEY_SEUIL_HUMIDITE_ON}}]},
+        "off_si": {"un_parmi": [{"non": OPERATION},
+                                {"capteur": "humidite", "op": ">=", "valeur": {"setting": config.KEY_SEUIL_HUMIDITE_OFF}}]},
+    },
+    "ventilation": {
+        "on_si": {"tous": [OPERATION, {"capteur": "co2", "op": ">", "valeur": {"setting": config.KEY_SEUIL_CO2_MAX}}]},
+        "off_si": {"un_parmi": [{"non": OPERATION},
+                                {"capteur": "co2", "op": "<", "valeur": {"setting": config.KEY_SEUIL_CO2_MAX,
+                                                                         "decalage": -config.HYSTERESIS_CO2}}]},
+    },
+}
+
+
+class _SettingsStub:
+    """Remplace SerreController: settings par défaut, sans verrou ni fichier."""
+    def get_setting(self, key, default_override=None):
+        return config.DEFAULT_SETTINGS.get(key, default_override)
+
+
+def _time_per_call(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du moteur de règles déclaratives")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--zones", type=int, default=100, help="Zones simulées pour evaluate_all (3 actionneurs chacune)")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    stub = _SettingsStub()
+    sensors = {"temperature": 22.0, "humidite": 80.0, "co2": 1150.0}
+    actuators = [LedController(None, stub), HumidifierController(None, stub), VentilationController(None, stub)]
+    engine = RuleEngine(EQUIVALENT_RULES, stub.get_setting)
+    states = {a.device_name: False for a in actuators}
+    ctx = RuleContext(sensors, datetime.now(), states)
+
+    results = {"classes_us": {}, "rules_us": {}}
+    for actuator in actuators:
+        results["classes_us"][actuator.device_name] = round(
+            _time_per_call(lambda: actuator._get_desired_automatic_state(sensors), args.iterations), 2)
+        results["rules_us"][actuator.device_name] = round(
+            _time_per_call(lambda: engine.evaluate(actuator.device_name, ctx, False), args.iterations), 2)
+
+    fleet_rules = {f"zone{z:03d}.{name}": spec for z in range(args.zones) for name, spec in EQUIVALENT_RULES.items()}
+    fleet = RuleEngine(fleet_rules, stub.get_setting)
+    fleet_ctx = RuleContext(sensors, datetime.now(), {name: False for name in fleet_rules})
+    per_cycle = _time_per_call(lambda: fleet.evaluate_all(fleet_ctx), max(1, args.iterations // len(fleet_rules)))
+    results["fleet"] = {
+        "actuators": len(fleet_rules),
+        "us_per_cycle": round(per_cycle, 1),
+        "us_per_actuator": round(per_cycle / len(fleet_rules), 2),
+    }
+    compile_start = time.perf_counter()
+    fleet.compile()
+    results["fleet"]["compile_ms"] = round((time.perf_counter() - compile_start) * 1000, 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
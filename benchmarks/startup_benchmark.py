@@ -0,0 +1,110 @@
+# benchmarks/startup_benchmark.py
+"""
+Temps d'import des points d'entrée du contrôleur, mesuré avec `python -X importtime` dans des
+processus neufs (cache disque chaud: un premier import non mesuré compile les .pyc).
+
+Pour chaque module: médiane du temps cumulé d'import sur `--repetitions` processus, comparée
+à un budget, et liste des modules lourds chargés alors qu'ils ne devraient pas l'être (psycopg2
+ou Flask pour le démon, bibliothèques Adafruit avant la construction du matériel).
+
+Code de sortie 1 si un budget est dépassé ou un module interdit est chargé: le script peut
+servir de garde-fou de non-régression (CI, ou sur le Pi avec --facteur-budget).
+
+Exemple:
+    python benchmarks/startup_benchmark.py --repetitions 7 --facteur-budget 4
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+HEAVY_MODULES = ("psycopg2", "flask", "werkzeug", "board", "busio", "lgpio", "adafruit_scd30")
+
+# module -> (budget en ms sur poste de développement, modules lourds interdits)
+TARGETS = {
+    "src.config": (60, HEAVY_MODULES),
+    "src.core.serre_logic": (120, HEAVY_MODULES),
+    "src.core.zones": (120, HEAVY_MODULES),
+    "src.ipc.server": (120, HEAVY_MODULES),
+    "src.hardware_interface.raspberry_pi": (80, HEAVY_MODULES),
+    # Flask est importé par le module de l'API lui-même; psycopg2 seulement à l'ingestion
+    "src.api.app": (400, ("psycopg2", "board", "busio", "lgpio", "adafruit_scd30")),
+}
+
+
+def measure_import(module: str) -> tuple[float, set]:
+    """(temps cumulé d'import en secondes, modules chargés) pour `import module` dans un processus neuf."""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               cwd=ROOT, capture_output=True, text=True, check=True)
+    cumulative_us = None
+    loaded = set()
+    for line in completed.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        loaded.add(name)
+        if name == module:
+            cumulative_us = int(cumulative)
+    if cumulative_us is None:
+        raise RuntimeError(f"Import de '{module}' absent de la sortie -X importtime.")
+    return cumulative_us / 1e6, loaded
+
+
+def run(modules, repetitions: int, budget_factor: float) -> dict:
+    results = {}
+    for module in modules:
+        budget_ms, forbidden = TARGETS[module]
+        measure_import(module) # Préchauffage (.pyc, cache disque)
+        durations, loaded = [], set()
+        for _ in range(repetitions):
+            duration, modules_loaded = measure_import(module)
+            durations.append(duration)
+            loaded |= modules_loaded
+        median_ms = statistics.median(durations) * 1000
+        budget_ms = budget_ms * budget_factor
+        unexpected = sorted(name for name in forbidden if name in loaded)
+        results[module] = {
+            "median_ms": round(median_ms, 2),
+            "min_ms": round(min(durations) * 1000, 2),
+            "max_ms": round(max(durations) * 1000, 2),
+            "budget_ms": round(budget_ms, 2),
+            "modules_interdits_charges": unexpected,
+            "ok": median_ms <= budget_ms and not unexpected,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps d'import des points d'entrée (budget de non-régression)")
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--facteur-budget", type=float, default=1.0,
+                        help="Multiplie les budgets (ex: 4 sur un Raspberry Pi)")
+    parser.add_argument("--module", action="append", choices=sorted(TARGETS),
+                        help="Module à mesurer (répétable; défaut: tous)")
+    parser.add_argument("--output", help="Fichier JSON de résultats (sinon sortie standard)")
+    args = parser.parse_args()
+
+    results = run(args.module or list(TARGETS), args.repetitions, args.facteur_budget)
+    report = {
+        "benchmark": "startup",
+        "python": sys.version.split()[0],
+        "parameters": {"repetitions": args.repetitions, "facteur_budget": args.facteur_budget},
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    sys.exit(0 if all(result["ok"] for result in results.values()) else 1)
+
+
+if __name__ == '__main__':
+    main()
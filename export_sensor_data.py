@@ -0,0 +1,60 @@
+# export_sensor_data.py
+import sys
+import os
+import argparse
+import logging
+
+# Ajouter le répertoire racine du projet au PYTHONPATH
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    from src.utils.export import stream_export, parse_export_range, EXPORT_FORMATS
+except ImportError as e:
+    print(f"ERREUR: Impossible d'importer les modules nécessaires: {e}")
+    sys.exit(1)
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s', stream=sys.stderr)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Exporte l'historique de sensor_data pour une période, en flux (mémoire constante).
+
+    Exemples:
+        python export_sensor_data.py --start 2024-01-01 --end 2025-01-01 --format csv --gzip -o annee.csv.gz
+        python export_sensor_data.py --start 2024-05-19T08:00 | head
+    """
+    parser = argparse.ArgumentParser(description="Export de l'historique des capteurs (NDJSON/CSV).")
+    parser.add_argument("--start", required=True, help="Début (ISO 8601, inclus)")
+    parser.add_argument("--end", default=None, help="Fin (ISO 8601, exclue). Défaut: maintenant")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    parser.add_argument("--gzip", action="store_true", help="Compresser la sortie (gzip)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Lignes lues par bloc")
+    parser.add_argument("-o", "--output", default="-", help="Fichier de sortie (défaut: sortie standard)")
+    args = parser.parse_args()
+
+    try:
+        start, end = parse_export_range(args.start, args.end)
+    except ValueError as e:
+        parser.error(str(e))
+
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        for chunk in stream_export(start, end, args.format, args.gzip, args.chunk_size):
+            out.write(chunk)
+        out.flush()
+    except BrokenPipeError:
+        pass # Lecteur fermé (ex: | head)
+    except Exception as e:
+        logger.error(f"Échec de l'export: {e}")
+        sys.exit(1)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,8 @@ try:
     # On importe directement l'implémentation RaspberryPiHardware
     # Ce script est destiné à être exécuté UNIQUEMENT sur le Raspberry Pi.
     from src.hardware_interface.raspberry_pi import RaspberryPiHardware, RASPBERRY_PI_LIBS_AVAILABLE
-    # from src import config # Pas strictement nécessaire ici car on force RaspberryPiHardware
+    from src import config # Chemin du statut publié par le contrôleur
+    from src.ipc.status_shm import StatusReader
 except ImportError as e:
     print(f"ERREUR: Impossible d'importer les modules nécessaires: {e}")
     print("Assurez-vous que ce script est dans le répertoire racine du projet et que la structure est correcte.")
@@ -45,8 +46,32 @@ def display_menu():
     print("  0. Quitter")
     print("-------------------------------------------------------")
 
+def controller_is_running() -> bool:
+    """
+    Affiche le statut publié en mémoire partagée par le contrôleur (main.py) s'il est récent:
+    le contrôleur possède alors les GPIO et ce script entrerait en conflit avec lui.
+    """
+    if not config.STATUS_SHM_PATH:
+        return False
+    try:
+        snapshots = StatusReader(config.STATUS_SHM_PATH).read_all()
+    except Exception as e:
+        logger.warning(f"Lecture du statut du contrôleur impossible: {e}")
+        return False
+    fresh = [s for s in snapshots if time.time() - s["published_at"] < config.STATUS_SHM_PERIME_SECONDES]
+    for s in fresh:
+        print(f"Contrôleur actif, zone '{s['zone_id']}': T={s['temperature']} H={s['humidite']} CO2={s['co2']} | "
+              f"LEDs={'ON' if s['leds_active'] else 'OFF'} Humidificateur={'ON' if s['humidifier_active'] else 'OFF'} "
+              f"Ventilation={'ON' if s['ventilation_active'] else 'OFF'}")
+    return bool(fresh)
+
 def main():
     logger.info("Démarrage du script de test matériel interactif pour Raspberry Pi.")
+
+    if controller_is_running():
+        print("\nATTENTION: Le contrôleur de serre est en cours d'exécution et pilote les GPIO.")
+        if input("Continuer quand même ? (o/N): ").strip().lower() != 'o':
+            return
     
     if not RASPBERRY_PI_LIBS_AVAILABLE:
         logger.error("Les bibliothèques Raspberry Pi ne sont pas disponibles. Ce script ne peut pas fonctionner.")
@@ -3,7 +3,6 @@ import sys
 import os
 import time
 import logging
-import logging.handlers # Pour FileHandler
 import signal
 import threading
 
@@ -15,6 +14,10 @@ if project_root not in sys.path:
 
 try:
     from src.core.serre_logic import SerreController
+    from src.core.zones import MultiZoneController, controller_zones
+    from src.ipc.server import ControllerServer
+    from src.ipc.status_shm import StatusSegment
+    from src.utils.logging_setup import configure_logging
     from src import config # S'assure que config.py est accessible et chargé
 except ImportError as e:
     # Utiliser print ici car le logging n'est peut-être pas encore configuré
@@ -27,76 +30,42 @@ except Exception as e:
     sys.exit(1)
 
 # --- Configuration centralisée du logging ---
-# Cette section est basée sur votre sélection et nos améliorations.
-try:
-    log_level_str = config.LOG_LEVEL.upper()
-    log_level = getattr(logging, log_level_str, logging.INFO) # Default to INFO if invalid
-except AttributeError:
-    print("AVERTISSEMENT: config.LOG_LEVEL non trouvé, utilisation du niveau INFO par défaut pour le logging.")
-    log_level = logging.INFO
-
-log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(name)s - %(threadName)s - %(message)s')
-
-# Récupérer le logger racine pour y attacher les handlers.
-# Cela évite les problèmes si basicConfig est appelé plusieurs fois ou par différents modules.
+# Les threads de contrôle ne font que mettre les enregistrements en file; un thread dédié les
+# écrit par lots (console + fichier avec rotation et compression), voir src/utils/logging_setup.py.
+log_listener = configure_logging()
+config.log_configuration_summary()
 root_logger = logging.getLogger()
-root_logger.setLevel(log_level) # Définir le niveau sur le logger racine. Les handlers peuvent avoir des niveaux plus restrictifs.
-
-# Supprimer les handlers existants pour éviter la duplication si le script est rechargé (rare pour main.py mais bonne pratique)
-for handler in root_logger.handlers[:]:
-    root_logger.removeHandler(handler)
-
-# Handler pour la console
-console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setFormatter(log_formatter)
-# console_handler.setLevel(log_level) # Optionnel: le handler hérite du niveau du logger racine par défaut
-root_logger.addHandler(console_handler)
-
-# Handler pour le fichier
-try:
-    log_file_path = config.LOG_FILE_PATH
-
-    # --- DÉBUT DE L'AJOUT ---
-    # Obtenir le répertoire du fichier journal
-    log_directory = os.path.dirname(log_file_path)
-    # Si le chemin contient un répertoire (n'est pas juste un nom de fichier)
-    # et que ce répertoire n'existe pas, le créer.
-    if log_directory and not os.path.exists(log_directory):
-        os.makedirs(log_directory)
-        print(f"Répertoire de logs créé : {log_directory}")
-    # --- FIN DE L'AJOUT ---
-
-    file_handler = logging.FileHandler(log_file_path, mode='a') # 'a' pour append
-    file_handler.setFormatter(log_formatter)
-    # file_handler.setLevel(log_level) # Optionnel
-    root_logger.addHandler(file_handler)
-    print(f"Logging configuré. Console: ON, Fichier: '{log_file_path}' (Niveau: {logging.getLevelName(log_level)})")
-except AttributeError:
-    print("AVERTISSEMENT: config.LOG_FILE_PATH non trouvé. Logging fichier désactivé.")
-except Exception as e:
-    print(f"AVERTISSEMENT: Impossible de configurer le logging vers le fichier (config.LOG_FILE_PATH='{config.LOG_FILE_PATH if hasattr(config, 'LOG_FILE_PATH') else 'Non défini'}'): {e}")
-    # L'application continuera avec le logging console uniquement.
+print(f"Logging configuré. Console: ON, Fichier: '{config.LOG_FILE_PATH}' "
+      f"(Niveau: {logging.getLevelName(root_logger.level)}, {'asynchrone' if log_listener else 'synchrone'})")
 
 main_logger = logging.getLogger(__name__) # Obtenir un logger spécifique pour ce module (main.py)
 # --- Fin de la configuration du logging ---
 
 
 # Variable globale pour le contrôleur afin qu'il soit accessible par le gestionnaire de signal
-serre_controller_instance: SerreController | None = None
+serre_controller_instance: SerreController | MultiZoneController | None = None
 controller_thread: threading.Thread | None = None # Pour gérer le thread du contrôleur
+ipc_server: ControllerServer | None = None # Socket Unix pour l'API web (CONTROLLER_MODE='daemon')
+status_segment: StatusSegment | None = None # Statut publié en mémoire partagée (config.STATUS_SHM_PATH)
 
 def signal_handler(signum, frame):
     """
     Gère les signaux d'arrêt (SIGINT, SIGTERM) pour un arrêt propre.
     """
     signal_name = signal.Signals(signum).name if sys.platform != "win32" else f"Signal {signum}" # Windows ne nomme pas bien les signaux
-    main_logger.info(f"Signal {signal_name} reçu. Arrêt en cours...")
+    # SIGUSR2: arrêt pour redémarrage à chaud (déploiement), les relais restent dans leur état
+    warm_restart = signum == getattr(signal, 'SIGUSR2', None)
+    main_logger.info(f"Signal {signal_name} reçu. {'Arrêt pour redémarrage à chaud' if warm_restart else 'Arrêt'} en cours...")
     
+    # Plus de nouvelles requêtes de l'API pendant l'arrêt
+    if ipc_server:
+        ipc_server.stop()
+
     # Demander au contrôleur de s'arrêter
     if serre_controller_instance:
         # La méthode shutdown du contrôleur devrait idéalement changer un flag 'self.running = False'
         # pour que sa boucle principale se termine naturellement.
-        serre_controller_instance.shutdown() 
+        serre_controller_instance.shutdown(keep_outputs=warm_restart)
 
     # Attendre que le thread du contrôleur se termine.
     # Le thread du contrôleur devrait appeler serre_controller_instance.shutdown()
@@ -114,7 +83,7 @@ def run_controller():
     """
     Initialise et démarre le SerreController.
     """
-    global serre_controller_instance, controller_thread
+    global serre_controller_instance, controller_thread, ipc_server, status_segment
 
     main_logger.info("----------------------------------------------------")
     main_logger.info("--- Démarrage du Contrôleur de Serre (Mode CLI) ---")
@@ -122,15 +91,36 @@ def run_controller():
     main_logger.info(f"Mode Matériel (HARDWARE_ENV): {config.HARDWARE_ENV}")
     main_logger.info(f"Mode Base de Données (DB_ENV): {config.DB_ENV}")
     main_logger.info(f"Niveau de Log configuré: {logging.getLevelName(root_logger.getEffectiveLevel())}")
-    main_logger.info(f"Logs écrits dans le fichier: {config.LOG_FILE_PATH if hasattr(config, 'LOG_FILE_PATH') and any(isinstance(h, logging.FileHandler) for h in root_logger.handlers) else 'Non configuré ou erreur'}")
+    main_logger.info(f"Logs écrits dans le fichier: {config.LOG_FILE_PATH or 'Non configuré'}")
     main_logger.info("Appuyez sur Ctrl+C pour arrêter.")
 
     try:
-        serre_controller_instance = SerreController()
+        # Plusieurs zones (config.ZONES): une roue temporelle et un pool de threads partagés
+        serre_controller_instance = MultiZoneController.from_config() if config.ZONES else SerreController()
     except Exception as e:
         main_logger.critical(f"Échec de l'initialisation de SerreController: {e}", exc_info=True)
         sys.exit(1)
 
+    if config.STATUS_SHM_PATH:
+        # Chaque zone republie son statut après chaque acquisition, cycle de logique ou commande
+        try:
+            zones = controller_zones(serre_controller_instance)
+            status_segment = StatusSegment(config.STATUS_SHM_PATH, zones)
+            for zone_id, zone in zones.items():
+                zone.status_publisher = status_segment.writer(zone_id)
+        except OSError as e:
+            main_logger.error(f"Publication du statut en mémoire partagée désactivée ('{config.STATUS_SHM_PATH}'): {e}")
+
+    if config.CONTROLLER_MODE == 'daemon':
+        # L'API web (app.py en mode daemon, éventuellement plusieurs workers) se connecte à ce socket
+        try:
+            ipc_server = ControllerServer(serre_controller_instance)
+            ipc_server.start()
+        except OSError as e:
+            main_logger.critical(f"Impossible d'ouvrir le socket IPC '{config.IPC_SOCKET_PATH}': {e}", exc_info=True)
+            serre_controller_instance.shutdown()
+            sys.exit(1)
+
     # Démarrer la boucle principale du contrôleur dans son propre thread
     controller_thread = threading.Thread(target=serre_controller_instance.run, name="SerreControllerThread", daemon=True)
     controller_thread.start()
@@ -161,6 +151,8 @@ def run_controller():
         # S'assurer que le cleanup a été fait si le thread s'est terminé de manière inattendue
         # et que le signal_handler n'a pas déjà appelé shutdown().
         # La méthode shutdown() de SerreController devrait être idempotente.
+        if ipc_server:
+            ipc_server.stop()
         if serre_controller_instance:
              main_logger.info("Appel de shutdown sur SerreController au cas où (fin de main.py).")
              serre_controller_instance.shutdown()
@@ -172,6 +164,9 @@ if __name__ == "__main__":
     # SIGTERM est un signal d'arrêt plus générique (ex: `kill <pid>`).
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
+    # SIGUSR2 (ex: `systemctl kill -s USR2 serre` avec Restart=always): redémarrage à chaud
+    if hasattr(signal, 'SIGUSR2'):
+        signal.signal(signal.SIGUSR2, signal_handler)
 
     # Sur Windows, SIGTERM n'est pas vraiment supporté de la même manière.
     # SIGBREAK (Ctrl+Break) peut être une alternative, ou gérer Ctrl+C via KeyboardInterrupt.
@@ -12,163 +12,613 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 try:
-    from flask import Flask, jsonify, render_template, request
-    from src.core.serre_logic import SerreController
+    # Le contrôleur, psycopg2 et les modules d'ingestion/export ne sont importés qu'à la
+    # construction de l'application ou à la première requête qui en a besoin.
+    from flask import Blueprint, Flask, current_app, g, jsonify, render_template, request, Response, stream_with_context
     from src import config 
+    from src.utils import metrics
 except ImportError as e:
     print(f"Erreur d'importation critique dans app.py: {e}.")
     sys.exit(1)
 
-# Configuration du logging
-log_level_str = getattr(config, 'LOG_LEVEL', 'INFO').upper()
-log_level = getattr(logging, log_level_str, logging.INFO)
-log_file_dir = os.path.dirname(config.LOG_FILE_PATH)
-
-if log_file_dir and not os.path.exists(log_file_dir):
-    try: 
-        os.makedirs(log_file_dir)
-    except OSError as e_mkdir:
-        print(f"AVERTISSEMENT: Impossible de créer le répertoire de logs {log_file_dir}: {e_mkdir}")
-
-log_handlers = [logging.StreamHandler(sys.stdout)]
-if hasattr(config, 'LOG_FILE_PATH') and config.LOG_FILE_PATH:
-    try:
-        if not os.path.exists(log_file_dir) and log_file_dir:
-             os.makedirs(log_file_dir)
-        log_handlers.append(logging.FileHandler(config.LOG_FILE_PATH, mode='a'))
-    except Exception as e_fh:
-        print(f"AVERTISSEMENT: Impossible d'ouvrir le fichier log {config.LOG_FILE_PATH}: {e_fh}")
-
-logging.basicConfig(
-    level=log_level,
-    format='%(asctime)s - %(levelname)s - %(name)s - %(threadName)s - %(message)s',
-    handlers=log_handlers
-)
 flask_logger = logging.getLogger(__name__)
 
-app = Flask(__name__, template_folder='templates')
+bp = Blueprint('serre', __name__)
 
 # --- Variable globale pour l'état d'arrêt ---
 SHUTDOWN_REQUESTED = threading.Event()
 
-# Instanciation du contrôleur de la serre
-try:
-    controller = SerreController()
-except Exception as e:
-    flask_logger.critical(f"Erreur critique lors de l'initialisation de SerreController: {e}", exc_info=True)
-    # Si le contrôleur ne peut pas démarrer, il est préférable d'arrêter l'application Flask.
-    # On pourrait lever l'exception pour arrêter le script, ou appeler sys.exit(1)
-    print("ERREUR CRITIQUE: SerreController n'a pas pu être initialisé. Arrêt de l'application.")
-    sys.exit(1)
+
+class ControllerState:
+    """
+    Cibles des routes d'une application: le contrôleur local (et ses zones), ou le client du
+    démon en mode daemon. `controller` est la cible des routes sans identifiant de zone.
+    """
+    def __init__(self, controller, zone_manager=None, ipc_client=None, status_reader=None):
+        self.controller = controller
+        self.zone_manager = zone_manager
+        self.ipc_client = ipc_client
+        self.status_reader = status_reader
+        self._ingest_db = None
+        self._ingest_db_lock = threading.Lock()
+
+    @property
+    def remote(self) -> bool:
+        return self.ipc_client is not None
+
+    def zones(self) -> dict:
+        """Zones par identifiant (en mode une seule serre, l'unique zone est config.GREENHOUSE_ID)."""
+        if self.remote:
+            from src.ipc.client import RemoteController
+            return {zone_id: RemoteController(self.ipc_client, zone_id) for zone_id in self.ipc_client.call("zone_ids")}
+        return self.zone_manager.zones if self.zone_manager else {config.GREENHOUSE_ID: self.controller}
+
+    def ingest_db_manager(self):
+        """Base du contrôleur local; en mode daemon, un gestionnaire propre au worker (créé au premier lot)."""
+        if not self.remote:
+            return self.controller.db_manager
+        with self._ingest_db_lock:
+            if self._ingest_db is None:
+                from src.utils.db_utils import DatabaseManager
+                self._ingest_db = DatabaseManager()
+            return self._ingest_db
+
+    def run(self):
+        (self.zone_manager or self.controller).run()
+
+    def shutdown(self):
+        if self.remote:
+            flask_logger.info("Mode daemon: le contrôleur reste actif dans son processus.")
+            self.ipc_client.close()
+        else:
+            (self.zone_manager or self.controller).shutdown()
+
+
+def build_controller_state() -> ControllerState:
+    """
+    Instancie le contrôleur de la serre (ou des zones si config.ZONES est défini). En mode
+    'daemon', le contrôleur tourne dans main.py: l'API passe par le socket Unix du démon.
+    """
+    try:
+        if config.CONTROLLER_MODE == 'daemon':
+            from src.ipc.client import ControllerClient, RemoteController
+            from src.ipc.status_shm import StatusReader
+            ipc_client = ControllerClient()
+            flask_logger.info(f"Mode daemon: contrôleur distant sur '{ipc_client.socket_path}'.")
+            return ControllerState(
+                RemoteController(ipc_client), ipc_client=ipc_client,
+                status_reader=StatusReader(config.STATUS_SHM_PATH) if config.STATUS_SHM_PATH else None)
+        if getattr(config, 'ZONES', None):
+            from src.core.zones import MultiZoneController
+            zone_manager = MultiZoneController.from_config()
+            return ControllerState(zone_manager.default_zone, zone_manager=zone_manager)
+        from src.core.serre_logic import SerreController
+        return ControllerState(SerreController())
+    except Exception as e:
+        flask_logger.critical(f"Erreur critique lors de l'initialisation de SerreController: {e}", exc_info=True)
+        raise
+
+
+def create_app(state: ControllerState | None = None, configure_logs: bool = True) -> Flask:
+    """
+    Fabrique de l'application. Sans `state`, le contrôleur est construit d'après la
+    configuration (CONTROLLER_MODE, ZONES). Rien n'est démarré à l'import du module.
+    """
+    if configure_logs:
+        # Écriture asynchrone par lots, rotation: src/utils/logging_setup.py
+        from src.utils.logging_setup import configure_logging
+        configure_logging()
+        config.log_configuration_summary()
+    app = Flask(__name__, template_folder='templates')
+    # Plus grosse requête acceptée (lot d'ingestion non compressé): au-delà, 413 sans lire le corps
+    app.config['MAX_CONTENT_LENGTH'] = config.INGEST_MAX_BODY_BYTES
+    app.extensions['serre'] = state or build_controller_state()
+    app.register_blueprint(bp)
+    return app
+
+
+def __getattr__(name):
+    # `app` (ex: gunicorn src.api.app:app) n'est construite qu'au premier accès
+    if name == 'app':
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _state() -> ControllerState:
+    return current_app.extensions['serre']
 
 
 # --- Routes (inchangées) ---
-@app.route('/')
+@bp.route('/')
 def index():
     return render_template('index.html')
 
-@app.route('/status', methods=['GET'])
+@bp.route('/status', methods=['GET'])
 def get_status_route():
     try:
-        current_status = controller.get_status()
+        current_status = _state().controller.get_status()
         return jsonify(current_status)
     except Exception as e:
         flask_logger.error(f"Erreur lors de la récupération du statut: {e}", exc_info=True)
         return jsonify({"error": "Erreur interne du serveur lors de la récupération du statut"}), 500
 
-@app.route('/api/settings', methods=['GET'])
-def get_settings_route_api():
+@bp.route('/api/status/snapshot', methods=['GET'])
+def get_status_snapshot_route():
+    """
+    Statut compact de toutes les zones. En mode daemon, lu dans la mémoire partagée publiée par
+    le contrôleur (aucun aller-retour IPC); "perime" signale un contrôleur qui ne publie plus.
+    """
     try:
-        current_settings = controller.get_all_settings() 
-        return jsonify(current_settings)
+        state = _state()
+        if state.remote:
+            if state.status_reader is None:
+                return jsonify({"error": "Publication du statut désactivée (STATUS_SHM_PATH vide)."}), 503
+            snapshots = state.status_reader.read_all()
+        else:
+            now = time.time()
+            snapshots = [{**zone.get_status_snapshot(), "published_at": now} for zone in state.zones().values()]
+        limit = time.time() - config.STATUS_SHM_PERIME_SECONDES
+        for snapshot in snapshots:
+            snapshot["perime"] = snapshot["published_at"] < limit
+        return jsonify({"zones": snapshots})
+    except Exception as e:
+        flask_logger.error(f"Erreur lors de la lecture du statut compact: {e}", exc_info=True)
+        return jsonify({"error": "Erreur interne du serveur"}), 500
+
+@bp.before_app_request
+def _start_request_timer():
+    g.request_start = time.perf_counter()
+
+@bp.after_app_request
+def _observe_request_duration(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        # Gabarit de la route (pas l'URL): une série par route, pas par zone ou paramètre
+        route = request.url_rule.rule if request.url_rule is not None else "inconnue"
+        metrics.API_REQUEST_SECONDS.observe(time.perf_counter() - start, request.method, route, response.status_code)
+    return response
+
+@bp.route('/metrics', methods=['GET'])
+def metrics_route():
+    """Métriques au format texte Prometheus; en mode démon, celles du démon suivent celles de l'API."""
+    body = metrics.render()
+    state = _state()
+    if state.remote:
+        try:
+            body += state.ipc_client.call("metrics")
+        except Exception as e:
+            flask_logger.warning(f"Métriques du démon indisponibles: {e}")
+    return Response(body, mimetype=None, content_type=metrics.CONTENT_TYPE)
+
+@bp.route('/api/readiness', methods=['GET'])
+def readiness_route():
+    """
+    Phase de démarrage de chaque zone (étapes matériel, settings, base de données). 200 dès que
+    le contrôle est actif dans toutes les zones, 503 sinon (ou si le démon ne répond pas).
+    """
+    try:
+        zones = [zone.get_startup_status() for zone in _state().zones().values()]
+    except Exception as e:
+        flask_logger.warning(f"État de démarrage indisponible: {e}")
+        return jsonify({"pret": False, "message": "Contrôleur indisponible."}), 503
+    ready = all(zone["pret"] for zone in zones)
+    return jsonify({"pret": ready, "zones": zones}), 200 if ready else 503
+
+def _recent_sensor_data_response(target):
+    """Dernières heures d'acquisition (fenêtre en mémoire). Paramètres: since (epoch s), max_points, stats_only=1."""
+    try:
+        if request.args.get('stats_only', '0').lower() in ['1', 'true', 'yes']:
+            return jsonify({"stats": target.get_sensor_stats()})
+        since = request.args.get('since', type=float)
+        max_points = request.args.get('max_points', type=int)
+        return jsonify(target.get_recent_sensor_data(since=since, max_points=max_points))
+    except Exception as e:
+        flask_logger.error(f"Erreur lors de la récupération des données récentes: {e}", exc_info=True)
+        return jsonify({"error": "Erreur interne du serveur"}), 500
+
+def _settings_etag(version: int) -> str:
+    return f'"{version}"'
+
+def _get_settings_response(target):
+    """Settings complets; l'en-tête ETag porte leur version (à renvoyer dans If-Match)."""
+    try:
+        versioned = target.get_versioned_settings()
+        response = jsonify(versioned["settings"])
+        response.headers['ETag'] = _settings_etag(versioned["version"])
+        return response
     except Exception as e:
         flask_logger.error(f"Erreur lors de la récupération des configurations: {e}", exc_info=True)
         return jsonify({"error": "Erreur interne du serveur"}), 500
 
-@app.route('/api/settings', methods=['POST'])
-def update_settings_route_api():
+def _expected_settings_version():
+    """Version exigée par l'en-tête If-Match (None: mise à jour inconditionnelle, ou If-Match: *)."""
+    if_match = request.headers.get('If-Match', '').strip()
+    if not if_match or if_match == '*':
+        return None
+    try:
+        return int(if_match.removeprefix('W/').strip('"'))
+    except ValueError:
+        return -1 # Aucune version ne correspond: 412
+
+def _update_settings_response(target):
+    """
+    Mise à jour partielle des settings. Avec If-Match (ETag de GET), la mise à jour n'est
+    appliquée que si les settings n'ont pas changé depuis: sinon 412 et la version actuelle.
+    """
+    from src.core.settings_history import SettingsVersionConflict
     try:
         new_settings_data = request.json
         if not new_settings_data:
             return jsonify({"success": False, "message": "Aucune donnée de configuration fournie."}), 400
         flask_logger.info(f"Requête de mise à jour des configurations reçue: {new_settings_data}")
-        if controller.update_settings(new_settings_data):
+        if target.update_settings(new_settings_data, expected_version=_expected_settings_version()):
             flask_logger.info("Configurations mises à jour avec succès.")
             return jsonify({"success": True, "message": "Configurations mises à jour avec succès."})
         else:
             flask_logger.warning("Échec de la mise à jour des configurations (validation ou sauvegarde échouée).")
             return jsonify({"success": False, "message": "Échec de la mise à jour des configurations."}), 400
+    except SettingsVersionConflict as e:
+        response = jsonify({"success": False, "message": "Les configurations ont été modifiées entre-temps.",
+                            "version": e.current_version})
+        if e.current_version is not None:
+            response.headers['ETag'] = _settings_etag(e.current_version)
+        return response, 412
     except Exception as e:
         flask_logger.error(f"Erreur lors de la mise à jour des configurations: {e}", exc_info=True)
         return jsonify({"success": False, "message": "Erreur interne du serveur"}), 500
 
-# Contrôles des actionneurs (inchangés)
-@app.route('/control/leds', methods=['POST'])
+def _settings_history_response(target):
+    """
+    Historique des settings. Paramètres (epoch s): a=T -> version en vigueur à T;
+    debut=T1&fin=T2 -> intervalles de validité; sinon journal (depuis_version, limite).
+    """
+    try:
+        at = request.args.get('a', type=float)
+        start, end = request.args.get('debut', type=float), request.args.get('fin', type=float)
+        if at is not None:
+            version = target.get_settings_at(at)
+            if version is None:
+                return jsonify({"success": False, "message": "Aucune version des settings à cette date."}), 404
+            return jsonify(version)
+        if start is not None or end is not None:
+            if start is None or end is None or end <= start:
+                return jsonify({"success": False, "message": "Paramètres 'debut' et 'fin' requis (debut < fin)."}), 400
+            return jsonify({"intervalles": target.get_settings_intervals(start, end)})
+        since_version = request.args.get('depuis_version', default=0, type=int)
+        limit = request.args.get('limite', type=int)
+        return jsonify({"versions": target.get_settings_history(since_version, limit)})
+    except Exception as e:
+        flask_logger.error(f"Erreur lors de la récupération de l'historique des configurations: {e}", exc_info=True)
+        return jsonify({"error": "Erreur interne du serveur"}), 500
+
+def _loop_timing_response(target):
+    """Gigue et échéances manquées des boucles d'acquisition et de logique. Paramètre: cycles (derniers cycles détaillés)."""
+    try:
+        recent_cycles = min(max(0, request.args.get('cycles', 0, type=int)), config.TEMPORISATION_HISTORIQUE_CYCLES)
+        return jsonify(target.get_loop_timing(recent_cycles))
+    except Exception as e:
+        flask_logger.error(f"Erreur lors de la lecture de la temporisation des boucles: {e}", exc_info=True)
+        return jsonify({"error": "Erreur interne du serveur"}), 500
+
+@bp.route('/api/temporisation', methods=['GET'])
+def get_loop_timing_route():
+    return _loop_timing_response(_state().controller)
+
+@bp.route('/api/sensors/recent', methods=['GET'])
+def get_recent_sensor_data_route():
+    return _recent_sensor_data_response(_state().controller)
+
+@bp.route('/api/settings', methods=['GET'])
+def get_settings_route_api():
+    return _get_settings_response(_state().controller)
+
+@bp.route('/api/settings', methods=['POST'])
+def update_settings_route_api():
+    return _update_settings_response(_state().controller)
+
+@bp.route('/api/settings/history', methods=['GET'])
+def get_settings_history_route():
+    return _settings_history_response(_state().controller)
+
+def _token_unauthorized(token: str, setting: str, disabled_message: str):
+    """403 tant que le jeton `setting` n'est pas défini (routes désactivées), 401 si le jeton est absent ou faux."""
+    if not token:
+        return jsonify({"success": False, "message": f"{disabled_message} ({setting} non défini)."}), 403
+    if request.headers.get('Authorization') != f"Bearer {token}":
+        return jsonify({"success": False, "message": "Non autorisé."}), 401
+    return None
+
+# --- Point de collecte de la flotte ---
+@bp.route('/api/ingest', methods=['POST'])
+def ingest_batch_route():
+    """
+    Reçoit un lot (JSON compressé gzip/deflate) d'échantillons et d'événements d'une serre distante
+    et l'écrit en une transaction. Un lot déjà reçu (même batch_seq) est acquitté sans réécriture;
+    un lot arrivé hors ordre est inséré.
+    """
+    denied = _token_unauthorized(config.INGEST_TOKEN, "INGEST_TOKEN", "Point de collecte désactivé")
+    if denied:
+        return denied
+    from src.utils.ingest import decode_ingest_body, validate_ingest_batch, IngestValidationError
+    try:
+        payload = decode_ingest_body(request.get_data(cache=False), request.headers.get('Content-Encoding'))
+        batch = validate_ingest_batch(payload)
+    except IngestValidationError as e:
+        return jsonify({"success": False, "message": str(e), "errors": e.errors}), 400
+
+    try:
+        result = _state().ingest_db_manager().bulk_insert_batch(
+            batch["greenhouse_id"], batch["batch_seq"], batch["samples"], batch["events"])
+    except Exception as e:
+        flask_logger.error(f"Erreur lors de l'insertion du lot {batch['batch_seq']} de '{batch['greenhouse_id']}': {e}")
+        return jsonify({"success": False, "message": "Base de données indisponible, renvoyer le lot plus tard."}), 503
+    return jsonify({
+        "success": True, "status": result,
+        "samples": len(batch["samples"]), "events": len(batch["events"])
+    })
+
+@bp.route('/api/export', methods=['GET'])
+def export_sensor_data_route():
+    """
+    Exporte l'historique des capteurs en flux (NDJSON ou CSV, gzip optionnel).
+    Paramètres: start (requis), end (défaut: maintenant), format=ndjson|csv, gzip=1.
+    """
+    from src.utils.export import stream_export, parse_export_range, EXPORT_FORMATS
+    fmt = request.args.get('format', 'ndjson').lower()
+    compress = request.args.get('gzip', '0').lower() in ['1', 'true', 'yes']
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"success": False, "message": f"Format inconnu '{fmt}'."}), 400
+    try:
+        start, end = parse_export_range(request.args.get('start'), request.args.get('end'))
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    filename = f"sensor_data_{start:%Y%m%d}_{end:%Y%m%d}.{fmt}" + (".gz" if compress else "")
+    mimetype = "application/gzip" if compress else ("application/x-ndjson" if fmt == "ndjson" else "text/csv")
+    flask_logger.info(f"Export {fmt}{' (gzip)' if compress else ''} demandé: {start} -> {end}")
+    try:
+        # Connexion et requête avant la réponse: une erreur de base donne un 503, pas un fichier tronqué
+        stream = stream_export(start, end, fmt, compress)
+    except Exception as e:
+        flask_logger.error(f"Export {start} -> {end} impossible: {e}")
+        return jsonify({"success": False, "message": "Base de données indisponible."}), 503
+    return Response(
+        stream_with_context(stream),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+# Contrôles des actionneurs
+# device -> (messages ON/OFF, clé d'état de la réponse)
+_ACTUATOR_CONTROLS = {
+    "leds": (("LEDs allumées", "LEDs éteintes"), "leds_active"),
+    "humidifier": (("Humidificateur activé", "Humidificateur désactivé"), "humidifier_active"),
+    "ventilation": (("Ventilation activée", "Ventilation désactivée"), "ventilation_active"),
+}
+
+def _control_actuator_response(target, device: str):
+    """Bascule (action=toggle) ou force (action=on|off) un actionneur en mode manuel."""
+    (message_on, message_off), state_key = _ACTUATOR_CONTROLS[device]
+    try:
+        updated_status = target.command_actuator(device, request.form.get('action', 'toggle'))
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    return jsonify({"success": True, "message": message_on if updated_status["is_active"] else message_off,
+                    state_key: updated_status["is_active"], "manual_mode": updated_status["manual_mode"]})
+
+@bp.route('/control/leds', methods=['POST'])
 def control_leds_route():
     try:
-        action = request.form.get('action', 'toggle') 
-        current_status = controller.led_ctrl.get_status()
-        new_state = not current_status["is_active"] if action == 'toggle' else (action == 'on')
-        controller.set_leds_manual_mode(True, new_state)
-        updated_status = controller.led_ctrl.get_status()
-        return jsonify({"success": True, "message": f"LEDs {'allumées' if new_state else 'éteintes'}", "leds_active": updated_status["is_active"], "manual_mode": updated_status["manual_mode"]})
+        return _control_actuator_response(_state().controller, "leds")
     except Exception as e:
         flask_logger.error(f"Erreur contrôle LEDs: {e}", exc_info=True)
         return jsonify({"success": False, "message": "Erreur serveur"}), 500
 
-@app.route('/control/humidifier', methods=['POST'])
+@bp.route('/control/humidifier', methods=['POST'])
 def control_humidifier_route():
     try:
-        action = request.form.get('action', 'toggle')
-        current_status = controller.humidifier_ctrl.get_status()
-        new_state = not current_status["is_active"] if action == 'toggle' else (action == 'on')
-        controller.set_humidifier_manual_mode(True, new_state)
-        updated_status = controller.humidifier_ctrl.get_status()
-        return jsonify({"success": True, "message": f"Humidificateur {'activé' if new_state else 'désactivé'}", "humidifier_active": updated_status["is_active"], "manual_mode": updated_status["manual_mode"]})
+        return _control_actuator_response(_state().controller, "humidifier")
     except Exception as e:
         flask_logger.error(f"Erreur contrôle Humidificateur: {e}", exc_info=True)
         return jsonify({"success": False, "message": "Erreur serveur"}), 500
 
-@app.route('/control/ventilation', methods=['POST'])
+@bp.route('/control/ventilation', methods=['POST'])
 def control_ventilation_route():
     try:
-        action = request.form.get('action', 'toggle')
-        current_status = controller.ventilation_ctrl.get_status()
-        new_state = not current_status["is_active"] if action == 'toggle' else (action == 'on')
-        controller.set_ventilation_manual_mode(True, new_state)
-        updated_status = controller.ventilation_ctrl.get_status()
-        return jsonify({"success": True, "message": f"Ventilation {'activée' if new_state else 'désactivée'}", "ventilation_active": updated_status["is_active"], "manual_mode": updated_status["manual_mode"]})
+        return _control_actuator_response(_state().controller, "ventilation")
     except Exception as e:
         flask_logger.error(f"Erreur contrôle Ventilation: {e}", exc_info=True)
         return jsonify({"success": False, "message": "Erreur serveur"}), 500
 
-@app.route('/control/auto_mode', methods=['POST'])
+@bp.route('/control/auto_mode', methods=['POST'])
 def set_auto_mode_route():
     try:
-        controller.set_all_auto_mode()
+        _state().controller.set_all_auto_mode()
         return jsonify({"success": True, "message": "Mode automatique global activé."})
     except Exception as e:
         flask_logger.error(f"Erreur mode auto: {e}", exc_info=True)
         return jsonify({"success": False, "message": "Erreur serveur"}), 500
 
-@app.route('/control/emergency_stop', methods=['POST'])
+@bp.route('/control/emergency_stop', methods=['POST'])
 def emergency_stop_route():
+    """Arrêt d'urgence de tous les actionneurs (de toutes les zones en multi-zone)."""
     try:
-        controller.emergency_stop_all_actuators()
+        state = _state()
+        (state.zone_manager or state.controller).emergency_stop_all_actuators()
         return jsonify({"success": True, "message": "Arrêt d'urgence effectué."})
     except Exception as e:
         flask_logger.error(f"Erreur arrêt d'urgence: {e}", exc_info=True)
         return jsonify({"success": False, "message": "Erreur serveur"}), 500
 
+# --- Routes par zone (en mode une seule serre, l'unique zone est config.GREENHOUSE_ID) ---
+def _zone_not_found(zone_id: str):
+    return jsonify({"success": False, "message": f"Zone inconnue '{zone_id}'."}), 404
+
+@bp.route('/api/zones', methods=['GET'])
+def list_zones_route():
+    try:
+        state = _state()
+        if state.remote:
+            return jsonify(state.ipc_client.call("zones")) # Résumé construit par le démon en un aller-retour
+        from src.core.zones import zone_summary
+        response = {"zones": [zone_summary(zone_id, zone) for zone_id, zone in state.zones().items()]}
+        if state.zone_manager:
+            response["ordonnanceur"] = state.zone_manager.get_scheduler_status()
+        return jsonify(response)
+    except Exception as e:
+        flask_logger.error(f"Erreur lors de la récupération des zones: {e}", exc_info=True)
+        return jsonify({"error": "Erreur interne du serveur"}), 500
+
+@bp.route('/zones/<zone_id>/status', methods=['GET'])
+def get_zone_status_route(zone_id):
+    zone = _state().zones().get(zone_id)
+    if zone is None:
+        return _zone_not_found(zone_id)
+    try:
+        return jsonify(zone.get_status())
+    except Exception as e:
+        flask_logger.error(f"Erreur lors de la récupération du statut de la zone '{zone_id}': {e}", exc_info=True)
+        return jsonify({"error": "Erreur interne du serveur lors de la récupération du statut"}), 500
+
+@bp.route('/api/zones/<zone_id>/sensors/recent', methods=['GET'])
+def get_zone_recent_sensor_data_route(zone_id):
+    zone = _state().zones().get(zone_id)
+    return _recent_sensor_data_response(zone) if zone is not None else _zone_not_found(zone_id)
+
+@bp.route('/api/zones/<zone_id>/settings', methods=['GET'])
+def get_zone_settings_route(zone_id):
+    zone = _state().zones().get(zone_id)
+    return _get_settings_response(zone) if zone is not None else _zone_not_found(zone_id)
+
+@bp.route('/api/zones/<zone_id>/settings', methods=['POST'])
+def update_zone_settings_route(zone_id):
+    zone = _state().zones().get(zone_id)
+    return _update_settings_response(zone) if zone is not None else _zone_not_found(zone_id)
+
+@bp.route('/api/zones/<zone_id>/temporisation', methods=['GET'])
+def get_zone_loop_timing_route(zone_id):
+    zone = _state().zones().get(zone_id)
+    return _loop_timing_response(zone) if zone is not None else _zone_not_found(zone_id)
+
+@bp.route('/api/zones/<zone_id>/settings/history', methods=['GET'])
+def get_zone_settings_history_route(zone_id):
+    zone = _state().zones().get(zone_id)
+    return _settings_history_response(zone) if zone is not None else _zone_not_found(zone_id)
+
+@bp.route('/zones/<zone_id>/control/<device>', methods=['POST'])
+def control_zone_route(zone_id, device):
+    """device: leds | humidifier | ventilation | auto_mode | emergency_stop."""
+    zone = _state().zones().get(zone_id)
+    if zone is None:
+        return _zone_not_found(zone_id)
+    try:
+        if device in _ACTUATOR_CONTROLS:
+            return _control_actuator_response(zone, device)
+        if device == 'auto_mode':
+            zone.set_all_auto_mode()
+            return jsonify({"success": True, "message": f"Mode automatique activé pour la zone '{zone_id}'."})
+        if device == 'emergency_stop':
+            zone.emergency_stop_all_actuators()
+            return jsonify({"success": True, "message": f"Arrêt d'urgence effectué pour la zone '{zone_id}'."})
+        return jsonify({"success": False, "message": f"Commande inconnue '{device}'."}), 404
+    except Exception as e:
+        flask_logger.error(f"Erreur de contrôle '{device}' de la zone '{zone_id}': {e}", exc_info=True)
+        return jsonify({"success": False, "message": "Erreur serveur"}), 500
+
+
+# --- Diagnostic à la demande (profilage, tracemalloc) ---
+def _admin_unauthorized():
+    return _token_unauthorized(config.ADMIN_TOKEN, "ADMIN_TOKEN", "Routes d'administration désactivées")
+
+def _diagnostic_in_daemon(state: ControllerState) -> bool:
+    """En mode démon, le diagnostic porte sur le démon (threads de contrôle), sauf processus=api."""
+    return state.remote and request.args.get('processus') != 'api'
+
+def _diagnostic_error_response(e: Exception):
+    from src.ipc.client import ControllerError
+    from src.ipc.protocol import ERROR_BAD_REQUEST, ERROR_CONFLICT
+    from src.utils.profiling import ProfilingStateError
+    if isinstance(e, ProfilingStateError) or (isinstance(e, ControllerError) and e.kind == ERROR_CONFLICT):
+        return jsonify({"success": False, "message": str(e)}), 409
+    if isinstance(e, ValueError) or (isinstance(e, ControllerError) and e.kind == ERROR_BAD_REQUEST):
+        return jsonify({"success": False, "message": str(e)}), 400
+    flask_logger.error(f"Erreur de diagnostic: {e}", exc_info=True)
+    return jsonify({"success": False, "message": "Erreur serveur"}), 500
+
+@bp.route('/api/admin/profil', methods=['POST'])
+def profile_route():
+    """
+    Profilage par échantillonnage de tous les threads, la réponse arrivant après `duree` s.
+    Paramètres: duree, frequence (Hz), threads (préfixes de noms séparés par des virgules),
+    format=json (sinon piles repliées pour flamegraph), processus=api (mode démon).
+    """
+    denied = _admin_unauthorized()
+    if denied:
+        return denied
+    from src.utils import profiling
+    duration = request.args.get('duree', config.PROFILAGE_DUREE_DEFAUT_SECONDES, type=float)
+    frequency = request.args.get('frequence', type=float)
+    threads = [name.strip() for name in request.args.get('threads', '').split(',') if name.strip()] or None
+    state = _state()
+    try:
+        if _diagnostic_in_daemon(state):
+            # Connexion dédiée: la requête dure `duree` s, sans bloquer le client partagé du worker
+            from src.ipc.client import ControllerClient
+            client = ControllerClient(state.ipc_client.socket_path, timeout=duration + config.IPC_TIMEOUT_SECONDS)
+            try:
+                profile = client.call("profile", duration=duration, frequency=frequency, threads=threads)
+            finally:
+                client.close()
+        else:
+            profile = profiling.sample_stacks(duration, frequency, threads)
+    except Exception as e:
+        return _diagnostic_error_response(e)
+    if request.args.get('format') == 'json':
+        return jsonify(profile)
+    return Response(profiling.collapsed(profile), mimetype='text/plain')
+
+_MEMORY_ACTIONS = {'demarrer': "memory_start", 'instantane': "memory_snapshot", 'arreter': "memory_stop"}
+
+@bp.route('/api/admin/memoire/<action>', methods=['POST'])
+def memory_route(action):
+    """
+    Suivi des allocations (tracemalloc). action: demarrer (profondeur) | instantane (limite,
+    cle=lineno|filename|traceback, reference=precedent|debut) | arreter. processus=api (mode démon).
+    """
+    denied = _admin_unauthorized()
+    if denied:
+        return denied
+    op = _MEMORY_ACTIONS.get(action)
+    if op is None:
+        return jsonify({"success": False, "message": f"Action inconnue '{action}'."}), 404
+    from src.utils import profiling
+    args = {}
+    if op == "memory_start":
+        args["frames"] = request.args.get('profondeur', type=int)
+    elif op == "memory_snapshot":
+        args = {"limit": request.args.get('limite', 20, type=int), "key_type": request.args.get('cle', 'lineno'),
+                "reference": request.args.get('reference', profiling.REFERENCE_PREVIOUS)}
+    state = _state()
+    try:
+        if _diagnostic_in_daemon(state):
+            return jsonify(state.ipc_client.call(op, **args))
+        tracker = profiling.MEMORY_TRACKER
+        handlers = {"memory_start": tracker.start, "memory_snapshot": tracker.snapshot, "memory_stop": tracker.stop}
+        return jsonify(handlers[op](**args))
+    except Exception as e:
+        return _diagnostic_error_response(e)
+
 
 # --- Gestion de l'arrêt propre ---
 controller_main_thread_instance = None 
+main_state: ControllerState | None = None # État de l'application lancée par __main__
 
 def perform_shutdown_tasks():
-    """Effectue les tâches de nettoyage pour SerreController."""
-    if controller: 
+    """Effectue les tâches de nettoyage pour SerreController (ou toutes les zones)."""
+    if main_state: 
         flask_logger.info("perform_shutdown_tasks: Appel de controller.shutdown()...")
-        controller.shutdown() 
+        main_state.shutdown() 
     
     global controller_main_thread_instance
     if controller_main_thread_instance and controller_main_thread_instance.is_alive():
@@ -211,16 +661,20 @@ def signal_handler_flask(signum, frame):
 
 
 if __name__ == "__main__":
+    try:
+        app = create_app()
+    except Exception:
+        # Si le contrôleur ne peut pas démarrer, il est préférable d'arrêter l'application Flask.
+        print("ERREUR CRITIQUE: SerreController n'a pas pu être initialisé. Arrêt de l'application.")
+        sys.exit(1)
+    main_state = app.extensions['serre']
     flask_logger.info(f"Démarrage de l'application Flask sur {config.APP_HOST}:{config.APP_PORT}")
     flask_logger.info(f"Mode matériel: {getattr(config, 'HARDWARE_ENV', 'N/A')}, Mode base de données: {getattr(config, 'DB_ENV', 'N/A')}")
 
-    if controller: 
+    if not main_state.remote:
         flask_logger.info("Démarrage du thread pour SerreController.run()...")
-        controller_main_thread_instance = threading.Thread(target=controller.run, name="SerreControllerRunThread", daemon=True)
+        controller_main_thread_instance = threading.Thread(target=main_state.run, name="SerreControllerRunThread", daemon=True)
         controller_main_thread_instance.start()
-    else:
-        # Cette condition est maintenant gérée par le sys.exit(1) plus haut si controller n'est pas initialisé.
-        pass
 
     signal.signal(signal.SIGINT, signal_handler_flask) 
     signal.signal(signal.SIGTERM, signal_handler_flask)
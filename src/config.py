@@ -41,10 +41,234 @@ INTERVALLE_LECTURE_RAPIDE_CAPTEURS_SECONDES = 15 # Pour le thread d'acquisition
 FLUSH_INTERVAL_BUFFER_SECONDES = 300
 BUFFER_SIZE_MAX = 10
 
+# --- Échantillonnage adaptatif (acquisition rapide près des seuils, lente quand c'est stable) ---
+ECHANTILLONNAGE_ADAPTATIF = os.getenv('ECHANTILLONNAGE_ADAPTATIF', 'True').lower() in ['true', '1', 't']
+ECHANTILLONNAGE_INTERVALLE_MIN_SECONDES = 5
+# Jamais plus lent que la boucle logique: chaque cycle logique dispose d'une lecture récente
+ECHANTILLONNAGE_INTERVALLE_MAX_SECONDES = INTERVALLE_LECTURE_CAPTEURS_SECONDES
+# Distance à un seuil sous laquelle l'acquisition accélère (unités du canal)
+ECHANTILLONNAGE_MARGES = {"humidite": 3.0, "co2": 150.0}
+# Accélère aussi si la tendance actuelle atteint un seuil dans moins de ce délai
+ECHANTILLONNAGE_HORIZON_TENDANCE_SECONDES = 300
+
+# --- Enregistrement des lectures (une ligne sensor_data par cycle logique au plus) ---
+# Un cycle dont les valeurs restent dans ces bandes mortes par rapport à la dernière ligne
+# enregistrée, sans changement d'état d'un actionneur, n'est pas mis en tampon.
+ENREGISTREMENT_IGNORER_INCHANGES = os.getenv('ENREGISTREMENT_IGNORER_INCHANGES', 'True').lower() in ['true', '1', 't']
+ENREGISTREMENT_BANDES_MORTES = {"temperature": 0.1, "humidite": 0.5, "co2": 10.0}
+# Une ligne est tout de même enregistrée au moins à cet intervalle (courbes sans trou)
+ENREGISTREMENT_INTERVALLE_MAX_SECONDES = 600
+
+# --- Fenêtre glissante en mémoire des dernières acquisitions (graphiques sans requête DB) ---
+FENETRE_CAPTEURS_HEURES = 6
+
+# --- Filtrage des lectures capteurs (entre la lecture SCD30 et les actionneurs) ---
+# Chaîne de filtres par canal, appliquée dans l'ordre. Types: "hampel" (rejet des valeurs
+# aberrantes), "median" (médiane des N dernières), "ema" (lissage exponentiel),
+# "rate_limit" (variation maximale par seconde). Liste vide = canal non filtré.
+FILTRAGE_CAPTEURS_ACTIF = os.getenv('FILTRAGE_CAPTEURS_ACTIF', 'True').lower() in ['true', '1', 't']
+FILTRES_CAPTEURS = {
+    "temperature": [
+        {"type": "hampel", "window": 7, "n_sigmas": 3.0, "min_deviation": 0.3},
+        {"type": "ema", "alpha": 0.5},
+    ],
+    "humidite": [
+        {"type": "hampel", "window": 7, "n_sigmas": 3.0, "min_deviation": 1.0},
+        {"type": "median", "window": 3},
+    ],
+    "co2": [
+        {"type": "hampel", "window": 7, "n_sigmas": 3.0, "min_deviation": 25.0},
+        {"type": "median", "window": 3},
+    ],
+}
+
+# --- Réplication vers la base centrale (edge -> central) ---
+# Chaque Pi écrit d'abord dans un stockage local (SQLite), puis un agent
+# expédie les nouvelles lignes par lots compressés vers la base PostgreSQL centrale.
+GREENHOUSE_ID = os.getenv('GREENHOUSE_ID', 'serre-01') # Identifiant unique de cette serre dans la flotte
+REPLICATION_ENABLED = os.getenv('REPLICATION_ENABLED', 'False').lower() in ['true', '1', 't']
+LOCAL_STORE_PATH = os.path.join(PROJECT_ROOT_DIR, 'data', 'local_store.sqlite3')
+REPLICATION_BATCH_SIZE = 5000 # Nombre maximal de lignes par lot expédié
+REPLICATION_INTERVAL_SECONDES = 60
+REPLICATION_MAX_BACKOFF_SECONDES = 900 # Attente maximale entre deux essais après une panne
+
+DB_CONFIG_CENTRAL = {
+    "database": os.getenv('DB_NAME_CENTRAL', "serre_centrale"),
+    "user": os.getenv('DB_USER_CENTRAL', "ulysse"),
+    "password": os.getenv('DB_PASSWORD_CENTRAL', "1234"),
+    "host": os.getenv('DB_HOST_CENTRAL', "localhost"),
+    "port": os.getenv('DB_PORT_CENTRAL', "5432"),
+    "client_encoding": "UTF8"
+}
+
+# --- Point de collecte (ingestion HTTP des lots de la flotte) ---
+INGEST_TOKEN = os.getenv('INGEST_TOKEN', '') # Requis dans l'en-tête Authorization: Bearer <token>; vide: /api/ingest refusé (403)
+INGEST_MAX_BATCH_ROWS = 50000
+INGEST_MAX_BODY_BYTES = 32 * 1024 * 1024 # Taille maximale d'un lot après décompression
+INGEST_SEQUENCES_CONSERVEES = 10000 # Séquences de lots mémorisées par serre (ingest_batches) pour reconnaître les rejeux
+
+# --- Export de l'historique des capteurs ---
+EXPORT_CHUNK_SIZE = 2000 # Lignes lues par aller-retour sur le curseur serveur (mémoire constante)
+
+# --- Rétention des données brutes (borne l'espace disque sur la carte SD) ---
+# Désactivée par défaut: supprime des lignes de sensor_data. Prérequis avant de l'activer: la
+# table sensor_data_hourly (Donnees.sql), qui reçoit les agrégats avant toute suppression.
+RETENTION_ENABLED = os.getenv('RETENTION_ENABLED', 'False').lower() in ['true', '1', 't']
+RETENTION_RAW_JOURS = int(os.getenv('RETENTION_RAW_JOURS', '90'))        # Lignes brutes de sensor_data
+RETENTION_ROLLUP_JOURS = int(os.getenv('RETENTION_ROLLUP_JOURS', '730')) # Agrégats horaires (sensor_data_hourly)
+RETENTION_BATCH_SIZE = 5000          # Lignes supprimées par transaction
+RETENTION_PAUSE_SECONDES = 0.5       # Pause entre deux lots de suppression
+RETENTION_MAX_LOTS_PAR_PASSE = 200   # Le reste est traité à la passe suivante
+RETENTION_INTERVALLE_SECONDES = 6 * 3600
+RETENTION_DELAI_INITIAL_SECONDES = 300 # Première passe après le démarrage
+
+# --- Anti-battement des actionneurs (protection des relais) ---
+# Durées minimales en marche/à l'arrêt et nombre maximal de commutations par heure glissante.
+# Ne s'applique qu'au mode automatique; la première commutation n'est jamais retardée.
+# Quand la limite horaire est atteinte, seul l'arrêt reste permis (état sûr).
+ANTI_BATTEMENT_ACTIONNEURS = {
+    "humidifier": {"min_on_seconds": 60, "min_off_seconds": 60, "max_switches_per_hour": 20},
+    "ventilation": {"min_on_seconds": 120, "min_off_seconds": 60, "max_switches_per_hour": 12},
+    "leds": {"min_on_seconds": 0, "min_off_seconds": 0, "max_switches_per_hour": 0}, # 0 = pas de limite
+}
+
+# --- Mode rapport cyclique (régulation PI à modulation temporelle) ---
+# Au lieu du tout-ou-rien autour des seuils, la durée de marche de chaque période est
+# calculée par un PI sur l'écart à la consigne (milieu de la bande de seuils).
+# La période doit être un multiple de INTERVALLE_LECTURE_CAPTEURS_SECONDES. Inactif par défaut.
+# Compromis (benchmarks/duty_cycle_simulation.py): bande d'humidité ~6x plus étroite,
+# au prix de davantage de commutations (~15/h contre ~4/h en tout-ou-rien).
+MODE_CYCLE_ACTIONNEURS = {
+    "humidifier": {"actif": False, "kp": 0.05, "ki": 0.0001, "periode_secondes": 480, "impulsion_min_secondes": 30},
+    "ventilation": {"actif": False, "kp": 0.002, "ki": 0.000005, "periode_secondes": 600, "impulsion_min_secondes": 30},
+}
+
+# --- Règles déclaratives des actionneurs (remplacent la logique codée si définies) ---
+# Syntaxe: voir src/core/rules.py. Vide = logique des classes d'actionneurs.
+# Exemple: ventilation si CO2 au-dessus du seuil OU température > 28°C, pendant la fenêtre
+# d'opération; arrêt sous (seuil - 100 ppm) ET température < 26°C.
+# REGLES_ACTIONNEURS = {
+#     "ventilation": {
+#         "on_si": {"tous": [
+#             {"plage_heures": ["HEURE_DEBUT_JOUR_OPERATION", "HEURE_FIN_JOUR_OPERATION"]},
+#             {"un_parmi": [
+#                 {"capteur": "co2", "op": ">", "valeur": {"setting": "SEUIL_CO2_MAX"}},
+#                 {"capteur": "temperature", "op": ">", "valeur": 28.0},
+#             ]},
+#         ]},
+#         "off_si": {"un_parmi": [
+#             {"non": {"plage_heures": ["HEURE_DEBUT_JOUR_OPERATION", "HEURE_FIN_JOUR_OPERATION"]}},
+#             {"tous": [
+#                 {"capteur": "co2", "op": "<", "valeur": {"setting": "SEUIL_CO2_MAX", "decalage": -100}},
+#                 {"capteur": "temperature", "op": "<", "valeur": 26.0},
+#             ]},
+#         ]},
+#     },
+# }
+REGLES_ACTIONNEURS = {}
+
+# --- Multi-zone: plusieurs salles de culture pilotées par un seul processus ---
+# Vide = une seule serre (SerreController autonome, comportement historique).
+# Chaque zone a son matériel, son fichier de settings (data/user_settings_<zone>.json par
+# défaut) et ses actionneurs; toutes partagent une roue temporelle et un pool de threads.
+# La table sensor_data n'ayant pas de colonne de zone, une seule zone ("historique": True,
+# sinon la première) écrit en base; les autres gardent leur fenêtre de données en mémoire.
+# ZONES = {
+#     "salle-a": {"materiel": "raspberry_pi", "historique": True},
+#     "salle-b": {"materiel": "mock"},
+#     "salle-c": {"materiel": "mock", "fichier_settings": "/var/lib/serre/salle-c.json"},
+# }
+ZONES = {}
+ZONES_THREADS = 4 # Threads du pool partagé (acquisitions et cycles de logique de toutes les zones)
+
+# --- Démon du Contrôleur (IPC) ---
+# 'integre': app.py instancie le contrôleur (un seul worker). 'daemon': main.py fait tourner le
+# contrôleur et l'expose sur un socket Unix; l'API web n'est qu'un client (plusieurs workers possibles).
+CONTROLLER_MODE = os.getenv('CONTROLLER_MODE', 'integre').lower()
+IPC_SOCKET_PATH = os.getenv('IPC_SOCKET_PATH', os.path.join(PROJECT_ROOT_DIR, 'data', 'controller.sock'))
+IPC_TIMEOUT_SECONDS = 5.0 # Délai maximal d'une requête de l'API vers le démon
+# Dernier statut de chaque zone publié par main.py en mémoire partagée (lu sans IPC par l'API et les outils).
+# Chaîne vide: publication désactivée.
+STATUS_SHM_PATH = os.getenv('STATUS_SHM_PATH', '/dev/shm/serre_status' if os.path.isdir('/dev/shm')
+                            else os.path.join(PROJECT_ROOT_DIR, 'data', 'status.shm'))
+# Au-delà, un statut publié est considéré comme périmé (contrôleur arrêté?). Au moins deux cycles
+# logiques (publication garantie à chaque cycle) plus une marge pour un cycle en retard.
+STATUS_SHM_MARGE_SECONDES = 15
+STATUS_SHM_PERIME_SECONDES = 2 * INTERVALLE_LECTURE_CAPTEURS_SECONDES + STATUS_SHM_MARGE_SECONDES
+
+# --- Démarrage (étapes d'initialisation parallèles, voir src/core/startup.py) ---
+# Délais maximaux par étape. Matériel et settings sont attendus avant de démarrer le contrôle
+# (matériel bloqué: échec du démarrage; settings en retard: démarrage avec les défauts);
+# la base de données s'initialise en arrière-plan, les enregistrements étant gardés en attente.
+INIT_DELAI_MATERIEL_SECONDES = float(os.getenv('INIT_DELAI_MATERIEL_SECONDES', '20'))
+INIT_DELAI_PARAMETRES_SECONDES = 5.0
+INIT_DELAI_DB_SECONDES = float(os.getenv('INIT_DELAI_DB_SECONDES', '30'))
+INIT_DB_ENREGISTREMENTS_EN_ATTENTE_MAX = 1000
+
+# --- Reprise à chaud (redémarrage sans coupure des relais, voir src/core/checkpoint.py) ---
+# États, modes et horodatages des actionneurs enregistrés à chaque transition. Au démarrage
+# (même démarrage du système), les relais sont réclamés dans cet état au lieu d'être mis à OFF.
+REPRISE_A_CHAUD = os.getenv('REPRISE_A_CHAUD', 'True').lower() in ['true', '1', 't']
+REPRISE_A_CHAUD_FICHIER = os.getenv('REPRISE_A_CHAUD_FICHIER', os.path.join(PROJECT_ROOT_DIR, 'data', 'etat_actionneurs.json'))
+
+# --- Sauvegarde des settings (voir src/core/persistence.py) ---
+# Écriture atomique (fichier temporaire, fsync, renommage) en arrière-plan; les modifications
+# reçues pendant ce délai (curseurs du tableau de bord) sont regroupées en une seule écriture.
+SETTINGS_ECRITURE_DELAI_SECONDES = float(os.getenv('SETTINGS_ECRITURE_DELAI_SECONDES', '1.0'))
+
+# --- Versions et journal des settings (voir src/core/settings_history.py) ---
+# Chaque changement est ajouté à <fichier de settings>_journal.jsonl (historique des seuils).
+# Sans journal, les versions (If-Match) ne sont conservées qu'en mémoire.
+SETTINGS_JOURNAL = os.getenv('SETTINGS_JOURNAL', 'True').lower() in ['true', '1', 't']
+# Versions gardées en mémoire (settings complets de chacune) pour /api/settings/history;
+# les plus anciennes restent dans le journal, relu à la demande.
+SETTINGS_VERSIONS_MEMOIRE_MAX = 1000
+
+# --- Rechargement à chaud des settings (voir src/core/settings_watcher.py) ---
+# Une modification externe de USER_SETTINGS_FILE est appliquée sans redémarrage (inotify,
+# ou scrutation périodique si inotify est indisponible).
+SETTINGS_SURVEILLANCE = os.getenv('SETTINGS_SURVEILLANCE', 'True').lower() in ['true', '1', 't']
+SETTINGS_SURVEILLANCE_INTERVALLE_SECONDES = 2.0 # Période de scrutation (repli sans inotify)
+SETTINGS_SURVEILLANCE_STABILISATION_SECONDES = 0.05 # Regroupe les écritures rapprochées avant relecture
+
+# --- Temporisation des boucles de contrôle (voir src/core/loop_timing.py) ---
+# Début prévu/effectif et durée des derniers cycles d'acquisition et de logique (gigue, échéances manquées).
+TEMPORISATION_HISTORIQUE_CYCLES = 1024
+# Ordonnancement des threads de contrôle (acquisition, logique, workers des zones), Linux:
+# liste de CPU ("3", "2-3") pour les isoler du serveur web; priorité SCHED_FIFO 1-99 (root ou
+# CAP_SYS_NICE). Vide / 0: ordonnancement normal.
+BOUCLES_CPU = os.getenv('BOUCLES_CPU', '')
+BOUCLES_PRIORITE_FIFO = int(os.getenv('BOUCLES_PRIORITE_FIFO', '0'))
+
+# --- Diagnostic à la demande (profilage, tracemalloc; voir src/utils/profiling.py) ---
+# Routes /api/admin/*: rien ne tourne tant qu'aucun profilage n'est demandé.
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '') # Requis dans l'en-tête Authorization: Bearer <token>; vide: routes refusées (403)
+PROFILAGE_DUREE_DEFAUT_SECONDES = 10
+PROFILAGE_DUREE_MAX_SECONDES = 60
+PROFILAGE_FREQUENCE_HZ = 100 # Échantillons de piles par seconde (tous les threads à chaque échantillon)
+PROFILAGE_FREQUENCE_MAX_HZ = 1000
+TRACEMALLOC_PROFONDEUR = 10 # Cadres de pile conservés par allocation (surcoût mémoire et CPU proportionnel)
+
 # --- Configuration du Logging ---
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
 # Chemin de log construit de manière plus robuste
 LOG_FILE_PATH = os.path.join(PROJECT_ROOT_DIR, 'data', 'logs', 'serre_controller.log')
+# Écriture des logs par un thread dédié (src/utils/logging_setup.py): les threads de contrôle
+# n'attendent jamais la carte SD. False: écriture synchrone (débogage).
+LOG_ASYNCHRONE = os.getenv('LOG_ASYNCHRONE', 'True').lower() in ['true', '1', 't']
+LOG_LOT_MAX = 256 # Enregistrements écrits entre deux vidages du fichier
+LOG_ROTATION_TAILLE_OCTETS = 5 * 1024 * 1024
+LOG_ROTATION_INTERVALLE_HEURES = 24
+LOG_ROTATION_FICHIERS = 7 # Fichiers tournés conservés (compressés si LOG_COMPRESSION)
+LOG_COMPRESSION = True
+# Limitation des messages répétitifs: au plus N messages par point d'appel (fichier + ligne)
+# et par fenêtre; le nombre de messages supprimés est indiqué dans le suivant. CRITICAL jamais limité.
+LOG_LIMITE_PAR_FENETRE = 30
+LOG_LIMITE_FENETRE_SECONDES = 60
+LOG_LIMITES_MODULES = {
+    # Préfixe de logger -> limite propre (ex: commutations GPIO des impulsions à rapport cyclique)
+    # "src.hardware_interface.raspberry_pi": 120,
+}
 
 # --- Configuration de l'Application Flask ---
 APP_HOST = '0.0.0.0'
@@ -58,8 +282,12 @@ KEY_HEURE_FIN_LEDS = "HEURE_FIN_LEDS"
 KEY_SEUIL_HUMIDITE_ON = "SEUIL_HUMIDITE_ON"
 KEY_SEUIL_HUMIDITE_OFF = "SEUIL_HUMIDITE_OFF"
 KEY_SEUIL_CO2_MAX = "SEUIL_CO2_MAX"
+KEY_HYSTERESIS_CO2 = "HYSTERESIS_CO2" # Bande sous SEUIL_CO2_MAX avant d'arrêter la ventilation
 KEY_HEURE_DEBUT_JOUR_OPERATION = "HEURE_DEBUT_JOUR_OPERATION"
 KEY_HEURE_FIN_JOUR_OPERATION = "HEURE_FIN_JOUR_OPERATION"
+# Plages multiples à la minute près ("06:00-11:30,13:00-20:00"); si vides, les heures début/fin s'appliquent
+KEY_PLAGES_LEDS = "PLAGES_LEDS"
+KEY_PLAGES_OPERATION = "PLAGES_OPERATION"
 
 # Clés pour les broches GPIO et noms/identifiants de capteurs
 KEY_PIN_LEDS = "PIN_LEDS"
@@ -77,8 +305,11 @@ DEFAULT_SETTINGS = {
     KEY_SEUIL_HUMIDITE_ON: 75.0,
     KEY_SEUIL_HUMIDITE_OFF: 84.9,
     KEY_SEUIL_CO2_MAX: 1200.0,
+    KEY_HYSTERESIS_CO2: 100.0, # Ventilation ON au-dessus de 1200 ppm, OFF sous 1100 ppm
     KEY_HEURE_DEBUT_JOUR_OPERATION: 8, # Heure de début générale des opérations (ex: humidificateur, ventilation)
     KEY_HEURE_FIN_JOUR_OPERATION: 22,   # Heure de fin générale des opérations
+    KEY_PLAGES_LEDS: "",
+    KEY_PLAGES_OPERATION: "",
 
     # Valeurs par défaut pour les broches (numérotation BCM pour Raspberry Pi)
     KEY_PIN_LEDS: 27,
@@ -113,8 +344,13 @@ HEURE_FIN_LEDS = DEFAULT_SETTINGS[KEY_HEURE_FIN_LEDS]
 SEUIL_HUMIDITE_ON = DEFAULT_SETTINGS[KEY_SEUIL_HUMIDITE_ON]
 SEUIL_HUMIDITE_OFF = DEFAULT_SETTINGS[KEY_SEUIL_HUMIDITE_OFF]
 CO2_MAX_THRESHOLD = DEFAULT_SETTINGS[KEY_SEUIL_CO2_MAX] # Alias pour la ventilation
+HYSTERESIS_CO2 = DEFAULT_SETTINGS[KEY_HYSTERESIS_CO2]
 HEURE_DEBUT_JOUR_OPERATION = DEFAULT_SETTINGS[KEY_HEURE_DEBUT_JOUR_OPERATION]
 HEURE_FIN_JOUR_OPERATION = DEFAULT_SETTINGS[KEY_HEURE_FIN_JOUR_OPERATION]
+PLAGES_LEDS = DEFAULT_SETTINGS[KEY_PLAGES_LEDS]
+PLAGES_OPERATION = DEFAULT_SETTINGS[KEY_PLAGES_OPERATION]
+# Session spéciale d'humidification quotidienne (humidificateur forcé ON)
+SESSION_SPECIALE_HUMIDIFICATION = "21:30-21:35"
 
 # Broches GPIO (utilisées par raspberry_pi.py et potentiellement les tests)
 PIN_LEDS = DEFAULT_SETTINGS[KEY_PIN_LEDS]
@@ -122,27 +358,25 @@ VENTILATION_OUTPUT_PIN = DEFAULT_SETTINGS[KEY_PIN_VENTILATION] # Alias pour la v
 PIN_FAN_HUMIDIFICATEUR = DEFAULT_SETTINGS[KEY_PIN_FAN_HUMIDIFICATEUR]
 PIN_BRUMISATEUR = DEFAULT_SETTINGS[KEY_PIN_BRUMISATEUR]
 
+# Délai de stabilisation du SCD30 après sa mise sous tension logicielle. L'initialisation ne
+# l'attend plus: seule la première lecture patiente jusqu'à son échéance si nécessaire.
+SCD30_STABILISATION_SECONDES = float(os.getenv('SCD30_STABILISATION_SECONDES', '2.0'))
+
 # Noms/Identifiants de capteurs (utilisés par les tests et potentiellement les constructeurs)
 CO2_SENSOR_INSTANCE_NAME = DEFAULT_SETTINGS[KEY_NOM_CAPTEUR_CO2] # Alias pour la ventilation
 
-# --- Logger pour ce module de configuration ---
-_config_module_logger = logging.getLogger("src.config") # Nom plus spécifique
-# Assurer une configuration minimale du logger si ce module est importé avant la config principale du logging
-if not _config_module_logger.hasHandlers() and not logging.getLogger().hasHandlers():
-    _handler = logging.StreamHandler()
-    _formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    _handler.setFormatter(_formatter)
-    _config_module_logger.addHandler(_handler)
-    # Le niveau sera défini par la configuration globale du logging dans main.py ou app.py
-    # mais on peut en mettre un par défaut ici si nécessaire.
-    _config_module_logger.setLevel(LOG_LEVEL if LOG_LEVEL else logging.INFO)
-
-
-_config_module_logger.info(f"Configuration (src/config.py) chargée: HARDWARE_ENV='{HARDWARE_ENV}', DB_ENV='{DB_ENV}'")
-_config_module_logger.info(f"ACTIVE_DB_CONFIG: {ACTIVE_DB_CONFIG}")
-_config_module_logger.info(f"Fichier de paramètres utilisateur attendu à: {USER_SETTINGS_FILE}")
-_config_module_logger.info(f"Valeurs par défaut (DEFAULT_SETTINGS) chargées.")
-
-
-
 
+# --- Résumé de la configuration ---
+def log_configuration_summary():
+    """
+    Journalise la configuration chargée. Appelée par les points d'entrée (main.py, app.py)
+    une fois le logging configuré: l'import de ce module n'a aucun effet de bord.
+    """
+    config_logger = logging.getLogger("src.config")
+    config_logger.info(f"Configuration (src/config.py) chargée: HARDWARE_ENV='{HARDWARE_ENV}', DB_ENV='{DB_ENV}'")
+    db_config = ACTIVE_DB_CONFIG
+    if isinstance(db_config, dict) and db_config.get('password'):
+        db_config = {**db_config, 'password': '***'}
+    config_logger.info(f"ACTIVE_DB_CONFIG: {db_config}")
+    config_logger.info(f"Fichier de paramètres utilisateur attendu à: {USER_SETTINGS_FILE}")
+    config_logger.info("Valeurs par défaut (DEFAULT_SETTINGS) chargées.")
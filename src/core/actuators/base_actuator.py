@@ -1,6 +1,15 @@
 # src/core/actuators/base_actuator.py
 from abc import ABC, abstractmethod
+from collections import deque
+import logging
+import threading
 import time
+from datetime import datetime
+
+from src import config
+from src.utils import metrics
+from ..duty_cycle import DutyCycleRegulator
+from ..scheduling import DailySchedule, compile_schedule
 
 class BaseActuator(ABC):
     """
@@ -17,6 +26,27 @@ class BaseActuator(ABC):
         self.off_time_start = None
         self.last_transition_info = None
 
+        # Anti-battement (mode automatique uniquement), voir config.ANTI_BATTEMENT_ACTIONNEURS
+        anti_chatter = getattr(config, 'ANTI_BATTEMENT_ACTIONNEURS', {}).get(device_name, {})
+        self.min_on_seconds = float(anti_chatter.get("min_on_seconds", 0))
+        self.min_off_seconds = float(anti_chatter.get("min_off_seconds", 0))
+        self.max_switches_per_hour = int(anti_chatter.get("max_switches_per_hour", 0))
+        self._last_switch_time = None # Aucune restriction avant la première commutation
+        self._recent_switch_times = deque() # Commutations de la dernière heure glissante
+        self.switch_count = 0
+        self.blocked_counts = {"min_on": 0, "min_off": 0, "max_switches": 0}
+
+        # Mode rapport cyclique (optionnel), voir config.MODE_CYCLE_ACTIONNEURS
+        self.duty_cycle = DutyCycleRegulator.from_config(getattr(config, 'MODE_CYCLE_ACTIONNEURS', {}).get(device_name))
+        self._pulse_timer = None
+        self._state_lock = threading.RLock() # La fin d'impulsion s'exécute dans le thread du Timer
+        self._schedule_cache = {} # nom -> (paramètres, DailySchedule compilée)
+        # Règle déclarative compilée (optionnelle): f(sensor_data, current_state) -> bool | None
+        self.rule_evaluator = None
+        # Appelé après chaque transition ou changement de mode (point de reprise du contrôleur)
+        self.state_listener = None
+        self.metrics_zone = config.GREENHOUSE_ID # Label "zone" des métriques (posé par le contrôleur)
+
     @abstractmethod
     def _get_desired_automatic_state(self, current_sensor_data: dict) -> bool:
         """
@@ -26,27 +56,58 @@ class BaseActuator(ABC):
         """
         pass
 
+    def _get_duty_cycle_error(self, current_sensor_data: dict) -> float | None:
+        """
+        Erreur de régulation pour le mode rapport cyclique (positive = l'actionneur doit agir).
+        None: le mode cyclique ne s'applique pas maintenant (hors fenêtre d'opération,
+        donnée manquante...) et la logique tout-ou-rien est utilisée.
+        À surcharger par les actionneurs qui supportent ce mode.
+        """
+        return None
+
     def update_state(self, current_sensor_data: dict) -> bool:
         """
         Met à jour l'état de l'actionneur (ON/OFF) en fonction du mode (manuel/auto)
         et des conditions actuelles.
         Retourne True si l'état a changé, False sinon.
         """
-        previous_state = self.current_state
-        desired_state = False
+        with self._state_lock:
+            self.cancel_pulse() # Reprogrammée ci-dessous si une impulsion est en cours
+            pulse_seconds = None
 
-        if self.is_manual_mode:
-            desired_state = self.manual_state
-        else:
-            desired_state = self._get_desired_automatic_state(current_sensor_data)
+            if self.is_manual_mode:
+                desired_state = self.manual_state
+            else:
+                duty_error = self._get_duty_cycle_error(current_sensor_data) if self.duty_cycle else None
+                if duty_error is not None:
+                    # La durée d'impulsion minimale du régulateur remplace l'anti-battement
+                    remaining_on = self.duty_cycle.update(duty_error, time.time())
+                    desired_state = remaining_on > 0
+                    if desired_state and not self.duty_cycle.is_continuous:
+                        pulse_seconds = remaining_on
+                else:
+                    if self.duty_cycle:
+                        self.duty_cycle.reset()
+                    desired_state = self.rule_evaluator(current_sensor_data, self.current_state) if self.rule_evaluator else None
+                    if desired_state is None: # Pas de règle valide: logique codée de l'actionneur
+                        desired_state = self._get_desired_automatic_state(current_sensor_data)
+                    if desired_state != self.current_state and self._anti_chatter_blocks(desired_state):
+                        desired_state = self.current_state
 
+            state_changed = self._apply_state(desired_state)
+            if pulse_seconds:
+                self._start_pulse(pulse_seconds)
+            return state_changed
+
+    def _apply_state(self, desired_state: bool) -> bool:
+        """Enregistre le nouvel état et les durées ON/OFF. Retourne True si l'état a changé."""
         state_changed = False
         if desired_state != self.current_state:
             self.current_state = desired_state
             state_changed = True
             self.last_state_change_time = time.time()
-            # Logique de transition spécifique à l'appareil (gérée dans les classes filles si besoin)
-            # self._handle_state_transition(previous_state, desired_state, current_sensor_data)
+            self._record_switch(self.last_state_change_time)
+            metrics.ACTUATOR_TRANSITIONS.inc(self.metrics_zone, self.device_name, "on" if desired_state else "off")
             
             # Mise à jour des temps ON/OFF
             if self.current_state: # Si l'appareil s'allume
@@ -69,16 +130,158 @@ class BaseActuator(ABC):
                         "timestamp": time.strftime('%Y-%m-%d %H:%M:%S')
                     }
                 self.on_time_start = None
+            self._notify_state_listener()
         else:
             # Réinitialiser last_transition_info si aucun changement d'état
             # pour ne pas le renvoyer plusieurs fois
             self.last_transition_info = None
+        return state_changed
 
+    def _notify_state_listener(self):
+        if self.state_listener is not None:
+            try:
+                self.state_listener()
+            except Exception as e:
+                logging.error(f"{self.device_name}: Échec de l'enregistrement de l'état: {e}")
 
-        # Commande matérielle (sera plus spécifique dans les classes filles)
-        # self._control_hardware(self.current_state)
-        return state_changed
+    def export_state(self) -> dict:
+        """État à conserver d'un démarrage du contrôleur au suivant (voir src/core/checkpoint.py)."""
+        return {
+            "etat": self.current_state,
+            "manuel": self.is_manual_mode,
+            "etat_manuel": self.manual_state,
+            "changement": self.last_state_change_time,
+            "on_depuis": self.on_time_start,
+            "off_depuis": self.off_time_start,
+            "derniere_commutation": self._last_switch_time,
+            "commutations_heure": list(self._recent_switch_times),
+            "nb_commutations": self.switch_count,
+        }
+
+    def restore_state(self, state: dict):
+        """Reprend un état exporté par export_state(), sans commander le matériel (déjà dans cet état)."""
+        with self._state_lock:
+            self.current_state = bool(state.get("etat", False))
+            self.is_manual_mode = bool(state.get("manuel", False))
+            self.manual_state = bool(state.get("etat_manuel", False))
+            self.last_state_change_time = state.get("changement") or time.time()
+            self.on_time_start = state.get("on_depuis")
+            self.off_time_start = state.get("off_depuis")
+            self._last_switch_time = state.get("derniere_commutation")
+            self._recent_switch_times = deque(state.get("commutations_heure") or ())
+            self._prune_switch_history(time.time())
+            self.switch_count = int(state.get("nb_commutations", 0))
+        logging.info(f"{self.device_name}: état repris ({'ON' if self.current_state else 'OFF'}, "
+                     f"{'manuel' if self.is_manual_mode else 'automatique'}).")
+
+    def _start_pulse(self, on_seconds: float):
+        """Programme l'arrêt de l'actionneur après `on_seconds` (fin de l'impulsion)."""
+        self._pulse_timer = threading.Timer(on_seconds, self._end_pulse)
+        self._pulse_timer.daemon = True
+        self._pulse_timer.name = f"{self.device_name}PulseTimer"
+        self._pulse_timer.start()
+
+    def _end_pulse(self):
+        with self._state_lock:
+            self._pulse_timer = None
+            if self._apply_state(False):
+                self._control_hardware()
+                logging.debug(f"{self.device_name}: fin d'impulsion (rapport cyclique).")
+
+    def cancel_pulse(self):
+        """Annule une fin d'impulsion programmée (l'état courant est conservé)."""
+        with self._state_lock:
+            if self._pulse_timer:
+                self._pulse_timer.cancel()
+                self._pulse_timer = None
 
+    def _get_compiled_schedule(self, name: str, windows_text: str, start_hour: int, end_hour: int) -> DailySchedule:
+        """
+        Plages horaires compilées, recompilées uniquement si les paramètres changent.
+        `windows_text` ("HH:MM-HH:MM,...") a priorité sur les heures de début/fin s'il est renseigné.
+        """
+        key = (windows_text or "", start_hour, end_hour)
+        cached = self._schedule_cache.get(name)
+        if cached and cached[0] == key:
+            return cached[1]
+        schedule = compile_schedule(windows_text, start_hour, end_hour, self.device_name)
+        self._schedule_cache[name] = (key, schedule)
+        return schedule
+
+    def _get_operation_schedule(self, heure_debut_operation: int, heure_fin_operation: int) -> DailySchedule:
+        """Fenêtre d'opération générale (humidificateur, ventilation); nécessite self.controller."""
+        plages = self.controller.get_setting(config.KEY_PLAGES_OPERATION, config.PLAGES_OPERATION)
+        return self._get_compiled_schedule("operation", plages, heure_debut_operation, heure_fin_operation)
+
+    def _get_current_operation_schedule(self) -> DailySchedule:
+        """Fenêtre d'opération d'après les settings actuels (défauts globaux si invalides)."""
+        try:
+            debut = int(self.controller.get_setting(config.KEY_HEURE_DEBUT_JOUR_OPERATION, config.HEURE_DEBUT_JOUR_OPERATION))
+            fin = int(self.controller.get_setting(config.KEY_HEURE_FIN_JOUR_OPERATION, config.HEURE_FIN_JOUR_OPERATION))
+            if not (0 <= debut <= 23 and 0 <= fin <= 23):
+                raise ValueError
+        except (ValueError, TypeError):
+            debut, fin = config.HEURE_DEBUT_JOUR_OPERATION, config.HEURE_FIN_JOUR_OPERATION
+        return self._get_operation_schedule(debut, fin)
+
+    def _get_schedules(self) -> list[DailySchedule]:
+        """Plages horaires qui pilotent cet actionneur (à surcharger)."""
+        return []
+
+    def is_scheduled_active(self, now: datetime) -> bool:
+        """Vrai si l'une des plages horaires qui pilotent cet actionneur est active à `now`."""
+        return any(schedule.is_active(now) for schedule in self._get_schedules())
+
+    def next_schedule_transition(self, now: datetime) -> datetime | None:
+        """Prochain instant où une plage horaire de cet actionneur change d'état (None si aucun)."""
+        transitions = [t for t in (s.next_transition(now) for s in self._get_schedules()) if t]
+        return min(transitions) if transitions else None
+
+    def _hysteresis_state(self, value: float, on_above: float, off_below: float) -> bool:
+        """
+        Commande à hystérésis: ON au-dessus de `on_above`, OFF sous `off_below`,
+        état actuel maintenu entre les deux (bande morte).
+        """
+        if value > on_above:
+            return True
+        if value < off_below:
+            return False
+        return self.current_state
+
+    def _prune_switch_history(self, now: float):
+        while self._recent_switch_times and self._recent_switch_times[0] <= now - 3600:
+            self._recent_switch_times.popleft()
+
+    def _record_switch(self, now: float):
+        self._last_switch_time = now
+        self.switch_count += 1
+        self._recent_switch_times.append(now)
+        self._prune_switch_history(now)
+
+    def _anti_chatter_blocks(self, desired_state: bool) -> bool:
+        """
+        Indique si la commutation automatique vers `desired_state` doit être retardée:
+        durée minimale dans l'état courant non atteinte, ou limite horaire de commutations
+        atteinte (seul l'allumage est alors refusé, l'arrêt restant toujours permis).
+        """
+        if self._last_switch_time is None:
+            return False
+        now = time.time()
+        elapsed = now - self._last_switch_time
+        reason = None
+        if self.current_state and elapsed < self.min_on_seconds:
+            reason = "min_on"
+        elif not self.current_state and elapsed < self.min_off_seconds:
+            reason = "min_off"
+        elif desired_state and self.max_switches_per_hour:
+            self._prune_switch_history(now)
+            if len(self._recent_switch_times) >= self.max_switches_per_hour:
+                reason = "max_switches"
+        if reason is None:
+            return False
+        self.blocked_counts[reason] += 1
+        logging.debug(f"{self.device_name}: commutation vers {'ON' if desired_state else 'OFF'} retardée (anti-battement: {reason}, {elapsed:.0f}s dans l'état actuel).")
+        return True
 
     def set_manual_mode(self, manual_mode_active: bool, desired_state_if_manual: bool = False):
         """
@@ -87,6 +290,7 @@ class BaseActuator(ABC):
         self.is_manual_mode = manual_mode_active
         if self.is_manual_mode:
             self.manual_state = desired_state_if_manual
+        self._notify_state_listener()
         # La mise à jour de l'état réel se fera lors du prochain appel à update_state()
 
     def get_status(self) -> dict:
@@ -106,7 +310,14 @@ class BaseActuator(ABC):
             "manual_mode": self.is_manual_mode,
             "on_duration_seconds": round(on_duration, 1),
             "off_duration_seconds": round(off_duration, 1),
+            "anti_chatter": {
+                "switch_count": self.switch_count,
+                "switches_last_hour": len(self._recent_switch_times),
+                "blocked": dict(self.blocked_counts),
+            },
         }
+        if self.duty_cycle:
+            status["duty_cycle"] = self.duty_cycle.get_status()
         # Inclure et réinitialiser les informations de transition si elles existent
         if self.last_transition_info:
             status["last_transition"] = self.last_transition_info
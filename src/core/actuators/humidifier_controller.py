@@ -3,6 +3,7 @@ from .base_actuator import BaseActuator
 from datetime import datetime
 import logging
 from src import config # Importer le module config depuis src
+from ..scheduling import DailySchedule, seconds_of_day
 
 class HumidifierController(BaseActuator):
     """
@@ -14,6 +15,7 @@ class HumidifierController(BaseActuator):
         super().__init__(hardware_interface, "humidifier")
         self.controller = controller_instance
         self.last_special_session_done_today = False
+        self.special_session_schedule = DailySchedule.parse(config.SESSION_SPECIALE_HUMIDIFICATION)
 
     def _get_desired_automatic_state(self, current_sensor_data: dict) -> bool:
         """
@@ -70,11 +72,7 @@ class HumidifierController(BaseActuator):
         now = datetime.now()
         heure_actuelle = now.hour
 
-        in_operation_window = False
-        if heure_debut_operation <= heure_fin_operation:
-            in_operation_window = heure_debut_operation <= heure_actuelle < heure_fin_operation
-        else: 
-            in_operation_window = heure_actuelle >= heure_debut_operation or heure_actuelle < heure_fin_operation
+        in_operation_window = self._get_operation_schedule(heure_debut_operation, heure_fin_operation).is_active(now)
         
         if not in_operation_window:
             return False
@@ -84,7 +82,7 @@ class HumidifierController(BaseActuator):
              self.last_special_session_done_today = False
              logging.info("HumidifierController: Réinitialisation du flag de session spéciale d'humidification.")
         
-        is_special_session_time = (heure_actuelle == 21 and 30 <= now.minute < 35)
+        is_special_session_time = self.special_session_schedule.is_active(now)
         if is_special_session_time and not self.last_special_session_done_today:
             logging.info("HumidifierController: En session spéciale d'humidification. Activation.")
             return True
@@ -92,13 +90,43 @@ class HumidifierController(BaseActuator):
         if humidite < seuil_humidite_on:
             return True
         elif humidite >= seuil_humidite_off:
-            if (heure_actuelle == 21 and now.minute >= 35) and not self.last_special_session_done_today:
+            if self._special_session_just_ended(now) and not self.last_special_session_done_today:
                 self.last_special_session_done_today = True
                 logging.info("HumidifierController: Session spéciale d'humidification marquée comme terminée (extinction après).")
             return False
         else:
             return self.current_state
 
+    def _get_duty_cycle_error(self, current_sensor_data: dict) -> float | None:
+        """
+        Mode rapport cyclique: consigne au milieu de la bande [SEUIL_HUMIDITE_ON, SEUIL_HUMIDITE_OFF].
+        Hors fenêtre d'opération, pendant la session spéciale ou sans donnée: logique tout-ou-rien.
+        """
+        humidite = current_sensor_data.get('humidite')
+        if humidite is None:
+            return None
+        try:
+            seuil_on = float(self.controller.get_setting(config.KEY_SEUIL_HUMIDITE_ON, config.SEUIL_HUMIDITE_ON))
+            seuil_off = float(self.controller.get_setting(config.KEY_SEUIL_HUMIDITE_OFF, config.SEUIL_HUMIDITE_OFF))
+            debut = int(self.controller.get_setting(config.KEY_HEURE_DEBUT_JOUR_OPERATION, config.HEURE_DEBUT_JOUR_OPERATION))
+            fin = int(self.controller.get_setting(config.KEY_HEURE_FIN_JOUR_OPERATION, config.HEURE_FIN_JOUR_OPERATION))
+        except (ValueError, TypeError):
+            return None
+        now = datetime.now()
+        if not self._get_operation_schedule(debut, fin).is_active(now) or self.special_session_schedule.is_active(now):
+            return None
+        return (seuil_on + seuil_off) / 2.0 - humidite
+
+    def _special_session_just_ended(self, now: datetime) -> bool:
+        """Vrai entre la fin de la session spéciale et la fin de l'heure où elle se termine."""
+        if not self.special_session_schedule.windows:
+            return False
+        session_end = self.special_session_schedule.windows[-1][1]
+        return session_end <= seconds_of_day(now) < (session_end // 3600 + 1) * 3600
+
+    def _get_schedules(self) -> list:
+        return [self._get_current_operation_schedule(), self.special_session_schedule]
+
     def _control_hardware(self):
         if self.current_state:
             self.hardware.activer_humidificateur()
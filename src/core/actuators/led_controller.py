@@ -20,7 +20,7 @@ class LedController(BaseActuator):
         Les LEDs sont allumées pendant une plage horaire définie.
         `current_sensor_data` n'est pas utilisé ici mais est requis par la signature.
         """
-        heure_actuelle = datetime.now().hour
+        now = datetime.now()
 
         # Récupérer les horaires depuis les settings dynamiques via SerreController.
         # Utiliser les constantes globales de config (initialisées depuis DEFAULT_SETTINGS) comme fallback.
@@ -54,10 +54,21 @@ class LedController(BaseActuator):
             heure_debut_leds = config.HEURE_DEBUT_LEDS
             heure_fin_leds = config.HEURE_FIN_LEDS
         
-        if heure_debut_leds <= heure_fin_leds:
-            return heure_debut_leds <= heure_actuelle < heure_fin_leds
-        else:
-            return heure_actuelle >= heure_debut_leds or heure_actuelle < heure_fin_leds
+        return self._get_led_schedule(heure_debut_leds, heure_fin_leds).is_active(now)
+
+    def _get_led_schedule(self, heure_debut_leds: int, heure_fin_leds: int):
+        plages = self.controller.get_setting(config.KEY_PLAGES_LEDS, config.PLAGES_LEDS)
+        return self._get_compiled_schedule("leds", plages, heure_debut_leds, heure_fin_leds)
+
+    def _get_schedules(self) -> list:
+        try:
+            debut = int(self.controller.get_setting(config.KEY_HEURE_DEBUT_LEDS, config.HEURE_DEBUT_LEDS))
+            fin = int(self.controller.get_setting(config.KEY_HEURE_FIN_LEDS, config.HEURE_FIN_LEDS))
+            if not (0 <= debut <= 23 and 0 <= fin <= 23):
+                raise ValueError
+        except (ValueError, TypeError):
+            debut, fin = config.HEURE_DEBUT_LEDS, config.HEURE_FIN_LEDS
+        return [self._get_led_schedule(debut, fin)]
 
     def _control_hardware(self):
         """
@@ -30,6 +30,10 @@ class VentilationController(BaseActuator):
             config.KEY_SEUIL_CO2_MAX,
             config.CO2_MAX_THRESHOLD # Valeur par défaut globale de config.py
         )
+        hysteresis_co2_setting = self.controller.get_setting(
+            config.KEY_HYSTERESIS_CO2,
+            config.HYSTERESIS_CO2 # Valeur par défaut globale de config.py
+        )
         heure_debut_operation_setting = self.controller.get_setting(
             config.KEY_HEURE_DEBUT_JOUR_OPERATION,
             config.HEURE_DEBUT_JOUR_OPERATION # Valeur par défaut globale de config.py
@@ -41,6 +45,7 @@ class VentilationController(BaseActuator):
 
         try:
             seuil_co2_max = float(seuil_co2_max_setting)
+            hysteresis_co2 = max(0.0, float(hysteresis_co2_setting))
             heure_debut_operation = int(heure_debut_operation_setting)
             heure_fin_operation = int(heure_fin_operation_setting)
 
@@ -57,6 +62,7 @@ class VentilationController(BaseActuator):
                 f"Utilisation des valeurs par défaut globaux."
             )
             seuil_co2_max = config.CO2_MAX_THRESHOLD
+            hysteresis_co2 = config.HYSTERESIS_CO2
             heure_debut_operation = config.HEURE_DEBUT_JOUR_OPERATION
             heure_fin_operation = config.HEURE_FIN_JOUR_OPERATION
 
@@ -65,21 +71,35 @@ class VentilationController(BaseActuator):
             return self.current_state 
 
         now = datetime.now()
-        heure_actuelle = now.hour
-
-        in_operation_window = False
-        if heure_debut_operation <= heure_fin_operation:
-            in_operation_window = heure_debut_operation <= heure_actuelle < heure_fin_operation
-        else: 
-            in_operation_window = heure_actuelle >= heure_debut_operation or heure_actuelle < heure_fin_operation
+        in_operation_window = self._get_operation_schedule(heure_debut_operation, heure_fin_operation).is_active(now)
         
         if not in_operation_window:
             return False
 
-        if co2 > seuil_co2_max:
-            return True
-        else:
-            return False 
+        # ON au-dessus du seuil, OFF seulement sous (seuil - hystérésis): évite les battements autour du seuil
+        return self._hysteresis_state(co2, seuil_co2_max, seuil_co2_max - hysteresis_co2)
+
+    def _get_duty_cycle_error(self, current_sensor_data: dict) -> float | None:
+        """
+        Mode rapport cyclique: consigne au milieu de la bande d'hystérésis sous SEUIL_CO2_MAX.
+        Hors fenêtre d'opération ou sans donnée: logique tout-ou-rien.
+        """
+        co2 = current_sensor_data.get(config.CO2_SENSOR_INSTANCE_NAME)
+        if co2 is None:
+            return None
+        try:
+            seuil_co2_max = float(self.controller.get_setting(config.KEY_SEUIL_CO2_MAX, config.CO2_MAX_THRESHOLD))
+            hysteresis_co2 = max(0.0, float(self.controller.get_setting(config.KEY_HYSTERESIS_CO2, config.HYSTERESIS_CO2)))
+            debut = int(self.controller.get_setting(config.KEY_HEURE_DEBUT_JOUR_OPERATION, config.HEURE_DEBUT_JOUR_OPERATION))
+            fin = int(self.controller.get_setting(config.KEY_HEURE_FIN_JOUR_OPERATION, config.HEURE_FIN_JOUR_OPERATION))
+        except (ValueError, TypeError):
+            return None
+        if not self._get_operation_schedule(debut, fin).is_active(datetime.now()):
+            return None
+        return co2 - (seuil_co2_max - hysteresis_co2 / 2.0)
+
+    def _get_schedules(self) -> list:
+        return [self._get_current_operation_schedule()]
 
     def _control_hardware(self):
         if self.current_state:
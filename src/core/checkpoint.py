@@ -0,0 +1,98 @@
+# src/core/checkpoint.py
+"""
+Point de reprise des actionneurs: modes manuels, états et horodatages des transitions, réécrit
+à chaque transition dans un petit fichier JSON (remplacement atomique). Au redémarrage du
+contrôleur (déploiement), les relais sont réclamés dans leur état enregistré et les durées
+ON/OFF continuent au lieu de repartir de zéro.
+
+Le point de reprise n'est pas utilisé après un redémarrage du système (boot_id différent: les
+relais ont été coupés entre-temps). Un arrêt normal (relais mis à OFF) le supprime; un arrêt
+pour redémarrage ou un arrêt brutal le laisse en place, les sorties gardant leur niveau.
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+from src import config
+
+checkpoint_logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 1
+BOOT_ID_PATH = "/proc/sys/kernel/random/boot_id"
+
+
+def current_boot_id() -> str | None:
+    try:
+        with open(BOOT_ID_PATH, 'r', encoding='ascii') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def checkpoint_path(zone_id: str | None = None) -> str:
+    """Fichier de reprise de la serre (config.REPRISE_A_CHAUD_FICHIER) ou d'une zone."""
+    if zone_id is None:
+        return config.REPRISE_A_CHAUD_FICHIER
+    root, extension = os.path.splitext(config.REPRISE_A_CHAUD_FICHIER)
+    return f"{root}_{zone_id}{extension}"
+
+
+def relay_states(actuators: dict | None) -> dict | None:
+    """États ON/OFF (actionneur -> bool) d'un point de reprise chargé, pour réclamer les sorties."""
+    if not actuators:
+        return None
+    return {name: bool(state.get("etat")) for name, state in actuators.items()}
+
+
+class ActuatorCheckpoint:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._last_written = None
+
+    def save(self, actuators: dict):
+        """`actuators`: nom -> BaseActuator.export_state(). Un contenu inchangé n'est pas réécrit (carte SD)."""
+        with self._lock:
+            if actuators == self._last_written:
+                return
+            data = json.dumps({"version": CHECKPOINT_VERSION, "boot_id": current_boot_id(), "ecrit_a": time.time(),
+                               "actionneurs": actuators}, separators=(',', ':'))
+            tmp_path = f"{self.path}.tmp"
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(tmp_path, self.path)
+                self._last_written = actuators
+            except OSError as e:
+                checkpoint_logger.error(f"Point de reprise '{self.path}' non écrit: {e}")
+
+    def load(self) -> dict | None:
+        """États des actionneurs (nom -> état exporté) si le point de reprise est utilisable."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            checkpoint_logger.warning(f"Point de reprise '{self.path}' illisible ({e}): démarrage à froid.")
+            return None
+        if not isinstance(checkpoint, dict) or checkpoint.get("version") != CHECKPOINT_VERSION:
+            checkpoint_logger.warning(f"Point de reprise '{self.path}' d'une autre version: démarrage à froid.")
+            return None
+        if checkpoint.get("boot_id") != current_boot_id():
+            checkpoint_logger.info("Point de reprise antérieur au démarrage du système: démarrage à froid.")
+            return None
+        return checkpoint.get("actionneurs") or None
+
+    def discard(self):
+        with self._lock:
+            self._last_written = None
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,99 @@
+# src/core/duty_cycle.py
+import logging
+
+duty_logger = logging.getLogger(__name__)
+
+
+class PIController:
+    """
+    Régulateur proportionnel-intégral dont la sortie est bornée à [out_min, out_max].
+    Anti-emballement de l'intégrale: l'intégration est suspendue quand la sortie est
+    saturée et que l'erreur pousserait encore plus loin dans la saturation.
+    """
+    def __init__(self, kp: float, ki: float, out_min: float = 0.0, out_max: float = 1.0):
+        self.kp = float(kp)
+        self.ki = float(ki)
+        self.out_min = float(out_min)
+        self.out_max = float(out_max)
+        self.integral = 0.0
+
+    def update(self, error: float, dt: float) -> float:
+        proportional = self.kp * error
+        candidate = self.integral + self.ki * error * max(dt, 0.0)
+        output = proportional + candidate
+        saturated_high = output > self.out_max and error > 0
+        saturated_low = output < self.out_min and error < 0
+        if not (saturated_high or saturated_low):
+            self.integral = candidate
+        return min(max(proportional + self.integral, self.out_min), self.out_max)
+
+    def reset(self):
+        self.integral = 0.0
+
+
+class DutyCycleRegulator:
+    """
+    Commande à rapport cyclique (modulation temporelle): au début de chaque période,
+    la fraction de marche calculée par le PI est convertie en durée de marche; l'actionneur
+    est ON au début de la période puis OFF jusqu'à la suivante.
+    La période est indépendante de l'intervalle de la boucle de logique (qui doit lui être
+    inférieur ou égal): une période longue limite le nombre de commutations du relais.
+    Les marches plus courtes que `min_pulse_seconds` sont supprimées et les arrêts plus
+    courts que `min_pulse_seconds` deviennent une marche continue.
+    """
+    def __init__(self, kp: float, ki: float, period_seconds: float = 600.0, min_pulse_seconds: float = 30.0):
+        self.pi = PIController(kp, ki)
+        self.period_seconds = float(period_seconds)
+        self.min_pulse_seconds = float(min_pulse_seconds)
+        self.last_fraction = 0.0
+        self.last_error = None
+        self.on_seconds = 0.0
+        self._period_start = None
+
+    @classmethod
+    def from_config(cls, settings: dict | None):
+        """Construit un régulateur depuis config.MODE_CYCLE_ACTIONNEURS[device] (None si inactif)."""
+        if not settings or not settings.get("actif"):
+            return None
+        return cls(kp=settings["kp"], ki=settings["ki"],
+                   period_seconds=settings.get("periode_secondes", 600.0),
+                   min_pulse_seconds=settings.get("impulsion_min_secondes", 30.0))
+
+    def update(self, error: float, now: float) -> float:
+        """
+        Retourne la durée de marche restante à partir de `now` (0 = arrêt). Une nouvelle
+        durée n'est calculée qu'au début d'une période; `error` est positive quand
+        l'actionneur doit agir (ex: humidité sous la consigne pour l'humidificateur).
+        """
+        if self._period_start is None or now - self._period_start >= self.period_seconds:
+            dt = self.period_seconds if self._period_start is None else now - self._period_start
+            self._period_start = now
+            self.last_error = error
+            self.last_fraction = self.pi.update(error, dt)
+            on_seconds = self.last_fraction * self.period_seconds
+            if on_seconds < self.min_pulse_seconds:
+                on_seconds = 0.0
+            elif on_seconds > self.period_seconds - self.min_pulse_seconds:
+                on_seconds = self.period_seconds
+            self.on_seconds = on_seconds
+        return max(0.0, self._period_start + self.on_seconds - now)
+
+    @property
+    def is_continuous(self) -> bool:
+        """Marche sur toute la période: aucune fin d'impulsion à programmer."""
+        return self.on_seconds >= self.period_seconds
+
+    def reset(self):
+        self.pi.reset()
+        self.last_fraction = 0.0
+        self.last_error = None
+        self.on_seconds = 0.0
+        self._period_start = None
+
+    def get_status(self) -> dict:
+        return {
+            "duty_fraction": round(self.last_fraction, 3),
+            "error": round(self.last_error, 2) if self.last_error is not None else None,
+            "on_seconds": round(self.on_seconds, 1),
+            "period_seconds": self.period_seconds,
+        }
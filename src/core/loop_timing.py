@@ -0,0 +1,130 @@
+# src/core/loop_timing.py
+"""
+Mesure de la temporisation des boucles de contrôle (acquisition, logique) et options
+d'ordonnancement temps réel de leurs threads.
+
+Pour chaque cycle, `LoopTimingTracker` conserve dans un tampon circulaire le début prévu,
+le début effectif et la durée: le retard au démarrage (gigue) et la durée sont résumés par
+percentiles, et un cycle qui se termine après la fin de sa période (début prévu + intervalle)
+est compté comme une échéance manquée.
+
+`apply_thread_scheduling` fixe, pour le thread appelant, l'affinité CPU et la politique
+SCHED_FIFO (Linux; root ou CAP_SYS_NICE pour SCHED_FIFO). Un réglage refusé est signalé
+et ignoré: le contrôle continue avec l'ordonnancement normal.
+"""
+import logging
+import os
+import threading
+from array import array
+
+from src import config
+
+timing_logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 90, 99)
+LOOP_ACQUISITION = "acquisition"
+LOOP_LOGIC = "logique"
+
+
+def _percentiles(values: list) -> dict:
+    """Percentiles par rang (valeurs en secondes) et maximum; None sans valeur."""
+    if not values:
+        return {**{f"p{p}": None for p in PERCENTILES}, "max": None}
+    values = sorted(values)
+    result = {f"p{p}": values[min(len(values) - 1, max(0, -(-p * len(values) // 100) - 1))] for p in PERCENTILES}
+    result["max"] = values[-1]
+    return result
+
+
+class LoopTimingTracker:
+    """Début prévu, début effectif et durée des `capacity` derniers cycles d'une boucle."""
+
+    def __init__(self, name: str, capacity: int | None = None):
+        self.name = name
+        self.capacity = capacity or config.TEMPORISATION_HISTORIQUE_CYCLES
+        self._planned = array('d', [0.0] * self.capacity)
+        self._lateness = array('d', [0.0] * self.capacity)
+        self._durations = array('d', [0.0] * self.capacity)
+        self._next = 0 # Prochaine case écrite
+        self._size = 0
+        self.cycles = 0
+        self.deadline_misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, planned_start: float, actual_start: float, duration: float, interval: float) -> bool:
+        """Enregistre un cycle; retourne True si son échéance (début prévu + intervalle) est manquée."""
+        lateness = max(0.0, actual_start - planned_start)
+        missed = lateness + duration > interval
+        with self._lock:
+            index = self._next
+            self._planned[index] = planned_start
+            self._lateness[index] = lateness
+            self._durations[index] = duration
+            self._next = (index + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+            self.cycles += 1
+            self.deadline_misses += missed
+        return missed
+
+    def recent(self, limit: int = 20) -> list:
+        """Les `limit` derniers cycles, du plus ancien au plus récent."""
+        with self._lock:
+            count = min(max(0, limit), self._size)
+            indexes = [(self._next - count + offset) % self.capacity for offset in range(count)]
+            return [{"debut_prevu": self._planned[i], "debut_effectif": self._planned[i] + self._lateness[i],
+                     "retard": self._lateness[i], "duree": self._durations[i]} for i in indexes]
+
+    def get_stats(self) -> dict:
+        """Percentiles du retard au démarrage et de la durée sur les cycles conservés (secondes)."""
+        with self._lock:
+            lateness = list(self._lateness[:self._size])
+            durations = list(self._durations[:self._size])
+            cycles, misses = self.cycles, self.deadline_misses
+        return {
+            "cycles": cycles,
+            "echeances_manquees": misses,
+            "fenetre_cycles": len(lateness),
+            "retard_demarrage": _percentiles(lateness),
+            "duree": _percentiles(durations),
+        }
+
+
+def parse_cpu_list(value: str) -> set:
+    """"2,3" ou "0-1,3" -> {0, 1, 3}; chaîne vide -> ensemble vide (pas d'affinité)."""
+    cpus = set()
+    for part in value.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            first, last = part.split('-', 1)
+            cpus.update(range(int(first), int(last) + 1))
+        else:
+            cpus.add(int(part))
+    return cpus
+
+
+def apply_thread_scheduling(label: str, cpus: set | None = None, fifo_priority: int | None = None) -> dict:
+    """
+    Applique au thread appelant l'affinité `cpus` et la priorité SCHED_FIFO `fifo_priority`
+    (défauts: BOUCLES_CPU, BOUCLES_PRIORITE_FIFO; vide/0 = inchangé). Retourne ce qui a été appliqué.
+    """
+    cpus = parse_cpu_list(config.BOUCLES_CPU) if cpus is None else cpus
+    fifo_priority = config.BOUCLES_PRIORITE_FIFO if fifo_priority is None else fifo_priority
+    applied = {"cpus": None, "priorite_fifo": None}
+    if cpus:
+        try:
+            os.sched_setaffinity(0, cpus) # 0: le thread appelant (Linux)
+            applied["cpus"] = sorted(cpus)
+        except (AttributeError, OSError, ValueError) as e:
+            timing_logger.warning(f"{label}: affinité CPU {sorted(cpus)} non appliquée ({e}).")
+    if fifo_priority:
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(fifo_priority))
+            applied["priorite_fifo"] = fifo_priority
+        except (AttributeError, OSError) as e:
+            timing_logger.warning(f"{label}: SCHED_FIFO (priorité {fifo_priority}) non appliqué ({e}); "
+                                  "ordonnancement normal (root ou CAP_SYS_NICE requis).")
+    if applied["cpus"] or applied["priorite_fifo"]:
+        timing_logger.info(f"{label}: ordonnancement appliqué (CPU {applied['cpus']}, SCHED_FIFO {applied['priorite_fifo']}).")
+    return applied
@@ -0,0 +1,105 @@
+# src/core/persistence.py
+"""
+Écriture des fichiers JSON de l'état persistant (settings utilisateur).
+
+`write_json_atomic` écrit dans un fichier temporaire du même répertoire, le synchronise sur
+disque (fsync), puis le renomme sur le fichier cible (os.replace) et synchronise le
+répertoire: après une coupure de courant, le fichier contient l'ancienne ou la nouvelle
+version, jamais un mélange des deux.
+
+`DebouncedJsonWriter` regroupe les demandes d'écriture rapprochées (curseurs du tableau de
+bord) en une seule écriture, faite hors du thread appelant à la fin du délai de regroupement.
+"""
+import json
+import logging
+import os
+import threading
+
+persistence_logger = logging.getLogger(__name__)
+
+
+def write_json_atomic(path: str, data, indent: int | None = 4, fsync: bool = True):
+    """Remplace `path` par `data` sérialisé en JSON. Lève OSError en cas d'échec (cible intacte)."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    if fsync:
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return # Répertoire non ouvrable (Windows): le renommage reste atomique
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
+
+
+class DebouncedJsonWriter:
+    """
+    Écrit `snapshot()` dans `path` au plus tard `delay_seconds` après la première demande
+    (`schedule`) d'une rafale: les demandes suivantes de la même rafale sont couvertes par la
+    même écriture, faite avec l'état le plus récent. `flush()` écrit immédiatement ce qui est
+    en attente (arrêt du contrôleur).
+    """
+    def __init__(self, path: str, snapshot, delay_seconds: float = 1.0, label: str = ""):
+        self.path = path
+        self.snapshot = snapshot
+        self.delay_seconds = delay_seconds
+        self.label = label
+        self.writes = 0
+        self.requests = 0
+        self.last_error = None
+        self._pending = False
+        self._timer = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def schedule(self):
+        with self._lock:
+            self.requests += 1
+            if self._pending:
+                return
+            self._pending = True
+            if self.delay_seconds > 0:
+                self._timer = threading.Timer(self.delay_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.name = "SettingsWriterThread"
+                self._timer.start()
+                return
+        self.flush() # Sans délai: écriture immédiate, dans le thread appelant
+
+    def flush(self) -> bool:
+        """Écrit l'état en attente. Retourne False si l'écriture a échoué (nouvel essai à la prochaine demande)."""
+        with self._write_lock:
+            with self._lock:
+                if not self._pending:
+                    return True
+                self._pending = False
+                if self._timer is not None and self._timer is not threading.current_thread():
+                    self._timer.cancel()
+                self._timer = None
+            try:
+                write_json_atomic(self.path, self.snapshot())
+            except OSError as e:
+                self.last_error = str(e)
+                persistence_logger.error(f"{self.label}Écriture de '{self.path}' échouée: {e}")
+                return False
+            self.writes += 1
+            self.last_error = None
+            persistence_logger.debug(f"{self.label}'{self.path}' écrit ({self.requests} demande(s), {self.writes} écriture(s)).")
+            return True
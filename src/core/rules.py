@@ -0,0 +1,182 @@
+# src/core/rules.py
+"""
+Moteur de règles déclaratives pour la logique automatique des actionneurs.
+
+Une règle d'actionneur est un dictionnaire:
+    {"on_si": <condition>, "off_si": <condition>}   # "off_si" optionnel
+- "on_si" vrai  -> ON;
+- "off_si" vrai -> OFF (sinon l'état actuel est maintenu: hystérésis);
+- sans "off_si", l'actionneur est OFF dès que "on_si" est faux.
+
+Conditions:
+    {"capteur": "co2", "op": ">", "valeur": 1200}
+    {"capteur": "co2", "op": ">", "valeur": {"setting": "SEUIL_CO2_MAX", "decalage": -100}}
+    {"plage": "08:00-12:00,14:00-20:00"}
+    {"plage_heures": ["HEURE_DEBUT_JOUR_OPERATION", "HEURE_FIN_JOUR_OPERATION"]}
+    {"actionneur": "humidifier", "etat": true}
+    {"tous": [...]}, {"un_parmi": [...]}, {"non": <condition>}
+
+Les règles sont compilées en fermetures (closures) une seule fois, puis à chaque changement
+de settings: les valeurs issues des settings sont figées dans les fermetures et
+l'évaluation ne fait plus aucune recherche de configuration.
+"""
+import logging
+import operator
+from datetime import datetime
+
+from .scheduling import DailySchedule, seconds_of_day
+
+rules_logger = logging.getLogger(__name__)
+
+_OPERATORS = {
+    ">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le,
+    "==": operator.eq, "!=": operator.ne,
+}
+
+
+class RuleContext:
+    """
+    Données d'une évaluation: capteurs, instant, états des actionneurs.
+    L'heure du jour est calculée une seule fois pour toutes les règles évaluées.
+    """
+    __slots__ = ("sensors", "now", "second_of_day", "states")
+
+    def __init__(self, sensors: dict, now: datetime, states: dict):
+        self.sensors = sensors
+        self.now = now
+        self.second_of_day = seconds_of_day(now)
+        self.states = states
+
+
+def _resolve_value(spec, get_setting) -> float:
+    if isinstance(spec, dict):
+        if "setting" not in spec:
+            raise ValueError(f"Valeur invalide {spec!r} (attendu un nombre ou {{'setting': ...}})")
+        return float(get_setting(spec["setting"], None)) + float(spec.get("decalage", 0.0))
+    return float(spec)
+
+
+def compile_condition(spec: dict, get_setting):
+    """Compile une condition en fonction `f(ctx) -> bool`. Lève ValueError si la spécification est invalide."""
+    if not isinstance(spec, dict) or len(spec.keys() - {"op", "valeur", "etat"}) != 1:
+        raise ValueError(f"Condition invalide: {spec!r}")
+
+    if "capteur" in spec:
+        channel = spec["capteur"]
+        compare = _OPERATORS.get(spec.get("op"))
+        if compare is None:
+            raise ValueError(f"Opérateur inconnu '{spec.get('op')}' (attendu: {', '.join(_OPERATORS)})")
+        threshold = _resolve_value(spec.get("valeur"), get_setting)
+
+        def sensor_condition(ctx):
+            value = ctx.sensors.get(channel)
+            return value is not None and compare(value, threshold)
+        return sensor_condition
+
+    if "plage" in spec or "plage_heures" in spec:
+        if "plage" in spec:
+            schedule = DailySchedule.parse(spec["plage"])
+        else:
+            start_key, end_key = spec["plage_heures"]
+            schedule = DailySchedule.from_hours(int(get_setting(start_key, None)), int(get_setting(end_key, None)))
+        is_active_at = schedule.compile_predicate()
+
+        def schedule_condition(ctx):
+            return is_active_at(ctx.second_of_day)
+        return schedule_condition
+
+    if "actionneur" in spec:
+        name = spec["actionneur"]
+        expected = bool(spec.get("etat", True))
+
+        def actuator_condition(ctx):
+            return bool(ctx.states.get(name, False)) == expected
+        return actuator_condition
+
+    if "tous" in spec or "un_parmi" in spec:
+        require_all = "tous" in spec
+        children = tuple(compile_condition(child, get_setting) for child in spec["tous" if require_all else "un_parmi"])
+        if not children:
+            raise ValueError(f"Liste de conditions vide: {spec!r}")
+        return _combine(children, require_all)
+
+    if "non" in spec:
+        child = compile_condition(spec["non"], get_setting)
+        return lambda ctx: not child(ctx)
+
+    raise ValueError(f"Condition inconnue: {spec!r}")
+
+
+def _combine(children: tuple, require_all: bool):
+    """ET/OU avec court-circuit; déroulé pour 1 à 3 conditions (cas courants, sans générateur)."""
+    if len(children) == 1:
+        return children[0]
+    if len(children) == 2:
+        a, b = children
+        return (lambda ctx: a(ctx) and b(ctx)) if require_all else (lambda ctx: a(ctx) or b(ctx))
+    if len(children) == 3:
+        a, b, c = children
+        return (lambda ctx: a(ctx) and b(ctx) and c(ctx)) if require_all else (lambda ctx: a(ctx) or b(ctx) or c(ctx))
+
+    def combined(ctx):
+        for child in children:
+            if child(ctx) is not require_all:
+                return not require_all
+        return require_all
+    return combined
+
+
+def compile_actuator_rule(spec: dict, get_setting):
+    """Compile une règle d'actionneur en fonction `f(ctx, current_state) -> bool`."""
+    if "on_si" not in spec:
+        raise ValueError("Règle sans clé 'on_si'.")
+    on_condition = compile_condition(spec["on_si"], get_setting)
+    if "off_si" not in spec:
+        return lambda ctx, current_state: on_condition(ctx)
+    off_condition = compile_condition(spec["off_si"], get_setting)
+
+    def rule(ctx, current_state):
+        if on_condition(ctx):
+            return True
+        if off_condition(ctx):
+            return False
+        return current_state
+    return rule
+
+
+class RuleEngine:
+    """
+    Ensemble de règles compilées, par nom d'actionneur. `compile()` est appelée à la
+    construction et à chaque changement de settings; en cas d'erreur, la règle concernée
+    conserve sa dernière version valide (ou reste absente).
+    """
+    def __init__(self, rules_spec: dict, get_setting):
+        self.rules_spec = dict(rules_spec or {})
+        self.get_setting = get_setting
+        self._compiled = {}
+        self.errors = {}
+        self.compile()
+
+    def compile(self):
+        compiled = dict(self._compiled)
+        self.errors = {}
+        for name, spec in self.rules_spec.items():
+            try:
+                compiled[name] = compile_actuator_rule(spec, self.get_setting)
+            except (ValueError, TypeError, KeyError) as e:
+                self.errors[name] = str(e)
+                rules_logger.error(f"RuleEngine: Règle '{name}' invalide: {e}. "
+                                   f"{'Version précédente conservée.' if name in compiled else 'Logique par défaut utilisée.'}")
+        self._compiled = compiled
+        rules_logger.info(f"RuleEngine: {len(compiled)} règle(s) compilée(s).")
+
+    def has_rule(self, name: str) -> bool:
+        return name in self._compiled
+
+    def evaluate(self, name: str, ctx: RuleContext, current_state: bool) -> bool:
+        return self._compiled[name](ctx, current_state)
+
+    def evaluate_all(self, ctx: RuleContext) -> dict:
+        """Évalue toutes les règles avec les états courants de `ctx.states`."""
+        states = ctx.states
+        return {name: rule(ctx, states.get(name, False)) for name, rule in self._compiled.items()}
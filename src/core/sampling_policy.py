@@ -0,0 +1,150 @@
+# src/core/sampling_policy.py
+import logging
+import threading
+import time
+from datetime import datetime
+
+from src import config
+
+from .scheduling import DailySchedule, compile_schedule
+
+sampling_logger = logging.getLogger(__name__)
+
+
+class AdaptiveSamplingPolicy:
+    """
+    Choisit l'intervalle d'acquisition suivant selon la situation:
+      - proche d'un seuil (humidité ON/OFF, CO2 max) ou en mouvement vers un seuil: rapide;
+      - conditions stables: ralentit progressivement jusqu'à `max_interval`;
+      - hors de la fenêtre d'opération: `max_interval` (aucun actionneur piloté).
+    L'urgence (0..1) est la plus forte de tous les seuils; l'intervalle est interpolé
+    linéairement entre `max_interval` (urgence 0) et `min_interval` (urgence 1).
+    `is_operating(now)`: plages des actionneurs pilotés par seuils (SerreController passe leurs
+    plages compilées); par défaut, PLAGES_OPERATION (ou les heures d'opération) et la session
+    spéciale d'humidification, d'après les settings.
+    """
+    def __init__(self, get_setting, min_interval: float | None = None, max_interval: float | None = None,
+                 margins: dict | None = None, horizon_seconds: float | None = None, is_operating=None):
+        self.get_setting = get_setting
+        self.is_operating = is_operating or self._settings_operating
+        self._schedule_cache = None # (paramètres, DailySchedule) de la fenêtre d'opération par défaut
+        self._special_session = DailySchedule.parse(config.SESSION_SPECIALE_HUMIDIFICATION)
+        self.min_interval = float(min_interval or config.ECHANTILLONNAGE_INTERVALLE_MIN_SECONDES)
+        self.max_interval = float(max_interval or config.ECHANTILLONNAGE_INTERVALLE_MAX_SECONDES)
+        if max_interval is None and self.max_interval > config.INTERVALLE_LECTURE_CAPTEURS_SECONDES:
+            # Plus lent que la boucle logique: des cycles réutiliseraient une lecture déjà traitée
+            sampling_logger.warning(f"Intervalle max d'échantillonnage ({self.max_interval}s) ramené à l'intervalle "
+                                    f"de la boucle logique ({config.INTERVALLE_LECTURE_CAPTEURS_SECONDES}s).")
+            self.max_interval = float(config.INTERVALLE_LECTURE_CAPTEURS_SECONDES)
+        if self.min_interval > self.max_interval:
+            raise ValueError(f"Intervalle min ({self.min_interval}s) supérieur au max ({self.max_interval}s)")
+        self.margins = margins or config.ECHANTILLONNAGE_MARGES
+        self.horizon_seconds = float(horizon_seconds or config.ECHANTILLONNAGE_HORIZON_TENDANCE_SECONDES)
+        self._previous = None # (timestamp, valeurs) de la lecture précédente, pour la tendance
+        self._lock = threading.Lock()
+        self._started_at = None
+        self._samples = 0
+        self._interval_sum = 0.0
+        self._fast_count = 0
+        self._slow_count = 0
+        self._last_interval = self.max_interval
+        self._last_reason = "démarrage"
+
+    def _thresholds(self) -> dict:
+        """Seuils actifs par canal, lus à chaque appel (les settings peuvent changer à chaud)."""
+        try:
+            return {
+                "humidite": (float(self.get_setting(config.KEY_SEUIL_HUMIDITE_ON, config.SEUIL_HUMIDITE_ON)),
+                             float(self.get_setting(config.KEY_SEUIL_HUMIDITE_OFF, config.SEUIL_HUMIDITE_OFF))),
+                "co2": (float(self.get_setting(config.KEY_SEUIL_CO2_MAX, config.CO2_MAX_THRESHOLD)),),
+            }
+        except (ValueError, TypeError) as e:
+            sampling_logger.error(f"AdaptiveSamplingPolicy: Seuils invalides ({e}). Utilisation des défauts globaux.")
+            return {"humidite": (config.SEUIL_HUMIDITE_ON, config.SEUIL_HUMIDITE_OFF), "co2": (config.CO2_MAX_THRESHOLD,)}
+
+    def _settings_operating(self, now: datetime) -> bool:
+        """Même fenêtre que les actionneurs, compilée depuis les settings (recompilée s'ils changent)."""
+        try:
+            start = int(self.get_setting(config.KEY_HEURE_DEBUT_JOUR_OPERATION, config.HEURE_DEBUT_JOUR_OPERATION))
+            end = int(self.get_setting(config.KEY_HEURE_FIN_JOUR_OPERATION, config.HEURE_FIN_JOUR_OPERATION))
+        except (ValueError, TypeError):
+            start, end = config.HEURE_DEBUT_JOUR_OPERATION, config.HEURE_FIN_JOUR_OPERATION
+        key = (self.get_setting(config.KEY_PLAGES_OPERATION, config.PLAGES_OPERATION) or "", start, end)
+        if self._schedule_cache is None or self._schedule_cache[0] != key:
+            self._schedule_cache = (key, compile_schedule(*key, label="AdaptiveSamplingPolicy"))
+        return self._schedule_cache[1].is_active(now) or self._special_session.is_active(now)
+
+    def _urgency(self, timestamp: float, values: dict) -> tuple[float, str]:
+        """Urgence 0..1 et canal responsable, d'après la distance et la tendance vers chaque seuil."""
+        best, reason = 0.0, "stable"
+        previous_ts, previous_values = self._previous or (None, {})
+        for channel, thresholds in self._thresholds().items():
+            value = values.get(channel)
+            margin = self.margins.get(channel)
+            if value is None or not margin:
+                continue
+            slope = None
+            if previous_ts is not None and previous_values.get(channel) is not None and timestamp > previous_ts:
+                slope = (value - previous_values[channel]) / (timestamp - previous_ts)
+            for threshold in thresholds:
+                distance = threshold - value
+                proximity = max(0.0, 1.0 - abs(distance) / margin)
+                trend = 0.0
+                if slope and distance * slope > 0: # Se rapproche du seuil
+                    time_to_threshold = distance / slope
+                    trend = max(0.0, 1.0 - time_to_threshold / self.horizon_seconds)
+                urgency = max(proximity, trend)
+                if urgency > best:
+                    best = urgency
+                    reason = f"{channel} {'proche du' if proximity >= trend else 'tend vers le'} seuil {threshold:g}"
+        return min(best, 1.0), reason
+
+    def next_interval(self, timestamp: float, values: dict | None, now: datetime | None = None) -> float:
+        """
+        Retourne l'attente avant la prochaine lecture. `values` à None (lecture invalide)
+        donne l'intervalle minimal, pour retrouver rapidement une lecture valide.
+        """
+        now = now or datetime.now()
+        if values is None:
+            interval, reason = self.min_interval, "lecture invalide"
+        elif not self.is_operating(now):
+            interval, reason = self.max_interval, "hors fenêtre d'opération"
+        else:
+            urgency, reason = self._urgency(timestamp, values)
+            interval = self.max_interval - urgency * (self.max_interval - self.min_interval)
+        if values is not None:
+            self._previous = (timestamp, dict(values))
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        self._record(interval, reason)
+        return interval
+
+    def _record(self, interval: float, reason: str):
+        with self._lock:
+            if self._started_at is None:
+                self._started_at = time.time()
+            self._samples += 1
+            self._interval_sum += interval
+            if interval <= self.min_interval:
+                self._fast_count += 1
+            elif interval >= self.max_interval:
+                self._slow_count += 1
+            if reason != self._last_reason:
+                sampling_logger.debug(f"AdaptiveSamplingPolicy: Intervalle {interval:.1f}s ({reason}).")
+            self._last_interval = interval
+            self._last_reason = reason
+
+    def get_metrics(self) -> dict:
+        """Métriques sur le rythme d'acquisition effectif."""
+        with self._lock:
+            elapsed = time.time() - self._started_at if self._started_at else 0.0
+            return {
+                "current_interval_seconds": round(self._last_interval, 1),
+                "reason": self._last_reason,
+                "min_interval_seconds": self.min_interval,
+                "max_interval_seconds": self.max_interval,
+                "samples": self._samples,
+                "mean_interval_seconds": round(self._interval_sum / self._samples, 1) if self._samples else None,
+                "samples_per_hour": round(self._samples * 3600 / elapsed, 1) if elapsed > 0 else None,
+                "fast_samples": self._fast_count,
+                "slow_samples": self._slow_count,
+            }
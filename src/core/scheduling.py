@@ -0,0 +1,202 @@
+# src/core/scheduling.py
+import bisect
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+scheduling_logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 24 * 3600
+
+
+def parse_time_windows(text: str) -> list[tuple[int, int]]:
+    """
+    Analyse des plages quotidiennes "HH:MM-HH:MM", séparées par des virgules
+    (ex: "06:00-11:30, 13:00-20:00"). Une plage dont la fin précède le début passe minuit.
+    Retourne des bornes en secondes depuis minuit.
+    """
+    windows = []
+    for part in (text or "").split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            start_text, end_text = part.split('-')
+            windows.append((_parse_hhmm(start_text), _parse_hhmm(end_text)))
+        except ValueError as e:
+            raise ValueError(f"Plage horaire invalide '{part}' (attendu HH:MM-HH:MM): {e}") from None
+    return windows
+
+
+def _parse_hhmm(text: str) -> int:
+    hours, minutes = (int(v) for v in text.strip().split(':'))
+    if not (0 <= hours <= 24 and 0 <= minutes < 60) or (hours == 24 and minutes):
+        raise ValueError(f"heure hors limites '{text.strip()}'")
+    return hours * 3600 + minutes * 60
+
+
+def seconds_of_day(moment: datetime) -> int:
+    return moment.hour * 3600 + moment.minute * 60 + moment.second
+
+
+class DailySchedule:
+    """
+    Plages quotidiennes compilées en une liste triée d'instants de transition.
+    L'état à un instant donné s'obtient par recherche dichotomique, puis reste en cache
+    jusqu'à la transition suivante: entre deux transitions, l'évaluation ne coûte
+    qu'une comparaison.
+    """
+    def __init__(self, windows: list[tuple[int, int]]):
+        intervals = []
+        for start, end in windows:
+            if start == end:
+                continue # Même convention que les heures de début/fin: plage vide
+            if start < end:
+                intervals.append((start, end))
+            else: # Passe minuit
+                intervals.extend([(start, SECONDS_PER_DAY), (0, end)])
+        merged = []
+        for start, end in sorted(intervals):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+
+        self.windows = [tuple(w) for w in merged]
+        self._initial_state = bool(merged) and merged[0][0] == 0
+        points = []
+        for start, end in merged:
+            points.extend([start, end])
+        # Les bornes 0 et 24h ne sont pas des transitions (l'état à minuit est _initial_state)
+        self._points = [p for p in points if 0 < p < SECONDS_PER_DAY]
+        self._cache = None # (valide_depuis, valide_jusqu_a, état)
+
+    @classmethod
+    def from_hours(cls, start_hour: int, end_hour: int):
+        return cls([(start_hour * 3600, end_hour * 3600)])
+
+    @classmethod
+    def parse(cls, text: str):
+        return cls(parse_time_windows(text))
+
+    def _state_at_second(self, second: int) -> bool:
+        return self._initial_state ^ (bisect.bisect_right(self._points, second) % 2 == 1)
+
+    def compile_predicate(self):
+        """Fonction `f(secondes_depuis_minuit) -> bool` spécialisée (comparaisons directes si possible)."""
+        points, initial = tuple(self._points), self._initial_state
+        if not points:
+            return lambda second: initial
+        if len(points) == 2:
+            start, end = points
+            if initial:
+                return lambda second: not (start <= second < end)
+            return lambda second: start <= second < end
+        bisect_right = bisect.bisect_right
+        return lambda second: initial ^ (bisect_right(points, second) % 2 == 1)
+
+    def is_active(self, moment: datetime) -> bool:
+        cache = self._cache
+        if cache and cache[0] <= moment < cache[1]:
+            return cache[2]
+        state = self._state_at_second(seconds_of_day(moment))
+        valid_from = moment.replace(microsecond=0)
+        self._cache = (valid_from, self.next_transition(moment) or valid_from + timedelta(days=1), state)
+        return state
+
+    def next_transition(self, moment: datetime) -> datetime | None:
+        """Prochain instant (strictement après `moment`, à la seconde) où l'état change."""
+        if not self._points:
+            return None
+        second = seconds_of_day(moment)
+        midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        index = bisect.bisect_right(self._points, second)
+        if index < len(self._points):
+            return midnight + timedelta(seconds=self._points[index])
+        return midnight + timedelta(days=1, seconds=self._points[0])
+
+
+def compile_schedule(windows_text: str, start_hour: int, end_hour: int, label: str = "") -> DailySchedule:
+    """
+    Plages "HH:MM-HH:MM,..." si renseignées (prioritaires), sinon heures de début/fin;
+    plages invalides: repli sur les heures, avec une erreur journalisée.
+    """
+    if windows_text:
+        try:
+            return DailySchedule.parse(windows_text)
+        except ValueError as e:
+            scheduling_logger.error(f"{label}: {e}. Utilisation des heures {start_hour}-{end_hour}.")
+    return DailySchedule.from_hours(start_hour, end_hour)
+
+
+class TimerWheel:
+    """
+    Roue temporelle hachée: chaque échéance est rangée dans l'alvéole de sa seconde
+    (modulo le nombre d'alvéoles). À chaque tick, seule l'alvéole courante est examinée;
+    planifier et annuler coûtent O(1).
+    """
+    def __init__(self, tick_seconds: float = 1.0, slots: int = 3600, clock=time.time):
+        self.tick_seconds = float(tick_seconds)
+        self.slots = int(slots)
+        self.clock = clock
+        self._wheel = [[] for _ in range(self.slots)]
+        self._lock = threading.Lock()
+        self._current_tick = int(self.clock() // self.tick_seconds)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def schedule(self, when: float, callback) -> list:
+        """Planifie `callback()` à l'instant `when` (timestamp). Retourne un identifiant pour cancel()."""
+        with self._lock:
+            tick = max(int(when // self.tick_seconds), self._current_tick + 1)
+            entry = [tick, callback, False]
+            self._wheel[tick % self.slots].append(entry)
+        return entry
+
+    def cancel(self, entry: list):
+        entry[2] = True # Retirée paresseusement au passage de l'alvéole
+
+    def advance(self, now: float | None = None) -> int:
+        """Exécute les échéances atteintes jusqu'à `now`. Retourne le nombre de rappels exécutés."""
+        target_tick = int((self.clock() if now is None else now) // self.tick_seconds)
+        due = []
+        with self._lock:
+            # Au-delà d'un tour complet, chaque alvéole n'a besoin d'être visitée qu'une fois
+            first_tick = max(self._current_tick + 1, target_tick - self.slots + 1)
+            for tick in range(first_tick, target_tick + 1):
+                slot = self._wheel[tick % self.slots]
+                if not slot:
+                    continue
+                remaining = []
+                for entry in slot:
+                    if entry[2]:
+                        continue
+                    (due if entry[0] <= target_tick else remaining).append(entry)
+                slot[:] = remaining
+            self._current_tick = max(self._current_tick, target_tick)
+        for entry in sorted(due, key=lambda e: e[0]):
+            try:
+                entry[1]()
+            except Exception as e:
+                scheduling_logger.error(f"TimerWheel: Erreur dans un rappel planifié: {e}", exc_info=True)
+        return len(due)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            next_tick_time = (self._current_tick + 1) * self.tick_seconds
+            self._stop_event.wait(max(0.0, next_tick_time - self.clock()))
+            if not self._stop_event.is_set():
+                self.advance()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="TimerWheelThread", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
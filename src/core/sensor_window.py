@@ -0,0 +1,132 @@
+# src/core/sensor_window.py
+import math
+import threading
+from array import array
+from collections import deque
+
+
+class _RunningStats:
+    """
+    Statistiques glissantes d'un canal en O(1) par échantillon:
+    moyenne/variance par Welford (ajout et retrait), min/max par files monotones.
+    """
+    __slots__ = ("count", "mean", "m2", "_min_queue", "_max_queue")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._min_queue = deque() # (numéro d'échantillon, valeur), valeurs croissantes
+        self._max_queue = deque() # (numéro d'échantillon, valeur), valeurs décroissantes
+
+    def add(self, sample_no: int, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        while self._min_queue and self._min_queue[-1][1] >= value:
+            self._min_queue.pop()
+        self._min_queue.append((sample_no, value))
+        while self._max_queue and self._max_queue[-1][1] <= value:
+            self._max_queue.pop()
+        self._max_queue.append((sample_no, value))
+
+    def remove(self, sample_no: int, value: float):
+        """Retire l'échantillon le plus ancien (celui numéroté `sample_no`)."""
+        self.count -= 1
+        if self.count == 0:
+            self.mean = 0.0
+            self.m2 = 0.0
+        else:
+            delta = value - self.mean
+            self.mean -= delta / self.count
+            self.m2 = max(0.0, self.m2 - delta * (value - self.mean))
+        if self._min_queue and self._min_queue[0][0] == sample_no:
+            self._min_queue.popleft()
+        if self._max_queue and self._max_queue[0][0] == sample_no:
+            self._max_queue.popleft()
+
+    def snapshot(self) -> dict:
+        if self.count == 0:
+            return {"count": 0, "min": None, "max": None, "mean": None, "stddev": None}
+        return {
+            "count": self.count,
+            "min": self._min_queue[0][1],
+            "max": self._max_queue[0][1],
+            "mean": self.mean,
+            "stddev": math.sqrt(self.m2 / self.count),
+        }
+
+
+class RollingSensorWindow:
+    """
+    Fenêtre glissante des dernières acquisitions capteurs (ex: 6 dernières heures).
+    Tampon circulaire préalloué (array('d')): l'empreinte mémoire est fixe et
+    la mise à jour des statistiques coûte O(1) par échantillon.
+    """
+    def __init__(self, window_seconds: float, min_sample_interval_seconds: float,
+                 channels: tuple = ("temperature", "humidite", "co2")):
+        self.window_seconds = float(window_seconds)
+        self.channels = tuple(channels)
+        self.capacity = max(1, math.ceil(self.window_seconds / max(min_sample_interval_seconds, 0.001)))
+        self._timestamps = array('d', bytes(8 * self.capacity))
+        self._values = {ch: array('d', bytes(8 * self.capacity)) for ch in self.channels}
+        self._stats = {ch: _RunningStats() for ch in self.channels}
+        self._head = 0        # Position du plus ancien échantillon
+        self._count = 0
+        self._next_sample_no = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    def _evict_oldest(self):
+        sample_no = self._next_sample_no - self._count
+        for ch in self.channels:
+            self._stats[ch].remove(sample_no, self._values[ch][self._head])
+        self._head = (self._head + 1) % self.capacity
+        self._count -= 1
+
+    def append(self, timestamp: float, values: dict):
+        """Ajoute un échantillon complet (toutes les valeurs de `channels` doivent être présentes)."""
+        with self._lock:
+            # Éviction par âge (intervalle d'acquisition variable) puis par capacité.
+            horizon = timestamp - self.window_seconds
+            while self._count and self._timestamps[self._head] < horizon:
+                self._evict_oldest()
+            if self._count == self.capacity:
+                self._evict_oldest()
+            position = (self._head + self._count) % self.capacity
+            self._timestamps[position] = timestamp
+            sample_no = self._next_sample_no
+            for ch in self.channels:
+                value = float(values[ch])
+                self._values[ch][position] = value
+                self._stats[ch].add(sample_no, value)
+            self._next_sample_no += 1
+            self._count += 1
+
+    def get_stats(self) -> dict:
+        """Statistiques courantes par canal (calculées incrémentalement, aucun parcours)."""
+        with self._lock:
+            stats = {ch: self._stats[ch].snapshot() for ch in self.channels}
+            stats["oldest_timestamp"] = self._timestamps[self._head] if self._count else None
+            stats["newest_timestamp"] = self._timestamps[(self._head + self._count - 1) % self.capacity] if self._count else None
+        return stats
+
+    def get_samples(self, since: float | None = None, max_points: int | None = None) -> dict:
+        """
+        Retourne les échantillons (format colonnes, prêt pour un graphique) plus récents que `since`.
+        Si `max_points` est fourni, les points sont sous-échantillonnés à pas régulier.
+        """
+        with self._lock:
+            positions = [(self._head + i) % self.capacity for i in range(self._count)]
+            if since is not None:
+                positions = [p for p in positions if self._timestamps[p] > since]
+            if max_points and len(positions) > max_points:
+                step = math.ceil(len(positions) / max_points)
+                positions = positions[::-1][::step][::-1] # Toujours garder le point le plus récent
+            result = {"timestamps": [self._timestamps[p] for p in positions]}
+            for ch in self.channels:
+                result[ch] = [self._values[ch][p] for p in positions]
+        return result
@@ -9,52 +9,218 @@ import importlib
 
 # Importer le module config (qui contient DEFAULT_SETTINGS et USER_SETTINGS_FILE)
 from src import config 
+from src.utils import metrics
 
 from .actuators.led_controller import LedController
 from .actuators.humidifier_controller import HumidifierController
 from .actuators.ventilation_controller import VentilationController
+from .sensor_window import RollingSensorWindow
+from .signal_filters import SensorFilterPipeline
+from .sampling_policy import AdaptiveSamplingPolicy
+from .scheduling import TimerWheel
+from .rules import RuleEngine, RuleContext
+from .startup import StartupStages, StageTimeoutError
+from .checkpoint import ActuatorCheckpoint, checkpoint_path, relay_states
+from .settings_watcher import SettingsFileWatcher
+from .persistence import DebouncedJsonWriter, write_json_atomic
+from .loop_timing import LoopTimingTracker, LOOP_ACQUISITION, LOOP_LOGIC, apply_thread_scheduling
+from .settings_history import (SettingsHistory, SettingsVersionConflict, journal_path,
+                               SOURCE_INITIAL, SOURCE_API, SOURCE_FILE)
 
-try:
-    from ..utils.db_utils import DatabaseManager
-except ImportError:
-    logging.warning("DatabaseManager non trouvé dans src.utils.db_utils. Utilisation de MockDatabaseManager.")
-    class MockDatabaseManager:
-        def __init__(self, *args, **kwargs): pass
-        def add_sensor_data_to_buffer(self, *args, **kwargs): logging.debug("MockDM: add_sensor_data_to_buffer")
-        def flush_buffer(self): logging.debug("MockDM: flush_buffer")
-        def close_pool(self): logging.debug("MockDM: close_pool")
-    DatabaseManager = MockDatabaseManager
-except Exception as e: # Attraper d'autres erreurs d'import possibles pour DatabaseManager
-    logging.error(f"Erreur inattendue lors de l'import de DatabaseManager: {e}. Utilisation de MockDatabaseManager.")
-    class MockDatabaseManager: # Fallback
-        def __init__(self, *args, **kwargs): pass
-        def add_sensor_data_to_buffer(self, *args, **kwargs): logging.debug("MockDM: add_sensor_data_to_buffer")
-        def flush_buffer(self): logging.debug("MockDM: flush_buffer")
-        def close_pool(self): logging.debug("MockDM: close_pool")
-    DatabaseManager = MockDatabaseManager
+class MockDatabaseManager: # Fallback (et zones sans historique en base)
+    def __init__(self, *args, **kwargs): pass
+    def add_sensor_data_to_buffer(self, *args, **kwargs): logging.debug("MockDM: add_sensor_data_to_buffer")
+    def flush_buffer(self): logging.debug("MockDM: flush_buffer")
+    def close_pool(self): logging.debug("MockDM: close_pool")
+
+def _make_database_manager(*args, **kwargs):
+    """
+    DatabaseManager de src.utils.db_utils, importé au premier usage: psycopg2 n'est chargé
+    que si une base est réellement utilisée (pas pour les zones sans historique ni les tests).
+    """
+    try:
+        from ..utils.db_utils import DatabaseManager as PostgresDatabaseManager
+    except ImportError as e:
+        logging.warning(f"DatabaseManager indisponible ({e}). Utilisation de MockDatabaseManager.")
+        return MockDatabaseManager()
+    return PostgresDatabaseManager(*args, **kwargs)
+
+
+class PendingDatabaseManager:
+    """
+    Tient lieu de gestionnaire de base pendant que celle-ci s'initialise en arrière-plan: les
+    enregistrements sont conservés (au plus `max_records`, les plus anciens abandonnés) puis
+    transmis au vrai gestionnaire par attach(). Ensuite, les appels lui sont relayés.
+    """
+    def __init__(self, max_records: int):
+        self.max_records = max_records
+        self.target = None
+        self.dropped = 0
+        self._pending = []
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def add_sensor_data_to_buffer(self, **record):
+        with self._lock:
+            if self.target is None:
+                if len(self._pending) >= self.max_records:
+                    self._pending.pop(0)
+                    self.dropped += 1
+                self._pending.append(record)
+                return
+        self.target.add_sensor_data_to_buffer(**record)
+
+    def attach(self, target) -> bool:
+        """Rejoue les enregistrements en attente dans `target`. False si l'arrêt a déjà eu lieu."""
+        with self._lock:
+            for record in self._pending:
+                target.add_sensor_data_to_buffer(**record)
+            if self._pending:
+                controller_logger.info(f"Base de données prête: {len(self._pending)} enregistrement(s) en attente transmis"
+                                       + (f", {self.dropped} abandonné(s)." if self.dropped else "."))
+            self._pending = []
+            self.target = target
+            return not self._closed
+
+    def flush_buffer(self):
+        if self.target is not None:
+            self.target.flush_buffer()
+
+    def close_pool(self):
+        with self._lock:
+            self._closed = True
+        if self.target is not None:
+            self.target.close_pool()
+
+    def __getattr__(self, name): # bulk_insert_batch, db_pool... une fois la base prête
+        target = self.__dict__.get('target')
+        if target is None:
+            raise AttributeError(f"Base de données en cours d'initialisation ('{name}' indisponible).")
+        return getattr(target, name)
 
 
 controller_logger = logging.getLogger(__name__)
 
-class SerreController:
-    def __init__(self):
-        controller_logger.info("Initialisation de SerreController...")
-        self.hardware = self._initialize_hardware() 
-        self.db_manager = self._initialize_db_manager()
+STAGE_HARDWARE = "materiel"
+STAGE_SETTINGS = "parametres"
+STAGE_DATABASE = "base_de_donnees"
+
+
+def load_hardware(hardware_env: str | None = None, initial_states: dict | None = None):
+    """
+    Charge dynamiquement l'interface matérielle ('raspberry_pi' ou mock), par défaut config.HARDWARE_ENV.
+    `initial_states` (actionneur -> état): reprise à chaud, les sorties sont réclamées dans cet état.
+    """
+    hardware_interface_module_path_root = 'src.hardware_interface'
+    # S'assurer que config.HARDWARE_ENV est bien défini
+    hardware_env = hardware_env or getattr(config, 'HARDWARE_ENV', 'mock') # Fallback sur 'mock' si non défini
 
+    if hardware_env == 'raspberry_pi':
+        try:
+            module_path = f'{hardware_interface_module_path_root}.raspberry_pi'
+            hw_module = importlib.import_module(module_path)
+            HardwareInterface = hw_module.RaspberryPiHardware
+            controller_logger.info("Utilisation de RaspberryPiHardware.")
+        except ImportError as e:
+            controller_logger.error(f"Erreur importation RaspberryPiHardware: {e}. Fallback sur MockHardware.")
+            module_path = f'{hardware_interface_module_path_root}.mock_hardware'
+            hw_module = importlib.import_module(module_path)
+            HardwareInterface = hw_module.MockHardware
+    else: # mock ou autre
+        module_path = f'{hardware_interface_module_path_root}.mock_hardware'
+        hw_module = importlib.import_module(module_path)
+        HardwareInterface = hw_module.MockHardware
+        controller_logger.info(f"Utilisation de {hardware_env}Hardware (ou MockHardware par défaut).")
+    return HardwareInterface(initial_states=initial_states)
+
+
+class SerreController:
+    def __init__(self, zone_id: str | None = None, hardware=None, db_manager=None,
+                 settings_file: str | None = None, timer_wheel: TimerWheel | None = None, autostart: bool = True,
+                 checkpoint_file: str | None = None):
+        """
+        Sans argument: une serre autonome (matériel, base et settings de config.py, threads propres).
+        En multi-zone (voir zones.MultiZoneController), la zone reçoit son matériel, son fichier de
+        settings et la roue temporelle partagée, avec autostart=False: ses cycles d'acquisition et de
+        logique (_acquire_sensors_once, _run_logic_cycle) sont alors exécutés par le gestionnaire de zones.
+        `checkpoint_file`: point de reprise des actionneurs (config.REPRISE_A_CHAUD_FICHIER par défaut
+        si le contrôleur crée son matériel); le matériel fourni doit avoir été créé dans l'état repris.
+        """
+        self.zone_id = zone_id
+        self._zone_label = f"[{zone_id}] " if zone_id else ""
+        self._metrics_zone = zone_id or config.GREENHOUSE_ID # Label "zone" des métriques
+        controller_logger.info(f"{self._zone_label}Initialisation de SerreController...")
+        # Étapes indépendantes lancées en parallèle: matériel et settings sont attendus (rien ne
+        # peut être décidé sans eux), la base de données arrive en arrière-plan.
+        self.startup = StartupStages(self._zone_label)
+        self._startup_lock = threading.Lock()
+        self._started = False
+        self.retention_manager = None # Créé avec la base de données (_attach_db_manager)
+        self.settings_file = settings_file or config.USER_SETTINGS_FILE
         # --- DÉBUT: Gestion centralisée des configurations ---
-        self.settings = {}  # Dictionnaire pour tenir les configurations actuelles
+        self.settings = config.DEFAULT_SETTINGS.copy()  # Remplacés par _load_settings
         self.settings_lock = threading.Lock() # Pour un accès thread-safe
-        self._load_settings() # Charger les configurations au démarrage
+        self._settings_listeners = [] # Appelés après chaque changement effectif des settings
+        self._settings_file_snapshot = None # Contenu du fichier à la dernière lecture/écriture (rechargement incrémental)
+        self.settings_watcher = None # Démarré avec le contrôle (start)
+        # Versions des settings et journal des changements (mises à jour conditionnelles, historique)
+        self.settings_history = SettingsHistory(journal_path(self.settings_file) if config.SETTINGS_JOURNAL else None,
+                                                label=self._zone_label)
+        # Sauvegardes regroupées et faites hors du thread appelant (requête HTTP)
+        self._settings_writer = DebouncedJsonWriter(self.settings_file, self._settings_to_persist,
+                                                    config.SETTINGS_ECRITURE_DELAI_SECONDES, label=self._zone_label)
+        self.startup.launch(STAGE_SETTINGS, self._load_settings, config.INIT_DELAI_PARAMETRES_SECONDES,
+                            on_done=self._on_settings_loaded)
         # --- FIN: Gestion centralisée des configurations ---
+        # Reprise à chaud: états des actionneurs laissés par le processus précédent (None: à froid)
+        if checkpoint_file is None and hardware is None and config.REPRISE_A_CHAUD:
+            checkpoint_file = checkpoint_path(zone_id)
+        self.checkpoint = ActuatorCheckpoint(checkpoint_file) if checkpoint_file else None
+        self._restored_actuators = self.checkpoint.load() if self.checkpoint else None
+        if hardware is None:
+            self.startup.launch(STAGE_HARDWARE, self._initialize_hardware, config.INIT_DELAI_MATERIEL_SECONDES)
+        self._owns_db_manager = db_manager is None # Un gestionnaire fourni reste à la charge de l'appelant
+        if self._owns_db_manager:
+            self.local_store = self._initialize_local_store()
+            self.db_manager = PendingDatabaseManager(config.INIT_DB_ENREGISTREMENTS_EN_ATTENTE_MAX)
+            self.startup.launch(STAGE_DATABASE, self._initialize_db_manager, config.INIT_DELAI_DB_SECONDES,
+                                on_done=self._attach_db_manager)
+        else:
+            self.local_store = None
+            self.db_manager = db_manager
+
+        if hardware is None:
+            try:
+                hardware = self.startup.wait(STAGE_HARDWARE)
+            except StageTimeoutError as e:
+                raise RuntimeError(f"{self._zone_label}Initialisation du matériel bloquée: {e}") from e
+        self.hardware = hardware
+        try:
+            self.startup.wait(STAGE_SETTINGS)
+        except StageTimeoutError as e:
+            controller_logger.warning(f"{self._zone_label}{e} Démarrage avec les settings par défaut.")
 
         # Store pour les données capteurs (comme avant)
         self._latest_sensor_data_store = {
             "timestamp": 0, "temperature": None, "humidite": None,
-            "co2": None, "is_valid": False
+            "co2": None, "is_valid": False,
+            # Dernières valeurs brutes (avant filtrage), conservées à côté des valeurs filtrées
+            "temperature_brute": None, "humidite_brute": None, "co2_brute": None
         }
         self._sensor_data_lock = threading.Lock()
         self.last_sensor_read_error_logged = False 
+        # Historique récent en mémoire (taille fixe) pour les tableaux de bord
+        self.sensor_window = RollingSensorWindow(
+            window_seconds=config.FENETRE_CAPTEURS_HEURES * 3600,
+            min_sample_interval_seconds=min(config.INTERVALLE_LECTURE_RAPIDE_CAPTEURS_SECONDES,
+                                            config.ECHANTILLONNAGE_INTERVALLE_MIN_SECONDES),
+            channels=("temperature", "humidite", "co2", "temperature_brute", "humidite_brute", "co2_brute"))
+        # Intervalle d'acquisition adaptatif (None: intervalle fixe INTERVALLE_LECTURE_RAPIDE_CAPTEURS_SECONDES)
+        self.sampling_policy = (AdaptiveSamplingPolicy(self.get_setting, is_operating=self._threshold_control_active)
+                                if getattr(config, 'ECHANTILLONNAGE_ADAPTATIF', False) else None)
+        # Filtrage des lectures (les actionneurs ne voient que les valeurs filtrées)
+        self.sensor_filter = SensorFilterPipeline.from_config(
+            config.FILTRES_CAPTEURS if getattr(config, 'FILTRAGE_CAPTEURS_ACTIF', False) else {})
         
         # Événements pour la gestion des threads (comme avant)
         self._running = threading.Event(); self._running.set() 
@@ -66,22 +232,167 @@ class SerreController:
         self.humidifier_ctrl = HumidifierController(self.hardware, self)
         self.ventilation_ctrl = VentilationController(self.hardware, self)
 
-        # Démarrage des threads (comme avant)
-        self._sensor_acquisition_thread = threading.Thread(
-            target=self._sensor_acquisition_loop, name="SensorAcquisitionThread", daemon=True)
-        self._controller_logic_thread = threading.Thread(
-            target=self._controller_logic_loop, name="SerreControllerLogicThread", daemon=True)
+        if self._restored_actuators:
+            controller_logger.info(f"{self._zone_label}Reprise à chaud depuis '{self.checkpoint.path}'.")
+            for actuator in self._actuators():
+                if actuator.device_name in self._restored_actuators:
+                    actuator.restore_state(self._restored_actuators[actuator.device_name])
+        for actuator in self._actuators():
+            actuator.metrics_zone = self._metrics_zone
+        if self.checkpoint:
+            for actuator in self._actuators():
+                actuator.state_listener = self._save_checkpoint
+            self._save_checkpoint()
+
+        # Règles déclaratives (config.REGLES_ACTIONNEURS), recompilées à chaque changement de settings
+        self.rule_engine = self._initialize_rule_engine()
+        self._sensor_error_streak_for_logic = 0
+
+        # Publication du statut en mémoire partagée (StatusSlotWriter de src/ipc/status_shm.py, posé par main.py)
+        self.status_publisher = None
+        self._last_acquisition_seconds = None
+        self._last_logic_seconds = None
+        # (horodatage, valeurs, états des actionneurs) de la dernière ligne mise en tampon
+        self._last_recorded = None
+        self.skipped_records = 0
+        # Début prévu/effectif et durée des derniers cycles de chaque boucle (gigue, échéances manquées)
+        self.loop_timing = {LOOP_ACQUISITION: LoopTimingTracker(LOOP_ACQUISITION), LOOP_LOGIC: LoopTimingTracker(LOOP_LOGIC)}
+
+        # Transitions horaires (LEDs, fenêtres d'opération) déclenchées à la seconde près
+        self._owns_timer_wheel = timer_wheel is None
+        self.timer_wheel = timer_wheel or TimerWheel()
+        self._schedule_timers = {}
+        self._schedule_lock = threading.Lock()
+        self.add_settings_listener(self._reschedule_transitions) # Les plages horaires ont pu changer
+
+        self.replication_agent = self._initialize_replication_agent()
+
+        if autostart:
+            self.start()
+
+    def start(self, run_loops: bool = True, watch_settings: bool = True):
+        """
+        Démarre les traitements de fond. `run_loops=False`: ni thread d'acquisition ni thread
+        de logique (cycles pilotés de l'extérieur); la roue temporelle n'est démarrée que si
+        elle appartient à ce contrôleur. `watch_settings=False`: pas de surveillance propre du
+        fichier de settings (MultiZoneController surveille ceux de toutes ses zones).
+        """
+        if run_loops:
+            self._sensor_acquisition_thread = threading.Thread(
+                target=self._sensor_acquisition_loop, name="SensorAcquisitionThread", daemon=True)
+            self._controller_logic_thread = threading.Thread(
+                target=self._controller_logic_loop, name="SerreControllerLogicThread", daemon=True)
+
+            controller_logger.info("Démarrage du Thread d'acquisition des capteurs...")
+            self._sensor_acquisition_thread.start()
+            controller_logger.info("Démarrage du Thread de logique du contrôleur...")
+            self._controller_logic_thread.start()
+
+        if self._owns_timer_wheel:
+            self.timer_wheel.start()
+        self._reschedule_transitions()
+
+        if self.replication_agent:
+            controller_logger.info("Démarrage du Thread de réplication vers la base centrale...")
+            self.replication_agent.start()
 
-        controller_logger.info("Démarrage du Thread d'acquisition des capteurs...")
-        self._sensor_acquisition_thread.start()
-        controller_logger.info("Démarrage du Thread de logique du contrôleur...")
-        self._controller_logic_thread.start()
+        if config.SETTINGS_SURVEILLANCE and watch_settings:
+            self.settings_watcher = SettingsFileWatcher(
+                self.settings_file, self.reload_settings, poll_interval=config.SETTINGS_SURVEILLANCE_INTERVALLE_SECONDES,
+                settle_seconds=config.SETTINGS_SURVEILLANCE_STABILISATION_SECONDES, label=self._zone_label)
+            self.settings_watcher.start()
+
+        with self._startup_lock:
+            self._started = True
+            self._start_maintenance()
+        self.startup.mark_control_started()
+
+    def _start_maintenance(self):
+        if self.retention_manager and self._started and not hasattr(self, '_maintenance_thread'):
+            self._maintenance_thread = threading.Thread(
+                target=self._maintenance_loop, name="MaintenanceThread", daemon=True)
+            controller_logger.info("Démarrage du Thread de maintenance (rétention des données)...")
+            self._maintenance_thread.start()
+
+    def _on_settings_loaded(self, _result):
+        # Chargement arrivé après son délai: le contrôle a démarré avec les défauts
+        if self.startup.finished_late(STAGE_SETTINGS):
+            self._notify_settings_listeners()
+
+    def _attach_db_manager(self, db_manager):
+        """Fin de l'étape base de données: les enregistrements en attente lui sont transmis."""
+        pending = self.db_manager
+        if not pending.attach(db_manager): # Arrêt demandé pendant l'initialisation de la base
+            db_manager.flush_buffer()
+            db_manager.close_pool()
+            return
+        with self._startup_lock:
+            self.db_manager = db_manager
+            self.retention_manager = self._initialize_retention_manager()
+            self._start_maintenance()
+
+    def get_startup_status(self) -> dict:
+        """Phase de démarrage et état des étapes d'initialisation (voir src/core/startup.py)."""
+        return {"zone_id": self.zone_id or config.GREENHOUSE_ID, **self.startup.get_status()}
+
+    def _initialize_rule_engine(self):
+        rules_spec = getattr(config, 'REGLES_ACTIONNEURS', None)
+        if not rules_spec:
+            return None
+        engine = RuleEngine(rules_spec, self.get_setting)
+        self.add_settings_listener(engine.compile)
+        for actuator in (self.led_ctrl, self.humidifier_ctrl, self.ventilation_ctrl):
+            if actuator.device_name in rules_spec:
+                actuator.rule_evaluator = self._make_rule_evaluator(engine, actuator.device_name)
+                controller_logger.info(f"{actuator.device_name}: logique automatique définie par règle déclarative.")
+        return engine
+
+    def _make_rule_evaluator(self, engine: RuleEngine, name: str):
+        def evaluate(sensor_data: dict, current_state: bool):
+            if not engine.has_rule(name):
+                return None
+            return engine.evaluate(name, RuleContext(sensor_data, datetime.now(), self._get_actuator_states()), current_state)
+        return evaluate
+
+    def _get_actuator_states(self) -> dict:
+        return {a.device_name: a.current_state for a in (self.led_ctrl, self.humidifier_ctrl, self.ventilation_ctrl)}
+
+    def _initialize_local_store(self):
+        """Ouvre le stockage local (SQLite) si la réplication vers la base centrale est activée."""
+        if not getattr(config, 'REPLICATION_ENABLED', False):
+            return None
+        try:
+            from ..utils.replication import LocalSensorStore
+            return LocalSensorStore(config.LOCAL_STORE_PATH)
+        except Exception as e:
+            controller_logger.error(f"Impossible d'ouvrir le stockage local '{getattr(config, 'LOCAL_STORE_PATH', None)}': {e}. Réplication désactivée.")
+            return None
+
+    def _initialize_replication_agent(self):
+        """Crée l'agent de réplication edge -> central (non démarré)."""
+        if self.local_store is None:
+            return None
+        from ..utils.replication import ReplicationAgent, PostgresSink
+        return ReplicationAgent(self.local_store, PostgresSink(config.DB_CONFIG_CENTRAL))
+
+    def _initialize_retention_manager(self):
+        """Crée le gestionnaire de rétention si activé et si le pool DB est disponible."""
+        if not getattr(config, 'RETENTION_ENABLED', False) or not self._owns_db_manager:
+            return None
+        db_pool = getattr(self.db_manager, 'db_pool', None)
+        if db_pool is None:
+            controller_logger.info("Rétention des données désactivée: pool DB non disponible.")
+            return None
+        from ..utils.retention import RetentionManager
+        return RetentionManager(db_pool)
 
     def _initialize_db_manager(self):
         """Initialise et retourne le gestionnaire de base de données."""
         try:
             if hasattr(config, 'ACTIVE_DB_CONFIG') and config.ACTIVE_DB_CONFIG:
-                 return DatabaseManager()
+                 if self.local_store is not None:
+                     return _make_database_manager(local_store=self.local_store)
+                 return _make_database_manager()
             else:
                 controller_logger.warning("config.ACTIVE_DB_CONFIG non trouvé ou vide. Utilisation de MockDatabaseManager.")
                 return MockDatabaseManager() 
@@ -91,33 +402,19 @@ class SerreController:
 
     def _initialize_hardware(self):
         """Charge dynamiquement l'interface matérielle basée sur config.HARDWARE_ENV."""
-        hardware_interface_module_path_root = 'src.hardware_interface'
-        # S'assurer que config.HARDWARE_ENV est bien défini
-        hardware_env = getattr(config, 'HARDWARE_ENV', 'mock') # Fallback sur 'mock' si non défini
+        return load_hardware(initial_states=relay_states(self._restored_actuators))
 
-        if hardware_env == 'raspberry_pi':
-            try:
-                module_path = f'{hardware_interface_module_path_root}.raspberry_pi'
-                hw_module = importlib.import_module(module_path)
-                HardwareInterface = hw_module.RaspberryPiHardware
-                controller_logger.info("Utilisation de RaspberryPiHardware.")
-            except ImportError as e:
-                controller_logger.error(f"Erreur importation RaspberryPiHardware: {e}. Fallback sur MockHardware.")
-                module_path = f'{hardware_interface_module_path_root}.mock_hardware'
-                hw_module = importlib.import_module(module_path)
-                HardwareInterface = hw_module.MockHardware
-        else: # mock ou autre
-            module_path = f'{hardware_interface_module_path_root}.mock_hardware'
-            hw_module = importlib.import_module(module_path)
-            HardwareInterface = hw_module.MockHardware
-            controller_logger.info(f"Utilisation de {hardware_env}Hardware (ou MockHardware par défaut).")
-        return HardwareInterface()
+    def _actuators(self) -> tuple:
+        return (self.led_ctrl, self.humidifier_ctrl, self.ventilation_ctrl)
+
+    def _save_checkpoint(self):
+        self.checkpoint.save({actuator.device_name: actuator.export_state() for actuator in self._actuators()})
 
     # --- NOUVELLES MÉTHODES ET LOGIQUE MODIFIÉE POUR LA GESTION DES CONFIGURATIONS ---
 
     def _ensure_data_directory_exists(self):
-        """S'assure que le répertoire spécifié dans USER_SETTINGS_FILE existe."""
-        settings_file_path = config.USER_SETTINGS_FILE
+        """S'assure que le répertoire du fichier de settings (USER_SETTINGS_FILE par défaut) existe."""
+        settings_file_path = self.settings_file
         data_dir = os.path.dirname(settings_file_path)
         if data_dir and not os.path.exists(data_dir): 
             try:
@@ -138,12 +435,13 @@ class SerreController:
             return
 
         current_loaded_settings = config.DEFAULT_SETTINGS.copy() 
-        settings_file_path = config.USER_SETTINGS_FILE
+        settings_file_path = self.settings_file
 
         try:
             if os.path.exists(settings_file_path) and os.path.getsize(settings_file_path) > 0:
                 with open(settings_file_path, 'r', encoding='utf-8') as f:
                     user_settings_from_file = json.load(f)
+                    self._settings_file_snapshot = user_settings_from_file
                     for key, value in user_settings_from_file.items():
                         if key in current_loaded_settings: 
                             default_type = type(current_loaded_settings[key])
@@ -161,36 +459,41 @@ class SerreController:
                     controller_logger.info(f"Configurations chargées et fusionnées depuis '{settings_file_path}'.")
             else:
                 controller_logger.info(f"'{settings_file_path}' non trouvé ou vide. Utilisation des configurations par défaut et création/mise à jour du fichier.")
-                with open(settings_file_path, 'w', encoding='utf-8') as f: 
-                    json.dump(current_loaded_settings, f, indent=4, ensure_ascii=False)
-        except (IOError, json.JSONDecodeError) as e:
+                write_json_atomic(settings_file_path, current_loaded_settings)
+                self._settings_file_snapshot = current_loaded_settings.copy()
+        except (OSError, json.JSONDecodeError) as e:
             controller_logger.error(f"Erreur lors du chargement/création de '{settings_file_path}': {e}. Utilisation des configurations par défaut strictes.")
             current_loaded_settings = config.DEFAULT_SETTINGS.copy()
 
         with self.settings_lock:
             self.settings = current_loaded_settings
+            self._record_loaded_settings()
+        self.settings_history.flush_journal()
         controller_logger.info(f"Configurations actives finales: {self.settings}")
 
 
     def _save_settings(self):
-        """Sauvegarde les configurations actuelles (self.settings) dans USER_SETTINGS_FILE."""
+        """
+        Demande la sauvegarde des configurations actuelles (self.settings) dans le fichier de
+        settings: écriture atomique faite en arrière-plan, les demandes rapprochées étant
+        regroupées (SETTINGS_ECRITURE_DELAI_SECONDES). Retourne False si le répertoire est inaccessible.
+        """
         if not self._ensure_data_directory_exists():
             controller_logger.error("Impossible de sauvegarder les settings, le répertoire n'a pas pu être assuré.")
             return False
-            
+        self._settings_writer.schedule()
+        return True
+
+    def _settings_to_persist(self) -> dict:
+        """État écrit par le DebouncedJsonWriter, lu au moment de l'écriture (le plus récent)."""
         with self.settings_lock:
             settings_to_save = self.settings.copy()
-        try:
-            with open(config.USER_SETTINGS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(settings_to_save, f, indent=4, ensure_ascii=False)
-            controller_logger.info(f"Configurations sauvegardées dans '{config.USER_SETTINGS_FILE}'.")
-            return True
-        except IOError as e:
-            controller_logger.error(f"Erreur lors de la sauvegarde des configurations dans '{config.USER_SETTINGS_FILE}': {e}")
-            return False
+            self._settings_file_snapshot = settings_to_save # Cette écriture ne sera pas prise pour une modification externe
+        return settings_to_save
 
     def get_setting(self, key: str, default_override=None):
         """Récupère une valeur de configuration de manière thread-safe."""
+        metrics.SETTINGS_LOOKUPS.inc()
         with self.settings_lock:
             value_from_memory = self.settings.get(key) # Peut être None si la clé n'est pas là
         
@@ -217,11 +520,14 @@ class SerreController:
             complete_settings.update(self.settings) 
             return complete_settings
 
-    def update_settings(self, new_settings_to_update: dict) -> bool:
+    def update_settings(self, new_settings_to_update: dict, expected_version: int | None = None) -> bool:
         """
         Met à jour une ou plusieurs configurations.
         Valide les clés et tente une conversion de type basée sur DEFAULT_SETTINGS.
-        Sauvegarde toutes les configurations après mise à jour si des changements ont eu lieu.
+        Sauvegarde toutes les configurations après mise à jour si des changements ont eu lieu
+        (écriture regroupée et faite en arrière-plan, voir _save_settings).
+        `expected_version` (If-Match): la mise à jour n'est appliquée que si les settings sont
+        toujours à cette version, sinon SettingsVersionConflict est levée.
         """
         if not isinstance(new_settings_to_update, dict):
             controller_logger.error("Mise à jour des settings échouée: les nouvelles données ne sont pas un dictionnaire.")
@@ -229,57 +535,24 @@ class SerreController:
 
         controller_logger.info(f"Demande de mise à jour des configurations avec: {new_settings_to_update}")
         
-        settings_actually_changed = False
-        
         with self.settings_lock:
-            # Faire une copie des settings actuels pour la comparaison et la modification
-            # Cela garantit que nous travaillons sur une base qui inclut déjà les settings chargés/défauts.
+            current_version = self.settings_history.version
+            if expected_version is not None and expected_version != current_version:
+                controller_logger.warning(f"Mise à jour des settings refusée: version {expected_version} attendue, version actuelle {current_version}.")
+                raise SettingsVersionConflict(expected_version, current_version)
             # self.settings est déjà le résultat de la fusion lors du _load_settings.
-            temp_current_settings = self.settings.copy()
-
-            for key, received_value in new_settings_to_update.items():
-                if key in config.DEFAULT_SETTINGS: # Clé valide car présente dans les défauts de référence
-                    default_value_for_type_check = config.DEFAULT_SETTINGS[key]
-                    default_type = type(default_value_for_type_check)
-                    
-                    value_before_update = temp_current_settings.get(key) # Valeur actuelle avant modification
-
-                    casted_value = None
-                    try:
-                        # Logique de conversion de type améliorée
-                        if default_type == bool:
-                            if isinstance(received_value, str):
-                                casted_value = received_value.lower() in ['true', 'on', '1', 'yes', 'vrai']
-                            elif isinstance(received_value, (int, float)): # Accepter 0/1 pour bool
-                                casted_value = bool(received_value)
-                            else: # Déjà un booléen
-                                casted_value = bool(received_value)
-                        elif default_type == int:
-                            casted_value = int(float(received_value)) # Permet "70.0" -> 70
-                        elif default_type == float:
-                            casted_value = float(received_value)
-                        else: # Pour str ou autres types (suppose que c'est déjà le bon type ou str)
-                            casted_value = default_type(received_value)
-
-                        # Vérifier si la valeur a réellement changé
-                        if value_before_update != casted_value:
-                            temp_current_settings[key] = casted_value # Mettre à jour dans la copie temporaire
-                            settings_actually_changed = True
-                            controller_logger.info(f"Setting '{key}' sera mis à jour de '{value_before_update}' à '{casted_value}'.")
-                        else:
-                            controller_logger.debug(f"Setting '{key}' inchangé (valeur: '{casted_value}').")
-                            
-                    except (ValueError, TypeError) as e:
-                        controller_logger.warning(f"Valeur '{received_value}' pour clé '{key}' invalide ou type incorrect (attendu {default_type}): {e}. Setting non modifié.")
-                else:
-                    controller_logger.warning(f"Clé de configuration inconnue '{key}' ignorée lors de la mise à jour.")
-            
+            changes = self._validated_changes(new_settings_to_update, self.settings)
+            settings_actually_changed = bool(changes)
             if settings_actually_changed:
-                self.settings = temp_current_settings # Appliquer les changements à self.settings
+                self.settings = {**self.settings, **changes} # Appliquer les changements à self.settings
+                self.settings_history.record(changes, SOURCE_API)
                 controller_logger.info(f"Configurations en mémoire après mise à jour: {self.settings}")
         
         if settings_actually_changed:
-            return self._save_settings() # Sauvegarder si des changements ont été appliqués
+            self.settings_history.flush_journal()
+            saved = self._save_settings() # Sauvegarder si des changements ont été appliqués
+            self._notify_settings_listeners()
+            return saved
         elif not new_settings_to_update:
              controller_logger.info("Aucun setting fourni pour la mise à jour.")
              return False 
@@ -287,6 +560,129 @@ class SerreController:
              controller_logger.info("Aucun changement effectif des settings après validation/comparaison.")
              return True # Considéré comme un succès car aucune erreur, même si rien n'a changé.
 
+    def _validated_changes(self, new_settings: dict, current_settings: dict) -> dict:
+        """
+        Valide `new_settings` (clés connues de DEFAULT_SETTINGS, conversion vers le type du défaut)
+        et retourne les valeurs converties qui diffèrent de `current_settings`.
+        """
+        changes = {}
+        for key, received_value in new_settings.items():
+            if key in config.DEFAULT_SETTINGS: # Clé valide car présente dans les défauts de référence
+                default_type = type(config.DEFAULT_SETTINGS[key])
+                value_before_update = current_settings.get(key) # Valeur actuelle avant modification
+                try:
+                    # Logique de conversion de type améliorée
+                    if default_type == bool:
+                        if isinstance(received_value, str):
+                            casted_value = received_value.lower() in ['true', 'on', '1', 'yes', 'vrai']
+                        else: # Booléen, ou 0/1
+                            casted_value = bool(received_value)
+                    elif default_type == int:
+                        casted_value = int(float(received_value)) # Permet "70.0" -> 70
+                    elif default_type == float:
+                        casted_value = float(received_value)
+                    else: # Pour str ou autres types (suppose que c'est déjà le bon type ou str)
+                        casted_value = default_type(received_value)
+
+                    # Vérifier si la valeur a réellement changé
+                    if value_before_update != casted_value:
+                        changes[key] = casted_value
+                        controller_logger.info(f"Setting '{key}' sera mis à jour de '{value_before_update}' à '{casted_value}'.")
+                    else:
+                        controller_logger.debug(f"Setting '{key}' inchangé (valeur: '{casted_value}').")
+                except (ValueError, TypeError) as e:
+                    controller_logger.warning(f"Valeur '{received_value}' pour clé '{key}' invalide ou type incorrect (attendu {default_type}): {e}. Setting non modifié.")
+            else:
+                controller_logger.warning(f"Clé de configuration inconnue '{key}' ignorée lors de la mise à jour.")
+        return changes
+
+    def reload_settings(self) -> dict:
+        """
+        Relit le fichier de settings après une modification externe (voir settings_watcher.py).
+        Seules les clés dont la valeur a changé dans le fichier depuis la dernière lecture ou
+        écriture sont revalidées (une clé retirée revient à son défaut); les changements sont
+        appliqués ensemble, puis écouteurs et actionneurs sont mis à jour.
+        Retourne les settings modifiés (vide si rien n'a changé ou si le fichier est invalide).
+        """
+        try:
+            with open(self.settings_file, 'r', encoding='utf-8') as f:
+                file_settings = json.load(f)
+        except FileNotFoundError:
+            controller_logger.warning(f"{self._zone_label}'{self.settings_file}' supprimé: configurations actuelles conservées.")
+            return {}
+        except (IOError, ValueError) as e:
+            controller_logger.error(f"{self._zone_label}'{self.settings_file}' illisible ({e}): configurations actuelles conservées.")
+            return {}
+        if not isinstance(file_settings, dict):
+            controller_logger.error(f"{self._zone_label}'{self.settings_file}' ne contient pas un objet JSON: ignoré.")
+            return {}
+
+        with self.settings_lock:
+            previous = self._settings_file_snapshot or {}
+            edited = {key: value for key, value in file_settings.items()
+                      if key not in previous or previous[key] != value}
+            removed = {key: config.DEFAULT_SETTINGS[key] for key in previous
+                       if key not in file_settings and key in config.DEFAULT_SETTINGS}
+            self._settings_file_snapshot = file_settings
+            changes = self._validated_changes({**removed, **edited}, self.settings)
+            if changes:
+                self.settings = {**self.settings, **changes}
+                self.settings_history.record(changes, SOURCE_FILE)
+        if not changes:
+            controller_logger.debug(f"{self._zone_label}'{self.settings_file}' relu: aucun changement.")
+            return {}
+
+        self.settings_history.flush_journal()
+        controller_logger.info(f"{self._zone_label}Settings rechargés depuis '{self.settings_file}': {changes}")
+        self._notify_settings_listeners()
+        if self._started:
+            for actuator in self._actuators():
+                self._force_actuator_update(actuator)
+            self._publish_status()
+        return changes
+
+    def _record_loaded_settings(self):
+        """Journalise les settings chargés au démarrage s'ils diffèrent de la dernière version (appelé sous settings_lock)."""
+        last_state = self.settings_history.current()
+        if last_state is None:
+            self.settings_history.record(dict(self.settings), SOURCE_INITIAL)
+            return
+        changes = {key: value for key, value in self.settings.items() if last_state.get(key) != value}
+        if changes: # Fichier modifié pendant l'arrêt du contrôleur
+            self.settings_history.record(changes, SOURCE_FILE)
+
+    def get_settings_version(self) -> int:
+        return self.settings_history.version
+
+    def get_versioned_settings(self) -> dict:
+        """Settings complets et leur version, lus ensemble (ETag de GET /api/settings)."""
+        with self.settings_lock:
+            return {"version": self.settings_history.version,
+                    "settings": {**config.DEFAULT_SETTINGS, **self.settings}}
+
+    def get_settings_history(self, since_version: int = 0, limit: int | None = None) -> list:
+        """Journal des changements de settings (versions > since_version)."""
+        return self.settings_history.entries(since_version, limit)
+
+    def get_settings_at(self, timestamp: float) -> dict | None:
+        """Version et settings complets en vigueur à `timestamp` (epoch s)."""
+        return self.settings_history.at(timestamp)
+
+    def get_settings_intervals(self, start: float, end: float) -> list:
+        """Intervalles de validité des versions de settings sur [start, end[ (epoch s)."""
+        return self.settings_history.intervals(start, end)
+
+    def add_settings_listener(self, callback):
+        """Enregistre `callback()`, appelé après chaque changement effectif des settings."""
+        self._settings_listeners.append(callback)
+
+    def _notify_settings_listeners(self):
+        for callback in list(self._settings_listeners):
+            try:
+                callback()
+            except Exception as e:
+                controller_logger.error(f"Erreur dans un écouteur de changement de settings ({callback}): {e}", exc_info=True)
+
     # --- FIN DES NOUVELLES MÉTHODES POUR LA GESTION DES CONFIGURATIONS ---
 
     # Les boucles _sensor_acquisition_loop et _controller_logic_loop
@@ -296,47 +692,151 @@ class SerreController:
     # Les contrôleurs d'actionneurs devront être adaptés pour utiliser self.get_setting().
 
     def _sensor_acquisition_loop(self):
-        intervalle_rapide = config.INTERVALLE_LECTURE_RAPIDE_CAPTEURS_SECONDES # Non dynamique pour l'instant
-        controller_logger.info(f"SensorAcquisitionThread: Boucle d'acquisition active (intervalle: {intervalle_rapide}s).")
+        if self.sampling_policy:
+            controller_logger.info(
+                f"SensorAcquisitionThread: Boucle d'acquisition active (intervalle adaptatif: "
+                f"{self.sampling_policy.min_interval}-{self.sampling_policy.max_interval}s).")
+        else:
+            controller_logger.info(f"SensorAcquisitionThread: Boucle d'acquisition active (intervalle: {config.INTERVALLE_LECTURE_RAPIDE_CAPTEURS_SECONDES}s).")
+        apply_thread_scheduling("SensorAcquisitionThread")
+        planned_start = time.time()
+        periode = config.INTERVALLE_LECTURE_RAPIDE_CAPTEURS_SECONDES # Période du cycle mesuré (fixée au cycle précédent)
         while self._running.is_set():
             loop_start_time = time.time()
-            try:
+            intervalle = self._acquire_sensors_once()
+            self.record_loop_timing(LOOP_ACQUISITION, planned_start, loop_start_time,
+                                    time.time() - loop_start_time, periode)
+            planned_start = loop_start_time + intervalle
+            periode = intervalle
+            self._interruptible_sleep(planned_start - time.time())
+        controller_logger.info("SensorAcquisitionThread: Boucle terminée.")
+
+    def _acquire_sensors_once(self) -> float:
+        """Une acquisition (lecture, filtrage, mise à jour du store). Retourne l'intervalle avant la suivante (s)."""
+        loop_start_time = time.time()
+        reading_valid = False
+        try:
+            with metrics.SENSOR_READ_SECONDS.time(self._metrics_zone):
                 temp, hum, co2_val = self.hardware.lire_capteur()
-                with self._sensor_data_lock:
-                    self._latest_sensor_data_store["timestamp"] = time.time() 
-                    if temp is not None and hum is not None and co2_val is not None:
-                        self._latest_sensor_data_store["temperature"] = temp
-                        self._latest_sensor_data_store["humidite"] = hum
-                        self._latest_sensor_data_store["co2"] = co2_val
-                        self._latest_sensor_data_store["is_valid"] = True
-                        if not self._first_valid_sensor_data_event.is_set():
-                            self._first_valid_sensor_data_event.set() 
-                            controller_logger.info("SensorAcquisitionThread: Première lecture valide des capteurs obtenue.")
-                        if self.last_sensor_read_error_logged:
-                            controller_logger.info("SensorAcquisitionThread: Lecture des capteurs réussie après une erreur précédente.")
-                            self.last_sensor_read_error_logged = False
-                        controller_logger.debug(f"SensorAcquisitionThread: Acquisition T={temp:.1f}, H={hum:.1f}, CO2={co2_val:.0f}")
-                    else:
-                        # Si une lecture est partielle, marquer comme non valide pour cette itération
-                        # mais conserver les anciennes valeurs valides dans le store pour get_status
-                        self._latest_sensor_data_store["is_valid"] = False 
-                        if not self.last_sensor_read_error_logged:
-                            controller_logger.warning(f"SensorAcquisitionThread: Données de capteur invalides/partielles: T={temp}, H={hum}, CO2={co2_val}")
-                            self.last_sensor_read_error_logged = True
-            except Exception as e: 
-                with self._sensor_data_lock: self._latest_sensor_data_store["is_valid"] = False
-                controller_logger.error(f"SensorAcquisitionThread: Erreur acquisition: {e}", exc_info=True)
-                self.last_sensor_read_error_logged = True
+            read_time = time.time()
+            reading_valid = temp is not None and hum is not None and co2_val is not None
+            if reading_valid:
+                raw_values = {"temperature": temp, "humidite": hum, "co2": co2_val}
+                filtered = self.sensor_filter.process(read_time, raw_values)
+                self.sensor_window.append(read_time, {
+                    **filtered, **{f"{channel}_brute": value for channel, value in raw_values.items()}})
+            with self._sensor_data_lock:
+                self._latest_sensor_data_store["timestamp"] = read_time 
+                if reading_valid:
+                    self._latest_sensor_data_store["temperature"] = filtered["temperature"]
+                    self._latest_sensor_data_store["humidite"] = filtered["humidite"]
+                    self._latest_sensor_data_store["co2"] = filtered["co2"]
+                    self._latest_sensor_data_store["temperature_brute"] = temp
+                    self._latest_sensor_data_store["humidite_brute"] = hum
+                    self._latest_sensor_data_store["co2_brute"] = co2_val
+                    self._latest_sensor_data_store["is_valid"] = True
+                    if not self._first_valid_sensor_data_event.is_set():
+                        self._first_valid_sensor_data_event.set() 
+                        controller_logger.info(f"{self._zone_label}SensorAcquisitionThread: Première lecture valide des capteurs obtenue.")
+                    if self.last_sensor_read_error_logged:
+                        controller_logger.info(f"{self._zone_label}SensorAcquisitionThread: Lecture des capteurs réussie après une erreur précédente.")
+                        self.last_sensor_read_error_logged = False
+                    controller_logger.debug(
+                        f"{self._zone_label}SensorAcquisitionThread: Acquisition T={temp:.1f}, H={hum:.1f}, CO2={co2_val:.0f} "
+                        f"(filtré: T={filtered['temperature']:.1f}, H={filtered['humidite']:.1f}, CO2={filtered['co2']:.0f})")
+                else:
+                    # Si une lecture est partielle, marquer comme non valide pour cette itération
+                    # mais conserver les anciennes valeurs valides dans le store pour get_status
+                    self._latest_sensor_data_store["is_valid"] = False 
+                    if not self.last_sensor_read_error_logged:
+                        controller_logger.warning(f"{self._zone_label}SensorAcquisitionThread: Données de capteur invalides/partielles: T={temp}, H={hum}, CO2={co2_val}")
+                        self.last_sensor_read_error_logged = True
+        except Exception as e: 
+            with self._sensor_data_lock: self._latest_sensor_data_store["is_valid"] = False
+            controller_logger.error(f"{self._zone_label}SensorAcquisitionThread: Erreur acquisition: {e}", exc_info=True)
+            self.last_sensor_read_error_logged = True
+        if not reading_valid:
+            metrics.SENSOR_READ_FAILURES.inc(self._metrics_zone)
 
-            elapsed_time = time.time() - loop_start_time
-            wait_time = intervalle_rapide - elapsed_time
-            if wait_time > 0:
-                chunk = 0.5; slept_duration = 0
-                while slept_duration < wait_time and self._running.is_set():
-                    time_to_sleep_this_chunk = min(chunk, wait_time - slept_duration)
-                    time.sleep(time_to_sleep_this_chunk)
-                    slept_duration += time_to_sleep_this_chunk
-        controller_logger.info("SensorAcquisitionThread: Boucle terminée.")
+        intervalle = config.INTERVALLE_LECTURE_RAPIDE_CAPTEURS_SECONDES
+        if self.sampling_policy:
+            try:
+                intervalle = self.sampling_policy.next_interval(
+                    read_time if reading_valid else loop_start_time, filtered if reading_valid else None)
+            except Exception as e:
+                controller_logger.error(f"{self._zone_label}SensorAcquisitionThread: Erreur de la politique d'échantillonnage: {e}", exc_info=True)
+        self._last_acquisition_seconds = time.time() - loop_start_time
+        self._publish_status()
+        return intervalle
+
+    def record_loop_timing(self, loop: str, planned_start: float, actual_start: float, duration: float, interval: float):
+        """Enregistre un cycle de la boucle `loop` (acquisition, logique) et ses métriques."""
+        missed = self.loop_timing[loop].record(planned_start, actual_start, duration, interval)
+        metrics.LOOP_START_LATENESS_SECONDS.observe(max(0.0, actual_start - planned_start), self._metrics_zone, loop)
+        if missed:
+            metrics.LOOP_DEADLINE_MISSES.inc(self._metrics_zone, loop)
+
+    def get_loop_timing(self, recent_cycles: int = 0) -> dict:
+        """
+        Gigue au démarrage et durée (percentiles, secondes) et échéances manquées de chaque boucle,
+        avec les `recent_cycles` derniers cycles (début prévu, début effectif, durée).
+        """
+        timing = {}
+        for loop, tracker in self.loop_timing.items():
+            timing[loop] = tracker.get_stats()
+            if recent_cycles:
+                timing[loop]["cycles_recents"] = tracker.recent(recent_cycles)
+        return timing
+
+    def _interruptible_sleep(self, seconds: float):
+        """Attend `seconds` par tranches de 0.5s, en s'interrompant dès l'arrêt du contrôleur."""
+        deadline = time.time() + seconds
+        while self._running.is_set():
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            time.sleep(min(0.5, remaining))
+
+    def _maintenance_loop(self):
+        """Exécute périodiquement la rétention des données (hors des boucles de contrôle)."""
+        intervalle = config.RETENTION_INTERVALLE_SECONDES
+        controller_logger.info(f"MaintenanceThread: Rétention planifiée toutes les {intervalle}s.")
+        self._interruptible_sleep(config.RETENTION_DELAI_INITIAL_SECONDES)
+        while self._running.is_set():
+            try:
+                self.retention_manager.run_once()
+            except Exception as e:
+                controller_logger.error(f"MaintenanceThread: Erreur lors de la rétention des données: {e}", exc_info=True)
+            self._interruptible_sleep(intervalle)
+        controller_logger.info("MaintenanceThread: Boucle terminée.")
+
+    def _reschedule_transitions(self):
+        """(Re)planifie la prochaine transition horaire de chaque actionneur."""
+        now = datetime.now()
+        for actuator in (self.led_ctrl, self.humidifier_ctrl, self.ventilation_ctrl):
+            self._schedule_next_transition(actuator, now)
+
+    def _schedule_next_transition(self, actuator, now: datetime):
+        with self._schedule_lock:
+            previous = self._schedule_timers.pop(actuator.device_name, None)
+            if previous:
+                self.timer_wheel.cancel(previous)
+            try:
+                when = actuator.next_schedule_transition(now)
+                if when:
+                    self._schedule_timers[actuator.device_name] = self.timer_wheel.schedule(
+                        when.timestamp(), lambda: self._on_schedule_transition(actuator))
+                    controller_logger.debug(f"Prochaine transition horaire de {actuator.device_name}: {when}.")
+            except Exception as e:
+                controller_logger.error(f"Planification de la transition horaire de {actuator.device_name} impossible: {e}")
+
+    def _on_schedule_transition(self, actuator):
+        """Rappel de la roue temporelle: réévalue l'actionneur à l'instant exact de la transition."""
+        if not self._running.is_set():
+            return
+        controller_logger.info(f"Transition horaire: réévaluation de {actuator.device_name}.")
+        self._force_actuator_update(actuator)
+        self._schedule_next_transition(actuator, datetime.now())
 
     def _get_current_sensor_values_for_actuators(self) -> dict:
         with self._sensor_data_lock:
@@ -350,6 +850,37 @@ class SerreController:
                 return {'temperature': None, 'humidite': None, 'co2': None}
 
 
+    def _threshold_control_active(self, now: datetime) -> bool:
+        """Vrai si l'humidificateur ou la ventilation est dans l'une de ses plages (mêmes plages compilées qu'eux)."""
+        return self.humidifier_ctrl.is_scheduled_active(now) or self.ventilation_ctrl.is_scheduled_active(now)
+
+    def _get_raw_sensor_values(self) -> dict:
+        """Valeurs brutes (avant filtrage) de la lecture utilisée par la logique; None si invalide."""
+        with self._sensor_data_lock:
+            store = self._latest_sensor_data_store
+            valid = store["is_valid"]
+            return {key: store[f"{key}_brute"] if valid else None for key in ('temperature', 'humidite', 'co2')}
+
+    def _should_record(self, now: float, values: dict, states: tuple) -> bool:
+        """
+        False si le cycle n'apporte rien par rapport à la dernière ligne enregistrée: valeurs
+        dans les bandes mortes, mêmes états d'actionneurs et écart sous ENREGISTREMENT_INTERVALLE_MAX_SECONDES.
+        """
+        last = self._last_recorded
+        if not config.ENREGISTREMENT_IGNORER_INCHANGES or last is None:
+            return True
+        last_time, last_values, last_states = last
+        if states != last_states or now - last_time >= config.ENREGISTREMENT_INTERVALLE_MAX_SECONDES:
+            return True
+        for key, band in config.ENREGISTREMENT_BANDES_MORTES.items():
+            value, last_value = values.get(key), last_values.get(key)
+            if value is None or last_value is None:
+                if value is not last_value:
+                    return True
+            elif abs(value - last_value) >= band:
+                return True
+        return False
+
     def _controller_logic_loop(self):
         intervalle_logique = config.INTERVALLE_LECTURE_CAPTEURS_SECONDES # Non dynamique pour l'instant
         controller_logger.info(f"SerreControllerLogicThread: Boucle de logique active (intervalle principal: {intervalle_logique}s).")
@@ -361,60 +892,83 @@ class SerreController:
         else:
             controller_logger.info("SerreControllerLogicThread: Première lecture valide des capteurs reçue. Démarrage de la logique principale.")
 
-        sensor_error_streak_for_logic = 0 
+        apply_thread_scheduling("SerreControllerLogicThread")
+        planned_start = time.time()
         while self._running.is_set():
             loop_start_time = time.time()
-            current_sensor_values_for_logic = self._get_current_sensor_values_for_actuators()
-
-            if all(v is not None for v in current_sensor_values_for_logic.values()):
-                sensor_error_streak_for_logic = 0
-                controller_logger.info(
-                    f"SerreControllerLogicThread: Données capteurs pour logique: T={current_sensor_values_for_logic['temperature']:.1f}°C, "
-                    f"H={current_sensor_values_for_logic['humidite']:.1f}%, "
-                    f"CO2={current_sensor_values_for_logic['co2']:.0f}ppm"
-                )
-            else:
-                sensor_error_streak_for_logic += 1
-                controller_logger.warning(f"SerreControllerLogicThread: Échec de récupération de données capteurs valides pour la logique (série: {sensor_error_streak_for_logic}).")
-                if sensor_error_streak_for_logic >= 5: 
-                     controller_logger.critical("SerreControllerLogicThread: Échec critique de récupération des données valides!")
-                     sensor_error_streak_for_logic = 0 
-
-            # Les contrôleurs d'actionneurs utiliseront self.get_setting() en interne via l'instance 'self' passée
-            self.led_ctrl.update_state(current_sensor_values_for_logic)
-            self.humidifier_ctrl.update_state(current_sensor_values_for_logic)
-            self.ventilation_ctrl.update_state(current_sensor_values_for_logic)
-            
-            status_leds = self.led_ctrl.get_status()
-            status_humid = self.humidifier_ctrl.get_status()
-            status_vent = self.ventilation_ctrl.get_status()
-            self.db_manager.add_sensor_data_to_buffer(
-                timestamp=datetime.now().replace(microsecond=0),
-                temperature=current_sensor_values_for_logic['temperature'], 
-                humidity=current_sensor_values_for_logic['humidite'],      
-                co2=current_sensor_values_for_logic['co2'],                
-                humidifier_active=status_humid["is_active"],
-                ventilation_active=status_vent["is_active"],
-                leds_active=status_leds["is_active"],
-                humidifier_on_duration=status_humid["on_duration_seconds"] if status_humid["is_active"] else None,
-                humidifier_off_duration=status_humid["off_duration_seconds"] if not status_humid["is_active"] else None,
-                ventilation_on_duration=status_vent["on_duration_seconds"] if status_vent["is_active"] else None,
-                ventilation_off_duration=status_vent["off_duration_seconds"] if not status_vent["is_active"] else None
-            )
+            self._run_logic_cycle()
 
             elapsed_time = time.time() - loop_start_time
+            self.record_loop_timing(LOOP_LOGIC, planned_start, loop_start_time, elapsed_time, intervalle_logique)
+            planned_start = loop_start_time + intervalle_logique
             wait_time = intervalle_logique - elapsed_time
+            metrics.LOGIC_LOOP_LOAD.observe(elapsed_time / intervalle_logique, self._metrics_zone)
             if wait_time > 0:
                 controller_logger.debug(f"SerreControllerLogicThread: Intervalle: {intervalle_logique}s. Boucle: {elapsed_time:.2f}s. Attente: {wait_time:.2f}s.")
-                chunk = 0.5; slept_duration = 0
-                while slept_duration < wait_time and self._running.is_set():
-                    time_to_sleep_this_chunk = min(chunk, wait_time - slept_duration)
-                    time.sleep(time_to_sleep_this_chunk)
-                    slept_duration += time_to_sleep_this_chunk
-            elif wait_time <= 0: # Correction: était elif wait_time <=0 :
+                self._interruptible_sleep(wait_time)
+            else:
+                metrics.LOGIC_LOOP_OVERRUNS.inc(self._metrics_zone)
                 controller_logger.warning(f"SerreControllerLogicThread: Boucle trop longue ({elapsed_time:.2f}s vs intervalle {intervalle_logique}s).")
         controller_logger.info("SerreControllerLogicThread: Boucle terminée.")
 
+    def _run_logic_cycle(self):
+        """Un cycle de logique: mise à jour des actionneurs avec les dernières valeurs, puis enregistrement."""
+        cycle_start_time = time.time()
+        current_sensor_values_for_logic = self._get_current_sensor_values_for_actuators()
+
+        if all(v is not None for v in current_sensor_values_for_logic.values()):
+            self._sensor_error_streak_for_logic = 0
+            controller_logger.info(
+                f"{self._zone_label}SerreControllerLogicThread: Données capteurs pour logique: T={current_sensor_values_for_logic['temperature']:.1f}°C, "
+                f"H={current_sensor_values_for_logic['humidite']:.1f}%, "
+                f"CO2={current_sensor_values_for_logic['co2']:.0f}ppm"
+            )
+        else:
+            self._sensor_error_streak_for_logic += 1
+            controller_logger.warning(f"{self._zone_label}SerreControllerLogicThread: Échec de récupération de données capteurs valides pour la logique (série: {self._sensor_error_streak_for_logic}).")
+            if self._sensor_error_streak_for_logic >= 5: 
+                 controller_logger.critical(f"{self._zone_label}SerreControllerLogicThread: Échec critique de récupération des données valides!")
+                 self._sensor_error_streak_for_logic = 0 
+
+        # Les contrôleurs d'actionneurs utiliseront self.get_setting() en interne via l'instance 'self' passée
+        self.led_ctrl.update_state(current_sensor_values_for_logic)
+        self.humidifier_ctrl.update_state(current_sensor_values_for_logic)
+        self.ventilation_ctrl.update_state(current_sensor_values_for_logic)
+        self.startup.mark_first_decision()
+        
+        status_leds = self.led_ctrl.get_status()
+        status_humid = self.humidifier_ctrl.get_status()
+        status_vent = self.ventilation_ctrl.get_status()
+        states = (status_humid["is_active"], status_vent["is_active"], status_leds["is_active"])
+        if self._should_record(cycle_start_time, current_sensor_values_for_logic, states):
+            self._buffer_sensor_record(current_sensor_values_for_logic, status_humid, status_vent, status_leds)
+            self._last_recorded = (cycle_start_time, dict(current_sensor_values_for_logic), states)
+        else:
+            self.skipped_records += 1
+            controller_logger.debug(f"{self._zone_label}SerreControllerLogicThread: Lecture inchangée, ligne non enregistrée.")
+        self._last_logic_seconds = time.time() - cycle_start_time
+        metrics.LOGIC_CYCLE_SECONDS.observe(self._last_logic_seconds, self._metrics_zone)
+        self._publish_status()
+
+    def _buffer_sensor_record(self, current_sensor_values_for_logic, status_humid, status_vent, status_leds):
+        raw_values = self._get_raw_sensor_values()
+        self.db_manager.add_sensor_data_to_buffer(
+            timestamp=datetime.now().replace(microsecond=0),
+            temperature=current_sensor_values_for_logic['temperature'], 
+            humidity=current_sensor_values_for_logic['humidite'],      
+            co2=current_sensor_values_for_logic['co2'],                
+            humidifier_active=status_humid["is_active"],
+            ventilation_active=status_vent["is_active"],
+            leds_active=status_leds["is_active"],
+            humidifier_on_duration=status_humid["on_duration_seconds"] if status_humid["is_active"] else None,
+            humidifier_off_duration=status_humid["off_duration_seconds"] if not status_humid["is_active"] else None,
+            ventilation_on_duration=status_vent["on_duration_seconds"] if status_vent["is_active"] else None,
+            ventilation_off_duration=status_vent["off_duration_seconds"] if not status_vent["is_active"] else None,
+            temperature_raw=raw_values['temperature'],
+            humidity_raw=raw_values['humidite'],
+            co2_raw=raw_values['co2']
+        )
+
     def get_status(self) -> dict:
         status_leds = self.led_ctrl.get_status()
         status_humid = self.humidifier_ctrl.get_status()
@@ -427,6 +981,11 @@ class SerreController:
             hum = self._latest_sensor_data_store["humidite"]
             co2_val = self._latest_sensor_data_store["co2"] 
             sensor_ok = self._latest_sensor_data_store["is_valid"]
+            raw_values = {
+                "temperature": self._latest_sensor_data_store["temperature_brute"],
+                "humidite": self._latest_sensor_data_store["humidite_brute"],
+                "co2": self._latest_sensor_data_store["co2_brute"],
+            }
 
             if sensor_ok:
                 temp_display = f"{temp:.1f}" if temp is not None else "N/A"
@@ -435,13 +994,88 @@ class SerreController:
         
         # Les settings ne sont plus retournés ici directement,
         # ils seront accessibles via une route API dédiée /api/settings
-        return {
+        status = {
             "timestamp": datetime.now().replace(microsecond=0).strftime('%Y-%m-%d %H:%M:%S'),
             "temperature": temp_display, "humidite": hum_display, "co2": co2_display,
             "sensor_read_ok": sensor_ok,
+            "capteurs_bruts": raw_values,
+            "filtres_capteurs": self.sensor_filter.get_status(),
             "leds": status_leds, "humidifier": status_humid, "ventilation": status_vent
         }
+        if getattr(self, 'sampling_policy', None):
+            status["echantillonnage"] = self.sampling_policy.get_metrics()
+        if getattr(self, 'replication_agent', None):
+            status["replication"] = self.replication_agent.get_status()
+        if getattr(self, 'retention_manager', None):
+            status["retention"] = self.retention_manager.last_run_summary
+        if getattr(self, 'loop_timing', None):
+            status["temporisation_boucles"] = self.get_loop_timing()
+        return status
     
+    def get_status_snapshot(self) -> dict:
+        """
+        Statut compact à champs fixes (valeurs numériques brutes, états et modes des actionneurs,
+        durées du dernier cycle): ce qui est publié en mémoire partagée.
+        """
+        with self._sensor_data_lock:
+            store = self._latest_sensor_data_store
+            snapshot = {
+                "zone_id": self.zone_id or config.GREENHOUSE_ID,
+                "sensor_timestamp": store["timestamp"] or None,
+                "temperature": store["temperature"], "humidite": store["humidite"], "co2": store["co2"],
+                "sensor_read_ok": store["is_valid"],
+            }
+        for name, actuator in (("leds", self.led_ctrl), ("humidifier", self.humidifier_ctrl),
+                               ("ventilation", self.ventilation_ctrl)):
+            actuator_status = actuator.get_status()
+            snapshot[f"{name}_active"] = actuator_status["is_active"]
+            snapshot[f"{name}_manual"] = actuator_status["manual_mode"]
+        snapshot["acquisition_seconds"] = self._last_acquisition_seconds
+        snapshot["logic_seconds"] = self._last_logic_seconds
+        return snapshot
+
+    def _publish_status(self):
+        if self.status_publisher is None:
+            return
+        try:
+            self.status_publisher.publish(self.get_status_snapshot())
+        except Exception as e:
+            controller_logger.error(f"{self._zone_label}Publication du statut en mémoire partagée en échec: {e}")
+
+    def get_recent_sensor_data(self, since: float | None = None, max_points: int | None = None) -> dict:
+        """Statistiques et échantillons récents servis depuis la mémoire (aucune requête DB)."""
+        return {
+            "window_hours": config.FENETRE_CAPTEURS_HEURES,
+            "stats": self.sensor_window.get_stats(),
+            "samples": self.sensor_window.get_samples(since=since, max_points=max_points),
+        }
+
+    def get_sensor_stats(self) -> dict:
+        """Statistiques de la fenêtre glissante seules (sans les échantillons)."""
+        return self.sensor_window.get_stats()
+
+    def command_actuator(self, device: str, action: str = 'toggle') -> dict:
+        """
+        Passe un actionneur ('leds', 'humidifier', 'ventilation') en mode manuel:
+        action 'toggle' inverse son état, 'on'/'off' le force. Retourne son statut mis à jour.
+        """
+        if device not in self._MANUAL_MODE_SETTERS:
+            raise ValueError(f"Actionneur inconnu '{device}'.")
+        if action not in ('toggle', 'on', 'off'):
+            raise ValueError(f"Action inconnue '{action}' (toggle, on ou off).")
+        attribute, set_manual_mode = self._MANUAL_MODE_SETTERS[device]
+        actuator = getattr(self, attribute)
+        new_state = not actuator.get_status()["is_active"] if action == 'toggle' else (action == 'on')
+        getattr(self, set_manual_mode)(True, new_state)
+        self._publish_status()
+        return actuator.get_status()
+
+    _MANUAL_MODE_SETTERS = {
+        "leds": ("led_ctrl", "set_leds_manual_mode"),
+        "humidifier": ("humidifier_ctrl", "set_humidifier_manual_mode"),
+        "ventilation": ("ventilation_ctrl", "set_ventilation_manual_mode"),
+    }
+
     def run(self):
         controller_logger.info("SerreController.run() appelé. Les threads internes gèrent les opérations.")
         try:
@@ -479,6 +1113,7 @@ class SerreController:
         self._force_actuator_update(self.humidifier_ctrl)
         self.ventilation_ctrl.set_manual_mode(False)
         self._force_actuator_update(self.ventilation_ctrl)
+        self._publish_status()
         controller_logger.info("Tous les actionneurs sont repassés en mode automatique et leur état a été mis à jour.")
 
     def emergency_stop_all_actuators(self):
@@ -486,19 +1121,40 @@ class SerreController:
         self.led_ctrl.set_manual_mode(True, False); self._force_actuator_update(self.led_ctrl)
         self.humidifier_ctrl.set_manual_mode(True, False); self._force_actuator_update(self.humidifier_ctrl)
         self.ventilation_ctrl.set_manual_mode(True, False); self._force_actuator_update(self.ventilation_ctrl)
+        self._publish_status()
         controller_logger.info("Tous les actionneurs ont été désactivés (arrêt d'urgence).")
 
-    def shutdown(self):
-        controller_logger.info("Arrêt de SerreController...")
+    def shutdown(self, keep_outputs: bool = False):
+        """
+        Arrête le contrôleur. `keep_outputs`: arrêt pour redémarrage à chaud, les relais restent
+        dans leur état et le point de reprise est conservé pour le processus suivant.
+        """
+        controller_logger.info(f"Arrêt de SerreController{' (redémarrage à chaud)' if keep_outputs else ''}...")
         if not self._running.is_set(): 
             controller_logger.info("SerreController.shutdown() appelé mais déjà en cours d'arrêt ou arrêté.")
             return 
         self._running.clear() 
+        if getattr(self, 'settings_watcher', None):
+            self.settings_watcher.stop()
+        if getattr(self, '_settings_writer', None):
+            self._settings_writer.flush() # Sauvegarde en attente écrite avant l'arrêt
+        if getattr(self, 'settings_history', None):
+            self.settings_history.flush_journal()
+        if getattr(self, 'timer_wheel', None):
+            if getattr(self, '_owns_timer_wheel', True):
+                self.timer_wheel.stop()
+            else: # Roue partagée entre zones: seules les échéances de cette zone sont annulées
+                with self._schedule_lock:
+                    for entry in self._schedule_timers.values():
+                        self.timer_wheel.cancel(entry)
+                    self._schedule_timers.clear()
         threads_to_join = []
         if hasattr(self, '_sensor_acquisition_thread') and self._sensor_acquisition_thread.is_alive():
             threads_to_join.append(self._sensor_acquisition_thread)
         if hasattr(self, '_controller_logic_thread') and self._controller_logic_thread.is_alive():
             threads_to_join.append(self._controller_logic_thread)
+        if hasattr(self, '_maintenance_thread') and self._maintenance_thread.is_alive():
+            threads_to_join.append(self._maintenance_thread)
 
         for thread in threads_to_join:
             join_timeout = max(config.INTERVALLE_LECTURE_RAPIDE_CAPTEURS_SECONDES, config.INTERVALLE_LECTURE_CAPTEURS_SECONDES) + 10 # Donner une marge
@@ -507,14 +1163,32 @@ class SerreController:
             if thread.is_alive():
                 controller_logger.warning(f"Le thread {thread.name} n'a pas pu être arrêté proprement dans le délai imparti.")
         
+        if getattr(self, 'replication_agent', None):
+            controller_logger.info("Arrêt de l'agent de réplication...")
+            self.replication_agent.stop()
+
         controller_logger.info("Vidage du buffer de la base de données avant l'arrêt...")
-        if hasattr(self, 'db_manager') and self.db_manager: 
+        if getattr(self, 'db_manager', None) and getattr(self, '_owns_db_manager', True): 
             self.db_manager.flush_buffer()
             self.db_manager.close_pool()
         
+        if getattr(self, 'local_store', None):
+            self.local_store.close()
+
+        for name in ('led_ctrl', 'humidifier_ctrl', 'ventilation_ctrl'):
+            if getattr(self, name, None):
+                getattr(self, name).cancel_pulse() # Aucune fin d'impulsion après le nettoyage du matériel
+                getattr(self, name).state_listener = None
+
+        keep_outputs = keep_outputs and getattr(self, 'checkpoint', None) is not None # Sans point de reprise: à froid
+        if keep_outputs:
+            self._save_checkpoint()
+
         if self.hardware:
             controller_logger.info("Nettoyage du matériel...")
-            self.hardware.cleanup()
+            self.hardware.cleanup(keep_outputs=keep_outputs)
+        if getattr(self, 'checkpoint', None) and not keep_outputs:
+            self.checkpoint.discard() # Relais à OFF: le prochain démarrage est un démarrage à froid
         
         controller_logger.info("SerreController arrêté.")
 
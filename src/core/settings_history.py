@@ -0,0 +1,239 @@
+# src/core/settings_history.py
+"""
+Versions successives des settings d'une serre (ou d'une zone) et journal des changements.
+
+Chaque changement effectif reçoit un numéro de version croissant et est ajouté à un journal
+JSON Lines (jamais réécrit) à côté du fichier de settings:
+    {"version": 4, "horodatage": 1718000000.5, "source": "api", "modifications": {"SEUIL_CO2_MAX": 900.0}}
+La version 1 contient les settings complets en vigueur au premier démarrage.
+
+En mémoire, l'horodatage et les settings complets des `max_versions` dernières versions sont
+conservés dans l'ordre: les settings en vigueur à un instant T s'obtiennent par recherche
+dichotomique, et les intervalles de validité d'une période permettent de joindre un historique
+de mesures aux seuils appliqués par un simple parcours fusionné. Les versions plus anciennes,
+sorties de la mémoire, sont relues du journal (rejoué depuis le début) à la demande.
+
+`record()` ne fait aucune écriture: la ligne du journal est ajoutée au fichier par
+`flush_journal()`, que l'appelant appelle après avoir relâché son propre verrou (settings_lock).
+"""
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+
+from src import config
+
+history_logger = logging.getLogger(__name__)
+
+SOURCE_INITIAL = "initial" # Premier démarrage (journal absent)
+SOURCE_API = "api" # update_settings (interface web, IPC)
+SOURCE_FILE = "fichier" # Modification externe du fichier de settings
+
+
+class SettingsVersionConflict(ValueError):
+    """Mise à jour conditionnelle (If-Match) refusée: les settings ont changé entre-temps."""
+    def __init__(self, expected_version, current_version):
+        super().__init__(f"Version des settings {expected_version} attendue, version actuelle {current_version}.")
+        self.expected_version = expected_version
+        self.current_version = current_version
+
+
+def journal_path(settings_file: str) -> str:
+    """data/user_settings.json -> data/user_settings_journal.jsonl"""
+    root, _ = os.path.splitext(settings_file)
+    return f"{root}_journal.jsonl"
+
+
+class SettingsHistory:
+    """`path` None: versions et historique conservés en mémoire seulement (depuis le démarrage)."""
+    def __init__(self, path: str | None, label: str = "", max_versions: int | None = None):
+        self.path = path
+        self.label = label
+        self.max_versions = max_versions or config.SETTINGS_VERSIONS_MEMOIRE_MAX
+        self._times = [] # Horodatage de chaque version, croissant
+        self._versions = []
+        self._sources = []
+        self._states = [] # Settings complets en vigueur à partir de chaque version
+        self._changes = []
+        self._dropped = False # Des versions anciennes ne sont plus qu'au journal
+        self._lock = threading.Lock()
+        self._pending_lines = [] # Lignes du journal pas encore ajoutées au fichier
+        self._journal_lock = threading.Lock() # Ajouts au fichier dans l'ordre des versions
+        self._load()
+
+    @property
+    def version(self) -> int:
+        """Dernière version (0: aucune)."""
+        with self._lock:
+            return self._versions[-1] if self._versions else 0
+
+    def current(self) -> dict | None:
+        with self._lock:
+            return dict(self._states[-1]) if self._states else None
+
+    def _read_journal(self):
+        """Versions valides du journal dans l'ordre, avec leurs settings complets (entrées de _entry)."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            history_logger.error(f"{self.label}Journal des settings '{self.path}' illisible: {e}")
+            return
+        state, last_version, last_time = {}, 0, None
+        for number, line in enumerate(lines, start=1):
+            try:
+                entry = json.loads(line)
+                version, changes = int(entry["version"]), dict(entry["modifications"])
+                timestamp = float(entry["horodatage"])
+            except (ValueError, KeyError, TypeError) as e:
+                # Dernière ligne tronquée (arrêt brutal pendant l'ajout) ou ligne corrompue
+                history_logger.warning(f"{self.label}Journal des settings: ligne {number} ignorée ({e}).")
+                continue
+            if version <= last_version:
+                history_logger.warning(f"{self.label}Journal des settings: version {version} hors séquence, ignorée.")
+                continue
+            if last_time is not None and timestamp < last_time:
+                timestamp = last_time # Horloge reculée (NTP): l'ordre des versions prime
+            state = {**state, **changes}
+            last_version, last_time = version, timestamp
+            yield {"version": version, "horodatage": timestamp, "source": entry.get("source", ""),
+                   "modifications": changes, "settings": state}
+
+    def _load(self):
+        if self.path is None:
+            return
+        for entry in self._read_journal():
+            self._append(entry["version"], entry["horodatage"], entry["source"], entry["modifications"], entry["settings"])
+        if self._versions:
+            history_logger.info(f"{self.label}Journal des settings chargé: version courante {self._versions[-1]} "
+                                f"({len(self._versions)} en mémoire).")
+
+    def _older_versions(self, before_version: int):
+        """Versions < `before_version` (sorties de la mémoire), relues du journal."""
+        self.flush_journal()
+        for entry in self._read_journal():
+            if entry["version"] >= before_version:
+                return
+            yield entry
+
+    def _append(self, version: int, timestamp: float, source: str, changes: dict, state: dict):
+        if self._times and timestamp < self._times[-1]:
+            timestamp = self._times[-1] # Horloge reculée (NTP): l'ordre des versions prime
+        self._versions.append(version)
+        self._times.append(timestamp)
+        self._sources.append(source)
+        self._changes.append(changes)
+        self._states.append(state)
+        if len(self._versions) > self.max_versions:
+            for values in (self._versions, self._times, self._sources, self._changes, self._states):
+                del values[0]
+            self._dropped = True
+
+    def record(self, changes: dict, source: str, timestamp: float | None = None) -> int:
+        """
+        Ajoute une version (settings modifiés -> nouvelles valeurs) et retourne son numéro.
+        La ligne du journal est mise en attente: voir flush_journal().
+        """
+        with self._lock:
+            version = (self._versions[-1] if self._versions else 0) + 1
+            timestamp = time.time() if timestamp is None else timestamp
+            state = {**(self._states[-1] if self._states else {}), **changes}
+            self._append(version, timestamp, source, dict(changes), state)
+            if self.path is not None:
+                self._pending_lines.append(json.dumps(
+                    {"version": version, "horodatage": timestamp, "source": source, "modifications": changes},
+                    separators=(',', ':'), ensure_ascii=False))
+            return version
+
+    def flush_journal(self):
+        """Ajoute au journal les lignes en attente (à appeler hors de settings_lock)."""
+        with self._journal_lock:
+            with self._lock:
+                lines, self._pending_lines = self._pending_lines, []
+            if not lines:
+                return
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                # Ajout court: le cache du système suffit, sans attendre la carte SD (fsync)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write("\n".join(lines) + "\n")
+            except OSError as e:
+                history_logger.error(f"{self.label}{len(lines)} version(s) des settings non journalisée(s): {e}")
+
+    def _entry(self, index: int, with_settings: bool) -> dict:
+        entry = {"version": self._versions[index], "horodatage": self._times[index],
+                 "source": self._sources[index], "modifications": self._changes[index]}
+        if with_settings:
+            entry["settings"] = dict(self._states[index])
+        return entry
+
+    def _journal_fallback(self) -> bool:
+        """Vrai si des versions antérieures à la mémoire sont à relire du journal (appelé sous `_lock`)."""
+        return self._dropped and self.path is not None
+
+    def at(self, timestamp: float) -> dict | None:
+        """Version en vigueur à `timestamp` (avec ses settings complets), None si antérieur à la première."""
+        with self._lock:
+            index = bisect.bisect_right(self._times, timestamp) - 1
+            if index >= 0 or not self._journal_fallback():
+                return self._entry(index, with_settings=True) if index >= 0 else None
+            oldest = self._versions[0]
+        found = None
+        for entry in self._older_versions(oldest):
+            if entry["horodatage"] > timestamp:
+                break
+            found = entry
+        return found
+
+    def entries(self, since_version: int = 0, limit: int | None = None) -> list:
+        """Entrées du journal de version > `since_version`, des plus anciennes aux plus récentes."""
+        older = []
+        with self._lock:
+            oldest = self._versions[0] if self._versions else None
+            read_journal = self._journal_fallback() and since_version + 1 < oldest
+        if read_journal:
+            for entry in self._older_versions(oldest):
+                if limit is not None and len(older) >= limit:
+                    break
+                if entry["version"] > since_version:
+                    older.append({key: value for key, value in entry.items() if key != "settings"})
+        with self._lock:
+            start = bisect.bisect_right(self._versions, since_version)
+            end = len(self._versions) if limit is None else min(len(self._versions), start + limit - len(older))
+            return older + [self._entry(index, with_settings=False) for index in range(start, end)]
+
+    def intervals(self, start: float, end: float) -> list:
+        """
+        Intervalles de validité couvrant [start, end[: {"debut", "fin", "version", "settings"},
+        "fin" None pour la version courante. Jointure avec des mesures triées par horodatage:
+        un seul parcours des deux listes.
+        """
+        with self._lock:
+            first = max(0, bisect.bisect_right(self._times, start) - 1)
+            last = bisect.bisect_left(self._times, end)
+            versions = [(self._times[index], self._versions[index], dict(self._states[index]))
+                        for index in range(first, last)]
+            following = self._times[last] if last < len(self._times) else None # Début de la version suivante
+            read_journal = self._journal_fallback() and start < self._times[0]
+            oldest, oldest_time = (self._versions[0], self._times[0]) if self._times else (None, None)
+        if read_journal:
+            older = []
+            for entry in self._older_versions(oldest):
+                if entry["horodatage"] >= end:
+                    break
+                if entry["horodatage"] <= start:
+                    older = [] # Seule la dernière version antérieure à `start` est utile
+                older.append((entry["horodatage"], entry["version"], entry["settings"]))
+            if older and not versions:
+                following = oldest_time
+            versions = older + versions
+        return [{"debut": debut,
+                 "fin": versions[position + 1][0] if position + 1 < len(versions) else following,
+                 "version": version, "settings": settings}
+                for position, (debut, version, settings) in enumerate(versions)]
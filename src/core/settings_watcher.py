@@ -0,0 +1,177 @@
+# src/core/settings_watcher.py
+"""
+Surveillance des fichiers de settings (data/user_settings.json, un fichier par zone): une
+modification externe (éditeur, scp, outil de déploiement) est signalée au contrôleur de la
+zone concernée sans redémarrage.
+
+inotify (Linux, via la libc) surveille le répertoire de chaque fichier, ce qui couvre aussi les
+éditeurs qui écrivent un fichier temporaire puis le renomment. Sans inotify (autre système,
+limite de surveillances atteinte), l'horodatage, la taille et l'inode des fichiers sont
+scrutés périodiquement. Les événements rapprochés sont regroupés (délai de stabilisation)
+pour ne pas relire un fichier en cours d'écriture.
+"""
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+import time
+
+watcher_logger = logging.getLogger(__name__)
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII") # wd, mask, cookie, longueur du nom
+
+
+def _load_libc():
+    if not hasattr(select, 'poll') or not os.path.isdir('/proc'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch # Absents hors Linux
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+def _file_signature(path: str):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class SettingsFileWatcher:
+    """
+    Appelle le rappel d'un fichier (depuis son thread) après chaque modification de ce fichier.
+    Un seul thread et une seule instance inotify pour tous les fichiers surveillés (un par
+    zone): `path`/`on_change` pour le premier, `add()` pour les suivants, avant `start()`.
+    `poll_interval`: période de scrutation sans inotify; `settle_seconds`: délai sans nouvel
+    événement avant l'appel. `use_inotify=False` force la scrutation.
+    """
+    def __init__(self, path: str | None = None, on_change=None, poll_interval: float = 2.0,
+                 settle_seconds: float = 0.05, use_inotify: bool = True, label: str = ""):
+        self.callbacks = {} # chemin absolu -> rappel
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.use_inotify = use_inotify
+        self.label = label
+        self.mode = None # "inotify" ou "scrutation", une fois démarré
+        self._stop = threading.Event()
+        self._wake_pipe = None # Réveille le thread inotify à l'arrêt
+        self._thread = None
+        if path is not None:
+            self.add(path, on_change)
+
+    def add(self, path: str, on_change):
+        if self._thread is not None:
+            raise RuntimeError("Fichier ajouté après le démarrage de la surveillance.")
+        self.callbacks[os.path.abspath(path)] = on_change
+
+    def start(self):
+        fd, directories = self._open_inotify() if self.use_inotify else (None, None)
+        self.mode = "inotify" if fd is not None else "scrutation"
+        # Signatures relevées avant le retour: une modification qui suit start() n'est pas manquée
+        if fd is not None:
+            self._wake_pipe = os.pipe()
+            target, args = self._run_inotify, (fd, directories)
+        else:
+            target, args = self._run_polling, ({path: _file_signature(path) for path in self.callbacks},)
+        self._thread = threading.Thread(target=target, args=args, name="SettingsWatcherThread", daemon=True)
+        self._thread.start()
+        watcher_logger.info(f"{self.label}Surveillance de {', '.join(repr(p) for p in self.callbacks)} ({self.mode}).")
+
+    def stop(self, timeout: float = 2.0):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self._wake_pipe:
+            os.write(self._wake_pipe[1], b"\0")
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _open_inotify(self):
+        """Descripteur inotify et {wd: répertoire}, ou (None, None) (scrutation)."""
+        libc = _load_libc()
+        if libc is None:
+            return None, None
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            watcher_logger.warning(f"{self.label}inotify indisponible ({os.strerror(ctypes.get_errno())}): scrutation.")
+            return None, None
+        directories = {}
+        for directory in sorted({os.path.dirname(path) for path in self.callbacks}):
+            wd = libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                watcher_logger.warning(f"{self.label}Surveillance inotify de '{directory}' impossible "
+                                       f"({os.strerror(ctypes.get_errno())}): scrutation.")
+                os.close(fd)
+                return None, None
+            directories[wd] = directory
+        return fd, directories
+
+    def _read_events(self, fd, directories: dict) -> set:
+        """Vide les événements en attente; retourne les fichiers surveillés concernés."""
+        changed = set()
+        while True:
+            try:
+                data = os.read(fd, 4096)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset + EVENT_HEADER.size <= len(data):
+                wd, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+                start = offset + EVENT_HEADER.size
+                name = os.fsdecode(data[start:start + length].rstrip(b"\0"))
+                path = os.path.join(directories.get(wd, ""), name)
+                if name and path in self.callbacks:
+                    changed.add(path)
+                offset = start + length
+
+    def _run_inotify(self, fd, directories: dict):
+        try:
+            while not self._stop.is_set():
+                ready, _, _ = select.select([fd, self._wake_pipe[0]], [], [])
+                if fd not in ready:
+                    continue
+                changed = self._read_events(fd, directories)
+                if not changed:
+                    continue
+                # Écriture en plusieurs fois, ou fichier temporaire puis renommage: attendre le calme
+                while select.select([fd], [], [], self.settle_seconds)[0]:
+                    changed |= self._read_events(fd, directories)
+                for path in sorted(changed):
+                    self._notify(path)
+        finally:
+            wake_pipe, self._wake_pipe = self._wake_pipe, None
+            for descriptor in (fd, *wake_pipe):
+                os.close(descriptor)
+
+    def _run_polling(self, signatures: dict):
+        while not self._stop.wait(self.poll_interval):
+            changed = [path for path, signature in signatures.items() if _file_signature(path) != signature]
+            if not changed:
+                continue
+            time.sleep(self.settle_seconds)
+            for path in changed:
+                signatures[path] = _file_signature(path)
+                self._notify(path)
+
+    def _notify(self, path: str):
+        if self._stop.is_set():
+            return
+        try:
+            self.callbacks[path]()
+        except Exception as e:
+            watcher_logger.error(f"{self.label}Erreur lors du rechargement de '{path}': {e}", exc_info=True)
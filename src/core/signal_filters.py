@@ -0,0 +1,180 @@
+# src/core/signal_filters.py
+import bisect
+import logging
+from collections import deque
+
+filters_logger = logging.getLogger(__name__)
+
+# Facteur de cohérence entre le MAD et l'écart-type pour une distribution normale.
+_MAD_SCALE = 1.4826
+
+
+class _SortedWindow:
+    """Fenêtre des N dernières valeurs, maintenue triée (coût borné par N, constant pour N fixe)."""
+    __slots__ = ("size", "_fifo", "_sorted")
+
+    def __init__(self, size: int):
+        self.size = size
+        self._fifo = deque()
+        self._sorted = []
+
+    def push(self, value: float):
+        if len(self._fifo) == self.size:
+            oldest = self._fifo.popleft()
+            del self._sorted[bisect.bisect_left(self._sorted, oldest)]
+        self._fifo.append(value)
+        bisect.insort(self._sorted, value)
+
+    def median(self) -> float:
+        n = len(self._sorted)
+        middle = n // 2
+        return self._sorted[middle] if n % 2 else (self._sorted[middle - 1] + self._sorted[middle]) / 2.0
+
+    def values(self):
+        return self._sorted
+
+    def __len__(self):
+        return len(self._fifo)
+
+    def clear(self):
+        self._fifo.clear()
+        self._sorted.clear()
+
+
+class MedianFilter:
+    """Médiane des N dernières valeurs: élimine les pointes isolées."""
+    def __init__(self, window: int = 3):
+        self._window = _SortedWindow(int(window))
+
+    def update(self, value: float, timestamp: float) -> float:
+        self._window.push(value)
+        return self._window.median()
+
+    def reset(self):
+        self._window.clear()
+
+
+class EmaFilter:
+    """Moyenne mobile exponentielle: y = y + alpha * (x - y)."""
+    def __init__(self, alpha: float = 0.3):
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError(f"alpha doit être dans ]0, 1], reçu {alpha}")
+        self.alpha = float(alpha)
+        self._state = None
+
+    def update(self, value: float, timestamp: float) -> float:
+        self._state = value if self._state is None else self._state + self.alpha * (value - self._state)
+        return self._state
+
+    def reset(self):
+        self._state = None
+
+
+class HampelFilter:
+    """
+    Rejet des valeurs aberrantes (filtre de Hampel): si |x - médiane| > n_sigmas * 1.4826 * MAD
+    sur la fenêtre, la valeur est remplacée par la médiane. La valeur brute entre tout de même
+    dans la fenêtre, pour qu'un vrai changement de niveau soit accepté après quelques lectures.
+    """
+    def __init__(self, window: int = 7, n_sigmas: float = 3.0, min_deviation: float = 0.0):
+        self._window = _SortedWindow(int(window))
+        self.n_sigmas = float(n_sigmas)
+        self.min_deviation = float(min_deviation) # Tolérance absolue (évite MAD=0 sur un signal plat)
+        self.rejected_count = 0
+
+    def update(self, value: float, timestamp: float) -> float:
+        self._window.push(value)
+        if len(self._window) < 3:
+            return value
+        median = self._window.median()
+        deviations = sorted(abs(v - median) for v in self._window.values())
+        n = len(deviations)
+        mad = deviations[n // 2] if n % 2 else (deviations[n // 2 - 1] + deviations[n // 2]) / 2.0
+        threshold = max(self.n_sigmas * _MAD_SCALE * mad, self.min_deviation)
+        if abs(value - median) > threshold:
+            self.rejected_count += 1
+            return median
+        return value
+
+    def reset(self):
+        self._window.clear()
+
+
+class RateLimitFilter:
+    """Limite la variation de la sortie à `max_per_second` unités par seconde."""
+    def __init__(self, max_per_second: float):
+        self.max_per_second = float(max_per_second)
+        self._last_value = None
+        self._last_timestamp = None
+
+    def update(self, value: float, timestamp: float) -> float:
+        if self._last_value is not None:
+            max_step = self.max_per_second * max(0.0, timestamp - self._last_timestamp)
+            value = min(max(value, self._last_value - max_step), self._last_value + max_step)
+        self._last_value = value
+        self._last_timestamp = timestamp
+        return value
+
+    def reset(self):
+        self._last_value = None
+        self._last_timestamp = None
+
+
+FILTER_TYPES = {
+    "median": MedianFilter,
+    "ema": EmaFilter,
+    "hampel": HampelFilter,
+    "rate_limit": RateLimitFilter,
+}
+
+
+def build_filter(spec: dict):
+    """Construit un filtre depuis une spécification: {"type": "median", "window": 5}."""
+    params = dict(spec)
+    filter_type = params.pop("type", None)
+    if filter_type not in FILTER_TYPES:
+        raise ValueError(f"Type de filtre inconnu '{filter_type}' (attendu: {', '.join(FILTER_TYPES)})")
+    return FILTER_TYPES[filter_type](**params)
+
+
+class SensorFilterPipeline:
+    """
+    Chaîne de filtres par canal (ex: "humidite": Hampel -> médiane -> EMA), appliquée
+    entre la lecture du capteur et le store utilisé par les actionneurs.
+    Les canaux sans filtre sont transmis tels quels.
+    """
+    def __init__(self, filters_by_channel: dict):
+        self._chains = {channel: list(chain) for channel, chain in filters_by_channel.items()}
+
+    @classmethod
+    def from_config(cls, spec_by_channel: dict):
+        chains = {}
+        for channel, specs in (spec_by_channel or {}).items():
+            try:
+                chains[channel] = [build_filter(spec) for spec in specs]
+            except (TypeError, ValueError) as e:
+                filters_logger.error(f"Configuration de filtre invalide pour '{channel}': {e}. Canal non filtré.")
+        return cls(chains)
+
+    def process(self, timestamp: float, values: dict) -> dict:
+        """Retourne les valeurs filtrées pour un échantillon complet."""
+        filtered = {}
+        for channel, value in values.items():
+            for stage in self._chains.get(channel, ()):
+                value = stage.update(value, timestamp)
+            filtered[channel] = value
+        return filtered
+
+    def reset(self):
+        for chain in self._chains.values():
+            for stage in chain:
+                stage.reset()
+
+    def get_status(self) -> dict:
+        return {
+            channel: [
+                {"type": type(stage).__name__, **({"rejected": stage.rejected_count} if isinstance(stage, HampelFilter) else {})}
+                for stage in chain
+            ]
+            for channel, chain in self._chains.items()
+        }
@@ -0,0 +1,138 @@
+# src/core/startup.py
+"""
+Initialisation par étapes indépendantes (matériel, settings, base de données) exécutées en
+parallèle, chacune avec son délai maximal, et état de démarrage exposé par l'API.
+
+Chaque étape tourne dans un thread démon: une étape bloquée (bus I2C figé, serveur de base
+injoignable) ne retient ni le démarrage des autres ni l'arrêt du processus.
+"""
+import logging
+import threading
+import time
+
+startup_logger = logging.getLogger(__name__)
+
+STAGE_PENDING = "en_cours"
+STAGE_READY = "pret"
+STAGE_FAILED = "echec"
+STAGE_TIMED_OUT = "delai_depasse"
+
+PHASE_INITIALIZING = "initialisation" # Ni matériel ni settings encore prêts: aucune décision possible
+PHASE_CONTROL = "controle" # Boucles de contrôle actives, étapes de fond (base) encore en cours
+PHASE_OPERATIONAL = "operationnel" # Toutes les étapes terminées
+PHASE_DEGRADED = "degrade" # Contrôle actif, mais une étape a échoué ou dépassé son délai
+
+
+class StageTimeoutError(TimeoutError):
+    """Une étape attendue n'a pas abouti dans son délai."""
+
+
+class _Stage:
+    def __init__(self, name: str, timeout: float):
+        self.name = name
+        self.timeout = timeout
+        self.started_at = time.monotonic()
+        self.duration = None
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class StartupStages:
+    """
+    Lance des étapes d'initialisation en parallèle et suit leur état. `wait(nom)` attend une
+    étape au plus jusqu'à l'échéance de son délai; les étapes qu'on n'attend pas (base de
+    données) signalent leur fin par `on_done`.
+    """
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.started_at = time.monotonic()
+        self.control_started_at = None
+        self.first_decision_at = None
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def launch(self, name: str, func, timeout: float, on_done=None):
+        stage = _Stage(name, timeout)
+        with self._lock:
+            self._stages[name] = stage
+        threading.Thread(target=self._run, args=(stage, func, on_done), name=f"Init-{name}", daemon=True).start()
+
+    def _run(self, stage: _Stage, func, on_done):
+        try:
+            stage.result = func()
+        except Exception as e:
+            stage.error = e
+            startup_logger.error(f"{self.label}Démarrage: étape '{stage.name}' en échec: {e}", exc_info=True)
+        stage.duration = time.monotonic() - stage.started_at
+        stage.done.set()
+        if stage.error is None:
+            late = " (après son délai)" if stage.duration > stage.timeout else ""
+            startup_logger.info(f"{self.label}Démarrage: étape '{stage.name}' terminée en {stage.duration:.2f}s{late}.")
+            if on_done is not None:
+                try:
+                    on_done(stage.result)
+                except Exception as e:
+                    startup_logger.error(f"{self.label}Démarrage: suite de l'étape '{stage.name}' en échec: {e}", exc_info=True)
+
+    def wait(self, name: str):
+        """Résultat de l'étape; lève StageTimeoutError à l'échéance, ou l'erreur de l'étape."""
+        stage = self._stages[name]
+        remaining = stage.timeout - (time.monotonic() - stage.started_at)
+        if not stage.done.wait(timeout=max(0.0, remaining)):
+            raise StageTimeoutError(f"Étape '{name}' non terminée après {stage.timeout:.1f}s.")
+        if stage.error is not None:
+            raise stage.error
+        return stage.result
+
+    def finished_late(self, name: str) -> bool:
+        stage = self._stages[name]
+        return stage.duration is not None and stage.duration > stage.timeout
+
+    def mark_control_started(self):
+        self.control_started_at = time.monotonic()
+        startup_logger.info(f"{self.label}Démarrage: contrôle actif {self.control_started_at - self.started_at:.2f}s après le début de l'initialisation.")
+
+    def mark_first_decision(self):
+        if self.first_decision_at is None:
+            self.first_decision_at = time.monotonic()
+            startup_logger.info(f"{self.label}Démarrage: première décision de contrôle {self.first_decision_at - self.started_at:.2f}s après le début de l'initialisation.")
+
+    def _stage_state(self, stage: _Stage, now: float) -> str:
+        if not stage.done.is_set():
+            return STAGE_TIMED_OUT if now - stage.started_at > stage.timeout else STAGE_PENDING
+        return STAGE_FAILED if stage.error is not None else STAGE_READY
+
+    def get_status(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            stages = list(self._stages.values())
+        states = {stage.name: self._stage_state(stage, now) for stage in stages}
+        if self.control_started_at is None:
+            phase = PHASE_INITIALIZING
+        elif any(state in (STAGE_FAILED, STAGE_TIMED_OUT) for state in states.values()):
+            phase = PHASE_DEGRADED
+        elif all(state == STAGE_READY for state in states.values()):
+            phase = PHASE_OPERATIONAL
+        else:
+            phase = PHASE_CONTROL
+
+        def since_start(instant):
+            return None if instant is None else round(instant - self.started_at, 3)
+
+        return {
+            "phase": phase,
+            "pret": self.control_started_at is not None,
+            "depuis_demarrage_secondes": round(now - self.started_at, 3),
+            "controle_actif_secondes": since_start(self.control_started_at),
+            "premiere_decision_secondes": since_start(self.first_decision_at),
+            "etapes": {
+                stage.name: {
+                    "etat": states[stage.name],
+                    "duree_secondes": None if stage.duration is None else round(stage.duration, 3),
+                    "delai_secondes": stage.timeout,
+                    "erreur": None if stage.error is None else str(stage.error),
+                }
+                for stage in stages
+            },
+        }
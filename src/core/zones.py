@@ -0,0 +1,236 @@
+# src/core/zones.py
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from src import config
+from src.utils import metrics
+
+from .checkpoint import ActuatorCheckpoint, checkpoint_path, relay_states
+from .loop_timing import LOOP_ACQUISITION, LOOP_LOGIC, apply_thread_scheduling
+from .scheduling import TimerWheel
+from .serre_logic import SerreController, MockDatabaseManager, load_hardware
+from .settings_watcher import SettingsFileWatcher
+
+zones_logger = logging.getLogger(__name__)
+
+TASK_ACQUISITION = LOOP_ACQUISITION
+TASK_LOGIC = LOOP_LOGIC
+
+
+def controller_zones(target) -> dict:
+    """Zones d'un contrôleur: celles d'un MultiZoneController, ou l'unique serre (config.GREENHOUSE_ID)."""
+    zones = getattr(target, 'zones', None)
+    return zones if zones is not None else {config.GREENHOUSE_ID: target}
+
+
+def zone_summary(zone_id: str, zone: SerreController) -> dict:
+    """Vue compacte d'une zone (capteurs et états des actionneurs) pour les listes de zones."""
+    status = zone.get_status()
+    return {
+        "zone_id": zone_id,
+        "sensor_read_ok": status["sensor_read_ok"],
+        "temperature": status["temperature"], "humidite": status["humidite"], "co2": status["co2"],
+        "actionneurs": {name: status[name]["is_active"] for name in ("leds", "humidifier", "ventilation")},
+    }
+
+
+class MultiZoneController:
+    """
+    Plusieurs zones (salles de culture) dans un seul processus. Chaque zone est un
+    SerreController sans threads propres (autostart=False): ses acquisitions et ses cycles
+    de logique sont planifiés sur une roue temporelle commune et exécutés par un pool de
+    threads partagé. Une tâche n'est replanifiée qu'à la fin de son exécution: une zone
+    n'a jamais deux acquisitions (ou deux cycles de logique) simultanées.
+    """
+    def __init__(self, zones_spec: dict, max_workers: int | None = None, zone_factory=None, autostart: bool = True):
+        if not zones_spec:
+            raise ValueError("Aucune zone définie (config.ZONES est vide).")
+        self.timer_wheel = TimerWheel()
+        self.max_workers = max_workers or config.ZONES_THREADS
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ZoneWorker",
+                                           initializer=apply_thread_scheduling, initargs=("ZoneWorker",))
+        self._running = threading.Event(); self._running.set()
+        self._timers = {} # (zone_id, tâche) -> entrée de la roue temporelle
+        self._timers_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self.tasks_run = 0
+        self.task_errors = 0
+        self.max_lag_seconds = 0.0 # Retard maximal d'une tâche sur son échéance (pool saturé)
+        self.settings_watcher = None # Un seul thread de surveillance pour les settings de toutes les zones
+
+        history_zone = next((zone_id for zone_id, spec in zones_spec.items() if (spec or {}).get("historique")),
+                            next(iter(zones_spec)))
+        zone_factory = zone_factory or self._create_zone
+        # Zones initialisées en parallèle sur le pool (matériel, settings): le démarrage ne dure
+        # pas la somme des initialisations. L'ordre de config.ZONES est conservé.
+        futures = {zone_id: self.executor.submit(zone_factory, zone_id, spec or {}, zone_id == history_zone, self.timer_wheel)
+                   for zone_id, spec in zones_spec.items()}
+        self.zones = {}
+        try:
+            for zone_id, future in futures.items():
+                self.zones[zone_id] = future.result()
+        except Exception:
+            # Toutes les zones construites (y compris celles terminées après l'échec) rendent
+            # leur matériel, sinon une nouvelle tentative trouverait les GPIO/I2C occupés
+            wait(futures.values())
+            for zone_id, future in futures.items():
+                if future.cancelled() or future.exception() is not None:
+                    continue
+                try:
+                    future.result().shutdown()
+                except Exception as e:
+                    zones_logger.error(f"MultiZoneController: Arrêt de la zone '{zone_id}' en échec: {e}", exc_info=True)
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        zones_logger.info(f"MultiZoneController: {len(self.zones)} zone(s) ({', '.join(self.zones)}), "
+                          f"pool de {self.max_workers} threads, historique en base: '{history_zone}'.")
+        if autostart:
+            self.start()
+
+    @classmethod
+    def from_config(cls):
+        return cls(config.ZONES, config.ZONES_THREADS)
+
+    @staticmethod
+    def _create_zone(zone_id: str, spec: dict, with_history: bool, timer_wheel: TimerWheel) -> SerreController:
+        settings_file = spec.get("fichier_settings") or os.path.join(
+            config.PROJECT_ROOT_DIR, 'data', f'user_settings_{zone_id}.json')
+        # Reprise à chaud: le matériel est créé dans l'état enregistré, que la zone reprend ensuite
+        checkpoint_file = checkpoint_path(zone_id) if config.REPRISE_A_CHAUD else None
+        restored = ActuatorCheckpoint(checkpoint_file).load() if checkpoint_file else None
+        return SerreController(
+            zone_id=zone_id,
+            hardware=load_hardware(spec.get("materiel"), initial_states=relay_states(restored)),
+            checkpoint_file=checkpoint_file,
+            db_manager=None if with_history else MockDatabaseManager(), # None: la zone ouvre la base
+            settings_file=settings_file,
+            timer_wheel=timer_wheel,
+            autostart=False)
+
+    @property
+    def default_zone(self) -> SerreController:
+        """Première zone: cible des routes historiques sans identifiant de zone."""
+        return next(iter(self.zones.values()))
+
+    def get_zone(self, zone_id: str) -> SerreController | None:
+        return self.zones.get(zone_id)
+
+    # --- Ordonnancement ---
+
+    def start(self):
+        self.timer_wheel.start()
+        now = time.time()
+        acquisition_interval = config.INTERVALLE_LECTURE_RAPIDE_CAPTEURS_SECONDES
+        for index, zone in enumerate(self.zones.values()):
+            zone.start(run_loops=False, watch_settings=False)
+            # Étalement des zones sur un intervalle d'acquisition (pas de rafale de lectures I2C)
+            offset = index * acquisition_interval / len(self.zones)
+            self._schedule(zone, TASK_ACQUISITION, now + offset, acquisition_interval)
+            # Premier cycle de logique après la première acquisition de la zone
+            self._schedule(zone, TASK_LOGIC, now + offset + acquisition_interval, config.INTERVALLE_LECTURE_CAPTEURS_SECONDES)
+        if config.SETTINGS_SURVEILLANCE:
+            self.settings_watcher = SettingsFileWatcher(
+                poll_interval=config.SETTINGS_SURVEILLANCE_INTERVALLE_SECONDES,
+                settle_seconds=config.SETTINGS_SURVEILLANCE_STABILISATION_SECONDES, label="MultiZoneController: ")
+            for zone in self.zones.values():
+                self.settings_watcher.add(zone.settings_file, zone.reload_settings)
+            self.settings_watcher.start()
+
+    def _schedule(self, zone: SerreController, task: str, when: float, period: float):
+        """`period`: intervalle en vigueur pour cette exécution (son échéance est `when + period`)."""
+        with self._timers_lock:
+            if not self._running.is_set():
+                return
+            self._timers[(zone.zone_id, task)] = self.timer_wheel.schedule(
+                when, lambda: self._submit(zone, task, when, period))
+
+    def _submit(self, zone: SerreController, task: str, due: float, period: float):
+        """Rappel de la roue temporelle: l'exécution part dans le pool pour ne pas bloquer la roue."""
+        try:
+            self.executor.submit(self._run_task, zone, task, due, period)
+        except RuntimeError: # Pool déjà arrêté
+            pass
+
+    def _run_task(self, zone: SerreController, task: str, due: float, period: float | None = None):
+        if not self._running.is_set():
+            return
+        start = time.time()
+        interval = (config.INTERVALLE_LECTURE_RAPIDE_CAPTEURS_SECONDES if task == TASK_ACQUISITION
+                    else config.INTERVALLE_LECTURE_CAPTEURS_SECONDES)
+        period = period or interval
+        failed = False
+        try:
+            if task == TASK_ACQUISITION:
+                interval = zone._acquire_sensors_once()
+            else:
+                zone._run_logic_cycle()
+        except Exception as e:
+            failed = True
+            zones_logger.error(f"MultiZoneController: Erreur de la tâche '{task}' de la zone '{zone.zone_id}': {e}", exc_info=True)
+        duration = time.time() - start
+        metrics.SCHEDULER_LAG_SECONDS.observe(max(0.0, start - due), task)
+        zone.record_loop_timing(task, due, start, duration, period)
+        if task == TASK_LOGIC:
+            load = duration / config.INTERVALLE_LECTURE_CAPTEURS_SECONDES
+            metrics.LOGIC_LOOP_LOAD.observe(load, zone.zone_id)
+            if load >= 1:
+                metrics.LOGIC_LOOP_OVERRUNS.inc(zone.zone_id)
+        with self._metrics_lock:
+            self.tasks_run += 1
+            self.task_errors += failed
+            self.max_lag_seconds = max(self.max_lag_seconds, start - due)
+        self._schedule(zone, task, start + interval, interval)
+
+    def get_scheduler_status(self) -> dict:
+        with self._metrics_lock:
+            return {
+                "zones": len(self.zones),
+                "threads": self.max_workers,
+                "tasks_run": self.tasks_run,
+                "task_errors": self.task_errors,
+                "max_lag_seconds": round(self.max_lag_seconds, 3),
+            }
+
+    # --- Opérations sur l'ensemble des zones ---
+
+    def get_zones_summary(self) -> list[dict]:
+        return [zone_summary(zone_id, zone) for zone_id, zone in self.zones.items()]
+
+    def emergency_stop_all_actuators(self):
+        for zone in self.zones.values():
+            try:
+                zone.emergency_stop_all_actuators()
+            except Exception as e:
+                zones_logger.error(f"MultiZoneController: Arrêt d'urgence de la zone '{zone.zone_id}' en échec: {e}", exc_info=True)
+
+    def run(self):
+        zones_logger.info("MultiZoneController.run() appelé. La roue temporelle et le pool gèrent les opérations.")
+        try:
+            while self._running.is_set():
+                time.sleep(1)
+        except KeyboardInterrupt:
+            zones_logger.info("KeyboardInterrupt reçu dans MultiZoneController.run(). Demande d'arrêt via shutdown().")
+            self.shutdown()
+
+    def shutdown(self, keep_outputs: bool = False):
+        zones_logger.info("Arrêt de MultiZoneController...")
+        if not self._running.is_set():
+            return
+        with self._timers_lock:
+            self._running.clear()
+            for entry in self._timers.values():
+                self.timer_wheel.cancel(entry)
+            self._timers.clear()
+        self.timer_wheel.stop()
+        if self.settings_watcher:
+            self.settings_watcher.stop()
+        self.executor.shutdown(wait=True, cancel_futures=True) # Laisse finir les tâches en cours
+        for zone in self.zones.values():
+            try:
+                zone.shutdown(keep_outputs=keep_outputs)
+            except Exception as e:
+                zones_logger.error(f"MultiZoneController: Arrêt de la zone '{zone.zone_id}' en échec: {e}", exc_info=True)
+        zones_logger.info("MultiZoneController arrêté.")
@@ -9,7 +9,11 @@ class BaseHardware(ABC):
     """
 
     def __init__(self):
-        """Initialise l'interface matérielle."""
+        """
+        Initialise l'interface matérielle. Les implémentations acceptent `initial_states`
+        (nom d'actionneur -> état, reprise à chaud): les sorties sont réclamées dans cet état
+        plutôt qu'à OFF.
+        """
         pass
 
     @abstractmethod
@@ -55,9 +59,10 @@ class BaseHardware(ABC):
         pass
 
     @abstractmethod
-    def cleanup(self):
+    def cleanup(self, keep_outputs: bool = False):
         """
         Nettoie et libère les ressources matérielles utilisées (ex: broches GPIO).
-        Appelée lors de l'arrêt de l'application.
+        Appelée lors de l'arrêt de l'application. `keep_outputs`: les sorties ne sont pas
+        mises à OFF (arrêt pour redémarrage à chaud, le processus suivant les reprend).
         """
         pass
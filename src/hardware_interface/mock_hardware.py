@@ -10,11 +10,12 @@ class MockHardware(BaseHardware):
     Utilisée pour les tests et le développement sur des machines
     qui n'ont pas le matériel réel (ex: Windows, macOS).
     """
-    def __init__(self):
+    def __init__(self, initial_states: dict | None = None):
         super().__init__()
-        self._leds_on = False
-        self._humidifier_on = False
-        self._ventilation_on = False
+        initial_states = initial_states or {}
+        self._leds_on = initial_states.get("leds", False)
+        self._humidifier_on = initial_states.get("humidifier", False)
+        self._ventilation_on = initial_states.get("ventilation", False)
         
         # Simuler des valeurs de capteurs initiales
         self._temperature = random.uniform(18, 22)
@@ -80,7 +81,7 @@ class MockHardware(BaseHardware):
             self._ventilation_on = False
             logging.info("MOCK: Ventilation désactivée.")
 
-    def cleanup(self):
+    def cleanup(self, keep_outputs: bool = False):
         logging.info("MOCK: Nettoyage des ressources matérielles simulées effectué.")
         # Rien de spécifique à faire pour le mock, mais la méthode doit exister.
         pass
@@ -1,33 +1,37 @@
 # src/hardware_interface/raspberry_pi.py
 from .base_hardware import BaseHardware
+import importlib.util
 import time
 import logging
 from src import config # Importer le module config depuis src
+from src.utils import metrics
+
+# Bibliothèques spécifiques au Raspberry Pi: leur présence est vérifiée sans les importer
+# (Blinka/board est long à charger); l'import réel est fait à la construction du matériel.
+_RPI_MODULES = ("lgpio", "board", "busio", "adafruit_scd30")
+RASPBERRY_PI_LIBS_AVAILABLE = all(importlib.util.find_spec(name) is not None for name in _RPI_MODULES)
+if not RASPBERRY_PI_LIBS_AVAILABLE:
+    # Utiliser print pour s'assurer que le message est visible même avant la config du logging.
+    print(f"AVERTISSEMENT (raspberry_pi.py): Bibliothèques Raspberry Pi non trouvées ({', '.join(_RPI_MODULES)}). RaspberryPiHardware ne fonctionnera pas correctement.")
+
+lgpio = board = busio = adafruit_scd30 = None # Renseignés par _import_libraries()
+
+
+def _import_libraries():
+    global lgpio, board, busio, adafruit_scd30
+    if lgpio is None:
+        import lgpio as _lgpio
+        import board as _board # Pour Adafruit CircuitPython
+        import busio as _busio # Pour I2C
+        import adafruit_scd30 as _adafruit_scd30
+        lgpio, board, busio, adafruit_scd30 = _lgpio, _board, _busio, _adafruit_scd30
 
-# Essayer d'importer les bibliothèques spécifiques au Raspberry Pi
-try:
-    import lgpio
-    import board # Pour Adafruit CircuitPython
-    import busio # Pour I2C
-    import adafruit_scd30
-    RASPBERRY_PI_LIBS_AVAILABLE = True
-except ImportError as e:
-    # Ce logger ne sera pas configuré par main.py si l'import échoue avant la config du logging
-    # Utiliser print pour s'assurer que le message est visible en cas d'échec précoce.
-    print(f"AVERTISSEMENT (raspberry_pi.py): Bibliothèques Raspberry Pi non trouvées ({e}). RaspberryPiHardware ne fonctionnera pas correctement.")
-    RASPBERRY_PI_LIBS_AVAILABLE = False
-    # Définir des stubs pour que le reste du fichier ne plante pas à l'import si les libs sont manquantes
-    # et pour permettre l'exécution en mode mock sans ces bibliothèques.
-    class lgpio: pass
-    class board: pass
-    class busio: pass
-    class adafruit_scd30: pass
 
 # Les définitions de broches GPIO en dur sont maintenant SUPPRIMÉES d'ici.
 # Elles sont récupérées depuis src/config.py
 
 class RaspberryPiHardware(BaseHardware):
-    def __init__(self):
+    def __init__(self, initial_states: dict | None = None):
         super().__init__()
         self.logger = logging.getLogger(__name__) # ex: src.hardware_interface.raspberry_pi
 
@@ -37,48 +41,47 @@ class RaspberryPiHardware(BaseHardware):
             self.scd = None # Instance du capteur SCD30
             return
 
+        self.h = None
+        self.scd = None
+        self._scd_ready_at = 0.0 # Échéance de stabilisation du SCD30 (time.monotonic())
         try:
+            _import_libraries()
             # Initialisation du GPIO via lgpio
             self.h = lgpio.gpiochip_open(0)
             self.logger.info("GPIO chip (lgpio) ouvert.")
 
+            # Les sorties sont réclamées avant le capteur: les relais ne restent pas dans un état
+            # indéterminé pendant l'initialisation I2C. Elles sont mises à OFF, sauf reprise à chaud
+            # (initial_states): chaque sortie est alors réclamée directement à son niveau enregistré,
+            # sans passage par OFF.
+            # Note: la valeur 0 pour lgpio.gpio_write signifie ON (typiquement pour un relais actif bas)
+            # et 1 signifie OFF. Ajustez si votre logique de relais est inversée.
+            initial_states = initial_states or {}
+            for device, pins in (("leds", (config.PIN_LEDS,)),
+                                 ("humidifier", (config.PIN_FAN_HUMIDIFICATEUR, config.PIN_BRUMISATEUR)),
+                                 ("ventilation", (config.VENTILATION_OUTPUT_PIN,))):
+                level = 0 if initial_states.get(device) else 1
+                for pin in pins:
+                    lgpio.gpio_claim_output(self.h, pin, level)
+            if any(initial_states.values()):
+                self.logger.info(f"Broches GPIO réclamées en sortie, états repris: {initial_states}.")
+            else:
+                self.logger.info("Broches GPIO réclamées en sortie et initialisées à OFF (logique 1).")
+
             # Initialisation du bus I2C et du capteur SCD30
             self.i2c = busio.I2C(board.SCL, board.SDA) # Utilise les pins SCL/SDA par défaut de board
             self.logger.info("Bus I2C initialisé.")
-            
-            self.scd = adafruit_scd30.SCD30(self.i2c)
-            self.logger.info("Capteur SCD30 contacté. Attente pour stabilisation...")
-            time.sleep(2) # Délai pour la stabilisation initiale du SCD30
 
-            try:
-                if self.scd.data_available:
-                    self.logger.info(f"SCD30 prêt. Température initiale lue: {self.scd.temperature:.1f}°C")
-                else:
-                    self.logger.info("SCD30: Données non disponibles immédiatement après initialisation.")
-            except Exception as e_init_read:
-                self.logger.warning(f"SCD30: Problème lors de la lecture de vérification initiale: {e_init_read}")
+            self.scd = adafruit_scd30.SCD30(self.i2c)
+            # Pas d'attente ici: la première lecture attendra l'échéance si elle arrive avant
+            self._scd_ready_at = time.monotonic() + config.SCD30_STABILISATION_SECONDES
+            self.logger.info(f"Capteur SCD30 contacté (stabilisation: {config.SCD30_STABILISATION_SECONDES:.1f}s).")
 
-            # Réclamer les broches GPIO en sortie en utilisant les valeurs de config
-            # Note: la valeur 0 pour lgpio.gpio_write signifie ON (typiquement pour un relais actif bas)
-            # et 1 signifie OFF. Ajustez si votre logique de relais est inversée.
-            lgpio.gpio_claim_output(self.h, config.PIN_LEDS)
-            lgpio.gpio_claim_output(self.h, config.VENTILATION_OUTPUT_PIN)
-            lgpio.gpio_claim_output(self.h, config.PIN_FAN_HUMIDIFICATEUR)
-            lgpio.gpio_claim_output(self.h, config.PIN_BRUMISATEUR)
-            self.logger.info("Broches GPIO réclamées en sortie selon la configuration.")
-
-            # Initialiser toutes les sorties à OFF (état logique 1 pour lgpio si relais actif bas)
-            lgpio.gpio_write(self.h, config.PIN_LEDS, 1)
-            lgpio.gpio_write(self.h, config.VENTILATION_OUTPUT_PIN, 1)
-            lgpio.gpio_write(self.h, config.PIN_FAN_HUMIDIFICATEUR, 1)
-            lgpio.gpio_write(self.h, config.PIN_BRUMISATEUR, 1)
-            self.logger.info("Toutes les sorties GPIO initialisées à OFF (logique 1).")
-            
             self.logger.info("RaspberryPiHardware initialisé avec succès.")
 
         except Exception as e:
             self.logger.error(f"Erreur majeure lors de l'initialisation de RaspberryPiHardware: {e}", exc_info=True)
-            if hasattr(self, 'h') and self.h is not None: # Tenter de fermer le chip GPIO si ouvert
+            if self.h is not None: # Tenter de fermer le chip GPIO si ouvert
                 lgpio.gpiochip_close(self.h)
             self.h = None 
             self.scd = None
@@ -90,8 +93,15 @@ class RaspberryPiHardware(BaseHardware):
             self.logger.error("SCD30 ou GPIO non initialisé. Impossible de lire les capteurs.")
             return None, None, None
 
+        attente_stabilisation = self._scd_ready_at - time.monotonic()
+        if attente_stabilisation > 0:
+            self.logger.debug(f"SCD30: Attente de stabilisation ({attente_stabilisation:.1f}s) avant la première lecture.")
+            time.sleep(attente_stabilisation)
+
         max_essais = 3
         for essai in range(1, max_essais + 1):
+            if essai > 1:
+                metrics.SENSOR_READ_RETRIES.inc()
             try:
                 if not self.scd.data_available:
                     self.logger.debug(f"SCD30: Données non disponibles (essai {essai}/{max_essais}). Attente de 2s...")
@@ -164,13 +174,17 @@ class RaspberryPiHardware(BaseHardware):
     def desactiver_ventilation(self):
         self._control_gpio(config.VENTILATION_OUTPUT_PIN, False, "Ventilation")
 
-    def cleanup(self):
+    def cleanup(self, keep_outputs: bool = False):
         if self.h:
             self.logger.info("Nettoyage des ressources RaspberryPiHardware...")
-            # Assurer que tous les actuateurs sont désactivés
-            self.desactiver_leds()
-            self.desactiver_humidificateur()
-            self.desactiver_ventilation()
+            if keep_outputs:
+                # Redémarrage à chaud: une sortie libérée garde son niveau jusqu'à la reprise
+                self.logger.info("Sorties GPIO laissées dans leur état (redémarrage à chaud).")
+            else:
+                # Assurer que tous les actuateurs sont désactivés
+                self.desactiver_leds()
+                self.desactiver_humidificateur()
+                self.desactiver_ventilation()
             
             # Libérer les broches (non strictement nécessaire avec gpiochip_close pour les sorties, mais bonne pratique)
             # lgpio.gpio_free(self.h, config.PIN_LEDS)
@@ -0,0 +1,172 @@
+# src/ipc/client.py
+import itertools
+import logging
+import socket
+import threading
+
+from src import config
+
+from src.core.settings_history import SettingsVersionConflict
+
+from .protocol import recv_message, send_message, ProtocolError, ERROR_BAD_REQUEST, ERROR_CONFLICT, READ_ONLY_OPS
+
+ipc_logger = logging.getLogger(__name__)
+
+
+class ControllerUnavailableError(ConnectionError):
+    """Le démon du contrôleur ne répond pas (arrêté, socket absent, délai dépassé)."""
+
+
+class ControllerError(Exception):
+    """
+    Erreur renvoyée par le démon; `kind` reprend les catégories de src/ipc/protocol.py,
+    `response` est la réponse complète (champs propres à certaines erreurs).
+    """
+    def __init__(self, kind: str, message: str, response: dict | None = None):
+        super().__init__(message)
+        self.kind = kind
+        self.response = response or {}
+
+
+class ControllerClient:
+    """
+    Client du démon (ControllerServer). Une connexion persistante par client, protégée par
+    un verrou: une requête à la fois. En cas de coupure (redémarrage du démon), la requête
+    est rejouée une fois sur une nouvelle connexion si elle n'a pas été entièrement envoyée,
+    ou si c'est une lecture (READ_ONLY_OPS). Une commande envoyée dont la réponse n'arrive
+    pas n'est pas rejouée: le démon a pu l'exécuter.
+    """
+    def __init__(self, socket_path: str | None = None, timeout: float | None = None):
+        self.socket_path = socket_path or config.IPC_SOCKET_PATH
+        self.timeout = timeout if timeout is not None else config.IPC_TIMEOUT_SECONDS
+        self._sock = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._request_sent = False # La trame de la requête en cours a été entièrement écrite
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self._sock = sock
+
+    def _disconnect(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def _exchange(self, request: dict) -> dict:
+        self._request_sent = False
+        if self._sock is None:
+            self._connect()
+        send_message(self._sock, request)
+        self._request_sent = True
+        response = recv_message(self._sock)
+        if response is None:
+            raise ProtocolError("Connexion fermée par le démon.")
+        return response
+
+    def call(self, op: str, zone: str | None = None, **args):
+        request = {"id": next(self._ids), "op": op}
+        if zone is not None:
+            request["zone"] = zone
+        if args:
+            request["args"] = args
+        with self._lock:
+            try:
+                response = self._exchange(request)
+            except (OSError, ProtocolError) as first_error:
+                self._disconnect()
+                if self._request_sent and op not in READ_ONLY_OPS:
+                    ipc_logger.error(f"ControllerClient: Pas de réponse du démon pour '{op}' après envoi: {first_error}")
+                    raise ControllerUnavailableError(
+                        f"Pas de réponse du démon pour '{op}' (exécution non confirmée): {first_error}") from first_error
+                # Connexion périmée (démon redémarré) ou lecture: une seule nouvelle tentative
+                try:
+                    response = self._exchange(request)
+                except (OSError, ProtocolError) as e:
+                    self._disconnect()
+                    ipc_logger.error(f"ControllerClient: Démon injoignable sur '{self.socket_path}': {e} (1re erreur: {first_error})")
+                    raise ControllerUnavailableError(f"Démon du contrôleur injoignable: {e}") from e
+        if not response.get("ok"):
+            raise ControllerError(response.get("kind", ""), response.get("error", "Erreur inconnue"), response)
+        return response.get("result")
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
+
+class RemoteController:
+    """
+    Vue d'une zone du démon avec l'interface de SerreController utilisée par l'API web.
+    zone_id None: zone par défaut du démon.
+    """
+    def __init__(self, client: ControllerClient, zone_id: str | None = None):
+        self.client = client
+        self.zone_id = zone_id
+
+    def _call(self, op: str, **args):
+        return self.client.call(op, zone=self.zone_id, **args)
+
+    def get_status(self) -> dict:
+        return self._call("status")
+
+    def get_all_settings(self) -> dict:
+        return self._call("settings")
+
+    def update_settings(self, new_settings: dict, expected_version: int | None = None) -> bool:
+        try:
+            return self._call("update_settings", settings=new_settings, expected_version=expected_version)
+        except ControllerError as e:
+            if e.kind == ERROR_CONFLICT: # Même erreur qu'en local
+                raise SettingsVersionConflict(expected_version, e.response.get("current_version")) from None
+            raise
+
+    def get_versioned_settings(self) -> dict:
+        return self._call("settings_versioned")
+
+    def get_settings_version(self) -> int:
+        return self.get_versioned_settings()["version"]
+
+    def get_settings_history(self, since_version: int = 0, limit: int | None = None) -> list:
+        return self._call("settings_history", since_version=since_version, limit=limit)
+
+    def get_settings_at(self, timestamp: float) -> dict | None:
+        return self._call("settings_at", timestamp=timestamp)
+
+    def get_settings_intervals(self, start: float, end: float) -> list:
+        return self._call("settings_intervals", start=start, end=end)
+
+    def get_recent_sensor_data(self, since: float | None = None, max_points: int | None = None) -> dict:
+        return self._call("recent_sensors", since=since, max_points=max_points)
+
+    def get_sensor_stats(self) -> dict:
+        return self._call("sensor_stats")
+
+    def get_startup_status(self) -> dict:
+        return self._call("startup")
+
+    def get_loop_timing(self, recent_cycles: int = 0) -> dict:
+        return self._call("loop_timing", recent_cycles=recent_cycles)
+
+    def command_actuator(self, device: str, action: str = 'toggle') -> dict:
+        try:
+            return self._call("command", device=device, action=action)
+        except ControllerError as e:
+            if e.kind == ERROR_BAD_REQUEST:
+                raise ValueError(str(e)) from None # Même erreur qu'en local (actionneur inconnu)
+            raise
+
+    def set_all_auto_mode(self):
+        self._call("auto_mode")
+
+    def emergency_stop_all_actuators(self):
+        self._call("emergency_stop")
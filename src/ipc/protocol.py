@@ -0,0 +1,76 @@
+# src/ipc/protocol.py
+"""
+Protocole entre le démon du contrôleur et ses clients (API web, outils locaux), sur socket Unix.
+
+Chaque message est une trame: longueur (4 octets, big-endian) suivie du JSON compact (UTF-8).
+    requête: {"id": 7, "op": "status", "zone": "salle-a", "args": {...}}   # "zone" et "args" optionnels
+    réponse: {"id": 7, "ok": true, "result": ...}
+             {"id": 7, "ok": false, "error": "message", "kind": "zone_inconnue"}
+Une connexion transporte un nombre quelconque de requêtes, traitées dans l'ordre.
+"""
+import json
+import struct
+
+HEADER = struct.Struct(">I")
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+# Catégories d'erreurs renvoyées dans "kind"
+ERROR_ZONE_UNKNOWN = "zone_inconnue"
+ERROR_BAD_REQUEST = "requete_invalide"
+ERROR_INTERNAL = "erreur_interne"
+ERROR_CONFLICT = "conflit_de_version" # Mise à jour conditionnelle des settings refusée
+
+# Opérations sans effet sur le démon: une requête envoyée dont la réponse est perdue peut être rejouée
+READ_ONLY_OPS = frozenset({
+    "ping", "zone_ids", "zones", "status", "settings", "settings_versioned", "settings_history",
+    "settings_at", "settings_intervals", "recent_sensors", "sensor_stats", "startup", "loop_timing",
+    "metrics",
+})
+
+
+class ProtocolError(Exception):
+    """Trame invalide ou connexion fermée au milieu d'une trame."""
+
+
+def encode_frame(message: dict) -> bytes:
+    payload = json.dumps(message, separators=(',', ':'), ensure_ascii=False, default=str).encode('utf-8')
+    if len(payload) > MAX_FRAME_BYTES:
+        raise ProtocolError(f"Message trop volumineux ({len(payload)} octets, max {MAX_FRAME_BYTES}).")
+    return HEADER.pack(len(payload)) + payload
+
+
+def send_message(sock, message: dict):
+    sock.sendall(encode_frame(message))
+
+
+def _recv_exactly(sock, size: int) -> bytes | None:
+    chunks, remaining = [], size
+    while remaining:
+        chunk = sock.recv(min(remaining, 65536))
+        if not chunk:
+            if remaining == size and not chunks:
+                return None # Fermeture propre entre deux trames
+            raise ProtocolError("Connexion fermée au milieu d'une trame.")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_message(sock) -> dict | None:
+    """Lit une trame complète. Retourne None si le pair a fermé la connexion entre deux trames."""
+    header = _recv_exactly(sock, HEADER.size)
+    if header is None:
+        return None
+    (length,) = HEADER.unpack(header)
+    if length > MAX_FRAME_BYTES:
+        raise ProtocolError(f"Trame annoncée trop volumineuse ({length} octets).")
+    payload = _recv_exactly(sock, length) if length else b""
+    if payload is None:
+        raise ProtocolError("Connexion fermée avant le contenu de la trame.")
+    try:
+        message = json.loads(payload.decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ProtocolError(f"Contenu de trame invalide: {e}") from None
+    if not isinstance(message, dict):
+        raise ProtocolError("Une trame doit contenir un objet JSON.")
+    return message
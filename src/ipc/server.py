@@ -0,0 +1,164 @@
+# src/ipc/server.py
+import logging
+import os
+import socketserver
+import threading
+
+from src import config
+from src.core.settings_history import SettingsVersionConflict
+from src.core.zones import controller_zones, zone_summary
+from src.utils import metrics, profiling
+
+from .protocol import (recv_message, send_message, ProtocolError,
+                       ERROR_ZONE_UNKNOWN, ERROR_BAD_REQUEST, ERROR_INTERNAL, ERROR_CONFLICT)
+
+ipc_logger = logging.getLogger(__name__)
+
+
+class ZoneNotFoundError(LookupError):
+    pass
+
+
+class _ControllerRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server = self.server
+        while True:
+            try:
+                request = recv_message(self.request)
+            except (ProtocolError, OSError) as e:
+                ipc_logger.warning(f"ControllerServer: Connexion client abandonnée: {e}")
+                return
+            if request is None:
+                return
+            response = server.controller_server.dispatch(request)
+            try:
+                send_message(self.request, response)
+            except OSError:
+                return
+
+
+class _ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ControllerServer:
+    """
+    Expose un SerreController (ou un MultiZoneController) sur un socket Unix: statut,
+    settings et commandes, au protocole de src/ipc/protocol.py. Un thread par connexion
+    cliente; les connexions sont persistantes (un worker de l'API en garde une ouverte).
+    """
+    def __init__(self, target, socket_path: str | None = None):
+        self.target = target
+        self.socket_path = socket_path or config.IPC_SOCKET_PATH
+        self._server = None
+        self._thread = None
+        # op -> fonction(zone_id, args); zone_id None = zone par défaut
+        self._ops = {
+            "ping": self._op_ping,
+            "zone_ids": lambda zone_id, args: list(self._zones()),
+            "zones": self._op_zones,
+            "status": lambda zone_id, args: self._zone(zone_id).get_status(),
+            "settings": lambda zone_id, args: self._zone(zone_id).get_all_settings(),
+            "update_settings": lambda zone_id, args: self._zone(zone_id).update_settings(
+                args["settings"], expected_version=args.get("expected_version")),
+            "settings_versioned": lambda zone_id, args: self._zone(zone_id).get_versioned_settings(),
+            "settings_history": lambda zone_id, args: self._zone(zone_id).get_settings_history(
+                args.get("since_version", 0), args.get("limit")),
+            "settings_at": lambda zone_id, args: self._zone(zone_id).get_settings_at(args["timestamp"]),
+            "settings_intervals": lambda zone_id, args: self._zone(zone_id).get_settings_intervals(
+                args["start"], args["end"]),
+            "recent_sensors": lambda zone_id, args: self._zone(zone_id).get_recent_sensor_data(
+                since=args.get("since"), max_points=args.get("max_points")),
+            "sensor_stats": lambda zone_id, args: self._zone(zone_id).get_sensor_stats(),
+            "startup": lambda zone_id, args: self._zone(zone_id).get_startup_status(),
+            "loop_timing": lambda zone_id, args: self._zone(zone_id).get_loop_timing(args.get("recent_cycles", 0)),
+            "command": lambda zone_id, args: self._zone(zone_id).command_actuator(
+                args["device"], args.get("action", "toggle")),
+            "auto_mode": lambda zone_id, args: self._zone(zone_id).set_all_auto_mode(),
+            "emergency_stop": self._op_emergency_stop,
+            "metrics": lambda zone_id, args: metrics.render(),
+            "profile": lambda zone_id, args: profiling.sample_stacks(
+                args["duration"], args.get("frequency"), args.get("threads")),
+            "memory_start": lambda zone_id, args: profiling.MEMORY_TRACKER.start(args.get("frames")),
+            "memory_snapshot": lambda zone_id, args: profiling.MEMORY_TRACKER.snapshot(
+                args.get("limit", 20), args.get("key_type", "lineno"), args.get("reference", profiling.REFERENCE_PREVIOUS)),
+            "memory_stop": lambda zone_id, args: profiling.MEMORY_TRACKER.stop(),
+        }
+
+    # --- Résolution des zones ---
+
+    def _zones(self) -> dict:
+        return controller_zones(self.target)
+
+    def _zone(self, zone_id: str | None):
+        if zone_id is None:
+            return getattr(self.target, 'default_zone', self.target)
+        zone = self._zones().get(zone_id)
+        if zone is None:
+            raise ZoneNotFoundError(f"Zone inconnue '{zone_id}'.")
+        return zone
+
+    # --- Opérations ---
+
+    def _op_ping(self, zone_id, args):
+        return {"pid": os.getpid(), "zones": list(self._zones())}
+
+    def _op_zones(self, zone_id, args):
+        result = {"zones": [zone_summary(zone_id, z) for zone_id, z in self._zones().items()]}
+        if hasattr(self.target, 'get_scheduler_status'):
+            result["ordonnanceur"] = self.target.get_scheduler_status()
+        return result
+
+    def _op_emergency_stop(self, zone_id, args):
+        # Sans zone: tous les actionneurs de toutes les zones (comme POST /control/emergency_stop)
+        (self.target if zone_id is None else self._zone(zone_id)).emergency_stop_all_actuators()
+
+    def dispatch(self, request: dict) -> dict:
+        request_id = request.get("id")
+        op = self._ops.get(request.get("op"))
+        if op is None:
+            return {"id": request_id, "ok": False, "kind": ERROR_BAD_REQUEST,
+                    "error": f"Opération inconnue '{request.get('op')}'."}
+        try:
+            return {"id": request_id, "ok": True, "result": op(request.get("zone"), request.get("args") or {})}
+        except ZoneNotFoundError as e:
+            return {"id": request_id, "ok": False, "kind": ERROR_ZONE_UNKNOWN, "error": str(e)}
+        except KeyError as e:
+            return {"id": request_id, "ok": False, "kind": ERROR_BAD_REQUEST, "error": f"Argument manquant: {e}"}
+        except SettingsVersionConflict as e:
+            return {"id": request_id, "ok": False, "kind": ERROR_CONFLICT, "error": str(e),
+                    "current_version": e.current_version}
+        except profiling.ProfilingStateError as e:
+            return {"id": request_id, "ok": False, "kind": ERROR_CONFLICT, "error": str(e)}
+        except (ValueError, TypeError) as e:
+            return {"id": request_id, "ok": False, "kind": ERROR_BAD_REQUEST, "error": str(e)}
+        except Exception as e:
+            ipc_logger.error(f"ControllerServer: Erreur lors de l'opération '{request.get('op')}': {e}", exc_info=True)
+            return {"id": request_id, "ok": False, "kind": ERROR_INTERNAL, "error": str(e)}
+
+    # --- Cycle de vie ---
+
+    def start(self):
+        directory = os.path.dirname(self.socket_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path) # Socket laissé par un arrêt brutal
+        self._server = _ThreadingUnixServer(self.socket_path, _ControllerRequestHandler)
+        self._server.controller_server = self
+        os.chmod(self.socket_path, 0o660) # Propriétaire et groupe (ex: utilisateur du serveur web)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="ControllerIPCThread", daemon=True)
+        self._thread.start()
+        ipc_logger.info(f"ControllerServer: En écoute sur '{self.socket_path}'.")
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+        ipc_logger.info("ControllerServer: Arrêté.")
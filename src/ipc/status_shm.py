@@ -0,0 +1,211 @@
+# src/ipc/status_shm.py
+"""
+Publication du dernier statut de chaque zone dans un segment de mémoire partagée (fichier
+mappé, /dev/shm par défaut), lisible sans aller-retour IPC ni verrou par les workers de
+l'API et les outils locaux.
+
+Disposition (little-endian, tailles fixes):
+    en-tête  (16 o): magic b"SRST", version u16, nombre de slots u16, taille d'un slot u32, réservé
+    slot i (SLOT.size o, à 16 + i * SLOT.size):
+        seq u64 | données (PAYLOAD) | crc32 u32 + 4 o | seq_fin u64   (128 o: seq alignés sur 8 o)
+
+Écriture (un seul écrivain par slot, style seqlock): seq passe à une valeur impaire, les
+données et leur CRC sont écrits, puis seq_fin et seq reçoivent la valeur paire suivante.
+Lecture: copie du slot, puis relecture de seq; la copie n'est retenue que si seq était pair,
+inchangé, égal à seq_fin et que le CRC correspond (ce dernier contrôle couvre aussi l'absence
+de barrières mémoire côté Python). Sinon la lecture est recommencée.
+"""
+import logging
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+
+status_shm_logger = logging.getLogger(__name__)
+
+MAGIC = b"SRST"
+LAYOUT_VERSION = 1
+HEADER = struct.Struct("<4sHHI4x")
+SEQ = struct.Struct("<Q")
+PAYLOAD = struct.Struct("<32s7d7BxQ")
+CRC = struct.Struct("<I4x")
+SLOT_SIZE = SEQ.size + PAYLOAD.size + CRC.size + SEQ.size
+PAYLOAD_OFFSET = SEQ.size
+CRC_OFFSET = PAYLOAD_OFFSET + PAYLOAD.size
+SEQ_END_OFFSET = CRC_OFFSET + CRC.size
+MAX_READ_ATTEMPTS = 100
+
+# Ordre des champs de PAYLOAD (après zone_id): flottants puis octets, puis compteur de publications
+FLOAT_FIELDS = ("published_at", "sensor_timestamp", "temperature", "humidite", "co2",
+                "acquisition_seconds", "logic_seconds")
+FLAG_FIELDS = ("sensor_read_ok", "leds_active", "leds_manual", "humidifier_active", "humidifier_manual",
+               "ventilation_active", "ventilation_manual")
+
+
+class StatusLayoutError(ValueError):
+    """Le fichier n'est pas un segment de statut (ou d'une version de disposition différente)."""
+
+
+def _slot_offset(index: int) -> int:
+    return HEADER.size + index * SLOT_SIZE
+
+
+def _encode_float(value) -> float:
+    return math.nan if value is None else float(value)
+
+
+def _decode_float(value: float):
+    return None if math.isnan(value) else value
+
+
+class StatusSlotWriter:
+    """Écrivain d'un slot. Thread-safe: plusieurs threads d'une zone peuvent publier."""
+    def __init__(self, buffer: mmap.mmap, index: int, zone_id: str):
+        self._buffer = buffer
+        self._offset = _slot_offset(index)
+        self._zone_id = zone_id.encode('utf-8')[:32]
+        self._lock = threading.Lock()
+        self._seq = SEQ.unpack_from(buffer, self._offset)[0] & ~1 # Reprise après un slot laissé impair
+        self._publications = 0
+
+    def publish(self, snapshot: dict):
+        floats = [_encode_float(snapshot.get(name)) for name in FLOAT_FIELDS]
+        floats[0] = time.time() # published_at
+        flags = [1 if snapshot.get(name) else 0 for name in FLAG_FIELDS]
+        with self._lock:
+            self._publications += 1
+            payload = PAYLOAD.pack(self._zone_id, *floats, *flags, self._publications)
+            offset = self._offset
+            SEQ.pack_into(self._buffer, offset, self._seq + 1) # Impair: écriture en cours
+            self._buffer[offset + PAYLOAD_OFFSET:offset + CRC_OFFSET] = payload
+            CRC.pack_into(self._buffer, offset + CRC_OFFSET, zlib.crc32(payload))
+            self._seq += 2
+            SEQ.pack_into(self._buffer, offset + SEQ_END_OFFSET, self._seq)
+            SEQ.pack_into(self._buffer, offset, self._seq)
+
+
+class StatusSegment:
+    """Côté contrôleur: crée le segment (un slot par zone) et fournit les écrivains."""
+    def __init__(self, path: str, zone_ids):
+        self.path = path
+        self.zone_ids = list(zone_ids)
+        size = HEADER.size + len(self.zone_ids) * SLOT_SIZE
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Nouveau fichier remplacé atomiquement: les lecteurs d'un segment précédent le détectent (inode)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, LAYOUT_VERSION, len(self.zone_ids), SLOT_SIZE))
+            f.write(b"\0" * (size - HEADER.size))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+        self._file = open(path, 'r+b')
+        self._buffer = mmap.mmap(self._file.fileno(), size)
+        status_shm_logger.info(f"StatusSegment: {len(self.zone_ids)} slot(s) de {SLOT_SIZE} octets publiés dans '{path}'.")
+
+    def writer(self, zone_id: str) -> StatusSlotWriter:
+        return StatusSlotWriter(self._buffer, self.zone_ids.index(zone_id), zone_id)
+
+    def close(self, unlink: bool = True):
+        self._buffer.close()
+        self._file.close()
+        if unlink:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+
+class StatusReader:
+    """
+    Côté lecteur (workers de l'API, outils): lectures cohérentes sans verrou. Le segment est
+    remappé si le contrôleur l'a recréé (redémarrage).
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._inode = None
+        self._buffer = None
+        self._slot_count = 0
+        self._indexes = {} # zone_id -> slot (recalculé après un remappage)
+        self._lock = threading.Lock() # Protège seulement le remappage
+
+    def _ensure_mapped(self) -> bool:
+        try:
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return False
+        if inode == self._inode:
+            return True
+        with self._lock:
+            if inode != self._inode:
+                try:
+                    with open(self.path, 'rb') as f:
+                        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    magic, version, slot_count, slot_size = HEADER.unpack_from(buffer, 0)
+                except (ValueError, struct.error) as e: # Fichier vide ou tronqué
+                    raise StatusLayoutError(f"'{self.path}' n'est pas un segment de statut: {e}") from None
+                if (magic != MAGIC or version != LAYOUT_VERSION or slot_size != SLOT_SIZE
+                        or len(buffer) < _slot_offset(slot_count)):
+                    buffer.close()
+                    raise StatusLayoutError(f"'{self.path}' n'est pas un segment de statut v{LAYOUT_VERSION}.")
+                self._buffer, self._slot_count, self._indexes = buffer, slot_count, {}
+                self._inode = inode
+        return True
+
+    def _read_slot(self, index: int) -> dict | None:
+        buffer, offset = self._buffer, _slot_offset(index)
+        for _ in range(MAX_READ_ATTEMPTS):
+            raw = buffer[offset:offset + SLOT_SIZE]
+            seq = SEQ.unpack_from(raw, 0)[0]
+            if seq == 0:
+                return None # Jamais publié
+            if (seq & 1 or SEQ.unpack_from(buffer, offset)[0] != seq
+                    or SEQ.unpack_from(raw, SEQ_END_OFFSET)[0] != seq
+                    or CRC.unpack_from(raw, CRC_OFFSET)[0] != zlib.crc32(raw[PAYLOAD_OFFSET:CRC_OFFSET])):
+                time.sleep(0) # Écriture en cours: laisser l'écrivain finir
+                continue
+            values = PAYLOAD.unpack_from(raw, PAYLOAD_OFFSET)
+            snapshot = {"zone_id": values[0].rstrip(b"\0").decode('utf-8', errors='replace'), "seq": seq}
+            floats = values[1:1 + len(FLOAT_FIELDS)]
+            flags = values[1 + len(FLOAT_FIELDS):-1]
+            snapshot.update((name, _decode_float(value)) for name, value in zip(FLOAT_FIELDS, floats))
+            snapshot.update((name, bool(value)) for name, value in zip(FLAG_FIELDS, flags))
+            snapshot["publications"] = values[-1]
+            return snapshot
+        status_shm_logger.warning(f"StatusReader: Slot {index} de '{self.path}' instable après {MAX_READ_ATTEMPTS} lectures.")
+        return None
+
+    def read_all(self) -> list[dict]:
+        """Instantané de chaque zone déjà publiée (liste vide si le segment n'existe pas)."""
+        if not self._ensure_mapped():
+            return []
+        snapshots = (self._read_slot(index) for index in range(self._slot_count))
+        return [snapshot for snapshot in snapshots if snapshot is not None]
+
+    def _index_of(self, zone_id: str) -> int | None:
+        index = self._indexes.get(zone_id)
+        if index is None:
+            encoded = zone_id.encode('utf-8')[:32].ljust(32, b"\0")
+            for candidate in range(self._slot_count):
+                start = _slot_offset(candidate) + PAYLOAD_OFFSET
+                if self._buffer[start:start + 32] == encoded:
+                    index = self._indexes[zone_id] = candidate
+                    break
+        return index
+
+    def read(self, zone_id: str | None = None) -> dict | None:
+        """Instantané d'une zone (zone_id None: premier slot), None si elle n'a rien publié."""
+        if not self._ensure_mapped() or not self._slot_count:
+            return None
+        index = 0 if zone_id is None else self._index_of(zone_id)
+        return None if index is None else self._read_slot(index)
+
+    def close(self):
+        with self._lock:
+            if self._buffer is not None:
+                self._buffer.close()
+            self._buffer, self._inode = None, None
@@ -5,10 +5,12 @@ import logging
 import time
 from datetime import datetime
 
+from . import metrics
+
 # Essayer d'importer les configurations spécifiques.
 # Si cela échoue, des valeurs par défaut locales à ce module seront utilisées.
 try:
-    from src.config import ACTIVE_DB_CONFIG, BUFFER_SIZE_MAX, FLUSH_INTERVAL_BUFFER_SECONDES
+    from src.config import ACTIVE_DB_CONFIG, BUFFER_SIZE_MAX, FLUSH_INTERVAL_BUFFER_SECONDES, INGEST_SEQUENCES_CONSERVEES
     # Si l'import réussit, ces variables sont disponibles globalement dans ce module.
     # Et ACTIVE_DB_CONFIG devrait être un dictionnaire.
 except ImportError:
@@ -20,15 +22,34 @@ except ImportError:
     ACTIVE_DB_CONFIG = {}  # Fallback: un dictionnaire vide EST un mapping.
     BUFFER_SIZE_MAX = 10
     FLUSH_INTERVAL_BUFFER_SECONDES = 300
+    INGEST_SEQUENCES_CONSERVEES = 10000
 
 # Logger spécifique pour ce module
 db_logger = logging.getLogger("db_utils") # Renommé pour éviter conflit avec le logger 'root' des logs utilisateur
 
+# Ordre des colonnes d'un enregistrement du buffer (tuple construit par add_sensor_data_to_buffer).
+# Partagé avec le stockage local et l'agent de réplication (src/utils/replication.py).
+SENSOR_DATA_COLUMNS = (
+    "timestamp", "temperature", "humidity", "co2",
+    "humidifier_active", "ventilation_active", "leds_active",
+    "humidifier_on_duration_seconds", "humidifier_off_duration_seconds",
+    "ventilation_on_duration_seconds", "ventilation_off_duration_seconds"
+)
+# Valeurs brutes des capteurs (avant filtrage), à la suite de SENSOR_DATA_COLUMNS dans les
+# enregistrements du buffer. Écrites dans sensor_data seulement: le stockage local, la réplication
+# et l'ingestion gardent le format de SENSOR_DATA_COLUMNS.
+SENSOR_DATA_RAW_COLUMNS = ("temperature_raw", "humidity_raw", "co2_raw")
+
 class DatabaseManager:
-    def __init__(self):
+    def __init__(self, local_store=None):
         self.db_pool = None
         self.data_buffer = []
         self.last_flush_time = time.time()
+        # Stockage local optionnel (LocalSensorStore): chaque enregistrement y est écrit
+        # avant d'être mis en buffer, pour être ensuite répliqué vers la base centrale.
+        self.local_store = local_store
+        # Colonnes brutes présentes dans sensor_data (migration appliquée), vérifié à la connexion
+        self.raw_columns = False
         
         # --- AJOUT DE LOGS DE DIAGNOSTIC ---
         db_logger.info(f"Attempting to initialize DatabaseManager. Type of ACTIVE_DB_CONFIG: {type(ACTIVE_DB_CONFIG)}")
@@ -45,7 +66,9 @@ class DatabaseManager:
             # return 
 
         try:
-            self.db_pool = psycopg2.pool.SimpleConnectionPool(
+            # Pool partagé par les threads de logique et de maintenance et les requêtes d'ingestion:
+            # ThreadedConnectionPool (SimpleConnectionPool n'est pas thread-safe).
+            self.db_pool = psycopg2.pool.ThreadedConnectionPool(
                 minconn=1, 
                 maxconn=5, 
                 **ACTIVE_DB_CONFIG # C'est ici que l'erreur se produit si ACTIVE_DB_CONFIG n'est pas un mapping
@@ -53,7 +76,7 @@ class DatabaseManager:
             db_logger.info(f"Pool de connexions à la base de données initialisé pour '{ACTIVE_DB_CONFIG.get('database')}' sur '{ACTIVE_DB_CONFIG.get('host')}'.")
             self._test_connection() 
         except TypeError as te: 
-            db_logger.error(f"Erreur de type lors de l'initialisation du pool de connexions (vérifiez les arguments passés à SimpleConnectionPool): {te}", exc_info=True)
+            db_logger.error(f"Erreur de type lors de l'initialisation du pool de connexions (vérifiez les arguments passés à ThreadedConnectionPool): {te}", exc_info=True)
             self.db_pool = None
         except psycopg2.Error as e: 
             db_logger.error(f"Erreur psycopg2 lors de l'initialisation du pool de connexions: {e}", exc_info=True) # Ajout exc_info
@@ -71,6 +94,7 @@ class DatabaseManager:
             conn = self.db_pool.getconn()
             if conn:
                 db_logger.info("Connexion à la base de données réussie (test initial du pool).")
+                self._check_raw_columns(conn)
             else:
                 db_logger.error("Échec de l'obtention d'une connexion depuis le pool (test initial).")
         except psycopg2.Error as e:
@@ -79,10 +103,24 @@ class DatabaseManager:
             if conn and self.db_pool: 
                 self.db_pool.putconn(conn)
 
+    def _check_raw_columns(self, conn):
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT column_name FROM information_schema.columns "
+                "WHERE table_name = 'sensor_data' AND column_name = ANY(%s)", (list(SENSOR_DATA_RAW_COLUMNS),))
+            found = {row[0] for row in cur.fetchall()}
+        conn.rollback()
+        self.raw_columns = found == set(SENSOR_DATA_RAW_COLUMNS)
+        if not self.raw_columns:
+            db_logger.warning("Colonnes des valeurs brutes absentes de sensor_data (migration de Donnees.sql): "
+                              "seules les valeurs filtrées sont enregistrées.")
+
     def add_sensor_data_to_buffer(self, timestamp: datetime, temperature: float | None, humidity: float | None, co2: float | None,
                                   humidifier_active: bool, ventilation_active: bool, leds_active: bool,
                                   humidifier_on_duration: float | None, humidifier_off_duration: float | None,
-                                  ventilation_on_duration: float | None, ventilation_off_duration: float | None):
+                                  ventilation_on_duration: float | None, ventilation_off_duration: float | None,
+                                  temperature_raw: float | None = None, humidity_raw: float | None = None,
+                                  co2_raw: float | None = None):
         record = (
             timestamp,
             round(temperature, 1) if temperature is not None else None,
@@ -94,8 +132,16 @@ class DatabaseManager:
             round(humidifier_on_duration, 1) if humidifier_on_duration is not None else None,
             round(humidifier_off_duration, 1) if humidifier_off_duration is not None else None,
             round(ventilation_on_duration, 1) if ventilation_on_duration is not None else None,
-            round(ventilation_off_duration, 1) if ventilation_off_duration is not None else None
+            round(ventilation_off_duration, 1) if ventilation_off_duration is not None else None,
+            round(temperature_raw, 2) if temperature_raw is not None else None,
+            round(humidity_raw, 2) if humidity_raw is not None else None,
+            round(co2_raw, 1) if co2_raw is not None else None
         )
+        if self.local_store is not None:
+            try:
+                self.local_store.append_records([record[:len(SENSOR_DATA_COLUMNS)]])
+            except Exception as e:
+                db_logger.error(f"Échec de l'écriture dans le stockage local: {e}")
         self.data_buffer.append(record)
         db_logger.debug(f"Donnée ajoutée au buffer DB. Taille actuelle: {len(self.data_buffer)}")
 
@@ -111,10 +157,23 @@ class DatabaseManager:
     def flush_buffer(self):
         if not self.data_buffer:
             return
+        flush_start = time.perf_counter()
+        result = self._flush_buffer()
+        metrics.DB_FLUSH_SECONDS.observe(time.perf_counter() - flush_start, result)
 
+    def _getconn(self):
+        wait_start = time.perf_counter()
+        try:
+            return self.db_pool.getconn()
+        finally:
+            metrics.DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - wait_start)
+
+    def _flush_buffer(self) -> str:
+        """Insère le buffer dans sensor_data (avec nouveaux essais). Retourne "insere" ou "echec" (métriques)."""
         if not self.db_pool:
             db_logger.error("Pool de connexions DB non disponible. Impossible de vider le buffer.")
-            return
+            metrics.DB_FLUSH_ROWS.inc("echec", amount=len(self.data_buffer))
+            return "echec"
 
         conn = None
         max_retries = 2
@@ -126,26 +185,23 @@ class DatabaseManager:
 
         while attempt <= max_retries:
             try:
-                conn = self.db_pool.getconn()
+                conn = self._getconn()
                 if not conn:
                     db_logger.error("Impossible d'obtenir une connexion depuis le pool pour flush_buffer.")
-                    return
+                    metrics.DB_FLUSH_ROWS.inc("echec", amount=len(buffer_to_flush))
+                    return "echec"
 
+                columns = SENSOR_DATA_COLUMNS + (SENSOR_DATA_RAW_COLUMNS if self.raw_columns else ())
                 with conn.cursor() as cur:
-                    sql_insert_query = """
-                        INSERT INTO sensor_data (
-                            timestamp, temperature, humidity, co2,
-                            humidifier_active, ventilation_active, leds_active,
-                            humidifier_on_duration_seconds, humidifier_off_duration_seconds,
-                            ventilation_on_duration_seconds, ventilation_off_duration_seconds
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """
-                    cur.executemany(sql_insert_query, buffer_to_flush)
+                    sql_insert_query = (f"INSERT INTO sensor_data ({', '.join(columns)}) "
+                                        f"VALUES ({', '.join(['%s'] * len(columns))})")
+                    cur.executemany(sql_insert_query, [record[:len(columns)] for record in buffer_to_flush])
                 conn.commit()
                 db_logger.info(f"{len(buffer_to_flush)} enregistrements insérés avec succès dans sensor_data.")
                 self.data_buffer.clear() 
                 self.last_flush_time = time.time()
-                return 
+                metrics.DB_FLUSH_ROWS.inc("insere", amount=len(buffer_to_flush))
+                return "insere"
 
             except psycopg2.Error as e:
                 db_logger.error(f"Erreur DB lors de l'insertion (tentative {attempt + 1}/{max_retries + 1}): {e}")
@@ -155,22 +211,85 @@ class DatabaseManager:
                 
                 attempt += 1
                 if attempt <= max_retries:
+                    metrics.DB_FLUSH_RETRIES.inc()
                     sleep_time = 2**attempt 
                     db_logger.info(f"Nouvel essai d'insertion DB dans {sleep_time} secondes...") 
                     time.sleep(sleep_time) 
                 else:
                     db_logger.critical(f"Échec définitif de l'insertion de {len(buffer_to_flush)} enregistrements après {max_retries + 1} tentatives.")
-                    return 
+                    metrics.DB_FLUSH_ROWS.inc("echec", amount=len(buffer_to_flush))
+                    return "echec"
             except Exception as e: 
                 db_logger.critical(f"Erreur inattendue lors du vidage du buffer DB: {e}", exc_info=True)
                 if conn:
                     try: conn.rollback()
                     except: pass 
-                return 
+                metrics.DB_FLUSH_ROWS.inc("echec", amount=len(buffer_to_flush))
+                return "echec"
             finally:
                 if conn and self.db_pool: 
                     self.db_pool.putconn(conn) 
 
+    def bulk_insert_batch(self, greenhouse_id: str, batch_seq: int, samples: list[tuple], events: list[tuple]) -> str:
+        """
+        Insère un lot validé (voir src/utils/ingest.py) en une seule transaction:
+        échantillons par COPY + upsert dans sensor_data_central, événements dans actuator_events.
+        Chaque séquence reçue est enregistrée (ingest_batches): un lot rejoué est reconnu comme
+        doublon, un lot arrivé hors ordre (plus ancien que le dernier reçu) est inséré.
+        Retourne "inserted" ou "duplicate". Lève une exception si la base est indisponible.
+        """
+        from .replication import copy_upsert_sensor_rows, rows_to_csv
+        from psycopg2.extras import execute_values
+
+        if not self.db_pool:
+            raise RuntimeError("Pool de connexions DB non disponible.")
+
+        conn = self.db_pool.getconn()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "INSERT INTO ingest_sequences (greenhouse_id, last_batch_seq) VALUES (%s, -1) "
+                    "ON CONFLICT (greenhouse_id) DO NOTHING", (greenhouse_id,))
+                # Verrou de ligne: deux lots concurrents d'une même serre sont sérialisés.
+                cur.execute(
+                    "SELECT last_batch_seq FROM ingest_sequences WHERE greenhouse_id = %s FOR UPDATE", (greenhouse_id,))
+                last_batch_seq = cur.fetchone()[0]
+                cur.execute(
+                    "INSERT INTO ingest_batches (greenhouse_id, batch_seq) VALUES (%s, %s) ON CONFLICT DO NOTHING",
+                    (greenhouse_id, batch_seq))
+                if cur.rowcount == 0:
+                    conn.rollback()
+                    db_logger.info(f"Lot {batch_seq} de '{greenhouse_id}' déjà reçu, ignoré.")
+                    return "duplicate"
+                if batch_seq < last_batch_seq:
+                    db_logger.info(f"Lot {batch_seq} de '{greenhouse_id}' reçu hors ordre (dernier: {last_batch_seq}), inséré.")
+
+                if samples:
+                    copy_upsert_sensor_rows(cur, rows_to_csv(greenhouse_id, [(batch_seq,) + tuple(s) for s in samples]))
+                if events:
+                    execute_values(
+                        cur,
+                        "INSERT INTO actuator_events (greenhouse_id, timestamp, device, state, duration_seconds) "
+                        "VALUES %s ON CONFLICT DO NOTHING",
+                        [(greenhouse_id,) + tuple(e) for e in events],
+                        page_size=1000)
+                cur.execute(
+                    "UPDATE ingest_sequences SET last_batch_seq = GREATEST(last_batch_seq, %s) WHERE greenhouse_id = %s",
+                    (batch_seq, greenhouse_id))
+                # Séquences anciennes oubliées: un rejeu aussi tardif serait réécrit à l'identique (upserts)
+                cur.execute(
+                    "DELETE FROM ingest_batches WHERE greenhouse_id = %s AND batch_seq < %s",
+                    (greenhouse_id, max(batch_seq, last_batch_seq) - INGEST_SEQUENCES_CONSERVEES))
+            conn.commit()
+            db_logger.debug(f"Lot {batch_seq} de '{greenhouse_id}' inséré: {len(samples)} échantillons, {len(events)} événements.")
+            return "inserted"
+        except Exception:
+            try: conn.rollback()
+            except Exception: pass
+            raise
+        finally:
+            self.db_pool.putconn(conn)
+
     def close_pool(self):
         if self.db_pool:
             db_logger.info("Vidage final du buffer DB avant la fermeture du pool de connexions...")
@@ -0,0 +1,131 @@
+# src/utils/export.py
+import csv
+import io
+import json
+import logging
+import uuid
+import zlib
+from datetime import datetime
+
+from src import config
+from .db_utils import SENSOR_DATA_COLUMNS
+
+export_logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+
+def iter_sensor_row_chunks(start: datetime, end: datetime, chunk_size: int | None = None,
+                           db_config: dict | None = None, connect=None):
+    """
+    Lit les lignes de sensor_data dans [start, end[ par blocs de `chunk_size`,
+    via un curseur nommé (côté serveur): seul un bloc est en mémoire à la fois.
+
+    Utilise une connexion dédiée (et non le pool du contrôleur) pour ne jamais
+    priver la boucle de contrôle d'une connexion pendant un long export.
+    """
+    chunk_size = chunk_size or config.EXPORT_CHUNK_SIZE
+    if connect is None:
+        import psycopg2 # Import local: l'export n'est pas requis pour le fonctionnement de base
+        connect = psycopg2.connect
+    conn = connect(**(db_config if db_config is not None else config.ACTIVE_DB_CONFIG))
+    try:
+        conn.set_session(readonly=True)
+        with conn.cursor(name=f"export_{uuid.uuid4().hex[:12]}") as cur:
+            cur.itersize = chunk_size
+            cur.execute(
+                f"SELECT {', '.join(SENSOR_DATA_COLUMNS)} FROM sensor_data "
+                f"WHERE timestamp >= %s AND timestamp < %s ORDER BY timestamp",
+                (start, end))
+            total = 0
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                total += len(rows)
+                yield rows
+        export_logger.info(f"Export terminé: {total} lignes entre {start} et {end}.")
+    finally:
+        try:
+            conn.rollback()
+        finally:
+            conn.close()
+
+
+def _json_value(value):
+    return value.isoformat(sep=' ') if isinstance(value, datetime) else value
+
+
+def format_ndjson(chunks):
+    """Une ligne JSON par enregistrement; un morceau de texte par bloc."""
+    for rows in chunks:
+        yield "".join(
+            json.dumps({col: _json_value(val) for col, val in zip(SENSOR_DATA_COLUMNS, row)},
+                       separators=(',', ':')) + "\n"
+            for row in rows)
+
+
+def format_csv(chunks):
+    """CSV avec en-tête; un morceau de texte par bloc."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(SENSOR_DATA_COLUMNS)
+    yield buffer.getvalue()
+    for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows((_json_value(v) for v in row) for row in rows)
+        yield buffer.getvalue()
+
+
+def gzip_stream(byte_chunks):
+    """Compresse un flux d'octets au format gzip, morceau par morceau."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in byte_chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _prefetch_first_chunk(chunks):
+    """
+    Lit le premier bloc tout de suite (connexion, requête): une base indisponible ou une requête
+    en échec lève l'exception à l'appel, avant l'envoi des en-têtes d'une réponse HTTP.
+    """
+    first = next(chunks, None)
+
+    def resume():
+        try:
+            if first is not None:
+                yield first
+                yield from chunks
+        finally:
+            chunks.close()
+    return resume()
+
+
+def stream_export(start: datetime, end: datetime, fmt: str = "ndjson", compress: bool = False,
+                  chunk_size: int | None = None, **source_kwargs):
+    """
+    Générateur d'octets pour exporter [start, end[ en NDJSON ou CSV, optionnellement gzip.
+    La mémoire utilisée ne dépend que de `chunk_size`, pas de la longueur de la période.
+    La connexion et la requête sont faites à l'appel (erreurs de base levées ici, pas pendant le flux).
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format d'export inconnu '{fmt}' (attendu: {', '.join(EXPORT_FORMATS)})")
+    chunks = _prefetch_first_chunk(iter_sensor_row_chunks(start, end, chunk_size, **source_kwargs))
+    text_chunks = format_ndjson(chunks) if fmt == "ndjson" else format_csv(chunks)
+    byte_chunks = (text.encode('utf-8') for text in text_chunks)
+    return gzip_stream(byte_chunks) if compress else byte_chunks
+
+
+def parse_export_range(start_value: str | None, end_value: str | None) -> tuple[datetime, datetime]:
+    """Analyse les bornes ISO 8601 d'un export (fin par défaut: maintenant)."""
+    if not start_value:
+        raise ValueError("Le paramètre 'start' est requis (ISO 8601, ex: 2024-05-01 ou 2024-05-01T08:00:00).")
+    start = datetime.fromisoformat(start_value)
+    end = datetime.fromisoformat(end_value) if end_value else datetime.now()
+    if end <= start:
+        raise ValueError("'end' doit être postérieur à 'start'.")
+    return start, end
@@ -0,0 +1,167 @@
+# src/utils/ingest.py
+import json
+import logging
+import math
+import zlib
+from datetime import datetime
+
+from src import config
+from .db_utils import SENSOR_DATA_COLUMNS
+
+ingest_logger = logging.getLogger(__name__)
+
+# Bornes physiques acceptées (plages du SCD30, avec marge).
+_SAMPLE_RANGES = {
+    "temperature": (-40.0, 85.0),
+    "humidity": (0.0, 100.0),
+    "co2": (0.0, 40000.0),
+}
+_BOOLEAN_COLUMNS = ("humidifier_active", "ventilation_active", "leds_active")
+_DURATION_COLUMNS = (
+    "humidifier_on_duration_seconds", "humidifier_off_duration_seconds",
+    "ventilation_on_duration_seconds", "ventilation_off_duration_seconds"
+)
+EVENT_DEVICES = ("leds", "humidifier", "ventilation")
+MAX_REPORTED_ERRORS = 20
+
+
+class IngestValidationError(ValueError):
+    """Lot rejeté en bloc; `errors` contient les premières erreurs détectées."""
+    def __init__(self, errors: list[str]):
+        super().__init__(f"{len(errors)} erreur(s) de validation dans le lot")
+        self.errors = errors
+
+
+def decode_ingest_body(body: bytes, content_encoding: str | None, max_bytes: int | None = None) -> dict:
+    """
+    Décompresse (gzip ou deflate/zlib) puis décode le JSON d'un lot.
+    La taille décompressée est bornée pour se protéger des bombes de décompression.
+    """
+    max_bytes = max_bytes or config.INGEST_MAX_BODY_BYTES
+    encoding = (content_encoding or "identity").lower().strip()
+    try:
+        if encoding == "gzip":
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            decompressor = zlib.decompressobj()
+        elif encoding == "identity":
+            decompressor = None
+        else:
+            raise IngestValidationError([f"Content-Encoding non supporté: '{content_encoding}'"])
+        if decompressor is not None:
+            raw = decompressor.decompress(body, max_bytes + 1)
+            if decompressor.unconsumed_tail:
+                raise IngestValidationError([f"Lot décompressé trop volumineux (> {max_bytes} octets)"])
+        else:
+            raw = body
+        if len(raw) > max_bytes:
+            raise IngestValidationError([f"Lot trop volumineux (> {max_bytes} octets)"])
+        payload = json.loads(raw)
+    except (zlib.error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise IngestValidationError([f"Corps de requête illisible: {e}"])
+    if not isinstance(payload, dict):
+        raise IngestValidationError(["Le lot doit être un objet JSON"])
+    return payload
+
+
+def _parse_timestamp(value):
+    if not isinstance(value, str):
+        raise ValueError("timestamp doit être une chaîne ISO 8601")
+    timestamp = datetime.fromisoformat(value)
+    # Colonnes TIMESTAMP sans fuseau: PostgreSQL ignorerait le décalage (même instant stocké à
+    # des heures différentes, clé (greenhouse_id, timestamp) qui ne déduplique plus)
+    if timestamp.tzinfo is not None:
+        raise ValueError(f"timestamp sans décalage horaire attendu, reçu {value!r}")
+    return timestamp
+
+
+def _check_number(value, bounds=None, allow_none=True):
+    if value is None:
+        if allow_none:
+            return None
+        raise ValueError("valeur manquante")
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"nombre attendu, reçu {value!r}")
+    if bounds and not (bounds[0] <= value <= bounds[1]):
+        raise ValueError(f"{value} hors plage {bounds}")
+    return float(value)
+
+
+def _check_bool(value):
+    if value is None or isinstance(value, bool):
+        return value
+    raise ValueError(f"booléen attendu, reçu {value!r}")
+
+
+def validate_ingest_batch(payload: dict, max_rows: int | None = None) -> dict:
+    """
+    Valide un lot complet et retourne une version normalisée:
+    {"greenhouse_id", "batch_seq", "samples": [tuples SENSOR_DATA_COLUMNS], "events": [tuples]}.
+
+    Les échantillons sont des listes dans l'ordre de SENSOR_DATA_COLUMNS (format compact).
+    Les événements sont des listes [timestamp, device, state, duration_seconds].
+    Le lot est accepté ou rejeté en entier: une seule erreur lève IngestValidationError.
+    """
+    max_rows = max_rows or config.INGEST_MAX_BATCH_ROWS
+    errors = []
+
+    greenhouse_id = payload.get("greenhouse_id")
+    if not isinstance(greenhouse_id, str) or not greenhouse_id or len(greenhouse_id) > 64:
+        errors.append("greenhouse_id doit être une chaîne non vide (64 caractères max)")
+    batch_seq = payload.get("batch_seq")
+    if isinstance(batch_seq, bool) or not isinstance(batch_seq, int) or batch_seq < 0:
+        errors.append("batch_seq doit être un entier positif")
+
+    raw_samples = payload.get("samples", [])
+    raw_events = payload.get("events", [])
+    if not isinstance(raw_samples, list) or not isinstance(raw_events, list):
+        errors.append("samples et events doivent être des listes")
+        raise IngestValidationError(errors)
+    if len(raw_samples) + len(raw_events) > max_rows:
+        errors.append(f"Lot trop grand: {len(raw_samples) + len(raw_events)} lignes (max {max_rows})")
+        raise IngestValidationError(errors)
+
+    column_count = len(SENSOR_DATA_COLUMNS)
+    boolean_indexes = [SENSOR_DATA_COLUMNS.index(c) for c in _BOOLEAN_COLUMNS]
+    duration_indexes = [SENSOR_DATA_COLUMNS.index(c) for c in _DURATION_COLUMNS]
+    range_indexes = [(SENSOR_DATA_COLUMNS.index(c), bounds) for c, bounds in _SAMPLE_RANGES.items()]
+
+    samples = []
+    for i, raw in enumerate(raw_samples):
+        if len(errors) >= MAX_REPORTED_ERRORS:
+            break
+        if not isinstance(raw, list) or len(raw) != column_count:
+            errors.append(f"samples[{i}]: {column_count} valeurs attendues")
+            continue
+        try:
+            row = list(raw)
+            row[0] = _parse_timestamp(raw[0])
+            for index, bounds in range_indexes:
+                row[index] = _check_number(raw[index], bounds)
+            for index in boolean_indexes:
+                row[index] = _check_bool(raw[index])
+            for index in duration_indexes:
+                row[index] = _check_number(raw[index], (0.0, float("inf")))
+            samples.append(tuple(row))
+        except ValueError as e:
+            errors.append(f"samples[{i}]: {e}")
+
+    events = []
+    for i, raw in enumerate(raw_events):
+        if len(errors) >= MAX_REPORTED_ERRORS:
+            break
+        if not isinstance(raw, list) or len(raw) != 4:
+            errors.append(f"events[{i}]: [timestamp, device, state, duration_seconds] attendu")
+            continue
+        try:
+            if raw[1] not in EVENT_DEVICES:
+                raise ValueError(f"appareil inconnu {raw[1]!r}")
+            if not isinstance(raw[2], bool):
+                raise ValueError("state doit être un booléen")
+            events.append((_parse_timestamp(raw[0]), raw[1], raw[2], _check_number(raw[3], (0.0, float("inf")))))
+        except ValueError as e:
+            errors.append(f"events[{i}]: {e}")
+
+    if errors:
+        raise IngestValidationError(errors)
+    return {"greenhouse_id": greenhouse_id, "batch_seq": batch_seq, "samples": samples, "events": events}
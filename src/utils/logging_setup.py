@@ -0,0 +1,191 @@
+# src/utils/logging_setup.py
+"""
+Journalisation asynchrone: les threads de contrôle ne font que déposer l'enregistrement dans
+une file (QueueHandler); un thread unique (QueueListener) écrit par lots dans la console et le
+fichier, avec rotation (taille et âge) et compression gzip des fichiers tournés.
+
+Un filtre limite, par point d'appel (module + ligne), le nombre de messages répétitifs sur une
+fenêtre glissante; le nombre de messages supprimés est signalé à la réouverture de la fenêtre.
+"""
+import atexit
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+
+from src import config
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(name)s - %(threadName)s - %(message)s'
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Au plus `limit` enregistrements par point d'appel et par fenêtre de `window_seconds`.
+    `module_limits`: limites propres à certains loggers (préfixe du nom -> limite).
+    Les messages CRITICAL ne sont jamais supprimés.
+    """
+    def __init__(self, limit: int, window_seconds: float, module_limits: dict | None = None):
+        super().__init__()
+        self.limit = limit
+        self.window_seconds = window_seconds
+        # Préfixes les plus longs d'abord: 'src.core.actuators' l'emporte sur 'src.core'
+        self.module_limits = sorted((module_limits or {}).items(), key=lambda item: -len(item[0]))
+        self._windows = {} # (logger, ligne) -> [début de fenêtre, émis, supprimés]
+        self._lock = threading.Lock()
+
+    def _limit_for(self, logger_name: str) -> int:
+        for prefix, limit in self.module_limits:
+            if logger_name == prefix or logger_name.startswith(prefix + "."):
+                return limit
+        return self.limit
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.CRITICAL:
+            return True
+        # Même filtre posé sur plusieurs handlers (mode synchrone): une seule décision par enregistrement
+        verdict = getattr(record, 'rate_limit_verdict', None)
+        if verdict is None:
+            verdict = record.rate_limit_verdict = self._admit(record)
+        return verdict
+
+    def _admit(self, record: logging.LogRecord) -> bool:
+        key = (record.name, record.pathname, record.lineno)
+        now = record.created
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.window_seconds:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.msg} [{suppressed} message(s) similaire(s) supprimé(s) en {self.window_seconds:.0f}s]"
+                return True
+            if window[1] < self._limit_for(record.name):
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Rotation à `max_bytes` ou après `max_age_seconds`, les fichiers tournés étant compressés
+    (serre_controller.log.1.gz, ...). Les écritures ne sont pas vidées à chaque
+    enregistrement: le QueueListener appelle flush() après chaque lot.
+    """
+    def __init__(self, filename: str, max_bytes: int, max_age_seconds: float, backup_count: int,
+                 compress: bool = True):
+        super().__init__(filename, mode='a', maxBytes=max_bytes, backupCount=backup_count,
+                         encoding='utf-8', delay=False)
+        self.max_age_seconds = max_age_seconds
+        self._opened_at = time.time()
+        if compress:
+            self.namer = lambda name: name + ".gz"
+            self.rotator = self._compress
+
+    @staticmethod
+    def _compress(source: str, dest: str):
+        with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(source)
+
+    def shouldRollover(self, record) -> bool:
+        if self.max_age_seconds and time.time() - self._opened_at >= self.max_age_seconds:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        super().doRollover()
+        self._opened_at = time.time()
+
+    def emit(self, record):
+        # Comme StreamHandler.emit, sans flush (fait par lot)
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """QueueListener qui vide la file par lots de `batch_size` et ne vide les handlers qu'une fois par lot."""
+    def __init__(self, log_queue, *handlers, batch_size: int = 256):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+
+    def _monitor(self):
+        q = self.queue
+        stopping = False
+        while not stopping:
+            batch = [q.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            for record in batch:
+                if record is self._sentinel:
+                    stopping = True # Les enregistrements déjà reçus du lot sont écrits
+                    continue
+                self.handle(record)
+            for handler in self.handlers:
+                handler.flush()
+
+
+def configure_logging(level=None, log_file_path: str | None = None, asynchronous: bool | None = None,
+                      console: bool = True):
+    """
+    Configure le logger racine (console + fichier). En mode asynchrone, retourne le
+    QueueListener démarré (arrêté et vidé automatiquement à la sortie du processus).
+    """
+    if level is None:
+        level = getattr(logging, config.LOG_LEVEL, logging.INFO)
+    log_file_path = config.LOG_FILE_PATH if log_file_path is None else log_file_path
+    asynchronous = config.LOG_ASYNCHRONE if asynchronous is None else asynchronous
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.StreamHandler(sys.stdout)] if console else []
+    if log_file_path:
+        try:
+            log_directory = os.path.dirname(log_file_path)
+            if log_directory:
+                os.makedirs(log_directory, exist_ok=True)
+            handlers.append(CompressingRotatingFileHandler(
+                log_file_path, max_bytes=config.LOG_ROTATION_TAILLE_OCTETS,
+                max_age_seconds=config.LOG_ROTATION_INTERVALLE_HEURES * 3600,
+                backup_count=config.LOG_ROTATION_FICHIERS, compress=config.LOG_COMPRESSION))
+        except OSError as e:
+            print(f"AVERTISSEMENT: Impossible d'ouvrir le fichier log {log_file_path}: {e}")
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(level)
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    rate_limit = RateLimitFilter(config.LOG_LIMITE_PAR_FENETRE, config.LOG_LIMITE_FENETRE_SECONDES,
+                                 config.LOG_LIMITES_MODULES)
+
+    if not asynchronous:
+        for handler in handlers:
+            handler.addFilter(rate_limit)
+            root_logger.addHandler(handler)
+        return None
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(rate_limit) # Filtré avant la file: rien n'est mis en file pour rien
+    root_logger.addHandler(queue_handler)
+    listener = BatchingQueueListener(log_queue, *handlers, batch_size=config.LOG_LOT_MAX)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
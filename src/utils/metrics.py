@@ -0,0 +1,242 @@
+# src/utils/metrics.py
+"""
+Métriques du contrôleur (compteurs et histogrammes) au format texte d'exposition Prometheus,
+servies par GET /metrics.
+
+Les points instrumentés sont sur les chemins chauds (lecture des capteurs, cycle de logique,
+lecture des settings): chaque thread incrémente ses propres valeurs (une partition par thread,
+sans verrou); les partitions ne sont additionnées qu'à la lecture des métriques. Les partitions
+des threads terminés (threads de requêtes HTTP) sont fusionnées à cette occasion et à chaque
+nouvelle partition.
+
+Les métriques sont définies ici, sous un préfixe commun, pour que leurs noms restent stables:
+    from src.utils import metrics
+    metrics.SENSOR_READ_SECONDS.observe(duree, zone_id)
+"""
+import bisect
+import math
+import threading
+import time
+import weakref
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "serre_"
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if any(existing.name == metric.name for existing in self._metrics):
+                raise ValueError(f"Métrique '{metric.name}' déjà enregistrée.")
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        """Toutes les métriques ayant au moins une valeur, au format texte d'exposition."""
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            samples = metric.samples()
+            if not samples:
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), registry: MetricsRegistry | None = REGISTRY):
+        self.name = PREFIX + name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = [] # (référence faible du thread, partition)
+        self._retired = {} # Valeurs des threads terminés
+        self._shards_lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None: # Premier enregistrement de ce thread
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                # Fusion des threads terminés ici aussi: la liste reste bornée même si les
+                # métriques ne sont jamais lues (un thread par requête HTTP)
+                self._retire_dead_shards()
+                self._shards.append((weakref.ref(threading.current_thread()), shard))
+        return shard
+
+    def _merge(self, target: dict, shard: dict):
+        raise NotImplementedError
+
+    def _retire_dead_shards(self):
+        """Fusionne dans `_retired` les partitions des threads terminés (appelé sous `_shards_lock`)."""
+        alive = []
+        for thread_ref, shard in self._shards:
+            thread = thread_ref()
+            if thread is None or not thread.is_alive():
+                self._merge(self._retired, dict(shard))
+            else:
+                alive.append((thread_ref, shard))
+        self._shards = alive
+
+    def _collect(self) -> dict:
+        """Somme des partitions (labels -> valeur); les partitions des threads terminés sont fusionnées."""
+        with self._shards_lock:
+            self._retire_dead_shards()
+            total = {}
+            self._merge(total, self._retired)
+            for _, shard in self._shards:
+                self._merge(total, dict(shard)) # Copie: le thread propriétaire continue d'écrire
+        return total
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def _merge(self, target: dict, shard: dict):
+        for labels, value in shard.items():
+            target[labels] = target.get(labels, 0) + value
+
+    def value(self, *labels) -> float:
+        return self._collect().get(labels, 0)
+
+    def samples(self) -> list:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in sorted(self._collect().items())]
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class Histogram(_Metric):
+    """Par labels: [effectif de chaque intervalle (dernier: au-delà du plus grand seuil), somme, nombre]."""
+    type = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS,
+                 registry: MetricsRegistry | None = REGISTRY):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help_text, labelnames, registry)
+
+    def observe(self, value: float, *labels):
+        shard = self._shard()
+        state = shard.get(labels)
+        if state is None:
+            state = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    def time(self, *labels) -> _Timer:
+        """`with histogramme.time(zone):` observe la durée du bloc."""
+        return _Timer(self, labels)
+
+    def _merge(self, target: dict, shard: dict):
+        for labels, state in shard.items():
+            total = target.get(labels)
+            if total is None:
+                target[labels] = list(state)
+            else:
+                for index, value in enumerate(state):
+                    total[index] += value
+
+    def count(self, *labels) -> int:
+        state = self._collect().get(labels)
+        return state[-1] if state else 0
+
+    def samples(self) -> list:
+        lines = []
+        for labels, state in sorted(self._collect().items()):
+            cumulative = 0
+            for bound, observations in zip(self.buckets + (math.inf,), state):
+                cumulative += observations
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {state[-1]}")
+        return lines
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+# --- Métriques du contrôleur ---
+
+SENSOR_READ_SECONDS = Histogram(
+    "lecture_capteurs_secondes", "Durée de lire_capteur() (essais et attentes compris).", ("zone",),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0))
+SENSOR_READ_FAILURES = Counter(
+    "lecture_capteurs_echecs_total", "Acquisitions sans lecture valide (erreur ou valeurs partielles).", ("zone",))
+SENSOR_READ_RETRIES = Counter(
+    "lecture_capteurs_essais_supplementaires_total", "Essais de lecture du SCD30 au-delà du premier.")
+LOGIC_CYCLE_SECONDS = Histogram(
+    "cycle_logique_secondes", "Durée d'un cycle de logique (actionneurs et mise en buffer).", ("zone",))
+LOGIC_LOOP_LOAD = Histogram(
+    "boucle_logique_occupation_ratio", "Durée du cycle de logique rapportée à son intervalle (1 = dépassement).",
+    ("zone",), buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0, 1.5, 2.0))
+LOGIC_LOOP_OVERRUNS = Counter(
+    "boucle_logique_depassements_total", "Cycles de logique plus longs que leur intervalle.", ("zone",))
+LOOP_START_LATENESS_SECONDS = Histogram(
+    "boucle_retard_demarrage_secondes", "Retard du début effectif d'un cycle sur son début prévu (gigue).",
+    ("zone", "boucle"), buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+LOOP_DEADLINE_MISSES = Counter(
+    "boucle_echeances_manquees_total", "Cycles terminés après la fin de leur période (début prévu + intervalle).", ("zone", "boucle"))
+SCHEDULER_LAG_SECONDS = Histogram(
+    "ordonnanceur_retard_secondes", "Retard d'exécution des tâches des zones sur leur échéance (multi-zone).", ("tache",))
+DB_FLUSH_SECONDS = Histogram(
+    "db_vidage_buffer_secondes", "Durée de flush_buffer() (essais compris).", ("resultat",),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+DB_FLUSH_ROWS = Counter("db_enregistrements_total", "Enregistrements vidés du buffer vers sensor_data.", ("resultat",))
+DB_FLUSH_RETRIES = Counter("db_vidage_essais_supplementaires_total", "Nouveaux essais d'insertion après une erreur.")
+DB_POOL_WAIT_SECONDS = Histogram("db_pool_attente_secondes", "Attente d'une connexion du pool (getconn).")
+ACTUATOR_TRANSITIONS = Counter(
+    "actionneur_transitions_total", "Changements d'état des actionneurs.", ("zone", "actionneur", "etat"))
+SETTINGS_LOOKUPS = Counter("settings_lectures_total", "Lectures de settings (get_setting).")
+API_REQUEST_SECONDS = Histogram(
+    "api_requete_secondes", "Durée de traitement des requêtes HTTP de l'API.", ("methode", "route", "code"))
@@ -0,0 +1,193 @@
+# src/utils/profiling.py
+"""
+Diagnostic à la demande: profilage par échantillonnage de tous les threads et suivi des
+allocations mémoire (tracemalloc), servis par les routes /api/admin/*.
+
+Le profileur relève périodiquement la pile de chaque thread (sys._current_frames) pendant une
+durée limitée, depuis le thread appelant: les threads observés ne sont pas instrumentés et
+rien ne tourne en dehors d'un profilage. Le résultat est au format « piles repliées »
+(une ligne par pile distincte: "thread;fonction (fichier:ligne);... nombre"), accepté par
+flamegraph.pl, speedscope ou inferno.
+
+tracemalloc n'est démarré que sur demande (son surcoût touche chaque allocation); chaque
+instantané est comparé au précédent (ou au premier) pour localiser ce qui grossit.
+"""
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+
+from src import config
+
+profiling_logger = logging.getLogger(__name__)
+
+REFERENCE_PREVIOUS = "precedent"
+REFERENCE_START = "debut"
+KEY_TYPES = ("lineno", "filename", "traceback")
+
+# Allocations du suivi lui-même et du chargement des modules: exclues des comparaisons
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class ProfilingStateError(RuntimeError):
+    """Demande incompatible avec l'état du diagnostic (profilage déjà en cours, tracemalloc arrêté)."""
+
+
+def _short_path(filename: str) -> str:
+    """Chemin relatif au projet, sinon les deux derniers éléments (bibliothèque standard, paquets)."""
+    root = config.PROJECT_ROOT_DIR + os.sep
+    if filename.startswith(root):
+        return filename[len(root):]
+    parts = filename.replace("\\", "/").rsplit("/", 2)
+    return "/".join(parts[-2:])
+
+
+def _thread_label(name: str) -> str:
+    """"Thread-12 (process_request_thread)" -> "Thread (process_request_thread)": une pile par rôle, pas par requête."""
+    return re.sub(r"-\d+", "", name).replace(";", ",")
+
+
+_profile_lock = threading.Lock()
+
+
+def sample_stacks(duration: float, frequency: float | None = None, threads: list | None = None) -> dict:
+    """
+    Échantillonne les piles de tous les threads (sauf l'appelant) pendant `duration` secondes,
+    `frequency` fois par seconde. `threads`: préfixes de noms de threads à retenir (tous si vide).
+    Retourne {"piles": {pile repliée: nombre}, "echantillons", "duree_secondes", "frequence_hz"}.
+    Un seul profilage à la fois (ProfilingStateError sinon).
+    """
+    frequency = frequency or config.PROFILAGE_FREQUENCE_HZ
+    if not 0 < duration <= config.PROFILAGE_DUREE_MAX_SECONDES:
+        raise ValueError(f"Durée de profilage hors limites (0, {config.PROFILAGE_DUREE_MAX_SECONDES}] s.")
+    if not 0 < frequency <= config.PROFILAGE_FREQUENCE_MAX_HZ:
+        raise ValueError(f"Fréquence de profilage hors limites (0, {config.PROFILAGE_FREQUENCE_MAX_HZ}] Hz.")
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilingStateError("Un profilage est déjà en cours.")
+    try:
+        profiling_logger.info(f"Profilage des threads: {duration}s à {frequency} Hz.")
+        interval = 1.0 / frequency
+        own_ident = threading.get_ident()
+        labels = {} # code -> "fonction (fichier:ligne)", calculé une fois par fonction
+        stacks = {}
+        samples = 0
+        start = time.perf_counter()
+        deadline = start + duration
+        next_sample = start
+        while True:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                name = _thread_label(names.get(ident, f"thread-{ident}"))
+                if threads and not name.startswith(tuple(threads)):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+                    stack.append(label)
+                    frame = frame.f_back
+                stack.append(name)
+                key = ";".join(reversed(stack))
+                stacks[key] = stacks.get(key, 0) + 1
+            samples += 1
+            next_sample += interval
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if next_sample > now:
+                time.sleep(min(next_sample, deadline) - now)
+            else:
+                next_sample = now # Échantillonnage en retard (Pi chargé): pas de rattrapage en rafale
+        return {"piles": stacks, "echantillons": samples, "duree_secondes": round(time.perf_counter() - start, 3),
+                "frequence_hz": frequency}
+    finally:
+        _profile_lock.release()
+
+
+def collapsed(profile: dict) -> str:
+    """Piles repliées (une ligne "pile nombre"), les plus fréquentes en premier."""
+    lines = [f"{stack} {count}" for stack, count in sorted(profile["piles"].items(), key=lambda item: -item[1])]
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+class MemoryTracker:
+    """
+    Suivi des allocations: `start()` démarre tracemalloc et prend l'instantané de départ,
+    `snapshot()` compare un nouvel instantané au précédent (ou au départ), `stop()` arrête
+    tracemalloc et libère les instantanés.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._start_snapshot = None
+        self._previous_snapshot = None
+        self._started_at = None
+
+    def _take_snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+    def status(self) -> dict:
+        current, peak = tracemalloc.get_traced_memory()
+        return {"actif": tracemalloc.is_tracing(), "profondeur": tracemalloc.get_traceback_limit(),
+                "demarre_a": self._started_at, "memoire_tracee_octets": current, "pic_octets": peak,
+                "surcout_tracemalloc_octets": tracemalloc.get_tracemalloc_memory()}
+
+    def start(self, frames: int | None = None) -> dict:
+        frames = frames or config.TRACEMALLOC_PROFONDEUR
+        if not 1 <= frames <= 100:
+            raise ValueError("Profondeur de pile tracemalloc hors limites [1, 100].")
+        with self._lock:
+            if tracemalloc.is_tracing():
+                raise ProfilingStateError("tracemalloc est déjà démarré.")
+            tracemalloc.start(frames)
+            self._started_at = time.time()
+            self._start_snapshot = self._previous_snapshot = self._take_snapshot()
+        profiling_logger.info(f"tracemalloc démarré ({frames} cadre(s) par allocation).")
+        return self.status()
+
+    def snapshot(self, limit: int = 20, key_type: str = "lineno", reference: str = REFERENCE_PREVIOUS) -> dict:
+        """Les `limit` emplacements dont la mémoire a le plus augmenté depuis l'instantané de `reference`."""
+        if key_type not in KEY_TYPES:
+            raise ValueError(f"Clé de regroupement inconnue '{key_type}' ({', '.join(KEY_TYPES)}).")
+        if reference not in (REFERENCE_PREVIOUS, REFERENCE_START):
+            raise ValueError(f"Référence inconnue '{reference}' ({REFERENCE_PREVIOUS}, {REFERENCE_START}).")
+        with self._lock:
+            if not tracemalloc.is_tracing() or self._start_snapshot is None:
+                raise ProfilingStateError("tracemalloc n'est pas démarré.")
+            snapshot = self._take_snapshot()
+            base = self._start_snapshot if reference == REFERENCE_START else self._previous_snapshot
+            self._previous_snapshot = snapshot
+        differences = []
+        for stat in snapshot.compare_to(base, key_type)[:limit]:
+            frame = stat.traceback[0]
+            entry = {"emplacement": f"{_short_path(frame.filename)}:{frame.lineno}",
+                     "difference_octets": stat.size_diff, "taille_octets": stat.size,
+                     "difference_nombre": stat.count_diff, "nombre": stat.count}
+            if key_type == "traceback":
+                entry["pile"] = [f"{_short_path(f.filename)}:{f.lineno}" for f in stat.traceback]
+            differences.append(entry)
+        return {**self.status(), "reference": reference, "differences": differences}
+
+    def stop(self) -> dict:
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                raise ProfilingStateError("tracemalloc n'est pas démarré.")
+            status = self.status()
+            tracemalloc.stop()
+            self._start_snapshot = self._previous_snapshot = self._started_at = None
+        profiling_logger.info("tracemalloc arrêté.")
+        return {**status, "actif": False}
+
+
+MEMORY_TRACKER = MemoryTracker()
@@ -0,0 +1,294 @@
+# src/utils/replication.py
+import csv
+import io
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
+
+from src import config
+from .db_utils import SENSOR_DATA_COLUMNS
+
+replication_logger = logging.getLogger(__name__)
+
+# Colonnes d'un lot répliqué: identifiant de serre + séquence locale + colonnes de sensor_data.
+BATCH_COLUMNS = ("greenhouse_id", "source_seq") + SENSOR_DATA_COLUMNS
+_BOOLEAN_COLUMNS = {"humidifier_active", "ventilation_active", "leds_active"}
+
+
+class LocalSensorStore:
+    """
+    Stockage local (SQLite) des enregistrements de capteurs.
+    Chaque ligne reçoit une séquence monotone (seq) qui sert de point de reprise
+    pour la réplication: l'agent ne relit jamais ce qui a déjà été expédié.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        # isolation_level=None: transactions gérées explicitement (BEGIN/COMMIT).
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")     # Lecteur et écrivain ne se bloquent pas
+        self._conn.execute("PRAGMA synchronous=NORMAL")   # Moins d'écritures sur la carte SD
+        columns_ddl = ", ".join(f"{col} {'INTEGER' if col in _BOOLEAN_COLUMNS else 'REAL'}"
+                                for col in SENSOR_DATA_COLUMNS if col != "timestamp")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS sensor_records ("
+            f"seq INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL, {columns_ddl})"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS replication_checkpoint (name TEXT PRIMARY KEY, last_seq INTEGER NOT NULL)"
+        )
+        replication_logger.info(f"Stockage local initialisé: '{path}'.")
+
+    def append_records(self, records: list[tuple]):
+        """Ajoute des enregistrements (tuples dans l'ordre de SENSOR_DATA_COLUMNS) en une transaction."""
+        if not records:
+            return
+        placeholders = ", ".join("?" for _ in SENSOR_DATA_COLUMNS)
+        rows = [
+            (record[0].isoformat(sep=' ') if isinstance(record[0], datetime) else record[0],) + tuple(record[1:])
+            for record in records
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    f"INSERT INTO sensor_records ({', '.join(SENSOR_DATA_COLUMNS)}) VALUES ({placeholders})", rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def read_batch(self, after_seq: int, limit: int) -> list[tuple]:
+        """Retourne au plus `limit` lignes (seq, *colonnes) dont seq > after_seq, par seq croissante."""
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT seq, {', '.join(SENSOR_DATA_COLUMNS)} FROM sensor_records "
+                f"WHERE seq > ? ORDER BY seq LIMIT ?", (after_seq, limit))
+            return cursor.fetchall()
+
+    def last_seq(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(seq) FROM sensor_records").fetchone()
+        return row[0] or 0
+
+    def get_checkpoint(self, name: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_seq FROM replication_checkpoint WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def set_checkpoint(self, name: str, last_seq: int):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO replication_checkpoint (name, last_seq) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET last_seq = excluded.last_seq", (name, last_seq))
+
+    def purge_up_to(self, seq: int) -> int:
+        """Supprime les lignes déjà répliquées (seq <= seq) pour borner la taille du fichier local."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM sensor_records WHERE seq <= ?", (seq,))
+            return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+        replication_logger.info("Stockage local fermé.")
+
+
+def rows_to_csv(greenhouse_id: str, rows: list[tuple]) -> io.StringIO:
+    """
+    Sérialise des lignes (seq, *colonnes) en CSV avec en-tête (BATCH_COLUMNS), prêt pour COPY.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(BATCH_COLUMNS)
+    for row in rows:
+        seq, values = row[0], row[1:]
+        writer.writerow((greenhouse_id, seq) + tuple(
+            ('t' if value else 'f') if column in _BOOLEAN_COLUMNS and value is not None else value
+            for column, value in zip(SENSOR_DATA_COLUMNS, values)))
+    buffer.seek(0)
+    return buffer
+
+
+def encode_batch(greenhouse_id: str, rows: list[tuple]) -> bytes:
+    """
+    Encode des lignes (seq, *colonnes) du stockage local en CSV compressé (zlib).
+    La première ligne du CSV est l'en-tête (BATCH_COLUMNS).
+    """
+    return zlib.compress(rows_to_csv(greenhouse_id, rows).getvalue().encode('utf-8'), level=6)
+
+
+def decode_batch(payload: bytes) -> io.StringIO:
+    """Décompresse un lot encodé par encode_batch et retourne le CSV (avec en-tête) prêt pour COPY."""
+    return io.StringIO(zlib.decompress(payload).decode('utf-8'))
+
+
+def copy_upsert_sensor_rows(cur, csv_file, table_name: str = "sensor_data_central") -> int:
+    """
+    Chemin d'insertion en masse: COPY du CSV (avec en-tête BATCH_COLUMNS) dans une table
+    temporaire, puis un seul INSERT ... ON CONFLICT (greenhouse_id, timestamp) vers `table_name`.
+    Doit être appelé dans une transaction ouverte; retourne le nombre de lignes copiées.
+    """
+    data_columns = ", ".join(SENSOR_DATA_COLUMNS)
+    update_columns = ", ".join(
+        f"{col} = EXCLUDED.{col}" for col in ("source_seq",) + SENSOR_DATA_COLUMNS if col != "timestamp")
+    cur.execute(
+        f"CREATE TEMP TABLE IF NOT EXISTS replication_staging "
+        f"(LIKE {table_name} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS")
+    cur.copy_expert(
+        f"COPY replication_staging ({', '.join(BATCH_COLUMNS)}) FROM STDIN WITH (FORMAT csv, HEADER true)",
+        csv_file)
+    copied = cur.rowcount
+    # DISTINCT ON: un même (greenhouse_id, timestamp) ne peut être mis à jour deux fois par commande.
+    cur.execute(
+        f"INSERT INTO {table_name} (greenhouse_id, source_seq, {data_columns}) "
+        f"SELECT DISTINCT ON (greenhouse_id, timestamp) greenhouse_id, source_seq, {data_columns} "
+        f"FROM replication_staging ORDER BY greenhouse_id, timestamp, source_seq DESC "
+        f"ON CONFLICT (greenhouse_id, timestamp) DO UPDATE SET {update_columns}")
+    return copied
+
+
+class PostgresSink:
+    """
+    Destination centrale PostgreSQL. Chaque lot est chargé par COPY dans une table
+    temporaire, puis fusionné par un seul INSERT ... ON CONFLICT (greenhouse_id, timestamp):
+    rejouer un lot après une panne ne crée donc jamais de doublon.
+    """
+    TABLE_NAME = "sensor_data_central"
+
+    def __init__(self, db_config: dict | None = None):
+        self.db_config = db_config if db_config is not None else config.DB_CONFIG_CENTRAL
+        self._conn = None
+
+    def _get_connection(self):
+        if self._conn is None or self._conn.closed:
+            import psycopg2 # Import local: l'agent n'est pas requis pour le fonctionnement de base
+            self._conn = psycopg2.connect(**self.db_config)
+        return self._conn
+
+    def send(self, payload: bytes) -> int:
+        """Charge un lot encodé et retourne le nombre de lignes reçues."""
+        conn = self._get_connection()
+        try:
+            with conn.cursor() as cur:
+                received = copy_upsert_sensor_rows(cur, decode_batch(payload), self.TABLE_NAME)
+            conn.commit()
+            return received
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                self._conn = None # Connexion probablement perdue, elle sera recréée au prochain lot
+            raise
+
+    def close(self):
+        if self._conn is not None and not self._conn.closed:
+            self._conn.close()
+        self._conn = None
+
+
+class ReplicationAgent:
+    """
+    Expédie les nouvelles lignes du stockage local vers une destination (sink) par lots.
+    Le point de reprise (checkpoint) n'avance qu'après un envoi réussi: après une panne,
+    l'agent reprend exactement où il s'était arrêté, sans relire l'historique.
+    """
+    CHECKPOINT_NAME = "central"
+
+    def __init__(self, local_store: LocalSensorStore, sink, greenhouse_id: str | None = None,
+                 batch_size: int | None = None, interval_seconds: float | None = None,
+                 max_backoff_seconds: float | None = None):
+        self.local_store = local_store
+        self.sink = sink
+        self.greenhouse_id = greenhouse_id or config.GREENHOUSE_ID
+        self.batch_size = batch_size or config.REPLICATION_BATCH_SIZE
+        self.interval_seconds = interval_seconds or config.REPLICATION_INTERVAL_SECONDES
+        self.max_backoff_seconds = max_backoff_seconds or config.REPLICATION_MAX_BACKOFF_SECONDES
+
+        self.rows_shipped = 0
+        self.batches_shipped = 0
+        self.last_error = None
+        self.last_success_time = None
+        self._consecutive_failures = 0
+        self._running = threading.Event()
+        self._thread = None
+
+    def replicate_once(self) -> int:
+        """
+        Expédie tous les lots en attente. Retourne le nombre de lignes expédiées.
+        Une erreur d'envoi est propagée; le checkpoint reste sur le dernier lot confirmé.
+        """
+        shipped = 0
+        checkpoint = self.local_store.get_checkpoint(self.CHECKPOINT_NAME)
+        while True:
+            rows = self.local_store.read_batch(checkpoint, self.batch_size)
+            if not rows:
+                break
+            payload = encode_batch(self.greenhouse_id, rows)
+            self.sink.send(payload)
+            checkpoint = rows[-1][0]
+            self.local_store.set_checkpoint(self.CHECKPOINT_NAME, checkpoint)
+            self.local_store.purge_up_to(checkpoint)
+            shipped += len(rows)
+            self.rows_shipped += len(rows)
+            self.batches_shipped += 1
+            replication_logger.debug(f"Lot répliqué: {len(rows)} lignes, {len(payload)} octets compressés, seq={checkpoint}.")
+            if len(rows) < self.batch_size:
+                break
+        if shipped:
+            replication_logger.info(f"Réplication: {shipped} lignes expédiées (checkpoint seq={checkpoint}).")
+        return shipped
+
+    def _next_wait(self) -> float:
+        if self._consecutive_failures == 0:
+            return self.interval_seconds
+        return min(self.interval_seconds * (2 ** self._consecutive_failures), self.max_backoff_seconds)
+
+    def _run_loop(self):
+        replication_logger.info(f"ReplicationThread: Démarrage (serre '{self.greenhouse_id}', intervalle {self.interval_seconds}s).")
+        while self._running.is_set():
+            try:
+                self.replicate_once()
+                self._consecutive_failures = 0
+                self.last_error = None
+                self.last_success_time = time.time()
+            except Exception as e:
+                self._consecutive_failures += 1
+                self.last_error = str(e)
+                replication_logger.warning(
+                    f"ReplicationThread: Échec de la réplication (échec {self._consecutive_failures}): {e}. "
+                    f"Nouvel essai dans {self._next_wait():.0f}s.")
+            deadline = time.time() + self._next_wait()
+            while self._running.is_set() and time.time() < deadline:
+                time.sleep(min(0.5, max(0.0, deadline - time.time())))
+        replication_logger.info("ReplicationThread: Boucle terminée.")
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._running.set()
+        self._thread = threading.Thread(target=self._run_loop, name="ReplicationThread", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        self._running.clear()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        if hasattr(self.sink, 'close'):
+            self.sink.close()
+
+    def get_status(self) -> dict:
+        checkpoint = self.local_store.get_checkpoint(self.CHECKPOINT_NAME)
+        return {
+            "greenhouse_id": self.greenhouse_id,
+            "checkpoint_seq": checkpoint,
+            "pending_rows": max(0, self.local_store.last_seq() - checkpoint),
+            "rows_shipped": self.rows_shipped,
+            "batches_shipped": self.batches_shipped,
+            "last_success_time": self.last_success_time,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,184 @@
+# src/utils/retention.py
+import logging
+import re
+import time
+from datetime import datetime, timedelta
+
+from src import config
+
+retention_logger = logging.getLogger(__name__)
+
+RAW_TABLE = "sensor_data"
+ROLLUP_TABLE = "sensor_data_hourly"
+
+# Borne supérieure d'une partition par plage: "FOR VALUES FROM ('...') TO ('2024-02-01 00:00:00')"
+_PARTITION_UPPER_BOUND_RE = re.compile(r"TO \('([^']+)'\)")
+
+_ROLLUP_SQL = f"""
+    INSERT INTO {ROLLUP_TABLE} (
+        hour, sample_count,
+        temperature_avg, temperature_min, temperature_max,
+        humidity_avg, humidity_min, humidity_max,
+        co2_avg, co2_min, co2_max,
+        humidifier_active_ratio, ventilation_active_ratio, leds_active_ratio
+    )
+    SELECT date_trunc('hour', timestamp) AS hour, count(*),
+           avg(temperature), min(temperature), max(temperature),
+           avg(humidity), min(humidity), max(humidity),
+           avg(co2), min(co2), max(co2),
+           avg(humidifier_active::int), avg(ventilation_active::int), avg(leds_active::int)
+    FROM {RAW_TABLE}
+    WHERE timestamp >= %s AND timestamp < %s
+    GROUP BY 1
+    ON CONFLICT (hour) DO UPDATE SET
+        sample_count = EXCLUDED.sample_count,
+        temperature_avg = EXCLUDED.temperature_avg, temperature_min = EXCLUDED.temperature_min,
+        temperature_max = EXCLUDED.temperature_max,
+        humidity_avg = EXCLUDED.humidity_avg, humidity_min = EXCLUDED.humidity_min,
+        humidity_max = EXCLUDED.humidity_max,
+        co2_avg = EXCLUDED.co2_avg, co2_min = EXCLUDED.co2_min, co2_max = EXCLUDED.co2_max,
+        humidifier_active_ratio = EXCLUDED.humidifier_active_ratio,
+        ventilation_active_ratio = EXCLUDED.ventilation_active_ratio,
+        leds_active_ratio = EXCLUDED.leds_active_ratio
+"""
+
+
+class RetentionManager:
+    """
+    Borne la taille des données brutes:
+      1. agrège les heures complètes dans sensor_data_hourly (conservée plus longtemps);
+      2. supprime les lignes brutes expirées, par partitions entières si la table est
+         partitionnée, sinon par lots bornés (transactions courtes, verrous brefs);
+      3. supprime les agrégats expirés.
+    """
+    def __init__(self, db_pool, raw_retention_days: int | None = None, rollup_retention_days: int | None = None,
+                 batch_size: int | None = None, pause_seconds: float | None = None, max_batches_per_run: int | None = None):
+        self.db_pool = db_pool
+        self.raw_retention_days = raw_retention_days or config.RETENTION_RAW_JOURS
+        self.rollup_retention_days = rollup_retention_days or config.RETENTION_ROLLUP_JOURS
+        self.batch_size = batch_size or config.RETENTION_BATCH_SIZE
+        self.pause_seconds = config.RETENTION_PAUSE_SECONDES if pause_seconds is None else pause_seconds
+        self.max_batches_per_run = max_batches_per_run or config.RETENTION_MAX_LOTS_PAR_PASSE
+        self.last_run_summary = None
+
+    def run_once(self, now: datetime | None = None) -> dict:
+        """Exécute une passe complète de rétention et retourne un résumé."""
+        now = now or datetime.now()
+        raw_cutoff = now - timedelta(days=self.raw_retention_days)
+        rollup_cutoff = now - timedelta(days=self.rollup_retention_days)
+        started = time.time()
+
+        summary = {"hours_rolled_up": self.rollup_complete_hours(now)}
+        summary["partitions_dropped"] = self.drop_expired_partitions(raw_cutoff)
+        summary["raw_rows_deleted"] = self.delete_in_batches(RAW_TABLE, "timestamp", raw_cutoff)
+        summary["rollup_rows_deleted"] = self.delete_in_batches(ROLLUP_TABLE, "hour", rollup_cutoff)
+        if summary["raw_rows_deleted"]:
+            self._vacuum(RAW_TABLE)
+        summary["duration_seconds"] = round(time.time() - started, 2)
+        self.last_run_summary = summary
+        retention_logger.info(f"Rétention: passe terminée {summary} (brut < {raw_cutoff:%Y-%m-%d}, agrégats < {rollup_cutoff:%Y-%m-%d}).")
+        return summary
+
+    def rollup_complete_hours(self, now: datetime) -> int:
+        """Agrège les heures complètes depuis le dernier agrégat (la dernière heure est recalculée)."""
+        current_hour = now.replace(minute=0, second=0, microsecond=0)
+        conn = self.db_pool.getconn()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(f"SELECT max(hour) FROM {ROLLUP_TABLE}")
+                last_hour = cur.fetchone()[0]
+                if last_hour is None:
+                    cur.execute(f"SELECT date_trunc('hour', min(timestamp)) FROM {RAW_TABLE}")
+                    last_hour = cur.fetchone()[0]
+                if last_hour is None or last_hour >= current_hour:
+                    conn.rollback()
+                    return 0
+                cur.execute(_ROLLUP_SQL, (last_hour, current_hour))
+                rolled = cur.rowcount
+            conn.commit()
+            return rolled
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.db_pool.putconn(conn)
+
+    def _list_partitions(self, cur) -> list[tuple[str, str]]:
+        cur.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s", (RAW_TABLE,))
+        return cur.fetchall()
+
+    def drop_expired_partitions(self, cutoff: datetime) -> list[str]:
+        """
+        Détache puis supprime les partitions dont la borne supérieure est <= cutoff.
+        Sans effet si sensor_data n'est pas partitionnée.
+        """
+        dropped = []
+        conn = self.db_pool.getconn()
+        try:
+            with conn.cursor() as cur:
+                partitions = self._list_partitions(cur)
+            conn.commit()
+            for name, bound in partitions:
+                match = _PARTITION_UPPER_BOUND_RE.search(bound or "")
+                if not match or datetime.fromisoformat(match.group(1)) > cutoff:
+                    continue
+                with conn.cursor() as cur:
+                    cur.execute(f'ALTER TABLE {RAW_TABLE} DETACH PARTITION "{name}"')
+                    cur.execute(f'DROP TABLE "{name}"')
+                conn.commit()
+                dropped.append(name)
+                retention_logger.info(f"Rétention: partition '{name}' (borne {match.group(1)}) supprimée.")
+            return dropped
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.db_pool.putconn(conn)
+
+    def delete_in_batches(self, table: str, time_column: str, cutoff: datetime) -> int:
+        """
+        Supprime les lignes antérieures à `cutoff` par lots de `batch_size`, une transaction
+        courte par lot et une pause entre les lots. S'arrête après `max_batches_per_run` lots;
+        le reste sera traité à la passe suivante.
+        """
+        total = 0
+        for _ in range(self.max_batches_per_run):
+            conn = self.db_pool.getconn()
+            try:
+                with conn.cursor() as cur:
+                    # (tableoid, ctid): identifie la ligne même si la table est partitionnée.
+                    cur.execute(
+                        f"DELETE FROM {table} WHERE (tableoid, ctid) IN ("
+                        f"SELECT tableoid, ctid FROM {table} WHERE {time_column} < %s LIMIT %s)",
+                        (cutoff, self.batch_size))
+                    deleted = cur.rowcount
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                self.db_pool.putconn(conn)
+            total += deleted
+            if deleted < self.batch_size:
+                break
+            if self.pause_seconds:
+                time.sleep(self.pause_seconds) # Laisse passer les insertions du contrôleur
+        return total
+
+    def _vacuum(self, table: str):
+        """VACUUM simple (pas FULL): rend l'espace réutilisable sans verrou exclusif."""
+        conn = self.db_pool.getconn()
+        previous_autocommit = conn.autocommit
+        try:
+            conn.autocommit = True # VACUUM ne peut pas s'exécuter dans une transaction
+            with conn.cursor() as cur:
+                cur.execute(f"VACUUM (ANALYZE) {table}")
+        except Exception as e:
+            retention_logger.warning(f"Rétention: VACUUM de '{table}' impossible: {e}")
+        finally:
+            # Rendue au pool partagé dans son mode d'origine, même après un échec
+            conn.autocommit = previous_autocommit
+            self.db_pool.putconn(conn)
@@ -0,0 +1,182 @@
+# tests/api/test_app.py
+import unittest
+from unittest.mock import MagicMock, patch
+import logging
+import subprocess
+import sys
+import threading
+
+from src import config
+from src.api.app import create_app, ControllerState
+
+logging.disable(logging.CRITICAL)
+
+ADMIN_HEADERS = {"Authorization": "Bearer secret"}
+
+
+class TestCreateApp(unittest.TestCase):
+
+    def setUp(self):
+        self.controller = MagicMock()
+        self.controller.get_status.return_value = {"temperature": 21.5, "sensor_read_ok": True}
+        self.app = create_app(ControllerState(self.controller), configure_logs=False)
+        self.client = self.app.test_client()
+
+    def test_routes_use_injected_state(self):
+        response = self.client.get('/status')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["temperature"], 21.5)
+        self.controller.get_status.assert_called_once()
+
+    def test_apps_are_independent(self):
+        other_controller = MagicMock()
+        other_controller.get_status.return_value = {"temperature": 12.0}
+        other_client = create_app(ControllerState(other_controller), configure_logs=False).test_client()
+        self.assertEqual(other_client.get('/status').get_json()["temperature"], 12.0)
+        self.assertEqual(self.client.get('/status').get_json()["temperature"], 21.5)
+
+    def test_unknown_actuator_action_is_bad_request(self):
+        self.controller.command_actuator.side_effect = ValueError("Action inconnue 'blink'.")
+        response = self.client.post('/control/leds', json={"action": "blink"})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.get_json()["success"])
+
+    def test_readiness_reports_startup_phase(self):
+        self.controller.get_startup_status.return_value = {"pret": False, "phase": "initialisation"}
+        self.assertEqual(self.client.get('/api/readiness').status_code, 503)
+        self.controller.get_startup_status.return_value = {"pret": True, "phase": "controle"}
+        response = self.client.get('/api/readiness')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["zones"][0]["phase"], "controle")
+
+    def test_settings_etag_and_conditional_update(self):
+        from src.core.settings_history import SettingsVersionConflict
+        self.controller.get_versioned_settings.return_value = {"version": 7, "settings": {"SEUIL_CO2_MAX": 1200.0}}
+        response = self.client.get('/api/settings')
+        self.assertEqual(response.headers['ETag'], '"7"')
+        self.assertEqual(response.get_json(), {"SEUIL_CO2_MAX": 1200.0})
+
+        self.controller.update_settings.return_value = True
+        self.assertEqual(self.client.post('/api/settings', json={"SEUIL_CO2_MAX": 900}, headers={'If-Match': '"7"'}).status_code, 200)
+        self.controller.update_settings.assert_called_with({"SEUIL_CO2_MAX": 900}, expected_version=7)
+        self.client.post('/api/settings', json={"SEUIL_CO2_MAX": 900}) # Sans If-Match: inconditionnelle
+        self.controller.update_settings.assert_called_with({"SEUIL_CO2_MAX": 900}, expected_version=None)
+
+        self.controller.update_settings.side_effect = SettingsVersionConflict(7, 8)
+        response = self.client.post('/api/settings', json={"SEUIL_CO2_MAX": 950}, headers={'If-Match': '"7"'})
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual((response.get_json()["version"], response.headers['ETag']), (8, '"8"'))
+
+    def test_settings_history_queries(self):
+        self.controller.get_settings_at.return_value = None
+        self.assertEqual(self.client.get('/api/settings/history?a=10').status_code, 404)
+        self.assertEqual(self.client.get('/api/settings/history?debut=20&fin=10').status_code, 400)
+        self.controller.get_settings_intervals.return_value = [{"version": 1}]
+        response = self.client.get('/api/settings/history?debut=10&fin=20')
+        self.assertEqual(response.get_json(), {"intervalles": [{"version": 1}]})
+        self.controller.get_settings_intervals.assert_called_once_with(10.0, 20.0)
+        self.controller.get_settings_history.return_value = []
+        self.client.get('/api/settings/history?depuis_version=3&limite=5')
+        self.controller.get_settings_history.assert_called_once_with(3, 5)
+
+    def test_metrics_exposition(self):
+        self.client.get('/status')
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain; version=0.0.4"))
+        body = response.get_data(as_text=True)
+        self.assertIn("# TYPE serre_api_requete_secondes histogram", body)
+        self.assertIn('serre_api_requete_secondes_count{methode="GET",route="/status",code="200"}', body)
+
+    def test_metrics_include_daemon_metrics_in_remote_mode(self):
+        ipc_client = MagicMock()
+        ipc_client.call.return_value = "serre_settings_lectures_total 42\n"
+        client = create_app(ControllerState(None, ipc_client=ipc_client), configure_logs=False).test_client()
+        self.assertIn("serre_settings_lectures_total 42", client.get('/metrics').get_data(as_text=True))
+        ipc_client.call.assert_called_with("metrics")
+
+    def test_ingest_requires_configured_token(self):
+        with patch.object(config, 'INGEST_TOKEN', ''):
+            self.assertEqual(self.client.post('/api/ingest', data=b"{}").status_code, 403)
+        with patch.object(config, 'INGEST_TOKEN', 'jeton'):
+            self.assertEqual(self.client.post('/api/ingest', data=b"{}").status_code, 401)
+            response = self.client.post('/api/ingest', data=b"{}", headers={"Authorization": "Bearer jeton"})
+            self.assertEqual(response.status_code, 400) # Authentifié: lot vide refusé à la validation
+
+    def test_admin_routes_require_configured_token(self):
+        with patch.object(config, 'ADMIN_TOKEN', ''):
+            self.assertEqual(self.client.post('/api/admin/memoire/demarrer').status_code, 403)
+        with patch.object(config, 'ADMIN_TOKEN', 'secret'):
+            self.assertEqual(self.client.post('/api/admin/memoire/demarrer').status_code, 401)
+            self.assertEqual(self.client.post('/api/admin/memoire/demarrer', headers={"Authorization": "Bearer faux"}).status_code, 401)
+
+    @patch.object(config, 'ADMIN_TOKEN', 'secret')
+    def test_admin_profile_returns_collapsed_stacks(self):
+        stop = threading.Event()
+        thread = threading.Thread(target=stop.wait, name="SerreControllerLogicThread")
+        thread.start()
+        try:
+            response = self.client.post('/api/admin/profil?duree=0.1&frequence=100&threads=SerreController',
+                                        headers=ADMIN_HEADERS)
+        finally:
+            stop.set()
+            thread.join()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain"))
+        self.assertTrue(response.get_data(as_text=True).startswith("SerreControllerLogicThread;"))
+        self.assertEqual(self.client.post('/api/admin/profil?duree=3600', headers=ADMIN_HEADERS).status_code, 400)
+
+    @patch.object(config, 'ADMIN_TOKEN', 'secret')
+    def test_admin_memory_requires_started_tracemalloc(self):
+        self.assertEqual(self.client.post('/api/admin/memoire/instantane', headers=ADMIN_HEADERS).status_code, 409)
+        self.assertEqual(self.client.post('/api/admin/memoire/purger', headers=ADMIN_HEADERS).status_code, 404)
+
+    def test_admin_profile_runs_in_daemon(self):
+        ipc_client = MagicMock()
+        ipc_client.socket_path = "/tmp/inexistant.sock"
+        client = create_app(ControllerState(None, ipc_client=ipc_client), configure_logs=False).test_client()
+        with patch('src.ipc.client.ControllerClient') as mock_client_class:
+            mock_client_class.return_value.call.return_value = {"piles": {"SerreControllerLogicThread;run 3": 3}}
+            with patch.object(config, 'ADMIN_TOKEN', 'secret'):
+                response = client.post('/api/admin/profil?duree=2', headers=ADMIN_HEADERS)
+        mock_client_class.assert_called_once_with("/tmp/inexistant.sock", timeout=2 + config.IPC_TIMEOUT_SECONDS)
+        mock_client_class.return_value.call.assert_called_once_with("profile", duration=2.0, frequency=None, threads=None)
+        mock_client_class.return_value.close.assert_called_once()
+        self.assertIn("SerreControllerLogicThread", response.get_data(as_text=True))
+
+    def test_loop_timing_route(self):
+        self.controller.get_loop_timing.return_value = {"logique": {"cycles": 3, "echeances_manquees": 1}}
+        response = self.client.get('/api/temporisation?cycles=5')
+        self.assertEqual(response.get_json()["logique"]["echeances_manquees"], 1)
+        self.controller.get_loop_timing.assert_called_once_with(5)
+
+    def test_export_database_error_is_503_before_streaming(self):
+        with patch('src.utils.export.iter_sensor_row_chunks', side_effect=OSError("connexion refusée")):
+            response = self.client.get('/api/export?start=2024-05-01&format=csv')
+        self.assertEqual(response.status_code, 503)
+
+    def test_single_zone_listing(self):
+        self.assertEqual(list(ControllerState(self.controller).zones()), [config.GREENHOUSE_ID])
+
+
+class TestLazyImports(unittest.TestCase):
+    """Chaque vérification dans un interpréteur neuf: sys.modules du processus de test est déjà peuplé."""
+
+    def loaded_modules(self, statement: str) -> set:
+        code = f"import sys; {statement}; print(' '.join(sys.modules))"
+        completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        return set(completed.stdout.split())
+
+    def test_controller_import_does_not_load_db_or_web_stack(self):
+        loaded = self.loaded_modules("import src.core.zones, src.ipc.server")
+        for heavy in ("psycopg2", "flask", "board", "lgpio"):
+            self.assertNotIn(heavy, loaded)
+
+    def test_app_module_import_builds_nothing(self):
+        loaded = self.loaded_modules("import src.api.app")
+        self.assertNotIn("src.core.serre_logic", loaded)
+        self.assertNotIn("psycopg2", loaded)
+
+
+if __name__ == '__main__':
+    unittest.main()
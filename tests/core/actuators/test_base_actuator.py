@@ -0,0 +1,85 @@
+# tests/core/actuators/test_base_actuator.py
+import unittest
+from unittest.mock import MagicMock, patch
+import logging
+
+from src.core.actuators.base_actuator import BaseActuator
+
+logging.disable(logging.CRITICAL)
+
+
+class _DummyActuator(BaseActuator):
+    """Actionneur minimal: l'état automatique souhaité est fourni par le test."""
+    def __init__(self):
+        super().__init__(MagicMock(), "dummy")
+        self.wanted = False
+
+    def _get_desired_automatic_state(self, current_sensor_data: dict) -> bool:
+        return self.wanted
+
+    def _control_hardware(self):
+        pass
+
+
+class TestAntiChatter(unittest.TestCase):
+
+    def setUp(self):
+        self.actuator = _DummyActuator()
+        self.actuator.min_on_seconds = 60
+        self.actuator.min_off_seconds = 30
+        self.actuator.max_switches_per_hour = 3
+
+    def _update_at(self, timestamp, wanted):
+        self.actuator.wanted = wanted
+        with patch('time.time', return_value=timestamp):
+            return self.actuator.update_state({})
+
+    def test_first_switch_is_never_delayed(self):
+        self.assertTrue(self._update_at(1000.0, True))
+
+    def test_minimum_on_time_delays_switch_off(self):
+        self._update_at(1000.0, True)
+        self.assertFalse(self._update_at(1030.0, False))
+        self.assertTrue(self.actuator.current_state)
+        self.assertTrue(self._update_at(1060.0, False))
+        self.assertEqual(self.actuator.blocked_counts["min_on"], 1)
+
+    def test_minimum_off_time_delays_switch_on(self):
+        self._update_at(1000.0, True)
+        self._update_at(1100.0, False)
+        self.assertFalse(self._update_at(1110.0, True))
+        self.assertTrue(self._update_at(1130.0, True))
+
+    def test_switch_limit_refuses_switch_on_but_allows_switch_off(self):
+        self._update_at(0.0, True)
+        self._update_at(100.0, False)
+        self._update_at(200.0, True)
+        self._update_at(300.0, False) # 4e commutation: l'arrêt reste permis
+        self.assertFalse(self._update_at(400.0, True))
+        self.assertEqual(self.actuator.blocked_counts["max_switches"], 1)
+        self.assertTrue(self._update_at(3700.0, True)) # Les plus anciennes sont sorties de l'heure glissante
+
+    def test_manual_mode_bypasses_anti_chatter(self):
+        self._update_at(1000.0, True)
+        self.actuator.set_manual_mode(True, False)
+        self.assertTrue(self._update_at(1001.0, True))
+        self.assertFalse(self.actuator.current_state)
+
+    def test_status_exposes_counters(self):
+        self._update_at(1000.0, True)
+        self._update_at(1010.0, False)
+        with patch('time.time', return_value=1010.0):
+            status = self.actuator.get_status()["anti_chatter"]
+        self.assertEqual(status["switch_count"], 1)
+        self.assertEqual(status["switches_last_hour"], 1)
+        self.assertEqual(status["blocked"]["min_on"], 1)
+
+    def test_hysteresis_holds_state_inside_band(self):
+        self.assertTrue(self.actuator._hysteresis_state(1250.0, 1200.0, 1100.0))
+        self.actuator.current_state = True
+        self.assertTrue(self.actuator._hysteresis_state(1150.0, 1200.0, 1100.0))
+        self.assertFalse(self.actuator._hysteresis_state(1050.0, 1200.0, 1100.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+# tests/core/test_checkpoint.py
+import unittest
+from unittest.mock import MagicMock, patch
+import json
+import os
+import shutil
+import tempfile
+import logging
+
+from src import config
+from src.core import checkpoint as checkpoint_module
+from src.core.checkpoint import ActuatorCheckpoint, checkpoint_path, relay_states
+from src.core.serre_logic import SerreController
+from src.hardware_interface.mock_hardware import MockHardware
+
+logging.disable(logging.CRITICAL)
+
+
+class TestActuatorCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.path = os.path.join(self.tmp_dir, "etat.json")
+
+    def test_round_trip(self):
+        actuators = {"leds": {"etat": True, "on_depuis": 123.0}, "humidifier": {"etat": False}}
+        ActuatorCheckpoint(self.path).save(actuators)
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+        self.assertEqual(ActuatorCheckpoint(self.path).load(), actuators)
+        self.assertEqual(relay_states(actuators), {"leds": True, "humidifier": False})
+
+    def test_unchanged_state_is_not_rewritten(self):
+        checkpoint = ActuatorCheckpoint(self.path)
+        checkpoint.save({"leds": {"etat": True}})
+        with patch('src.core.checkpoint.os.replace') as mock_replace:
+            checkpoint.save({"leds": {"etat": True}})
+            mock_replace.assert_not_called()
+            checkpoint.save({"leds": {"etat": False}})
+            mock_replace.assert_called_once()
+
+    def test_other_boot_corrupt_or_missing_means_cold_start(self):
+        checkpoint = ActuatorCheckpoint(self.path)
+        self.assertIsNone(checkpoint.load())
+        with patch.object(checkpoint_module, 'current_boot_id', return_value="boot-1"):
+            checkpoint.save({"leds": {"etat": True}})
+        with patch.object(checkpoint_module, 'current_boot_id', return_value="boot-2"):
+            self.assertIsNone(checkpoint.load())
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write("{tronqué")
+        self.assertIsNone(checkpoint.load())
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({"version": 0, "actionneurs": {"leds": {"etat": True}}}, f)
+        self.assertIsNone(checkpoint.load())
+
+    def test_zone_path(self):
+        with patch.object(config, 'REPRISE_A_CHAUD_FICHIER', os.path.join("data", "etat.json")):
+            self.assertEqual(checkpoint_path(), os.path.join("data", "etat.json"))
+            self.assertEqual(checkpoint_path("nord"), os.path.join("data", "etat_nord.json"))
+
+
+class TestWarmRestart(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.path = os.path.join(self.tmp_dir, "etat.json")
+        patcher = patch.object(config, 'RETENTION_ENABLED', False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _controller(self):
+        restored = ActuatorCheckpoint(self.path).load()
+        controller = SerreController(hardware=MockHardware(initial_states=relay_states(restored)),
+                                     db_manager=MagicMock(), settings_file=os.path.join(self.tmp_dir, "settings.json"),
+                                     autostart=False, checkpoint_file=self.path)
+        self.addCleanup(controller.shutdown)
+        return controller
+
+    def test_states_and_timers_survive_warm_restart(self):
+        first = self._controller()
+        first.led_ctrl.set_manual_mode(True, True)
+        first.led_ctrl.update_state({})
+        on_since = first.led_ctrl.on_time_start
+        self.assertIsNotNone(on_since)
+        first.shutdown(keep_outputs=True)
+        self.assertTrue(os.path.exists(self.path))
+
+        second = self._controller()
+        self.assertTrue(second.hardware._leds_on) # Sortie réclamée dans son état
+        self.assertTrue(second.led_ctrl.current_state)
+        self.assertTrue(second.led_ctrl.is_manual_mode)
+        self.assertEqual(second.led_ctrl.on_time_start, on_since) # Durée ON non remise à zéro
+        self.assertEqual(second.led_ctrl.switch_count, first.led_ctrl.switch_count)
+        self.assertFalse(second.humidifier_ctrl.current_state)
+
+    def test_normal_shutdown_discards_checkpoint(self):
+        controller = self._controller()
+        controller.led_ctrl.set_manual_mode(True, True)
+        controller.led_ctrl.update_state({})
+        self.assertTrue(ActuatorCheckpoint(self.path).load()["leds"]["etat"])
+        controller.shutdown()
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
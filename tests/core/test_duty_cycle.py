@@ -0,0 +1,81 @@
+# tests/core/test_duty_cycle.py
+import unittest
+from unittest.mock import MagicMock, patch
+from datetime import datetime
+import logging
+
+from src.core.duty_cycle import PIController, DutyCycleRegulator
+from src.core.actuators.humidifier_controller import HumidifierController
+
+logging.disable(logging.CRITICAL)
+
+
+class TestPIController(unittest.TestCase):
+
+    def test_output_is_clamped_and_integral_does_not_wind_up(self):
+        pi = PIController(kp=1.0, ki=0.1)
+        for _ in range(100):
+            self.assertEqual(pi.update(10.0, 60.0), 1.0)
+        self.assertLessEqual(pi.integral, 1.0) # Intégrale gelée pendant la saturation
+        self.assertEqual(pi.update(-1.0, 60.0), 0.0)
+
+    def test_integral_removes_steady_state_error(self):
+        pi = PIController(kp=0.0, ki=0.01)
+        self.assertAlmostEqual(pi.update(1.0, 10.0), 0.1)
+        self.assertAlmostEqual(pi.update(1.0, 10.0), 0.2)
+
+
+class TestDutyCycleRegulator(unittest.TestCase):
+
+    def test_on_time_is_computed_once_per_period(self):
+        regulator = DutyCycleRegulator(kp=0.1, ki=0.0, period_seconds=600, min_pulse_seconds=30)
+        self.assertEqual(regulator.update(5.0, 0.0), 300.0) # 50% de 600s
+        self.assertEqual(regulator.update(-50.0, 120.0), 180.0) # Même période: durée inchangée
+        self.assertEqual(regulator.update(5.0, 420.0), 0.0)
+        self.assertEqual(regulator.update(2.0, 600.0), 120.0) # Nouvelle période
+
+    def test_short_pulses_and_short_rests_are_suppressed(self):
+        regulator = DutyCycleRegulator(kp=0.01, ki=0.0, period_seconds=600, min_pulse_seconds=30)
+        self.assertEqual(regulator.update(0.4, 0.0), 0.0) # 24s < 30s: pas de marche
+        regulator = DutyCycleRegulator(kp=0.1, ki=0.0, period_seconds=600, min_pulse_seconds=30)
+        self.assertEqual(regulator.update(9.8, 0.0), 600.0) # Arrêt de 12s: marche continue
+        self.assertTrue(regulator.is_continuous)
+
+    def test_from_config_returns_none_when_inactive(self):
+        self.assertIsNone(DutyCycleRegulator.from_config({"actif": False, "kp": 1, "ki": 0}))
+        self.assertIsNotNone(DutyCycleRegulator.from_config({"actif": True, "kp": 1, "ki": 0}))
+
+
+class TestHumidifierDutyCycleMode(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_hardware = MagicMock()
+        self.mock_serre_controller = MagicMock()
+        self.mock_serre_controller.get_setting.side_effect = lambda key, default_value: default_value
+        self.controller = HumidifierController(self.mock_hardware, self.mock_serre_controller)
+        self.controller.duty_cycle = DutyCycleRegulator(kp=0.1, ki=0.0, period_seconds=600, min_pulse_seconds=30)
+
+    @patch('src.core.actuators.humidifier_controller.datetime')
+    def test_pulse_turns_humidifier_on_then_off(self, mock_datetime):
+        mock_datetime.now.return_value = datetime(2024, 5, 19, 10, 0, 0)
+        with patch.object(self.controller, '_start_pulse') as mock_start_pulse:
+            changed = self.controller.update_state({'humidite': 76.95}) # 3% sous la consigne (79.95)
+        self.assertTrue(changed)
+        self.assertTrue(self.controller.current_state)
+        self.mock_hardware.activer_humidificateur.assert_called_once()
+        self.assertAlmostEqual(mock_start_pulse.call_args[0][0], 180.0, delta=1.0)
+
+        self.controller._end_pulse()
+        self.assertFalse(self.controller.current_state)
+        self.mock_hardware.desactiver_humidificateur.assert_called_once()
+
+    @patch('src.core.actuators.humidifier_controller.datetime')
+    def test_outside_operation_window_falls_back_to_on_off_logic(self, mock_datetime):
+        mock_datetime.now.return_value = datetime(2024, 5, 19, 23, 0, 0)
+        self.controller.update_state({'humidite': 60.0})
+        self.assertFalse(self.controller.current_state)
+        self.assertIsNone(self.controller.duty_cycle.last_error)
+
+
+if __name__ == '__main__':
+    unittest.main()
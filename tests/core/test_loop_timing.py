@@ -0,0 +1,82 @@
+# tests/core/test_loop_timing.py
+import unittest
+from unittest.mock import patch
+import os
+import threading
+import logging
+
+from src.core.loop_timing import LoopTimingTracker, apply_thread_scheduling, parse_cpu_list
+
+logging.disable(logging.CRITICAL)
+
+
+class TestLoopTimingTracker(unittest.TestCase):
+
+    def test_percentiles_and_deadline_misses(self):
+        tracker = LoopTimingTracker("logique", capacity=100)
+        for i in range(100):
+            planned = 10.0 * i
+            # Retard de i ms; les 5 derniers cycles (0.5 s de retard + 9.6 s) dépassent leur période de 10 s
+            duration = 9.6 if i >= 95 else 1.0
+            lateness = 0.5 if i >= 95 else i / 1000
+            missed = tracker.record(planned, planned + lateness, duration, 10.0)
+            self.assertEqual(missed, i >= 95)
+        stats = tracker.get_stats()
+        self.assertEqual((stats["cycles"], stats["echeances_manquees"], stats["fenetre_cycles"]), (100, 5, 100))
+        self.assertAlmostEqual(stats["retard_demarrage"]["p50"], 0.049)
+        self.assertAlmostEqual(stats["retard_demarrage"]["p99"], 0.5)
+        self.assertEqual(stats["duree"]["p90"], 1.0)
+        self.assertEqual(stats["duree"]["max"], 9.6)
+
+    def test_ring_buffer_keeps_last_cycles(self):
+        tracker = LoopTimingTracker("acquisition", capacity=4)
+        self.assertIsNone(tracker.get_stats()["duree"]["p50"])
+        for i in range(10):
+            tracker.record(float(i), i + 0.01, 0.1 * i, 1.0)
+        self.assertEqual(tracker.get_stats()["fenetre_cycles"], 4)
+        self.assertEqual(tracker.get_stats()["cycles"], 10)
+        recent = tracker.recent(3)
+        self.assertEqual([cycle["debut_prevu"] for cycle in recent], [7.0, 8.0, 9.0])
+        self.assertAlmostEqual(recent[-1]["debut_effectif"], 9.01)
+        self.assertEqual(len(tracker.recent(50)), 4)
+
+    def test_early_start_counts_as_no_delay(self):
+        tracker = LoopTimingTracker("acquisition", capacity=4)
+        tracker.record(5.0, 4.9, 0.1, 1.0)
+        self.assertEqual(tracker.get_stats()["retard_demarrage"]["max"], 0.0)
+
+
+class TestThreadScheduling(unittest.TestCase):
+
+    def test_parse_cpu_list(self):
+        self.assertEqual(parse_cpu_list(""), set())
+        self.assertEqual(parse_cpu_list("0-1, 3"), {0, 1, 3})
+
+    def test_defaults_change_nothing(self):
+        with patch('src.config.BOUCLES_CPU', ''), patch('src.config.BOUCLES_PRIORITE_FIFO', 0):
+            self.assertEqual(apply_thread_scheduling("Test"), {"cpus": None, "priorite_fifo": None})
+
+    @unittest.skipUnless(hasattr(os, 'sched_setaffinity'), "Affinité CPU propre à Linux")
+    def test_affinity_applies_to_calling_thread_only(self):
+        allowed = os.sched_getaffinity(0)
+        cpu = min(allowed)
+        result = {}
+
+        def worker():
+            result["applied"] = apply_thread_scheduling("Test", cpus={cpu}, fifo_priority=0)
+            result["affinity"] = os.sched_getaffinity(0)
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        self.assertEqual(result["applied"]["cpus"], [cpu])
+        self.assertEqual(result["affinity"], {cpu})
+        self.assertEqual(os.sched_getaffinity(0), allowed)
+
+    def test_refused_fifo_is_ignored(self):
+        with patch('os.sched_setscheduler', side_effect=PermissionError("Operation not permitted"), create=True), \
+             patch('os.sched_param', create=True), patch('os.SCHED_FIFO', 1, create=True):
+            self.assertIsNone(apply_thread_scheduling("Test", cpus=set(), fifo_priority=50)["priorite_fifo"])
+
+
+if __name__ == '__main__':
+    unittest.main()
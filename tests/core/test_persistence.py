@@ -0,0 +1,111 @@
+# tests/core/test_persistence.py
+import unittest
+from unittest.mock import MagicMock, patch
+import json
+import os
+import shutil
+import tempfile
+import threading
+import logging
+
+from src import config
+from src.core.persistence import DebouncedJsonWriter, write_json_atomic
+from src.core.serre_logic import SerreController
+from src.hardware_interface.mock_hardware import MockHardware
+
+logging.disable(logging.CRITICAL)
+
+
+def read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class TestWriteJsonAtomic(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.path = os.path.join(self.tmp_dir, "sous_dossier", "settings.json")
+
+    def test_write_and_replace(self):
+        write_json_atomic(self.path, {"a": 1})
+        write_json_atomic(self.path, {"a": 2})
+        self.assertEqual(read_json(self.path), {"a": 2})
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["settings.json"])
+
+    def test_failed_write_keeps_previous_file(self):
+        write_json_atomic(self.path, {"a": 1})
+        with self.assertRaises(TypeError):
+            write_json_atomic(self.path, {"a": object()}) # Échec en cours de sérialisation
+        self.assertEqual(read_json(self.path), {"a": 1})
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["settings.json"])
+
+
+class TestDebouncedJsonWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.path = os.path.join(self.tmp_dir, "settings.json")
+        self.state = {"valeur": 0}
+
+    def test_burst_is_coalesced_into_one_write(self):
+        written = threading.Event()
+        writer = DebouncedJsonWriter(self.path, lambda: dict(self.state), delay_seconds=0.1)
+        with patch('src.core.persistence.write_json_atomic', side_effect=lambda path, data: written.set()) as mock_write:
+            for i in range(20):
+                self.state["valeur"] = i
+                writer.schedule()
+            mock_write.assert_not_called() # Rien n'est écrit dans le thread appelant
+            self.assertTrue(written.wait(2))
+            mock_write.assert_called_once_with(self.path, {"valeur": 19})
+        self.assertEqual((writer.requests, writer.writes), (20, 1))
+
+    def test_flush_writes_pending_state_immediately(self):
+        writer = DebouncedJsonWriter(self.path, lambda: dict(self.state), delay_seconds=60)
+        self.assertTrue(writer.flush()) # Rien en attente
+        self.assertFalse(os.path.exists(self.path))
+        self.state["valeur"] = 5
+        writer.schedule()
+        self.assertTrue(writer.flush())
+        self.assertEqual(read_json(self.path), {"valeur": 5})
+        self.assertEqual(writer.writes, 1)
+
+    def test_failed_write_is_reported(self):
+        writer = DebouncedJsonWriter(self.path, lambda: dict(self.state), delay_seconds=0)
+        with patch('src.core.persistence.write_json_atomic', side_effect=OSError("disque plein")):
+            writer.schedule()
+        self.assertEqual(writer.last_error, "disque plein")
+        writer.schedule() # Nouvel essai
+        self.assertIsNone(writer.last_error)
+        self.assertEqual(read_json(self.path), {"valeur": 0})
+
+
+class TestControllerSettingsPersistence(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.path = os.path.join(self.tmp_dir, "settings.json")
+        for name, value in (('RETENTION_ENABLED', False), ('REPRISE_A_CHAUD', False),
+                            ('SETTINGS_SURVEILLANCE', False), ('SETTINGS_ECRITURE_DELAI_SECONDES', 60)):
+            patcher = patch.object(config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_update_returns_before_write_and_shutdown_flushes(self):
+        controller = SerreController(hardware=MockHardware(), db_manager=MagicMock(),
+                                     settings_file=self.path, autostart=False)
+        self.addCleanup(controller.shutdown)
+        self.assertTrue(controller.update_settings({config.KEY_SEUIL_CO2_MAX: 900}))
+        self.assertTrue(controller.update_settings({config.KEY_SEUIL_CO2_MAX: 950}))
+        self.assertEqual(read_json(self.path)[config.KEY_SEUIL_CO2_MAX],
+                         config.DEFAULT_SETTINGS[config.KEY_SEUIL_CO2_MAX]) # Écriture encore en attente
+        controller.shutdown()
+        self.assertEqual(read_json(self.path)[config.KEY_SEUIL_CO2_MAX], 950.0)
+        self.assertEqual(controller._settings_writer.writes, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+# tests/core/test_rules.py
+import unittest
+from datetime import datetime
+import logging
+
+from src.core.rules import RuleContext, RuleEngine, compile_condition
+
+logging.disable(logging.CRITICAL)
+
+SETTINGS = {"SEUIL_CO2_MAX": 1200.0, "HEURE_DEBUT_JOUR_OPERATION": 6, "HEURE_FIN_JOUR_OPERATION": 20}
+NOON = datetime(2024, 5, 19, 12, 0)
+
+
+def _ctx(sensors, moment=NOON, states=None):
+    return RuleContext(sensors, moment, states or {})
+
+
+class TestRuleConditions(unittest.TestCase):
+
+    def setUp(self):
+        self.settings = dict(SETTINGS)
+        self.get_setting = lambda key, default=None: self.settings.get(key, default)
+
+    def test_sensor_threshold_from_setting_with_offset(self):
+        condition = compile_condition(
+            {"capteur": "co2", "op": "<", "valeur": {"setting": "SEUIL_CO2_MAX", "decalage": -100}}, self.get_setting)
+        self.assertTrue(condition(_ctx({"co2": 1099.0})))
+        self.assertFalse(condition(_ctx({"co2": 1100.0})))
+        self.assertFalse(condition(_ctx({"co2": None}))) # Capteur indisponible
+
+    def test_time_windows(self):
+        by_text = compile_condition({"plage": "08:00-12:00,14:00-20:00"}, self.get_setting)
+        self.assertFalse(by_text(_ctx({}, NOON)))
+        self.assertTrue(by_text(_ctx({}, datetime(2024, 5, 19, 11, 59))))
+        self.assertTrue(by_text(_ctx({}, datetime(2024, 5, 19, 14, 0))))
+        by_hours = compile_condition({"plage_heures": ["HEURE_DEBUT_JOUR_OPERATION", "HEURE_FIN_JOUR_OPERATION"]},
+                                     self.get_setting)
+        self.assertTrue(by_hours(_ctx({}, NOON)))
+        self.assertFalse(by_hours(_ctx({}, datetime(2024, 5, 19, 21, 0))))
+        overnight = compile_condition({"plage": "22:00-06:00"}, self.get_setting)
+        self.assertTrue(overnight(_ctx({}, datetime(2024, 5, 19, 23, 0))))
+        self.assertFalse(overnight(_ctx({}, NOON)))
+
+    def test_combinators_and_actuator_state(self):
+        condition = compile_condition({"tous": [
+            {"actionneur": "humidifier", "etat": False},
+            {"un_parmi": [{"capteur": "temperature", "op": ">", "valeur": 28},
+                          {"capteur": "humidite", "op": ">=", "valeur": 90},
+                          {"capteur": "co2", "op": ">", "valeur": 1500},
+                          {"non": {"capteur": "co2", "op": ">", "valeur": 0}}]},
+        ]}, self.get_setting)
+        self.assertTrue(condition(_ctx({"temperature": 30, "co2": 400}, states={"humidifier": False})))
+        self.assertFalse(condition(_ctx({"temperature": 30, "co2": 400}, states={"humidifier": True})))
+        self.assertFalse(condition(_ctx({"temperature": 20, "humidite": 50, "co2": 400})))
+        self.assertTrue(condition(_ctx({"temperature": 20, "humidite": 50, "co2": 0})))
+
+    def test_invalid_conditions_are_rejected(self):
+        for spec in ({"capteur": "co2", "op": "=>", "valeur": 1}, {"inconnu": 1}, {"tous": []},
+                     {"capteur": "co2", "op": ">", "valeur": {"decalage": 1}}, {"plage": "8h-12h"}):
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                compile_condition(spec, self.get_setting)
+
+
+class TestRuleEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.settings = dict(SETTINGS)
+        self.get_setting = lambda key, default=None: self.settings.get(key, default)
+        self.rules = {
+            "ventilation": {
+                "on_si": {"capteur": "co2", "op": ">", "valeur": {"setting": "SEUIL_CO2_MAX"}},
+                "off_si": {"capteur": "co2", "op": "<", "valeur": {"setting": "SEUIL_CO2_MAX", "decalage": -100}},
+            },
+            "leds": {"on_si": {"plage": "08:00-20:00"}},
+        }
+
+    def test_on_off_conditions_give_hysteresis(self):
+        engine = RuleEngine(self.rules, self.get_setting)
+        self.assertTrue(engine.evaluate("ventilation", _ctx({"co2": 1250}), False))
+        self.assertTrue(engine.evaluate("ventilation", _ctx({"co2": 1150}), True)) # Dans la bande: maintenu
+        self.assertFalse(engine.evaluate("ventilation", _ctx({"co2": 1150}), False))
+        self.assertFalse(engine.evaluate("ventilation", _ctx({"co2": 1050}), True))
+        self.assertFalse(engine.evaluate("leds", _ctx({}, datetime(2024, 5, 19, 21, 0)), True)) # Sans off_si
+
+    def test_recompile_picks_up_new_settings(self):
+        engine = RuleEngine(self.rules, self.get_setting)
+        self.settings["SEUIL_CO2_MAX"] = 1000.0
+        self.assertFalse(engine.evaluate("ventilation", _ctx({"co2": 1100}), False)) # Valeur figée
+        engine.compile()
+        self.assertTrue(engine.evaluate("ventilation", _ctx({"co2": 1100}), False))
+
+    def test_invalid_rule_keeps_previous_version(self):
+        engine = RuleEngine(self.rules, self.get_setting)
+        self.settings["SEUIL_CO2_MAX"] = "pas un nombre"
+        engine.compile()
+        self.assertIn("ventilation", engine.errors)
+        self.assertTrue(engine.has_rule("ventilation"))
+        self.assertTrue(engine.evaluate("ventilation", _ctx({"co2": 1250}), False))
+
+        broken = RuleEngine({"humidifier": {"off_si": {"capteur": "humidite", "op": ">", "valeur": 90}}}, self.get_setting)
+        self.assertFalse(broken.has_rule("humidifier"))
+        self.assertIn("humidifier", broken.errors)
+
+    def test_evaluate_all_uses_context_states(self):
+        engine = RuleEngine(self.rules, self.get_setting)
+        results = engine.evaluate_all(_ctx({"co2": 1150}, NOON, {"ventilation": True, "leds": False}))
+        self.assertEqual(results, {"ventilation": True, "leds": True})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+# tests/core/test_sampling_policy.py
+import unittest
+import logging
+from datetime import datetime
+from unittest.mock import patch
+
+from src import config
+from src.core.sampling_policy import AdaptiveSamplingPolicy
+
+logging.disable(logging.CRITICAL)
+
+DAY = datetime(2024, 5, 19, 12, 0)
+NIGHT = datetime(2024, 5, 19, 23, 30)
+
+
+class TestAdaptiveSamplingPolicy(unittest.TestCase):
+
+    def setUp(self):
+        settings = dict(config.DEFAULT_SETTINGS) # Humidité ON 75 / OFF 84.9, CO2 max 1200, opération 8h-22h
+        self.policy = AdaptiveSamplingPolicy(
+            lambda key, default=None: settings.get(key, default),
+            min_interval=5, max_interval=120, margins={"humidite": 3.0, "co2": 150.0}, horizon_seconds=300)
+
+    def test_stable_conditions_use_slow_rate(self):
+        interval = self.policy.next_interval(0.0, {"humidite": 80.0, "co2": 600.0}, now=DAY)
+        self.assertEqual(interval, 120)
+
+    def test_near_threshold_samples_faster(self):
+        interval = self.policy.next_interval(0.0, {"humidite": 75.5, "co2": 600.0}, now=DAY)
+        self.assertLess(interval, 30)
+        self.assertGreaterEqual(interval, 5)
+
+    def test_trend_toward_threshold_samples_faster(self):
+        self.policy.next_interval(0.0, {"humidite": 80.0, "co2": 900.0}, now=DAY)
+        # +1 ppm/s: le seuil de 1200 ppm est atteint dans ~270s, sous l'horizon de 300s
+        interval = self.policy.next_interval(30.0, {"humidite": 80.0, "co2": 930.0}, now=DAY)
+        self.assertLess(interval, 120)
+
+    def test_outside_operation_window_uses_max_interval(self):
+        interval = self.policy.next_interval(0.0, {"humidite": 75.0, "co2": 1200.0}, now=NIGHT)
+        self.assertEqual(interval, 120)
+
+    def test_config_max_interval_is_capped_at_logic_interval(self):
+        with patch.object(config, 'ECHANTILLONNAGE_INTERVALLE_MAX_SECONDES', 120), \
+             patch.object(config, 'INTERVALLE_LECTURE_CAPTEURS_SECONDES', 60):
+            policy = AdaptiveSamplingPolicy(lambda key, default=None: default)
+        self.assertEqual(policy.max_interval, 60)
+
+    def test_invalid_reading_retries_quickly_and_metrics_are_counted(self):
+        self.assertEqual(self.policy.next_interval(0.0, None, now=DAY), 5)
+        self.policy.next_interval(5.0, {"humidite": 80.0, "co2": 600.0}, now=DAY)
+        metrics = self.policy.get_metrics()
+        self.assertEqual(metrics["samples"], 2)
+        self.assertEqual(metrics["fast_samples"], 1)
+        self.assertEqual(metrics["slow_samples"], 1)
+        self.assertEqual(metrics["mean_interval_seconds"], 62.5)
+
+    def test_operation_windows_setting_matches_actuators(self):
+        settings = dict(config.DEFAULT_SETTINGS)
+        settings[config.KEY_PLAGES_OPERATION] = "06:00-07:00, 23:00-23:45" # Hors des heures 8h-22h
+        policy = AdaptiveSamplingPolicy(lambda key, default=None: settings.get(key, default),
+                                        min_interval=5, max_interval=120, margins={"humidite": 3.0})
+        near_threshold = {"humidite": 75.5, "co2": 600.0}
+        self.assertLess(policy.next_interval(0.0, near_threshold, now=NIGHT), 30) # 23:30: fenêtre active
+        self.assertEqual(policy.next_interval(10.0, near_threshold, now=DAY), 120) # 12:00: hors des plages
+        self.assertTrue(policy.is_operating(datetime(2024, 5, 19, 21, 32))) # Session spéciale d'humidification
+
+    def test_controller_schedules_decide_operation(self):
+        policy = AdaptiveSamplingPolicy(lambda key, default=None: default, min_interval=5, max_interval=120,
+                                        is_operating=lambda now: False)
+        self.assertEqual(policy.next_interval(0.0, {"humidite": 75.0, "co2": 1200.0}, now=DAY), 120)
+
+
+if __name__ == '__main__':
+    unittest.main()
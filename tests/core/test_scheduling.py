@@ -0,0 +1,87 @@
+# tests/core/test_scheduling.py
+import unittest
+from unittest.mock import MagicMock, patch
+from datetime import datetime
+import logging
+
+from src import config
+from src.core.scheduling import DailySchedule, TimerWheel, parse_time_windows
+from src.core.actuators.led_controller import LedController
+from src.core.actuators.humidifier_controller import HumidifierController
+
+logging.disable(logging.CRITICAL)
+
+
+class TestDailySchedule(unittest.TestCase):
+
+    def test_multiple_windows_at_minute_resolution(self):
+        schedule = DailySchedule.parse("06:00-11:30, 13:00-20:15")
+        self.assertTrue(schedule.is_active(datetime(2024, 5, 19, 11, 29, 59)))
+        self.assertFalse(schedule.is_active(datetime(2024, 5, 19, 11, 30, 0)))
+        self.assertFalse(schedule.is_active(datetime(2024, 5, 19, 12, 59, 0)))
+        self.assertTrue(schedule.is_active(datetime(2024, 5, 19, 20, 14, 0)))
+        self.assertEqual(schedule.next_transition(datetime(2024, 5, 19, 12, 0, 0)), datetime(2024, 5, 19, 13, 0, 0))
+
+    def test_window_crossing_midnight_and_next_day_transition(self):
+        schedule = DailySchedule.from_hours(20, 6)
+        self.assertTrue(schedule.is_active(datetime(2024, 5, 19, 23, 0)))
+        self.assertTrue(schedule.is_active(datetime(2024, 5, 20, 3, 0)))
+        self.assertFalse(schedule.is_active(datetime(2024, 5, 20, 12, 0)))
+        self.assertEqual(schedule.next_transition(datetime(2024, 5, 19, 23, 0)), datetime(2024, 5, 20, 6, 0))
+
+    def test_empty_and_full_day_schedules_have_no_transition(self):
+        self.assertIsNone(DailySchedule.from_hours(8, 8).next_transition(datetime(2024, 5, 19, 10, 0)))
+        full_day = DailySchedule.parse("00:00-24:00")
+        self.assertTrue(full_day.is_active(datetime(2024, 5, 19, 10, 0)))
+        self.assertIsNone(full_day.next_transition(datetime(2024, 5, 19, 10, 0)))
+
+    def test_invalid_windows_are_rejected(self):
+        with self.assertRaises(ValueError):
+            parse_time_windows("8h-12h")
+        with self.assertRaises(ValueError):
+            parse_time_windows("25:00-26:00")
+
+
+class TestTimerWheel(unittest.TestCase):
+
+    def test_callbacks_fire_at_their_second_and_can_be_cancelled(self):
+        wheel = TimerWheel(tick_seconds=1.0, slots=8, clock=lambda: 1000.0)
+        fired = []
+        wheel.schedule(1003.0, lambda: fired.append("a"))
+        wheel.schedule(1020.0, lambda: fired.append("b")) # Plus d'un tour de roue
+        cancelled = wheel.schedule(1004.0, lambda: fired.append("c"))
+        wheel.cancel(cancelled)
+
+        self.assertEqual(wheel.advance(1002.9), 0)
+        self.assertEqual(wheel.advance(1003.0), 1)
+        self.assertEqual(wheel.advance(1011.0), 0) # Même alvéole que 1020, mais pas encore due
+        wheel.advance(1030.0)
+        self.assertEqual(fired, ["a", "b"])
+
+
+class TestActuatorScheduleTransitions(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_serre_controller = MagicMock()
+        self.settings = {}
+        self.mock_serre_controller.get_setting.side_effect = \
+            lambda key, default_value: self.settings.get(key, default_value)
+
+    @patch('src.core.actuators.led_controller.datetime')
+    def test_led_windows_setting_takes_priority_over_hours(self, mock_datetime):
+        self.settings[config.KEY_PLAGES_LEDS] = "06:00-09:00,17:30-21:00"
+        leds = LedController(MagicMock(), self.mock_serre_controller)
+        mock_datetime.now.return_value = datetime(2024, 5, 19, 12, 0, 0)
+        self.assertFalse(leds._get_desired_automatic_state({}))
+        mock_datetime.now.return_value = datetime(2024, 5, 19, 17, 45, 0)
+        self.assertTrue(leds._get_desired_automatic_state({}))
+        self.assertEqual(leds.next_schedule_transition(datetime(2024, 5, 19, 12, 0)), datetime(2024, 5, 19, 17, 30))
+
+    def test_humidifier_next_transition_includes_special_session(self):
+        humidifier = HumidifierController(MagicMock(), self.mock_serre_controller)
+        self.assertEqual(humidifier.next_schedule_transition(datetime(2024, 5, 19, 21, 0)), datetime(2024, 5, 19, 21, 30))
+        self.assertEqual(humidifier.next_schedule_transition(datetime(2024, 5, 19, 21, 40)), datetime(2024, 5, 19, 22, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
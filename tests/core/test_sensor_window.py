@@ -0,0 +1,60 @@
+# tests/core/test_sensor_window.py
+import unittest
+import random
+import statistics
+
+from src.core.sensor_window import RollingSensorWindow
+
+
+class TestRollingSensorWindow(unittest.TestCase):
+
+    def setUp(self):
+        # Fenêtre de 100s, un échantillon toutes les 10s => capacité 10
+        self.window = RollingSensorWindow(window_seconds=100, min_sample_interval_seconds=10)
+
+    def _append(self, t, temperature, humidite=80.0, co2=800.0):
+        self.window.append(t, {"temperature": temperature, "humidite": humidite, "co2": co2})
+
+    def test_capacity_is_preallocated(self):
+        self.assertEqual(self.window.capacity, 10)
+        self.assertEqual(len(self.window._timestamps), 10)
+        self.assertEqual(len(self.window), 0)
+        self.assertIsNone(self.window.get_stats()["temperature"]["mean"])
+
+    def test_stats_match_brute_force_over_sliding_window(self):
+        rng = random.Random(42)
+        values = []
+        for i in range(57):
+            value = rng.uniform(15, 30)
+            values.append(value)
+            self._append(i * 10.0, value)
+            expected = values[-10:] # L'âge et la capacité retiennent les 10 derniers
+            stats = self.window.get_stats()["temperature"]
+            self.assertEqual(stats["count"], len(expected))
+            self.assertEqual(stats["min"], min(expected))
+            self.assertEqual(stats["max"], max(expected))
+            self.assertAlmostEqual(stats["mean"], statistics.fmean(expected), places=9)
+            self.assertAlmostEqual(stats["stddev"], statistics.pstdev(expected), places=9)
+
+    def test_old_samples_evicted_by_age(self):
+        self._append(0.0, 20.0)
+        self._append(10.0, 21.0)
+        self._append(500.0, 25.0) # Après un trou d'acquisition, les anciens points sortent de la fenêtre
+        stats = self.window.get_stats()
+        self.assertEqual(stats["temperature"]["count"], 1)
+        self.assertEqual(stats["temperature"]["min"], 25.0)
+        self.assertEqual(stats["oldest_timestamp"], 500.0)
+
+    def test_get_samples_since_and_downsampling(self):
+        for i in range(10):
+            self._append(i * 10.0, float(i))
+        recent = self.window.get_samples(since=65.0)
+        self.assertEqual(recent["timestamps"], [70.0, 80.0, 90.0])
+        self.assertEqual(recent["temperature"], [7.0, 8.0, 9.0])
+        reduced = self.window.get_samples(max_points=4)
+        self.assertLessEqual(len(reduced["timestamps"]), 4)
+        self.assertEqual(reduced["timestamps"][-1], 90.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
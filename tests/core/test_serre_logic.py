@@ -24,7 +24,7 @@ class TestSerreController(unittest.TestCase):
     @patch('src.core.serre_logic.threading.Thread')
     # NOUS ALLONS PATCHER _initialize_hardware DIRECTEMENT PLUS TARD
     # @patch('src.core.serre_logic.importlib.import_module') 
-    @patch('src.core.serre_logic.DatabaseManager') 
+    @patch('src.core.serre_logic._make_database_manager') 
     @patch('src.core.serre_logic.VentilationController')
     @patch('src.core.serre_logic.HumidifierController')
     @patch('src.core.serre_logic.LedController')
@@ -78,6 +78,8 @@ class TestSerreController(unittest.TestCase):
 
 
     # Patch _initialize_hardware pour ce test spécifique (et potentiellement d'autres)
+    @patch.object(global_real_config, 'REPRISE_A_CHAUD', False) # Ni point de reprise ni journal écrits dans data/
+    @patch.object(global_real_config, 'SETTINGS_JOURNAL', False)
     @patch.object(SerreController, '_initialize_hardware')
     def test_initialization_default_settings(self, mock_initialize_hardware):
         # Configurer le mock de _initialize_hardware pour qu'il retourne notre instance mockée
@@ -0,0 +1,148 @@
+# tests/core/test_settings_history.py
+import unittest
+from unittest.mock import MagicMock, patch
+import json
+import os
+import shutil
+import tempfile
+import logging
+
+from src import config
+from src.core.serre_logic import SerreController
+from src.core.settings_history import (SettingsHistory, SettingsVersionConflict, journal_path,
+                                       SOURCE_INITIAL, SOURCE_API, SOURCE_FILE)
+from src.hardware_interface.mock_hardware import MockHardware
+
+logging.disable(logging.CRITICAL)
+
+
+class TestSettingsHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.path = os.path.join(self.tmp_dir, "settings_journal.jsonl")
+
+    def make_history(self, max_versions=None):
+        history = SettingsHistory(self.path, max_versions=max_versions)
+        history.record({"a": 1, "b": 2}, SOURCE_INITIAL, timestamp=100.0)
+        history.record({"a": 5}, SOURCE_API, timestamp=200.0)
+        history.record({"b": 7}, SOURCE_FILE, timestamp=300.0)
+        history.flush_journal()
+        return history
+
+    def test_lookup_at_time(self):
+        history = self.make_history()
+        self.assertEqual(history.version, 3)
+        self.assertIsNone(history.at(99.0))
+        self.assertEqual(history.at(100.0)["settings"], {"a": 1, "b": 2})
+        self.assertEqual((history.at(250.0)["version"], history.at(250.0)["settings"]), (2, {"a": 5, "b": 2}))
+        self.assertEqual(history.at(1e12)["settings"], {"a": 5, "b": 7})
+
+    def test_intervals_and_entries(self):
+        history = self.make_history()
+        intervals = history.intervals(150.0, 310.0)
+        self.assertEqual([(i["version"], i["debut"], i["fin"]) for i in intervals],
+                         [(1, 100.0, 200.0), (2, 200.0, 300.0), (3, 300.0, None)])
+        self.assertEqual([i["version"] for i in history.intervals(210.0, 220.0)], [2])
+        self.assertEqual([e["version"] for e in history.entries(since_version=1)], [2, 3])
+        self.assertEqual(history.entries(since_version=1, limit=1)[0]["modifications"], {"a": 5})
+
+    def test_journal_is_reloaded_and_truncated_line_ignored(self):
+        self.make_history()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{"version": 4, "horod') # Arrêt brutal pendant l'ajout
+        history = SettingsHistory(self.path)
+        self.assertEqual(history.version, 3)
+        self.assertEqual(history.current(), {"a": 5, "b": 7})
+        self.assertEqual(history.at(250.0)["source"], SOURCE_API)
+
+    def test_memory_only(self):
+        history = SettingsHistory(None)
+        self.assertEqual(history.record({"a": 1}, SOURCE_INITIAL), 1)
+        history.flush_journal()
+        self.assertEqual(os.listdir(self.tmp_dir), [])
+
+    def test_record_defers_journal_append(self):
+        history = SettingsHistory(self.path)
+        history.record({"a": 1}, SOURCE_INITIAL, timestamp=100.0)
+        history.record({"a": 2}, SOURCE_API, timestamp=200.0)
+        self.assertFalse(os.path.exists(self.path)) # Aucune écriture pendant record()
+        history.flush_journal()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            self.assertEqual([json.loads(line)["version"] for line in f], [1, 2])
+
+    def test_memory_keeps_latest_versions_only(self):
+        history = self.make_history(max_versions=2)
+        self.assertEqual(history._versions, [2, 3]) # Version 1 sortie de la mémoire
+        self.assertEqual(history.at(250.0)["settings"], {"a": 5, "b": 2})
+        self.assertIsNone(history.at(50.0))
+
+    def test_versions_older_than_memory_are_read_from_journal(self):
+        history = self.make_history(max_versions=2)
+        entry = history.at(150.0) # Antérieur à la plus ancienne version en mémoire
+        self.assertEqual((entry["version"], entry["settings"]), (1, {"a": 1, "b": 2}))
+        self.assertEqual([e["version"] for e in history.entries()], [1, 2, 3])
+        self.assertEqual([e["version"] for e in history.entries(limit=2)], [1, 2])
+        self.assertEqual([(i["debut"], i["fin"], i["version"]) for i in history.intervals(150.0, 310.0)],
+                         [(100.0, 200.0, 1), (200.0, 300.0, 2), (300.0, None, 3)])
+        self.assertEqual(history.intervals(120.0, 150.0),
+                         [{"debut": 100.0, "fin": 200.0, "version": 1, "settings": {"a": 1, "b": 2}}])
+        reloaded = SettingsHistory(self.path, max_versions=2) # Le journal garde toutes les versions
+        self.assertEqual(reloaded.version, 3)
+        self.assertEqual(reloaded.current(), {"a": 5, "b": 7})
+
+
+class TestControllerSettingsVersions(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.path = os.path.join(self.tmp_dir, "settings.json")
+        for name in ('RETENTION_ENABLED', 'REPRISE_A_CHAUD', 'SETTINGS_SURVEILLANCE'):
+            patcher = patch.object(config, name, False)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def make_controller(self):
+        controller = SerreController(hardware=MockHardware(), db_manager=MagicMock(),
+                                     settings_file=self.path, autostart=False)
+        self.addCleanup(controller.shutdown)
+        return controller
+
+    def test_compare_and_set(self):
+        controller = self.make_controller()
+        versioned = controller.get_versioned_settings()
+        self.assertEqual(versioned["version"], 1) # Settings initiaux
+        self.assertTrue(controller.update_settings({config.KEY_SEUIL_CO2_MAX: 900}, expected_version=1))
+        self.assertEqual(controller.get_settings_version(), 2)
+        with self.assertRaises(SettingsVersionConflict) as ctx:
+            controller.update_settings({config.KEY_SEUIL_CO2_MAX: 1000}, expected_version=1)
+        self.assertEqual(ctx.exception.current_version, 2)
+        self.assertEqual(controller.get_setting(config.KEY_SEUIL_CO2_MAX), 900.0)
+        controller.update_settings({config.KEY_SEUIL_CO2_MAX: 900}) # Sans changement: pas de version
+        self.assertEqual(controller.get_settings_version(), 2)
+
+    def test_history_survives_restart_and_offline_edits(self):
+        controller = self.make_controller()
+        controller.update_settings({config.KEY_SEUIL_CO2_MAX: 900})
+        controller.shutdown()
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            settings = json.load(f)
+        settings[config.KEY_HEURE_FIN_LEDS] = 18 # Modifié pendant l'arrêt
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(settings, f)
+
+        restarted = self.make_controller()
+        self.assertEqual(restarted.get_settings_version(), 3)
+        entries = restarted.get_settings_history()
+        self.assertEqual([e["source"] for e in entries], [SOURCE_INITIAL, SOURCE_API, SOURCE_FILE])
+        self.assertEqual(entries[2]["modifications"], {config.KEY_HEURE_FIN_LEDS: 18})
+        self.assertEqual(restarted.get_settings_at(entries[1]["horodatage"])["settings"][config.KEY_HEURE_FIN_LEDS],
+                         config.DEFAULT_SETTINGS[config.KEY_HEURE_FIN_LEDS])
+        self.assertTrue(os.path.exists(journal_path(self.path)))
+
+
+if __name__ == '__main__':
+    unittest.main()
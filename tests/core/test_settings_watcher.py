@@ -0,0 +1,141 @@
+# tests/core/test_settings_watcher.py
+import unittest
+from unittest.mock import MagicMock, patch
+import json
+import os
+import shutil
+import tempfile
+import threading
+import logging
+
+from src import config
+from src.core.serre_logic import SerreController
+from src.core.settings_watcher import SettingsFileWatcher
+from src.hardware_interface.mock_hardware import MockHardware
+
+logging.disable(logging.CRITICAL)
+
+
+class TestSettingsFileWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.path = os.path.join(self.tmp_dir, "settings.json")
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write("{}")
+
+    def _watch(self, **kwargs):
+        changed = threading.Event()
+        watcher = SettingsFileWatcher(self.path, changed.set, poll_interval=0.05, settle_seconds=0.01, **kwargs)
+        watcher.start()
+        self.addCleanup(watcher.stop)
+        return watcher, changed
+
+    def test_in_place_write_and_rename_are_detected(self):
+        watcher, changed = self._watch()
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('{"a": 1}')
+        self.assertTrue(changed.wait(2))
+        changed.clear()
+        # Éditeur: fichier temporaire renommé sur le fichier surveillé
+        tmp_path = os.path.join(self.tmp_dir, "settings.json.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('{"a": 2}')
+        os.replace(tmp_path, self.path)
+        self.assertTrue(changed.wait(2))
+
+    def test_other_files_are_ignored(self):
+        watcher, changed = self._watch()
+        if watcher.mode != "inotify":
+            self.skipTest("inotify indisponible")
+        with open(os.path.join(self.tmp_dir, "autre.json"), 'w', encoding='utf-8') as f:
+            f.write("{}")
+        self.assertFalse(changed.wait(0.3))
+
+    def test_polling_fallback(self):
+        watcher, changed = self._watch(use_inotify=False)
+        self.assertEqual(watcher.mode, "scrutation")
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('{"a": 10}')
+        self.assertTrue(changed.wait(2))
+
+    def test_one_watcher_dispatches_each_file_to_its_callback(self):
+        other_dir = os.path.join(self.tmp_dir, "zone-b")
+        os.makedirs(other_dir)
+        other_path = os.path.join(other_dir, "settings.json")
+        changed_a, changed_b = threading.Event(), threading.Event()
+        watcher = SettingsFileWatcher(self.path, changed_a.set, poll_interval=0.05, settle_seconds=0.01)
+        watcher.add(other_path, changed_b.set)
+        watcher.start()
+        self.addCleanup(watcher.stop)
+        with open(other_path, 'w', encoding='utf-8') as f:
+            f.write('{"b": 1}')
+        self.assertTrue(changed_b.wait(2))
+        self.assertFalse(changed_a.is_set())
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('{"a": 1}')
+        self.assertTrue(changed_a.wait(2))
+
+
+class TestSettingsReload(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.path = os.path.join(self.tmp_dir, "settings.json")
+        for name in ('RETENTION_ENABLED', 'REPRISE_A_CHAUD', 'SETTINGS_SURVEILLANCE'):
+            patcher = patch.object(config, name, False)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.controller = SerreController(hardware=MockHardware(), db_manager=MagicMock(),
+                                          settings_file=self.path, autostart=False)
+        self.addCleanup(self.controller.shutdown)
+
+    def _write(self, settings: dict):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(settings, f)
+
+    def test_only_edited_keys_are_applied_and_listeners_notified(self):
+        listener = MagicMock()
+        self.controller.add_settings_listener(listener)
+        settings = self.controller.get_all_settings()
+        settings[config.KEY_SEUIL_CO2_MAX] = "1500"
+        self._write(settings)
+        self.assertEqual(self.controller.reload_settings(), {config.KEY_SEUIL_CO2_MAX: 1500.0})
+        self.assertEqual(self.controller.get_setting(config.KEY_SEUIL_CO2_MAX), 1500.0)
+        listener.assert_called_once()
+
+        self.assertEqual(self.controller.reload_settings(), {}) # Fichier relu sans changement
+        listener.assert_called_once()
+
+    def test_removed_key_reverts_to_default_and_invalid_file_is_ignored(self):
+        self.controller.update_settings({config.KEY_HEURE_FIN_LEDS: 18})
+        self.assertEqual(self.controller.reload_settings(), {}) # Propre écriture du contrôleur
+
+        settings = self.controller.get_all_settings()
+        del settings[config.KEY_HEURE_FIN_LEDS]
+        self._write(settings)
+        self.assertEqual(self.controller.reload_settings(),
+                         {config.KEY_HEURE_FIN_LEDS: config.DEFAULT_SETTINGS[config.KEY_HEURE_FIN_LEDS]})
+
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('{"tronqu')
+        self.assertEqual(self.controller.reload_settings(), {})
+        self.assertEqual(self.controller.get_setting(config.KEY_HEURE_FIN_LEDS),
+                         config.DEFAULT_SETTINGS[config.KEY_HEURE_FIN_LEDS])
+
+    def test_watcher_reloads_after_start(self):
+        with patch.object(config, 'SETTINGS_SURVEILLANCE', True):
+            self.controller.start(run_loops=False)
+        changed = threading.Event()
+        self.controller.add_settings_listener(changed.set)
+        settings = self.controller.get_all_settings()
+        settings[config.KEY_SEUIL_HUMIDITE_ON] = 70.0
+        self._write(settings)
+        self.assertTrue(changed.wait(3))
+        self.assertEqual(self.controller.get_setting(config.KEY_SEUIL_HUMIDITE_ON), 70.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+# tests/core/test_signal_filters.py
+import unittest
+import logging
+
+from src.core.signal_filters import (
+    MedianFilter, EmaFilter, HampelFilter, RateLimitFilter, SensorFilterPipeline, build_filter
+)
+
+logging.disable(logging.CRITICAL)
+
+
+class TestSignalFilters(unittest.TestCase):
+
+    def test_median_filter_removes_isolated_spike(self):
+        f = MedianFilter(window=3)
+        outputs = [f.update(v, t) for t, v in enumerate([80.0, 80.2, 60.0, 80.1, 80.3])]
+        self.assertEqual(outputs[2], 80.0)
+        self.assertEqual(outputs[3], 80.1)
+
+    def test_ema_filter_smooths_toward_input(self):
+        f = EmaFilter(alpha=0.5)
+        self.assertEqual(f.update(10.0, 0), 10.0)
+        self.assertEqual(f.update(20.0, 1), 15.0)
+        self.assertEqual(f.update(20.0, 2), 17.5)
+        with self.assertRaises(ValueError):
+            EmaFilter(alpha=0.0)
+
+    def test_hampel_rejects_outlier_but_accepts_level_change(self):
+        f = HampelFilter(window=5, n_sigmas=3.0, min_deviation=1.0)
+        for t, v in enumerate([80.0, 80.4, 79.8, 80.2]):
+            f.update(v, t)
+        self.assertEqual(f.update(95.0, 4), 80.2) # Pointe isolée remplacée par la médiane
+        self.assertEqual(f.rejected_count, 1)
+        outputs = [f.update(90.0, t) for t in range(5, 9)]
+        self.assertEqual(outputs[-1], 90.0) # Nouveau niveau accepté une fois majoritaire
+
+    def test_rate_limit_clamps_variation_per_second(self):
+        f = RateLimitFilter(max_per_second=0.1)
+        f.update(800.0, 0.0)
+        self.assertEqual(f.update(900.0, 15.0), 801.5)
+        self.assertEqual(f.update(700.0, 30.0), 800.0)
+
+    def test_build_filter_rejects_unknown_type(self):
+        self.assertIsInstance(build_filter({"type": "median", "window": 5}), MedianFilter)
+        with self.assertRaises(ValueError):
+            build_filter({"type": "kalman"})
+
+    def test_pipeline_filters_per_channel_and_passes_others_through(self):
+        pipeline = SensorFilterPipeline.from_config({
+            "humidite": [{"type": "median", "window": 3}],
+            "co2": [{"type": "inconnu"}], # Configuration invalide: canal non filtré
+        })
+        pipeline.process(0, {"humidite": 80.0, "co2": 800.0, "temperature": 21.0})
+        pipeline.process(15, {"humidite": 80.2, "co2": 810.0, "temperature": 21.1})
+        filtered = pipeline.process(30, {"humidite": 60.0, "co2": 2000.0, "temperature": 21.2})
+        self.assertEqual(filtered, {"humidite": 80.0, "co2": 2000.0, "temperature": 21.2})
+        self.assertEqual(pipeline.get_status(), {"humidite": [{"type": "MedianFilter"}]})
+
+
+if __name__ == '__main__':
+    unittest.main()
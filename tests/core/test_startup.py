@@ -0,0 +1,140 @@
+# tests/core/test_startup.py
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import shutil
+import tempfile
+import threading
+import time
+import logging
+
+from src import config
+from src.core.serre_logic import SerreController, PendingDatabaseManager
+from src.core.startup import (StartupStages, StageTimeoutError, STAGE_READY, STAGE_FAILED, STAGE_TIMED_OUT,
+                              STAGE_PENDING, PHASE_INITIALIZING, PHASE_CONTROL, PHASE_OPERATIONAL, PHASE_DEGRADED)
+from src.hardware_interface.mock_hardware import MockHardware
+
+logging.disable(logging.CRITICAL)
+
+
+class TestStartupStages(unittest.TestCase):
+
+    def test_stages_run_concurrently(self):
+        stages = StartupStages()
+        barrier = threading.Barrier(2, timeout=2)
+        stages.launch("a", barrier.wait, timeout=2)
+        stages.launch("b", barrier.wait, timeout=2)
+        # Exécutées l'une après l'autre, les deux étapes resteraient bloquées sur la barrière
+        self.assertCountEqual((stages.wait("a"), stages.wait("b")), (0, 1))
+
+    def test_timeout_failure_and_late_completion(self):
+        stages = StartupStages()
+        release = threading.Event()
+        done = threading.Event()
+        stages.launch("lente", release.wait, timeout=0.05, on_done=lambda result: done.set())
+        stages.launch("cassee", lambda: 1 / 0, timeout=1)
+        with self.assertRaises(StageTimeoutError):
+            stages.wait("lente")
+        with self.assertRaises(ZeroDivisionError):
+            stages.wait("cassee")
+        etapes = stages.get_status()["etapes"]
+        self.assertEqual(etapes["lente"]["etat"], STAGE_TIMED_OUT)
+        self.assertEqual(etapes["cassee"]["etat"], STAGE_FAILED)
+
+        release.set()
+        self.assertTrue(done.wait(2))
+        self.assertTrue(stages.finished_late("lente"))
+        self.assertEqual(stages.get_status()["etapes"]["lente"]["etat"], STAGE_READY)
+
+    def test_phases(self):
+        stages = StartupStages()
+        release = threading.Event()
+        stages.launch("base", release.wait, timeout=5)
+        self.assertEqual(stages.get_status()["phase"], PHASE_INITIALIZING)
+        stages.mark_control_started()
+        status = stages.get_status()
+        self.assertEqual((status["phase"], status["pret"]), (PHASE_CONTROL, True))
+        self.assertEqual(status["etapes"]["base"]["etat"], STAGE_PENDING)
+        release.set()
+        stages.wait("base")
+        self.assertEqual(stages.get_status()["phase"], PHASE_OPERATIONAL)
+        stages.launch("cassee", lambda: 1 / 0, timeout=1)
+        with self.assertRaises(ZeroDivisionError):
+            stages.wait("cassee")
+        self.assertEqual(stages.get_status()["phase"], PHASE_DEGRADED)
+
+
+class TestPendingDatabaseManager(unittest.TestCase):
+
+    def test_records_are_kept_then_replayed(self):
+        pending = PendingDatabaseManager(max_records=2)
+        for i in range(3):
+            pending.add_sensor_data_to_buffer(temperature=i)
+        with self.assertRaises(AttributeError):
+            pending.bulk_insert_batch
+        target = MagicMock()
+        self.assertTrue(pending.attach(target))
+        self.assertEqual([c.kwargs["temperature"] for c in target.add_sensor_data_to_buffer.call_args_list], [1, 2])
+        self.assertEqual(pending.dropped, 1)
+        pending.add_sensor_data_to_buffer(temperature=3) # Relayé directement
+        self.assertEqual(target.add_sensor_data_to_buffer.call_count, 3)
+        self.assertIs(pending.bulk_insert_batch, target.bulk_insert_batch)
+
+    def test_attach_after_close_is_refused(self):
+        pending = PendingDatabaseManager(max_records=10)
+        pending.close_pool()
+        self.assertFalse(pending.attach(MagicMock()))
+
+
+class TestStagedControllerInit(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        for name in ('RETENTION_ENABLED', 'REPRISE_A_CHAUD'):
+            patcher = patch.object(config, name, False)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_control_starts_before_database(self):
+        db_release = threading.Event()
+        db_manager = MagicMock()
+
+        def slow_db(controller):
+            db_release.wait(5)
+            return db_manager
+
+        with patch.object(SerreController, '_initialize_hardware', return_value=MockHardware()), \
+             patch.object(SerreController, '_initialize_db_manager', slow_db):
+            controller = SerreController(settings_file=os.path.join(self.tmp_dir, "settings.json"), autostart=False)
+            self.addCleanup(controller.shutdown)
+            controller.start(run_loops=False)
+
+            status = controller.get_startup_status()
+            self.assertEqual(status["phase"], PHASE_CONTROL)
+            self.assertEqual(status["etapes"]["base_de_donnees"]["etat"], STAGE_PENDING)
+            controller._acquire_sensors_once()
+            controller._run_logic_cycle() # Décision prise avant que la base ne soit prête
+            self.assertIsNotNone(controller.get_startup_status()["premiere_decision_secondes"])
+            self.assertIsInstance(controller.db_manager, PendingDatabaseManager)
+
+            db_release.set()
+            deadline = time.monotonic() + 2
+            while controller.db_manager is not db_manager and time.monotonic() < deadline:
+                time.sleep(0.01)
+        self.assertIs(controller.db_manager, db_manager)
+        db_manager.add_sensor_data_to_buffer.assert_called_once() # Enregistrement en attente rejoué
+        self.assertEqual(controller.get_startup_status()["phase"], PHASE_OPERATIONAL)
+
+    def test_blocked_hardware_fails_startup(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        with patch.object(config, 'INIT_DELAI_MATERIEL_SECONDES', 0.05), \
+             patch.object(SerreController, '_initialize_hardware', lambda controller: release.wait(5)):
+            with self.assertRaises(RuntimeError):
+                SerreController(settings_file=os.path.join(self.tmp_dir, "settings.json"),
+                                db_manager=MagicMock(), autostart=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
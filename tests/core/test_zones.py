@@ -0,0 +1,211 @@
+# tests/core/test_zones.py
+import unittest
+from unittest.mock import MagicMock, patch
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import logging
+
+from src import config
+from src.core.serre_logic import SerreController
+from src.core.zones import MultiZoneController, TASK_ACQUISITION, TASK_LOGIC
+from src.hardware_interface.mock_hardware import MockHardware
+
+logging.disable(logging.CRITICAL)
+
+
+class ZoneTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+
+    def make_zone(self, zone_id, timer_wheel=None):
+        return SerreController(
+            zone_id=zone_id, hardware=MockHardware(), db_manager=MagicMock(),
+            settings_file=os.path.join(self.tmp_dir, f"{zone_id}.json"),
+            timer_wheel=timer_wheel, autostart=False)
+
+
+class TestSerreControllerSteps(ZoneTestCase):
+
+    def test_zone_without_autostart_is_driven_step_by_step(self):
+        zone = self.make_zone("salle-a")
+        self.assertFalse(hasattr(zone, '_sensor_acquisition_thread'))
+        self.assertTrue(os.path.exists(zone.settings_file)) # Settings propres à la zone
+
+        interval = zone._acquire_sensors_once()
+        self.assertGreater(interval, 0)
+        self.assertTrue(zone.get_status()["sensor_read_ok"])
+
+        zone._run_logic_cycle()
+        zone.db_manager.add_sensor_data_to_buffer.assert_called_once()
+
+        zone.shutdown()
+        zone.db_manager.close_pool.assert_not_called() # Gestionnaire fourni: non fermé par la zone
+
+    def test_unchanged_cycles_are_not_buffered(self):
+        zone = self.make_zone("salle-a")
+        zone._acquire_sensors_once()
+        zone._run_logic_cycle()
+        zone._run_logic_cycle() # Même lecture, mêmes états d'actionneurs
+        zone.db_manager.add_sensor_data_to_buffer.assert_called_once()
+        self.assertEqual(zone.skipped_records, 1)
+
+        last_time, values, states = zone._last_recorded
+        zone._last_recorded = (last_time - config.ENREGISTREMENT_INTERVALLE_MAX_SECONDES, values, states)
+        zone._run_logic_cycle() # Intervalle maximal dépassé: ligne enregistrée malgré tout
+        self.assertEqual(zone.db_manager.add_sensor_data_to_buffer.call_count, 2)
+
+        with patch.object(config, 'ENREGISTREMENT_IGNORER_INCHANGES', False):
+            zone._run_logic_cycle()
+        self.assertEqual(zone.db_manager.add_sensor_data_to_buffer.call_count, 3)
+        zone.shutdown()
+
+    def test_zone_settings_are_independent(self):
+        zone_a, zone_b = self.make_zone("salle-a"), self.make_zone("salle-b")
+        zone_a.update_settings({config.KEY_SEUIL_CO2_MAX: 900})
+        self.assertEqual(zone_a.get_setting(config.KEY_SEUIL_CO2_MAX), 900.0)
+        self.assertEqual(zone_b.get_setting(config.KEY_SEUIL_CO2_MAX), config.DEFAULT_SETTINGS[config.KEY_SEUIL_CO2_MAX])
+
+    def test_sensor_read_error_is_reported_without_raising(self):
+        zone = self.make_zone("salle-a")
+        zone.hardware = MagicMock()
+        zone.hardware.lire_capteur.side_effect = OSError("I2C")
+        self.assertGreater(zone._acquire_sensors_once(), 0)
+        self.assertFalse(zone.get_status()["sensor_read_ok"])
+
+
+class TestMultiZoneController(ZoneTestCase):
+
+    def make_manager(self, zones_spec, autostart=False):
+        self.created = []
+
+        def factory(zone_id, spec, with_history, timer_wheel):
+            self.created.append((zone_id, with_history))
+            return self.make_zone(zone_id, timer_wheel=timer_wheel)
+
+        manager = MultiZoneController(zones_spec, max_workers=2, zone_factory=factory, autostart=autostart)
+        self.addCleanup(manager.shutdown)
+        return manager
+
+    def test_history_zone_is_flagged_or_first(self):
+        manager = self.make_manager({"a": {}, "b": {"historique": True}, "c": None})
+        # Zones créées en parallèle: ordre d'appel quelconque, ordre de config.ZONES conservé
+        self.assertCountEqual(self.created, [("a", False), ("b", True), ("c", False)])
+        self.assertEqual(list(manager.zones), ["a", "b", "c"])
+        self.make_manager({"a": {}, "b": {}})
+        self.assertCountEqual(self.created, [("a", True), ("b", False)])
+
+    def test_failed_zone_build_shuts_down_every_built_zone(self):
+        built = {}
+        b_failed = threading.Event()
+
+        def factory(zone_id, spec, with_history, timer_wheel):
+            if zone_id == "b":
+                b_failed.set()
+                raise RuntimeError("GPIO occupé")
+            if zone_id == "c":
+                b_failed.wait(2)
+                time.sleep(0.1) # Termine après l'échec de "b"
+            zone = built[zone_id] = self.make_zone(zone_id, timer_wheel=timer_wheel)
+            zone.shutdown = MagicMock(wraps=zone.shutdown)
+            return zone
+
+        with self.assertRaises(RuntimeError):
+            MultiZoneController({"a": {}, "b": {}, "c": {}}, max_workers=3, zone_factory=factory, autostart=False)
+        self.assertEqual(sorted(built), ["a", "c"])
+        for zone in built.values():
+            zone.shutdown.assert_called_once()
+
+    def test_empty_zone_spec_is_rejected(self):
+        with self.assertRaises(ValueError):
+            MultiZoneController({}, autostart=False)
+
+    def test_task_runs_zone_step_and_reschedules_itself(self):
+        manager = self.make_manager({"a": {}, "b": {}})
+        zone = manager.zones["a"]
+        with patch.object(manager.timer_wheel, 'schedule', wraps=manager.timer_wheel.schedule) as schedule:
+            manager._run_task(zone, TASK_ACQUISITION, due=0.0)
+            manager._run_task(zone, TASK_LOGIC, due=0.0)
+        self.assertEqual(schedule.call_count, 2)
+        self.assertIn(("a", TASK_ACQUISITION), manager._timers)
+        self.assertIn(("a", TASK_LOGIC), manager._timers)
+        self.assertEqual(manager.get_scheduler_status()["tasks_run"], 2)
+        zone.db_manager.add_sensor_data_to_buffer.assert_called_once()
+
+    def test_failing_task_is_counted_and_still_rescheduled(self):
+        manager = self.make_manager({"a": {}})
+        zone = manager.zones["a"]
+        zone._run_logic_cycle = MagicMock(side_effect=RuntimeError("boom"))
+        manager._run_task(zone, TASK_LOGIC, due=0.0)
+        self.assertEqual(manager.get_scheduler_status()["task_errors"], 1)
+        self.assertIn(("a", TASK_LOGIC), manager._timers)
+
+    def test_start_schedules_every_zone_and_shutdown_cancels(self):
+        manager = self.make_manager({f"z{i}": {} for i in range(5)}, autostart=True)
+        self.assertEqual(len(manager._timers), 10) # Acquisition + logique par zone
+        summary = manager.get_zones_summary()
+        self.assertEqual([z["zone_id"] for z in summary], [f"z{i}" for i in range(5)])
+        manager.shutdown()
+        self.assertEqual(manager._timers, {})
+        # z0 (décalage 0) a pu s'exécuter avant l'arrêt: seul compte qu'aucune tâche ne s'ajoute ensuite
+        tasks_run = manager.get_scheduler_status()["tasks_run"]
+        manager._run_task(manager.zones["z0"], TASK_ACQUISITION, due=0.0) # Ignorée après l'arrêt
+        self.assertEqual(manager.get_scheduler_status()["tasks_run"], tasks_run)
+
+    def test_zone_settings_share_one_watcher(self):
+        with patch.object(config, 'SETTINGS_SURVEILLANCE', True):
+            manager = self.make_manager({"a": {}, "b": {}}, autostart=True)
+        self.assertIsNotNone(manager.settings_watcher)
+        self.assertCountEqual(manager.settings_watcher.callbacks,
+                              [zone.settings_file for zone in manager.zones.values()])
+        self.assertTrue(all(zone.settings_watcher is None for zone in manager.zones.values()))
+
+        changed = threading.Event()
+        zone_b = manager.zones["b"]
+        zone_b.add_settings_listener(changed.set)
+        settings = zone_b.get_all_settings()
+        settings[config.KEY_SEUIL_CO2_MAX] = 950.0
+        with open(zone_b.settings_file, 'w', encoding='utf-8') as f:
+            json.dump(settings, f)
+        self.assertTrue(changed.wait(5))
+        self.assertEqual(zone_b.get_setting(config.KEY_SEUIL_CO2_MAX), 950.0)
+        self.assertEqual(manager.zones["a"].get_setting(config.KEY_SEUIL_CO2_MAX),
+                         config.DEFAULT_SETTINGS[config.KEY_SEUIL_CO2_MAX])
+
+    def test_task_timing_is_recorded_per_zone(self):
+        manager = self.make_manager({"a": {}, "b": {}})
+        zone = manager.zones["a"]
+        manager._run_task(zone, TASK_LOGIC, due=time.time() - 0.2) # Démarrée 0.2 s après son échéance
+        timing = zone.get_loop_timing(recent_cycles=1)
+        self.assertEqual(timing[TASK_LOGIC]["cycles"], 1)
+        self.assertGreaterEqual(timing[TASK_LOGIC]["retard_demarrage"]["max"], 0.2)
+        self.assertEqual(len(timing[TASK_LOGIC]["cycles_recents"]), 1)
+        self.assertEqual(timing[TASK_ACQUISITION]["cycles"], 0)
+        self.assertEqual(manager.zones["b"].get_loop_timing()[TASK_LOGIC]["cycles"], 0)
+
+    def test_task_deadline_uses_interval_in_effect(self):
+        manager = self.make_manager({"a": {}})
+        zone = manager.zones["a"]
+        zone._acquire_sensors_once = MagicMock(return_value=5.0) # Accélère les acquisitions suivantes
+        manager._run_task(zone, TASK_ACQUISITION, due=time.time() - 10, period=15.0)
+        timing = zone.get_loop_timing()[TASK_ACQUISITION]
+        self.assertEqual(timing["echeances_manquees"], 0) # 10 s de retard sur une période de 15 s
+        manager._run_task(zone, TASK_ACQUISITION, due=time.time() - 10, period=5.0)
+        self.assertEqual(zone.get_loop_timing()[TASK_ACQUISITION]["echeances_manquees"], 1)
+
+    def test_emergency_stop_reaches_every_zone(self):
+        manager = self.make_manager({"a": {}, "b": {}})
+        for zone in manager.zones.values():
+            zone.emergency_stop_all_actuators = MagicMock()
+        manager.emergency_stop_all_actuators()
+        for zone in manager.zones.values():
+            zone.emergency_stop_all_actuators.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+# tests/ipc/test_protocol.py
+import unittest
+import socket
+
+from src.ipc.protocol import encode_frame, send_message, recv_message, ProtocolError, HEADER
+
+
+class TestProtocol(unittest.TestCase):
+
+    def setUp(self):
+        self.left, self.right = socket.socketpair()
+        self.addCleanup(self.left.close)
+        self.addCleanup(self.right.close)
+
+    def test_messages_round_trip_in_order(self):
+        send_message(self.left, {"id": 1, "op": "status", "zone": "salle-é"})
+        send_message(self.left, {"id": 2, "op": "ping"})
+        self.assertEqual(recv_message(self.right), {"id": 1, "op": "status", "zone": "salle-é"})
+        self.assertEqual(recv_message(self.right), {"id": 2, "op": "ping"})
+
+    def test_clean_close_between_frames_returns_none(self):
+        self.left.close()
+        self.assertIsNone(recv_message(self.right))
+
+    def test_truncated_frame_raises(self):
+        frame = encode_frame({"id": 1, "op": "ping"})
+        self.left.sendall(frame[:-3])
+        self.left.close()
+        with self.assertRaises(ProtocolError):
+            recv_message(self.right)
+
+    def test_invalid_payload_raises(self):
+        self.left.sendall(HEADER.pack(3) + b"[1]")
+        with self.assertRaises(ProtocolError):
+            recv_message(self.right)
+        self.left.sendall(HEADER.pack(2) + b"{x")
+        with self.assertRaises(ProtocolError):
+            recv_message(self.right)
+
+    def test_oversized_announced_length_raises(self):
+        self.left.sendall(HEADER.pack(0xFFFFFFFF))
+        with self.assertRaises(ProtocolError):
+            recv_message(self.right)
+
+
+if __name__ == '__main__':
+    unittest.main()
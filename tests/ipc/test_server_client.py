@@ -0,0 +1,156 @@
+# tests/ipc/test_server_client.py
+import unittest
+from unittest.mock import MagicMock
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import time
+import logging
+
+from src import config
+from src.ipc.server import ControllerServer
+from src.ipc.client import ControllerClient, RemoteController, ControllerError, ControllerUnavailableError
+from src.ipc.protocol import ERROR_ZONE_UNKNOWN, ERROR_BAD_REQUEST, ERROR_INTERNAL
+from src.core.settings_history import SettingsVersionConflict
+
+logging.disable(logging.CRITICAL)
+
+
+class ServerClientTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.socket_path = os.path.join(self.tmp_dir, "controller.sock")
+        self.target = MagicMock(spec=["get_status", "get_all_settings", "update_settings", "get_recent_sensor_data",
+                                      "get_sensor_stats", "command_actuator", "set_all_auto_mode",
+                                      "emergency_stop_all_actuators"])
+        self.target.get_status.return_value = {"temperature": 21.5, "sensor_read_ok": True}
+        self.server = self.start_server(self.target)
+        self.client = ControllerClient(self.socket_path, timeout=2.0)
+        self.addCleanup(self.client.close)
+
+    def start_server(self, target):
+        server = ControllerServer(target, socket_path=self.socket_path)
+        server.start()
+        self.addCleanup(server.stop)
+        return server
+
+
+class TestSingleController(ServerClientTestCase):
+
+    def test_socket_is_group_accessible_only(self):
+        mode = stat.S_IMODE(os.stat(self.socket_path).st_mode)
+        self.assertEqual(mode, 0o660)
+
+    def test_remote_controller_mirrors_local_calls(self):
+        remote = RemoteController(self.client)
+        self.assertEqual(remote.get_status(), {"temperature": 21.5, "sensor_read_ok": True})
+
+        self.target.update_settings.return_value = True
+        self.assertTrue(remote.update_settings({config.KEY_SEUIL_CO2_MAX: 900}))
+        self.target.update_settings.assert_called_once_with({config.KEY_SEUIL_CO2_MAX: 900}, expected_version=None)
+
+        self.target.get_recent_sensor_data.return_value = {"samples": []}
+        remote.get_recent_sensor_data(since=10.0, max_points=5)
+        self.target.get_recent_sensor_data.assert_called_once_with(since=10.0, max_points=5)
+
+        self.target.command_actuator.return_value = {"is_active": True, "manual_mode": True}
+        self.assertEqual(remote.command_actuator("leds", "on"), {"is_active": True, "manual_mode": True})
+        self.target.command_actuator.assert_called_once_with("leds", "on")
+
+    def test_single_controller_is_listed_under_greenhouse_id(self):
+        self.assertEqual(self.client.call("zone_ids"), [config.GREENHOUSE_ID])
+        RemoteController(self.client, config.GREENHOUSE_ID).get_status()
+        with self.assertRaises(ControllerError) as ctx:
+            RemoteController(self.client, "inconnue").get_status()
+        self.assertEqual(ctx.exception.kind, ERROR_ZONE_UNKNOWN)
+
+    def test_errors_are_mapped_to_kinds(self):
+        self.target.command_actuator.side_effect = ValueError("Actionneur inconnu 'pompe'.")
+        with self.assertRaises(ValueError):
+            RemoteController(self.client).command_actuator("pompe")
+
+        with self.assertRaises(ControllerError) as ctx:
+            self.client.call("reboot")
+        self.assertEqual(ctx.exception.kind, ERROR_BAD_REQUEST)
+
+        self.target.get_status.side_effect = RuntimeError("I2C")
+        with self.assertRaises(ControllerError) as ctx:
+            self.client.call("status")
+        self.assertEqual(ctx.exception.kind, ERROR_INTERNAL)
+
+        self.target.update_settings.side_effect = SettingsVersionConflict(3, 4)
+        with self.assertRaises(SettingsVersionConflict) as ctx:
+            RemoteController(self.client).update_settings({config.KEY_SEUIL_CO2_MAX: 900}, expected_version=3)
+        self.assertEqual(ctx.exception.current_version, 4)
+        self.assertEqual(self.client.call("ping")["zones"], [config.GREENHOUSE_ID]) # Connexion toujours utilisable
+
+    def test_client_reconnects_after_daemon_restart(self):
+        self.client.call("ping")
+        self.server.stop()
+        self.start_server(self.target)
+        self.assertEqual(self.client.call("status")["temperature"], 21.5)
+
+    def test_command_without_response_is_not_replayed(self):
+        calls = threading.Event()
+        def slow_command(device, action):
+            time.sleep(0.5) # Réponse après le délai du client
+            calls.set()
+            return {"device": device}
+        self.target.command_actuator.side_effect = slow_command
+        client = ControllerClient(self.socket_path, timeout=0.2)
+        self.addCleanup(client.close)
+        with self.assertRaises(ControllerUnavailableError):
+            client.call("command", device="leds", action="on")
+        self.assertTrue(calls.wait(2.0))
+        time.sleep(0.3)
+        self.assertEqual(self.target.command_actuator.call_count, 1) # Exécutée une seule fois
+
+    def test_read_without_response_is_replayed(self):
+        delays = iter([0.5, 0.0]) # 1re réponse après le délai du client
+        def status():
+            time.sleep(next(delays))
+            return {"temperature": 21.5}
+        self.target.get_status.side_effect = status
+        client = ControllerClient(self.socket_path, timeout=0.2)
+        self.addCleanup(client.close)
+        self.assertEqual(client.call("status")["temperature"], 21.5)
+        self.assertEqual(self.target.get_status.call_count, 2)
+
+    def test_unreachable_daemon_raises_unavailable(self):
+        self.server.stop()
+        with self.assertRaises(ControllerUnavailableError):
+            self.client.call("ping")
+
+
+class TestMultiZoneTarget(ServerClientTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.server.stop()
+        self.zone_a, self.zone_b = MagicMock(), MagicMock()
+        self.manager = MagicMock(spec=["zones", "default_zone", "emergency_stop_all_actuators"])
+        self.manager.zones = {"a": self.zone_a, "b": self.zone_b}
+        self.manager.default_zone = self.zone_a
+        self.server = self.start_server(self.manager)
+
+    def test_zone_requests_reach_the_right_zone(self):
+        RemoteController(self.client, "b").set_all_auto_mode()
+        self.zone_b.set_all_auto_mode.assert_called_once()
+        self.zone_a.set_all_auto_mode.assert_not_called()
+        RemoteController(self.client).get_all_settings() # Zone par défaut
+        self.zone_a.get_all_settings.assert_called_once()
+
+    def test_emergency_stop_without_zone_stops_every_zone(self):
+        RemoteController(self.client).emergency_stop_all_actuators()
+        self.manager.emergency_stop_all_actuators.assert_called_once()
+        RemoteController(self.client, "b").emergency_stop_all_actuators()
+        self.zone_b.emergency_stop_all_actuators.assert_called_once()
+        self.manager.emergency_stop_all_actuators.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+# tests/ipc/test_status_shm.py
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import shutil
+import tempfile
+import threading
+import logging
+
+from src.core.serre_logic import SerreController
+from src.hardware_interface.mock_hardware import MockHardware
+from src.ipc import status_shm
+from src.ipc.status_shm import StatusSegment, StatusReader, StatusLayoutError
+
+logging.disable(logging.CRITICAL)
+
+
+class StatusShmTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.path = os.path.join(self.tmp_dir, "status.shm")
+
+    def make_segment(self, zone_ids=("a", "b")):
+        segment = StatusSegment(self.path, zone_ids)
+        self.addCleanup(segment.close, False)
+        return segment
+
+
+class TestStatusSegment(StatusShmTestCase):
+
+    def test_published_snapshot_is_read_back(self):
+        segment = self.make_segment()
+        reader = StatusReader(self.path)
+        self.assertIsNone(reader.read("b")) # Rien publié
+        segment.writer("b").publish({"temperature": 21.5, "humidite": None, "co2": 640.0,
+                                     "sensor_read_ok": True, "leds_active": True, "logic_seconds": 0.002})
+        snapshot = reader.read("b")
+        self.assertEqual(snapshot["zone_id"], "b")
+        self.assertEqual(snapshot["temperature"], 21.5)
+        self.assertIsNone(snapshot["humidite"])
+        self.assertTrue(snapshot["leds_active"])
+        self.assertFalse(snapshot["ventilation_active"])
+        self.assertEqual(snapshot["publications"], 1)
+        self.assertEqual(snapshot["seq"] % 2, 0)
+        self.assertEqual([s["zone_id"] for s in reader.read_all()], ["b"])
+        self.assertIsNone(reader.read("inconnue"))
+
+    def test_missing_or_foreign_file(self):
+        self.assertEqual(StatusReader(self.path).read_all(), [])
+        with open(self.path, 'wb') as f:
+            f.write(b"pas un segment de statut")
+        with self.assertRaises(StatusLayoutError):
+            StatusReader(self.path).read_all()
+
+    def test_torn_slot_is_never_returned(self):
+        segment = self.make_segment(["a"])
+        segment.writer("a").publish({"temperature": 20.0})
+        offset = status_shm._slot_offset(0) + status_shm.PAYLOAD_OFFSET + 40
+        segment._buffer[offset:offset + 8] = b"\xff" * 8 # Données modifiées sans mise à jour du CRC
+        with patch.object(status_shm, 'MAX_READ_ATTEMPTS', 3):
+            self.assertIsNone(StatusReader(self.path).read("a"))
+
+    def test_reader_follows_a_recreated_segment(self):
+        self.make_segment(["a"]).writer("a").publish({"temperature": 20.0})
+        reader = StatusReader(self.path)
+        self.assertEqual(reader.read("a")["temperature"], 20.0)
+        self.make_segment(["a", "b"]).writer("b").publish({"temperature": 25.0}) # Redémarrage du contrôleur
+        self.assertIsNone(reader.read("a"))
+        self.assertEqual(reader.read("b")["temperature"], 25.0)
+
+    def test_concurrent_reads_are_consistent(self):
+        writer = self.make_segment(["a"]).writer("a")
+        writer.publish({"temperature": 0.0, "humidite": 0.0, "co2": 0.0})
+        reader, stop, inconsistent = StatusReader(self.path), threading.Event(), []
+
+        def read_loop():
+            while not stop.is_set():
+                s = reader.read("a")
+                if s is not None and not (s["temperature"] == s["humidite"] == s["co2"]):
+                    inconsistent.append(s)
+
+        threads = [threading.Thread(target=read_loop) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for i in range(5000):
+            writer.publish({"temperature": float(i), "humidite": float(i), "co2": float(i)})
+        stop.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(inconsistent, [])
+        self.assertEqual(reader.read("a")["temperature"], 4999.0)
+
+
+class TestControllerPublication(StatusShmTestCase):
+
+    def test_controller_publishes_after_each_step(self):
+        zone = SerreController(zone_id="a", hardware=MockHardware(), db_manager=MagicMock(),
+                               settings_file=os.path.join(self.tmp_dir, "a.json"), autostart=False)
+        zone.status_publisher = self.make_segment(["a"]).writer("a")
+        reader = StatusReader(self.path)
+
+        zone._acquire_sensors_once()
+        snapshot = reader.read("a")
+        self.assertTrue(snapshot["sensor_read_ok"])
+        self.assertIsNotNone(snapshot["acquisition_seconds"])
+        self.assertIsNone(snapshot["logic_seconds"])
+
+        zone._run_logic_cycle()
+        self.assertIsNotNone(reader.read("a")["logic_seconds"])
+
+        zone.command_actuator("ventilation", "on")
+        snapshot = reader.read("a")
+        self.assertTrue(snapshot["ventilation_active"] and snapshot["ventilation_manual"])
+        self.assertEqual(snapshot["publications"], 3)
+        zone.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
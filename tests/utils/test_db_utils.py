@@ -0,0 +1,108 @@
+# tests/utils/test_db_utils.py
+import unittest
+from unittest.mock import MagicMock, patch
+from datetime import datetime
+import logging
+
+from src.utils.db_utils import DatabaseManager, SENSOR_DATA_COLUMNS, SENSOR_DATA_RAW_COLUMNS
+
+logging.disable(logging.CRITICAL)
+
+
+class TestDatabaseManagerBulkInsert(unittest.TestCase):
+
+    def setUp(self):
+        # Pas de connexion réelle: on remplace le pool après construction.
+        with patch('src.utils.db_utils.psycopg2.pool.ThreadedConnectionPool'):
+            self.manager = DatabaseManager()
+        self.mock_pool = MagicMock()
+        self.mock_conn = self.mock_pool.getconn.return_value
+        self.mock_cursor = self.mock_conn.cursor.return_value.__enter__.return_value
+        self.manager.db_pool = self.mock_pool
+        self.samples = [(datetime(2024, 5, 19, 10, 0), 21.5, 80.0, 800.0, True, False, True, 12.0, None, None, 30.0)]
+        self.events = [(datetime(2024, 5, 19, 10, 0, 30), "humidifier", False, 72.5)]
+
+    @patch('psycopg2.extras.execute_values')
+    def test_new_batch_is_written_in_one_transaction(self, mock_execute_values):
+        self.mock_cursor.fetchone.return_value = (2,)
+        self.mock_cursor.rowcount = 1
+        result = self.manager.bulk_insert_batch("serre-07", 3, self.samples, self.events)
+
+        self.assertEqual(result, "inserted")
+        self.mock_cursor.copy_expert.assert_called_once()
+        mock_execute_values.assert_called_once()
+        self.mock_conn.commit.assert_called_once()
+        self.mock_pool.putconn.assert_called_once_with(self.mock_conn)
+
+    @patch('psycopg2.extras.execute_values')
+    def test_replayed_batch_is_deduplicated(self, mock_execute_values):
+        self.mock_cursor.fetchone.return_value = (3,)
+        self.mock_cursor.rowcount = 0 # Séquence déjà dans ingest_batches
+        result = self.manager.bulk_insert_batch("serre-07", 3, self.samples, self.events)
+
+        self.assertEqual(result, "duplicate")
+        self.mock_cursor.copy_expert.assert_not_called()
+        mock_execute_values.assert_not_called()
+        self.mock_conn.commit.assert_not_called()
+
+    @patch('psycopg2.extras.execute_values')
+    def test_out_of_order_batch_is_inserted(self, mock_execute_values):
+        self.mock_cursor.fetchone.return_value = (6,) # Lot 6 reçu avant le lot 5 (rejoué après un échec)
+        self.mock_cursor.rowcount = 1
+        result = self.manager.bulk_insert_batch("serre-07", 5, self.samples, self.events)
+
+        self.assertEqual(result, "inserted")
+        self.mock_cursor.copy_expert.assert_called_once()
+        self.mock_conn.commit.assert_called_once()
+        statements = [call.args[0] for call in self.mock_cursor.execute.call_args_list]
+        self.assertTrue(any("GREATEST(last_batch_seq" in sql for sql in statements)) # Le dernier reste 6
+
+    def test_database_error_rolls_back(self):
+        self.mock_cursor.fetchone.return_value = (0,)
+        self.mock_cursor.rowcount = 1
+        self.mock_cursor.copy_expert.side_effect = RuntimeError("connexion perdue")
+        with self.assertRaises(RuntimeError):
+            self.manager.bulk_insert_batch("serre-07", 3, self.samples, [])
+        self.mock_conn.rollback.assert_called_once()
+        self.mock_pool.putconn.assert_called_once_with(self.mock_conn)
+
+    def test_local_store_receives_record_before_buffering(self):
+        self.manager.local_store = MagicMock()
+        self.manager.add_sensor_data_to_buffer(
+            timestamp=datetime(2024, 5, 19, 10, 0), temperature=21.54, humidity=80.0, co2=800.0,
+            humidifier_active=True, ventilation_active=False, leds_active=True,
+            humidifier_on_duration=12.0, humidifier_off_duration=None,
+            ventilation_on_duration=None, ventilation_off_duration=30.0)
+        stored = self.manager.local_store.append_records.call_args[0][0]
+        self.assertEqual(stored[0][1], 21.5)
+        self.assertEqual(len(stored[0]), len(SENSOR_DATA_COLUMNS)) # Valeurs brutes non répliquées
+        self.assertEqual(len(self.manager.data_buffer), 1)
+
+    def test_flush_writes_raw_values_when_columns_exist(self):
+        record = dict(timestamp=datetime(2024, 5, 19, 10, 0), temperature=21.5, humidity=80.0, co2=800.0,
+                      humidifier_active=True, ventilation_active=False, leds_active=True,
+                      humidifier_on_duration=12.0, humidifier_off_duration=None,
+                      ventilation_on_duration=None, ventilation_off_duration=30.0,
+                      temperature_raw=21.93, humidity_raw=81.2, co2_raw=812.4)
+        for raw_columns, expected_columns in ((True, SENSOR_DATA_COLUMNS + SENSOR_DATA_RAW_COLUMNS),
+                                              (False, SENSOR_DATA_COLUMNS)):
+            self.mock_cursor.reset_mock()
+            self.manager.raw_columns = raw_columns
+            self.manager.add_sensor_data_to_buffer(**record)
+            self.manager.flush_buffer()
+            sql, rows = self.mock_cursor.executemany.call_args[0]
+            self.assertIn(f"({', '.join(expected_columns)})", sql)
+            self.assertEqual(len(rows[0]), len(expected_columns))
+        self.assertEqual(rows[0][1], 21.5)
+
+    def test_raw_columns_detected_from_schema(self):
+        self.mock_cursor.fetchall.return_value = [(column,) for column in SENSOR_DATA_RAW_COLUMNS]
+        self.manager._check_raw_columns(self.mock_conn)
+        self.assertTrue(self.manager.raw_columns)
+        self.mock_cursor.fetchall.return_value = []
+        self.manager._check_raw_columns(self.mock_conn)
+        self.assertFalse(self.manager.raw_columns)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+# tests/utils/test_export.py
+import unittest
+from unittest.mock import MagicMock
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+import logging
+
+from src.utils.export import stream_export, iter_sensor_row_chunks, parse_export_range
+from src.utils.db_utils import SENSOR_DATA_COLUMNS
+
+logging.disable(logging.CRITICAL)
+
+
+def make_rows(count):
+    start = datetime(2024, 5, 19, 0, 0, 0)
+    return [(start + timedelta(minutes=i), 21.5, 80.0, 800.0, True, False, True, 12.0, None, None, 30.0)
+            for i in range(count)]
+
+
+def make_connect(rows):
+    """Simule psycopg2.connect avec un curseur nommé qui sert `rows` par fetchmany."""
+    mock_conn = MagicMock()
+    cursor = mock_conn.cursor.return_value.__enter__.return_value
+    remaining = list(rows)
+
+    def fetchmany(size):
+        batch = remaining[:size]
+        del remaining[:size]
+        return batch
+    cursor.fetchmany.side_effect = fetchmany
+    return MagicMock(return_value=mock_conn), mock_conn
+
+
+class TestExport(unittest.TestCase):
+
+    def test_reads_in_fixed_chunks_from_named_cursor(self):
+        connect, mock_conn = make_connect(make_rows(25))
+        chunks = list(iter_sensor_row_chunks(datetime(2024, 5, 19), datetime(2024, 5, 20),
+                                             chunk_size=10, db_config={}, connect=connect))
+        self.assertEqual([len(c) for c in chunks], [10, 10, 5])
+        self.assertIn('name', mock_conn.cursor.call_args.kwargs)
+        mock_conn.close.assert_called_once()
+
+    def test_ndjson_export(self):
+        connect, _ = make_connect(make_rows(3))
+        data = b"".join(stream_export(datetime(2024, 5, 19), datetime(2024, 5, 20), "ndjson",
+                                      chunk_size=2, db_config={}, connect=connect))
+        lines = data.decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 3)
+        first = json.loads(lines[0])
+        self.assertEqual(first["timestamp"], "2024-05-19 00:00:00")
+        self.assertIsNone(first["humidifier_off_duration_seconds"])
+
+    def test_csv_gzip_export(self):
+        connect, _ = make_connect(make_rows(5))
+        data = b"".join(stream_export(datetime(2024, 5, 19), datetime(2024, 5, 20), "csv", compress=True,
+                                      chunk_size=2, db_config={}, connect=connect))
+        rows = list(csv.reader(io.StringIO(gzip.decompress(data).decode('utf-8'))))
+        self.assertEqual(tuple(rows[0]), SENSOR_DATA_COLUMNS)
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[5][0], "2024-05-19 00:04:00")
+
+    def test_connection_closed_when_consumer_stops_early(self):
+        connect, mock_conn = make_connect(make_rows(100))
+        stream = stream_export(datetime(2024, 5, 19), datetime(2024, 5, 20), "ndjson",
+                               chunk_size=10, db_config={}, connect=connect)
+        next(stream)
+        stream.close()
+        mock_conn.close.assert_called_once()
+
+    def test_database_error_is_raised_before_streaming(self):
+        connect = MagicMock(side_effect=OSError("connexion refusée"))
+        with self.assertRaises(OSError):
+            stream_export(datetime(2024, 5, 19), datetime(2024, 5, 20), "csv", db_config={}, connect=connect)
+
+        connect, mock_conn = make_connect(make_rows(3))
+        mock_conn.cursor.return_value.__enter__.return_value.execute.side_effect = RuntimeError("relation absente")
+        with self.assertRaises(RuntimeError):
+            stream_export(datetime(2024, 5, 19), datetime(2024, 5, 20), "csv", db_config={}, connect=connect)
+        mock_conn.close.assert_called_once()
+
+    def test_parse_export_range(self):
+        start, end = parse_export_range("2024-05-01", "2024-06-01")
+        self.assertEqual((start.month, end.month), (5, 6))
+        with self.assertRaises(ValueError):
+            parse_export_range(None, None)
+        with self.assertRaises(ValueError):
+            parse_export_range("2024-06-01", "2024-05-01")
+        with self.assertRaises(ValueError):
+            stream_export(start, end, "xml")
+
+
+if __name__ == '__main__':
+    unittest.main()
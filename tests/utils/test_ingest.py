@@ -0,0 +1,94 @@
+# tests/utils/test_ingest.py
+import unittest
+import gzip
+import json
+import zlib
+import logging
+
+from src.utils.ingest import decode_ingest_body, validate_ingest_batch, IngestValidationError
+
+logging.disable(logging.CRITICAL)
+
+
+def make_payload(**overrides):
+    payload = {
+        "greenhouse_id": "serre-07",
+        "batch_seq": 3,
+        "samples": [
+            ["2024-05-19 10:00:00", 21.5, 80.0, 800, True, False, True, 12.0, None, None, 30.0],
+            ["2024-05-19 10:01:00", 21.6, 80.5, 810, False, False, True, None, 5.0, None, 90.0],
+        ],
+        "events": [["2024-05-19 10:00:30", "humidifier", False, 72.5]],
+    }
+    payload.update(overrides)
+    return payload
+
+
+class TestDecodeIngestBody(unittest.TestCase):
+
+    def test_gzip_and_deflate_bodies(self):
+        raw = json.dumps(make_payload()).encode('utf-8')
+        self.assertEqual(decode_ingest_body(gzip.compress(raw), "gzip")["batch_seq"], 3)
+        self.assertEqual(decode_ingest_body(zlib.compress(raw), "deflate")["batch_seq"], 3)
+        self.assertEqual(decode_ingest_body(raw, None)["batch_seq"], 3)
+
+    def test_decompression_is_bounded(self):
+        body = gzip.compress(b"[" + b" " * 10000 + b"]")
+        with self.assertRaises(IngestValidationError):
+            decode_ingest_body(body, "gzip", max_bytes=1000)
+
+    def test_unreadable_or_unsupported_body(self):
+        with self.assertRaises(IngestValidationError):
+            decode_ingest_body(b"pas du gzip", "gzip")
+        with self.assertRaises(IngestValidationError):
+            decode_ingest_body(b"{}", "br")
+        with self.assertRaises(IngestValidationError):
+            decode_ingest_body(b"[1, 2]", None)
+
+
+class TestValidateIngestBatch(unittest.TestCase):
+
+    def test_valid_batch_is_normalized(self):
+        batch = validate_ingest_batch(make_payload())
+        self.assertEqual(batch["greenhouse_id"], "serre-07")
+        self.assertEqual(len(batch["samples"]), 2)
+        self.assertEqual(batch["samples"][0][0].minute, 0)
+        self.assertEqual(batch["samples"][0][3], 800.0)
+        self.assertEqual(batch["events"][0][1], "humidifier")
+
+    def test_one_bad_row_rejects_whole_batch(self):
+        payload = make_payload()
+        payload["samples"][1][2] = 140.0 # Humidité hors plage
+        with self.assertRaises(IngestValidationError) as ctx:
+            validate_ingest_batch(payload)
+        self.assertEqual(len(ctx.exception.errors), 1)
+        self.assertIn("samples[1]", ctx.exception.errors[0])
+
+    def test_timestamp_with_offset_is_rejected(self):
+        for timestamp in ("2024-05-19T10:00:00+02:00", "2024-05-19T10:00:00Z"):
+            with self.subTest(timestamp=timestamp):
+                payload = make_payload()
+                payload["samples"][0][0] = timestamp
+                with self.assertRaises(IngestValidationError) as ctx:
+                    validate_ingest_batch(payload)
+                self.assertIn("samples[0]", ctx.exception.errors[0])
+                with self.assertRaises(IngestValidationError):
+                    validate_ingest_batch(make_payload(events=[[timestamp, "humidifier", False, 72.5]]))
+
+    def test_invalid_header_fields(self):
+        with self.assertRaises(IngestValidationError):
+            validate_ingest_batch(make_payload(greenhouse_id=""))
+        with self.assertRaises(IngestValidationError):
+            validate_ingest_batch(make_payload(batch_seq=True))
+
+    def test_unknown_event_device(self):
+        with self.assertRaises(IngestValidationError):
+            validate_ingest_batch(make_payload(events=[["2024-05-19 10:00:30", "chauffage", True, 1.0]]))
+
+    def test_batch_size_limit(self):
+        with self.assertRaises(IngestValidationError):
+            validate_ingest_batch(make_payload(), max_rows=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+# tests/utils/test_logging_setup.py
+import unittest
+from unittest.mock import patch
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import tempfile
+
+from src import config
+from src.utils.logging_setup import (RateLimitFilter, CompressingRotatingFileHandler,
+                                     BatchingQueueListener, configure_logging)
+
+logging.disable(logging.CRITICAL)
+
+
+def make_record(name="src.core.serre_logic", level=logging.INFO, lineno=10, created=0.0, msg="message"):
+    record = logging.LogRecord(name, level, "serre_logic.py", lineno, msg, None, None)
+    record.created = created
+    return record
+
+
+class TestRateLimitFilter(unittest.TestCase):
+
+    def test_repetitive_call_site_is_limited_per_window(self):
+        rate_limit = RateLimitFilter(limit=3, window_seconds=60)
+        admitted = [rate_limit.filter(make_record(created=t)) for t in range(10)]
+        self.assertEqual(admitted, [True] * 3 + [False] * 7)
+        self.assertTrue(rate_limit.filter(make_record(lineno=11, created=5))) # Autre point d'appel
+
+        record = make_record(created=61) # Nouvelle fenêtre: les suppressions sont signalées
+        self.assertTrue(rate_limit.filter(record))
+        self.assertIn("7 message(s) similaire(s) supprimé(s)", record.getMessage())
+
+    def test_critical_and_module_limits(self):
+        rate_limit = RateLimitFilter(limit=1, window_seconds=60,
+                                     module_limits={"src.hardware_interface": 5, "src.hardware_interface.raspberry_pi": 2})
+        self.assertEqual(sum(rate_limit.filter(make_record(level=logging.CRITICAL)) for _ in range(4)), 4)
+        self.assertEqual(sum(rate_limit.filter(make_record(name="src.hardware_interface.raspberry_pi")) for _ in range(4)), 2)
+        self.assertEqual(sum(rate_limit.filter(make_record(name="src.hardware_interface.mock_hardware")) for _ in range(9)), 5)
+
+    def test_one_decision_per_record_when_shared_by_handlers(self):
+        rate_limit = RateLimitFilter(limit=1, window_seconds=60)
+        record = make_record()
+        self.assertTrue(rate_limit.filter(record))
+        self.assertTrue(rate_limit.filter(record)) # Même enregistrement vu par un second handler
+        self.assertFalse(rate_limit.filter(make_record()))
+
+
+class LogFileTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.log_path = os.path.join(self.tmp_dir, "serre.log")
+
+
+class TestCompressingRotatingFileHandler(LogFileTestCase):
+
+    def make_handler(self, **kwargs):
+        handler = CompressingRotatingFileHandler(self.log_path, **{
+            "max_bytes": 0, "max_age_seconds": 0, "backup_count": 3, **kwargs})
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self.addCleanup(handler.close)
+        return handler
+
+    def test_size_rotation_compresses_backups(self):
+        handler = self.make_handler(max_bytes=100)
+        for i in range(10):
+            handler.emit(make_record(msg=f"ligne {i} " + "x" * 30))
+        handler.flush()
+        self.assertTrue(os.path.exists(self.log_path + ".1.gz"))
+        self.assertFalse(os.path.exists(self.log_path + ".1"))
+        with gzip.open(self.log_path + ".1.gz", 'rt') as f:
+            self.assertIn("ligne", f.read())
+
+    def test_age_rotation(self):
+        handler = self.make_handler(max_age_seconds=3600)
+        handler.emit(make_record(msg="avant"))
+        handler._opened_at -= 3600
+        handler.emit(make_record(msg="après"))
+        handler.flush()
+        with open(self.log_path) as f:
+            self.assertEqual(f.read(), "après\n")
+        self.assertTrue(os.path.exists(self.log_path + ".1.gz"))
+
+
+class TestBatchingQueueListener(LogFileTestCase):
+
+    def test_listener_writes_every_record_and_flushes_per_batch(self):
+        handler = CompressingRotatingFileHandler(self.log_path, max_bytes=0, max_age_seconds=0, backup_count=1)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self.addCleanup(handler.close)
+        log_queue = queue.SimpleQueue()
+        for i in range(600):
+            log_queue.put(make_record(msg=f"m{i}"))
+        listener = BatchingQueueListener(log_queue, handler, batch_size=256)
+        with patch.object(handler, 'flush', wraps=handler.flush) as flush:
+            listener.start()
+            listener.stop()
+        self.assertLessEqual(flush.call_count, 4) # 600 enregistrements en 3 lots (+ sentinelle)
+        with open(self.log_path) as f:
+            self.assertEqual(f.read().splitlines(), [f"m{i}" for i in range(600)])
+
+
+class TestConfigureLogging(LogFileTestCase):
+
+    def test_asynchronous_pipeline_end_to_end(self):
+        root_logger = logging.getLogger()
+        saved_handlers, saved_level, saved_disable = root_logger.handlers[:], root_logger.level, logging.root.manager.disable
+        logging.disable(logging.NOTSET)
+
+        def restore():
+            for handler in root_logger.handlers[:]:
+                root_logger.removeHandler(handler)
+            for handler in saved_handlers:
+                root_logger.addHandler(handler)
+            root_logger.setLevel(saved_level)
+            logging.disable(saved_disable)
+        self.addCleanup(restore)
+
+        with patch.object(config, 'LOG_LIMITE_PAR_FENETRE', 2), patch('atexit.register'):
+            listener = configure_logging(logging.INFO, self.log_path, asynchronous=True)
+        self.assertIsInstance(root_logger.handlers[0], logging.handlers.QueueHandler)
+        logger = logging.getLogger("src.tests.logging")
+        for i in range(5):
+            logger.info(f"cycle {i}")
+        try:
+            raise ValueError("capteur")
+        except ValueError:
+            logger.error("Erreur acquisition", exc_info=True)
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+        with open(self.log_path) as f:
+            content = f.read()
+        self.assertIn("cycle 1", content)
+        self.assertNotIn("cycle 2", content) # Limité à 2 par point d'appel
+        self.assertIn("ValueError: capteur", content) # Trace formatée avant la mise en file
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+# tests/utils/test_metrics.py
+import unittest
+import threading
+import logging
+
+from src.utils.metrics import Counter, Histogram, MetricsRegistry
+
+logging.disable(logging.CRITICAL)
+
+
+class TestCounter(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.counter = Counter("essais_total", "Essais.", ("zone",), registry=self.registry)
+
+    def test_shards_of_all_threads_are_summed(self):
+        def work():
+            for _ in range(1000):
+                self.counter.inc("nord")
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.counter.inc("sud", amount=2)
+        self.assertEqual(self.counter.value("nord"), 4000) # Threads terminés: partitions fusionnées
+        self.assertEqual(self.counter.value("nord"), 4000) # Une seule fois
+        self.assertEqual(self.counter.value("sud"), 2)
+
+    def test_dead_thread_shards_are_retired_without_reads(self):
+        for _ in range(50): # Un thread par requête, métriques jamais lues
+            thread = threading.Thread(target=self.counter.inc, args=("nord",))
+            thread.start()
+            thread.join()
+        self.assertLessEqual(len(self.counter._shards), 1) # Seule la partition du dernier thread
+        self.assertEqual(self.counter.value("nord"), 50)
+
+    def test_exposition_format(self):
+        self.assertEqual(self.registry.render(), "") # Métrique sans valeur: omise
+        self.counter.inc('est "1"')
+        self.assertEqual(self.registry.render(),
+                         '# HELP serre_essais_total Essais.\n'
+                         '# TYPE serre_essais_total counter\n'
+                         'serre_essais_total{zone="est \\"1\\""} 1\n')
+
+    def test_duplicate_name_is_rejected(self):
+        with self.assertRaises(ValueError):
+            Counter("essais_total", "Doublon.", registry=self.registry)
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_cumulative_buckets_sum_and_count(self):
+        registry = MetricsRegistry()
+        histogram = Histogram("duree_secondes", "Durée.", buckets=(0.1, 1.0), registry=registry)
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        thread = threading.Thread(target=histogram.observe, args=(0.2,))
+        thread.start()
+        thread.join()
+        self.assertEqual(histogram.count(), 5)
+        self.assertEqual(histogram.samples(), [
+            'serre_duree_secondes_bucket{le="0.1"} 2',
+            'serre_duree_secondes_bucket{le="1"} 4',
+            'serre_duree_secondes_bucket{le="+Inf"} 5',
+            'serre_duree_secondes_sum 3.85',
+            'serre_duree_secondes_count 5',
+        ])
+
+    def test_timer_observes_block_duration(self):
+        histogram = Histogram("bloc_secondes", "Bloc.", ("zone",), registry=None)
+        with histogram.time("nord"):
+            pass
+        self.assertEqual(histogram.count("nord"), 1)
+        self.assertEqual(histogram.count("sud"), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
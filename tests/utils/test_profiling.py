@@ -0,0 +1,88 @@
+# tests/utils/test_profiling.py
+import unittest
+import threading
+import tracemalloc
+import logging
+
+from src import config
+from src.utils import profiling
+from src.utils.profiling import MemoryTracker, ProfilingStateError, collapsed, sample_stacks
+
+logging.disable(logging.CRITICAL)
+
+
+def attente_capteur(stop: threading.Event):
+    while not stop.is_set():
+        stop.wait(0.001)
+
+
+class TestSampleStacks(unittest.TestCase):
+
+    def setUp(self):
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=attente_capteur, args=(self.stop,), name="SensorAcquisitionThread")
+        self.thread.start()
+        self.addCleanup(self.thread.join)
+        self.addCleanup(self.stop.set)
+
+    def test_collapsed_stacks_of_named_thread(self):
+        profile = sample_stacks(0.2, frequency=200, threads=["SensorAcquisition"])
+        self.assertGreater(profile["echantillons"], 5)
+        self.assertTrue(profile["piles"])
+        for stack in profile["piles"]:
+            self.assertTrue(stack.startswith("SensorAcquisitionThread;"))
+        self.assertTrue(any("attente_capteur (tests/utils/test_profiling.py:" in stack for stack in profile["piles"]))
+        lines = collapsed(profile).splitlines()
+        self.assertEqual(sum(int(line.rsplit(" ", 1)[1]) for line in lines), sum(profile["piles"].values()))
+
+    def test_one_profile_at_a_time(self):
+        with profiling._profile_lock:
+            with self.assertRaises(ProfilingStateError):
+                sample_stacks(0.1)
+
+    def test_limits(self):
+        with self.assertRaises(ValueError):
+            sample_stacks(config.PROFILAGE_DUREE_MAX_SECONDES + 1)
+        with self.assertRaises(ValueError):
+            sample_stacks(0.1, frequency=config.PROFILAGE_FREQUENCE_MAX_HZ + 1)
+
+    def test_request_threads_are_grouped_by_role(self):
+        self.assertEqual(profiling._thread_label("Thread-12 (process_request_thread)"), "Thread (process_request_thread)")
+
+
+class TestMemoryTracker(unittest.TestCase):
+
+    def setUp(self):
+        if tracemalloc.is_tracing():
+            self.skipTest("tracemalloc déjà actif")
+        self.tracker = MemoryTracker()
+        self.addCleanup(lambda: tracemalloc.is_tracing() and tracemalloc.stop())
+
+    def test_snapshot_reports_growth_since_previous(self):
+        with self.assertRaises(ProfilingStateError):
+            self.tracker.snapshot()
+        self.assertTrue(self.tracker.start(frames=1)["actif"])
+        with self.assertRaises(ProfilingStateError):
+            self.tracker.start()
+        buffer = [bytearray(1024) for _ in range(200)] # Croissance à localiser
+        report = self.tracker.snapshot(limit=5)
+        self.assertEqual(report["reference"], profiling.REFERENCE_PREVIOUS)
+        top = report["differences"][0]
+        self.assertTrue(top["emplacement"].startswith("tests/utils/test_profiling.py:"))
+        self.assertGreaterEqual(top["difference_octets"], 200 * 1024)
+        # Rien de nouveau depuis l'instantané précédent, mais toujours présent depuis le début
+        again = self.tracker.snapshot(limit=5)
+        self.assertFalse([d for d in again["differences"] if d["difference_octets"] >= 200 * 1024])
+        since_start = self.tracker.snapshot(limit=5, reference=profiling.REFERENCE_START)
+        self.assertGreaterEqual(since_start["differences"][0]["difference_octets"], 200 * 1024)
+        del buffer
+        self.assertFalse(self.tracker.stop()["actif"])
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_invalid_key_type(self):
+        with self.assertRaises(ValueError):
+            self.tracker.snapshot(key_type="module")
+
+
+if __name__ == '__main__':
+    unittest.main()
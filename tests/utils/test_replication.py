@@ -0,0 +1,155 @@
+# tests/utils/test_replication.py
+import unittest
+from unittest.mock import MagicMock
+import os
+import csv
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+import logging
+
+from src.utils.replication import (
+    LocalSensorStore, ReplicationAgent, PostgresSink,
+    encode_batch, decode_batch, BATCH_COLUMNS
+)
+
+logging.disable(logging.CRITICAL)
+
+
+def make_record(minute_offset: int, humidity: float = 80.0):
+    """Construit un enregistrement dans l'ordre de SENSOR_DATA_COLUMNS."""
+    return (datetime(2024, 5, 19, 10, 0, 0) + timedelta(minutes=minute_offset),
+            21.5, humidity, 800.0, True, False, True, 12.0, None, None, 30.0)
+
+
+class FakeSink:
+    """Destination en mémoire; peut simuler une panne."""
+    def __init__(self):
+        self.payloads = []
+        self.fail = False
+
+    def send(self, payload):
+        if self.fail:
+            raise ConnectionError("base centrale injoignable")
+        self.payloads.append(payload)
+        return 0
+
+
+class TestLocalSensorStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = LocalSensorStore(os.path.join(self.tmp_dir, "local.sqlite3"))
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_append_and_read_by_sequence(self):
+        self.store.append_records([make_record(i) for i in range(5)])
+        rows = self.store.read_batch(after_seq=0, limit=3)
+        self.assertEqual([row[0] for row in rows], [1, 2, 3])
+        rows = self.store.read_batch(after_seq=3, limit=10)
+        self.assertEqual([row[0] for row in rows], [4, 5])
+        self.assertEqual(rows[0][1], "2024-05-19 10:03:00")
+
+    def test_checkpoint_persists(self):
+        self.assertEqual(self.store.get_checkpoint("central"), 0)
+        self.store.set_checkpoint("central", 42)
+        self.store.set_checkpoint("central", 43)
+        self.assertEqual(self.store.get_checkpoint("central"), 43)
+
+    def test_sequence_stays_monotonic_after_purge(self):
+        self.store.append_records([make_record(0), make_record(1)])
+        self.store.purge_up_to(2)
+        self.store.append_records([make_record(2)])
+        self.assertEqual(self.store.read_batch(0, 10)[0][0], 3)
+
+
+class TestBatchEncoding(unittest.TestCase):
+
+    def test_encode_decode_roundtrip(self):
+        rows = [(7,) + ("2024-05-19 10:00:00",) + make_record(0)[1:]]
+        payload = encode_batch("serre-07", rows)
+        decoded = list(csv.reader(decode_batch(payload)))
+        self.assertEqual(tuple(decoded[0]), BATCH_COLUMNS)
+        self.assertEqual(decoded[1][:3], ["serre-07", "7", "2024-05-19 10:00:00"])
+        self.assertEqual(decoded[1][BATCH_COLUMNS.index("humidifier_active")], "t")
+        self.assertEqual(decoded[1][BATCH_COLUMNS.index("humidifier_off_duration_seconds")], "")
+
+    def test_payload_is_compressed(self):
+        rows = [(i, "2024-05-19 10:00:00") + make_record(0)[1:] for i in range(1, 500)]
+        payload = encode_batch("serre-01", rows)
+        self.assertLess(len(payload), len(decode_batch(payload).getvalue()) / 4)
+
+
+class TestReplicationAgent(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = LocalSensorStore(os.path.join(self.tmp_dir, "local.sqlite3"))
+        self.sink = FakeSink()
+        self.agent = ReplicationAgent(self.store, self.sink, greenhouse_id="serre-01",
+                                      batch_size=4, interval_seconds=1)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_replicate_once_ships_in_batches_and_advances_checkpoint(self):
+        self.store.append_records([make_record(i) for i in range(10)])
+        shipped = self.agent.replicate_once()
+        self.assertEqual(shipped, 10)
+        self.assertEqual(len(self.sink.payloads), 3) # 4 + 4 + 2
+        self.assertEqual(self.store.get_checkpoint(ReplicationAgent.CHECKPOINT_NAME), 10)
+        self.assertEqual(self.agent.replicate_once(), 0)
+
+    def test_resume_after_outage_without_rescanning(self):
+        self.store.append_records([make_record(i) for i in range(4)])
+        self.agent.replicate_once()
+        self.sink.fail = True
+        self.store.append_records([make_record(i) for i in range(4, 6)])
+        with self.assertRaises(ConnectionError):
+            self.agent.replicate_once()
+        self.assertEqual(self.store.get_checkpoint(ReplicationAgent.CHECKPOINT_NAME), 4)
+        self.assertEqual(self.agent.get_status()["pending_rows"], 2)
+
+        self.sink.fail = False
+        self.assertEqual(self.agent.replicate_once(), 2)
+        last_batch = list(csv.reader(decode_batch(self.sink.payloads[-1])))
+        self.assertEqual([row[1] for row in last_batch[1:]], ["5", "6"])
+
+    def test_backoff_is_bounded(self):
+        self.agent.max_backoff_seconds = 5
+        self.agent._consecutive_failures = 10
+        self.assertEqual(self.agent._next_wait(), 5)
+
+
+class TestPostgresSink(unittest.TestCase):
+
+    def test_send_copies_then_upserts_in_one_transaction(self):
+        sink = PostgresSink(db_config={})
+        mock_conn = MagicMock(closed=False)
+        mock_cursor = mock_conn.cursor.return_value.__enter__.return_value
+        sink._conn = mock_conn
+
+        sink.send(encode_batch("serre-01", [(1, "2024-05-19 10:00:00") + make_record(0)[1:]]))
+
+        mock_cursor.copy_expert.assert_called_once()
+        upsert_sql = mock_cursor.execute.call_args_list[-1][0][0]
+        self.assertIn("ON CONFLICT (greenhouse_id, timestamp) DO UPDATE", upsert_sql)
+        mock_conn.commit.assert_called_once()
+
+    def test_send_rolls_back_on_error(self):
+        sink = PostgresSink(db_config={})
+        mock_conn = MagicMock(closed=False)
+        mock_conn.cursor.return_value.__enter__.return_value.copy_expert.side_effect = RuntimeError("boom")
+        sink._conn = mock_conn
+        with self.assertRaises(RuntimeError):
+            sink.send(encode_batch("serre-01", []))
+        mock_conn.rollback.assert_called_once()
+        mock_conn.commit.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+# tests/utils/test_retention.py
+import unittest
+from unittest.mock import MagicMock, PropertyMock, patch
+from datetime import datetime
+import logging
+
+from src.utils.retention import RetentionManager
+
+logging.disable(logging.CRITICAL)
+
+
+class TestRetentionManager(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_pool = MagicMock()
+        self.mock_conn = self.mock_pool.getconn.return_value
+        self.mock_cursor = self.mock_conn.cursor.return_value.__enter__.return_value
+        self.manager = RetentionManager(self.mock_pool, raw_retention_days=30, rollup_retention_days=365,
+                                        batch_size=100, pause_seconds=0, max_batches_per_run=5)
+
+    def test_delete_in_batches_stops_on_partial_batch(self):
+        type(self.mock_cursor).rowcount = PropertyMock(side_effect=[100, 100, 42])
+        deleted = self.manager.delete_in_batches("sensor_data", "timestamp", datetime(2024, 1, 1))
+        self.assertEqual(deleted, 242)
+        self.assertEqual(self.mock_conn.commit.call_count, 3) # Une transaction courte par lot
+        self.assertEqual(self.mock_pool.putconn.call_count, 3)
+        self.assertIn("LIMIT %s", self.mock_cursor.execute.call_args[0][0])
+
+    def test_delete_in_batches_is_bounded_per_run(self):
+        type(self.mock_cursor).rowcount = PropertyMock(return_value=100)
+        deleted = self.manager.delete_in_batches("sensor_data", "timestamp", datetime(2024, 1, 1))
+        self.assertEqual(deleted, 500)
+
+    def test_drop_only_expired_partitions(self):
+        self.mock_cursor.fetchall.return_value = [
+            ("sensor_data_2024_01", "FOR VALUES FROM ('2024-01-01 00:00:00') TO ('2024-02-01 00:00:00')"),
+            ("sensor_data_2024_02", "FOR VALUES FROM ('2024-02-01 00:00:00') TO ('2024-03-01 00:00:00')"),
+        ]
+        dropped = self.manager.drop_expired_partitions(datetime(2024, 2, 15))
+        self.assertEqual(dropped, ["sensor_data_2024_01"])
+        executed = [c[0][0] for c in self.mock_cursor.execute.call_args_list]
+        self.assertIn('ALTER TABLE sensor_data DETACH PARTITION "sensor_data_2024_01"', executed)
+        self.assertNotIn('DROP TABLE "sensor_data_2024_02"', executed)
+
+    def test_rollup_starts_after_last_aggregated_hour(self):
+        self.mock_cursor.fetchone.return_value = (datetime(2024, 5, 19, 8, 0),)
+        self.manager.rollup_complete_hours(datetime(2024, 5, 19, 10, 17))
+        sql, params = self.mock_cursor.execute.call_args[0]
+        self.assertIn("ON CONFLICT (hour)", sql)
+        self.assertEqual(params, (datetime(2024, 5, 19, 8, 0), datetime(2024, 5, 19, 10, 0)))
+
+    def test_run_once_vacuums_only_after_deleting_raw_rows(self):
+        with patch.object(self.manager, 'rollup_complete_hours', return_value=2), \
+             patch.object(self.manager, 'drop_expired_partitions', return_value=[]), \
+             patch.object(self.manager, 'delete_in_batches', side_effect=[0, 0]), \
+             patch.object(self.manager, '_vacuum') as mock_vacuum:
+            summary = self.manager.run_once(datetime(2024, 5, 19))
+        mock_vacuum.assert_not_called()
+        self.assertEqual(summary["hours_rolled_up"], 2)
+        self.assertIs(self.manager.last_run_summary, summary)
+
+    def test_failed_vacuum_restores_autocommit_before_release(self):
+        self.mock_conn.autocommit = False
+        self.mock_cursor.execute.side_effect = Exception("lock timeout")
+        self.manager._vacuum("sensor_data") # Échec journalisé, non propagé
+        self.assertFalse(self.mock_conn.autocommit)
+        self.mock_pool.putconn.assert_called_once_with(self.mock_conn)
+
+
+if __name__ == '__main__':
+    unittest.main()